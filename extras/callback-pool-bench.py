@@ -0,0 +1,107 @@
+"""
+Throughput benchmark of the callback process pool (CALLBACK_POOL_SIZE).
+
+Pages of the server of the scrapy bench command are crawled with a
+CPU-bound callback, that parses every page --work times with selectors and
+a link extractor, first in the main process and then in pools of worker
+processes of increasing size.
+
+The pool can only help on machines with more than one CPU.
+
+usage:
+
+    python extras/callback-pool-bench.py [--pages 1000] [--work 20]
+        [--sizes 2,4]
+
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+import scrapy
+from scrapy.commands.bench import _BenchServer
+from scrapy.crawler import CrawlerProcess
+from scrapy.linkextractors import LinkExtractor
+
+
+class BenchSpider(scrapy.Spider):
+    name = "callback_pool_bench"
+    link_extractor = LinkExtractor()
+
+    def __init__(self, pages=1000, work=20, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.work = work
+
+    def start_requests(self):
+        qargs = {"total": self.pages * 10, "show": 20}
+        url = f"http://localhost:8998/?{urlencode(qargs)}"
+        yield scrapy.Request(url)
+
+    def parse(self, response):
+        for _ in range(self.work):
+            selector = scrapy.Selector(text=response.text)
+            selector.css("a::attr(href)").getall()
+            links = self.link_extractor.extract_links(response)
+        for link in links:
+            yield response.follow(link, callback=self.parse)
+        yield {"url": response.url}
+
+
+def run(pages, work, size):
+    process = CrawlerProcess(
+        settings={
+            "LOG_LEVEL": "WARNING",
+            "CLOSESPIDER_ITEMCOUNT": pages,
+            "CONCURRENT_REQUESTS": 32,
+            "CALLBACK_POOL_SIZE": size,
+            "CALLBACK_POOL_CALLBACKS": ["parse"],
+        },
+        install_root_handler=False,
+    )
+    crawler = process.create_crawler(BenchSpider)
+    process.crawl(crawler, pages=pages, work=work)
+    start = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - start
+    return crawler.stats.get_value("item_scraped_count", 0), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--work", type=int, default=20)
+    parser.add_argument("--sizes", default="2,4")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.size is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        items, elapsed = run(args.pages, args.work, args.size)
+        print(
+            f"CALLBACK_POOL_SIZE={args.size}: {items} pages in {elapsed:.2f}s "
+            f"({items / elapsed:.1f} pages/s)"
+        )
+        return
+
+    print(f"{os.cpu_count()} CPUs")
+    with _BenchServer():
+        for size in [0] + [int(size) for size in args.sizes.split(",")]:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--pages={args.pages}",
+                    f"--work={args.work}",
+                    f"--size={size}",
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
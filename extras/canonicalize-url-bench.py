@@ -0,0 +1,87 @@
+"""
+Benchmark of the canonical URL cache (CANONICALIZE_URL_CACHE_SIZE).
+
+Pages are downloaded from the server of the scrapy bench command, following
+links the same way its spider does. Then, for every page, links are
+extracted and the resulting requests are fingerprinted, with and without the
+cache.
+
+Links of the bench server never repeat across pages, so --navigation links,
+the same on every page, are added to each page, like the site-wide
+navigation links of real websites.
+
+usage:
+
+    python extras/canonicalize-url-bench.py [--pages 2000] [--navigation 20]
+
+"""
+
+import argparse
+import time
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from scrapy import Request
+from scrapy.commands.bench import _BenchServer
+from scrapy.http import HtmlResponse
+from scrapy.linkextractors import LinkExtractor
+from scrapy.utils.test import get_crawler
+from scrapy.utils.url import canonical_url_cache
+
+
+def download(pages, navigation):
+    url = "http://localhost:8998/?" + urlencode({"total": 10000, "show": 20})
+    menu = "".join(
+        f"<a href='/section/{i}'>section {i}</a>" for i in range(navigation)
+    ).encode()
+    queue, seen, responses = [url], {url}, []
+    link_extractor = LinkExtractor()
+    with _BenchServer():
+        while queue and len(responses) < pages:
+            url = queue.pop(0)
+            with urlopen(url) as f:
+                body = f.read().replace(b"<body>", b"<body>" + menu, 1)
+                response = HtmlResponse(url, body=body)
+            responses.append(response)
+            for link in link_extractor.extract_links(response):
+                if "/follow" in link.url and link.url not in seen:
+                    seen.add(link.url)
+                    queue.append(link.url)
+    return responses
+
+
+def run(responses, limit):
+    settings = {"REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7"}
+    fingerprinter = get_crawler(settings_dict=settings).request_fingerprinter
+    canonical_url_cache.clear()
+    canonical_url_cache.resize(limit)
+    canonical_url_cache.hits = canonical_url_cache.misses = 0
+    link_extractor = LinkExtractor(unique=True)
+    start = time.perf_counter()
+    for response in responses:
+        for link in link_extractor.extract_links(response):
+            fingerprinter.fingerprint(Request(link.url))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--navigation", type=int, default=20)
+    args = parser.parse_args()
+
+    responses = download(args.pages, args.navigation)
+    print(f"{len(responses)} pages")
+    for limit in (0, 1000, 10000, 100000):
+        elapsed = run(responses, limit)
+        lookups = canonical_url_cache.hits + canonical_url_cache.misses
+        hit_ratio = canonical_url_cache.hits / lookups if lookups else 0
+        print(
+            f"CANONICALIZE_URL_CACHE_SIZE={limit:>6}: {elapsed:.3f}s "
+            f"({len(responses) / elapsed:.0f} pages/s, "
+            f"{hit_ratio:.0%} hit ratio)"
+        )
+
+
+if __name__ == "__main__":
+    main()
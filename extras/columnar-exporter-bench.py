@@ -0,0 +1,99 @@
+"""
+Benchmark of the columnar item exporters (Parquet and Arrow) against
+JsonLinesItemExporter.
+
+Product-like items are exported to a temporary file with every exporter,
+reporting the export speed in items per second and the size of the output.
+
+usage:
+
+    python extras/columnar-exporter-bench.py [--items 200000]
+        [--row-group-size 10000]
+
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import scrapy
+from scrapy.exporters import (
+    ArrowItemExporter,
+    JsonLinesItemExporter,
+    ParquetItemExporter,
+)
+
+WORDS = (
+    "color tv dvd player laptop phone tablet camera speaker headphones "
+    "keyboard mouse monitor printer router charger cable case stand"
+).split()
+
+
+class Product(scrapy.Item):
+    url = scrapy.Field()
+    name = scrapy.Field()
+    price = scrapy.Field()
+    stock = scrapy.Field()
+    tags = scrapy.Field()
+    updated = scrapy.Field()
+
+
+def get_items(count):
+    rng = random.Random(0)
+    start = datetime(2023, 1, 1)
+    for i in range(count):
+        yield Product(
+            url=f"https://example.com/product/{i}",
+            name=" ".join(rng.choices(WORDS, k=3)).title(),
+            price=round(rng.uniform(1, 2000), 2),
+            stock=rng.randrange(100),
+            tags=rng.sample(WORDS, 3),
+            updated=start + timedelta(seconds=rng.randrange(10**7)),
+        )
+
+
+def run(exporter_cls, items, path, **kwargs):
+    with path.open("wb") as file:
+        start = time.perf_counter()
+        exporter = exporter_cls(file, **kwargs)
+        exporter.start_exporting()
+        for item in items:
+            exporter.export_item(item)
+        exporter.finish_exporting()
+        elapsed = time.perf_counter() - start
+    return elapsed, path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--row-group-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    items = list(get_items(args.items))
+    columnar = {"row_group_size": args.row_group_size}
+    exporters = [
+        ("jsonlines", JsonLinesItemExporter, {}),
+        ("parquet (snappy)", ParquetItemExporter, columnar),
+        ("parquet (zstd)", ParquetItemExporter, {"compression": "zstd", **columnar}),
+        ("arrow", ArrowItemExporter, columnar),
+        ("arrow (zstd)", ArrowItemExporter, {"compression": "zstd", **columnar}),
+    ]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        jsonlines_size = None
+        for name, exporter_cls, kwargs in exporters:
+            path = Path(tmpdir, name)
+            elapsed, size = run(exporter_cls, items, path, **kwargs)
+            jsonlines_size = jsonlines_size or size
+            print(
+                f"{name:<18} {len(items) / elapsed:>10.0f} items/s "
+                f"{size / 1024 ** 2:>8.2f} MiB "
+                f"({size / jsonlines_size:.0%} of jsonlines)"
+            )
+
+
+if __name__ == "__main__":
+    main()
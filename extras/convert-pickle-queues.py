@@ -0,0 +1,79 @@
+"""
+Convert the scheduler disk queues of a job directory from
+scrapy.squeues.PickleFifoDiskQueue or scrapy.squeues.PickleLifoDiskQueue to
+scrapy.squeues.BinaryFifoDiskQueue or scrapy.squeues.BinaryLifoDiskQueue.
+
+The job must not be running. Once converted, resume it with the matching
+SCHEDULER_DISK_QUEUE setting.
+
+usage:
+
+    python extras/convert-pickle-queues.py JOBDIR
+
+"""
+
+import argparse
+import json
+import pickle
+import shutil
+from pathlib import Path
+
+from queuelib.queue import FifoDiskQueue, LifoDiskQueue
+
+from scrapy.squeues import (
+    _BinaryFifoSerializationDiskQueue,
+    _BinaryLifoSerializationDiskQueue,
+)
+
+
+def find_queues(path):
+    """Yield (path, is_fifo) for every pickle queue found under path."""
+    for child in sorted(Path(path).iterdir()):
+        if child.is_file():
+            if child.name != "active.json":
+                yield child, False
+        elif (child / "info.json").exists():
+            info = json.loads((child / "info.json").read_text(encoding="utf-8"))
+            if "chunksize" in info:
+                yield child, True
+        else:
+            yield from find_queues(child)
+
+
+def convert(path, fifo):
+    if fifo:
+        source, target_cls = FifoDiskQueue(path), _BinaryFifoSerializationDiskQueue
+        requests = iter(source.pop, None)
+    else:
+        source, target_cls = LifoDiskQueue(path), _BinaryLifoSerializationDiskQueue
+        # pushed again from the bottom of the stack to keep the pop order
+        requests = reversed([data for data in iter(source.pop, None)])
+    converted = path.with_name(path.name + ".binary")
+    target = target_cls(converted)
+    count = 0
+    for data in requests:
+        target.push(pickle.loads(data))
+        count += 1
+    target.close()
+    source.close()  # empty, so it removes its own files
+    if converted.exists():
+        shutil.move(str(converted), str(path))
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("jobdir")
+    args = parser.parse_args()
+
+    queue_dir = Path(args.jobdir, "requests.queue")
+    if not queue_dir.exists():
+        parser.error(f"{queue_dir} does not exist")
+    for path, fifo in list(find_queues(queue_dir)):
+        count = convert(path, fifo)
+        kind = "FIFO" if fifo else "LIFO"
+        print(f"{path}: {count} requests ({kind})")
+
+
+if __name__ == "__main__":
+    main()
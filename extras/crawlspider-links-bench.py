@@ -0,0 +1,126 @@
+"""
+Benchmark of the link extraction of CrawlSpider rules.
+
+A product listing page with --links links (categories, products, pagination,
+media files and external sites) is passed to a CrawlSpider with --rules rules,
+which extract links with a link extractor each, one after another, and then
+all at once (the way CrawlSpider does it).
+
+usage:
+
+    python extras/crawlspider-links-bench.py [--links 5000] [--rules 15]
+        [--pages 20]
+
+"""
+
+import argparse
+import random
+import time
+
+from scrapy.http import HtmlResponse
+from scrapy.linkextractors import LinkExtractor
+from scrapy.linkextractors.lxmlhtml import _LxmlLinkExtractorSet
+from scrapy.spiders import CrawlSpider, Rule
+
+SECTIONS = ["phones", "laptops", "tablets", "cameras", "audio", "tv", "games"]
+
+
+def get_body(links, seed):
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Products</title></head><body>"]
+    parts.append('<div id="menu">')
+    for section in SECTIONS:
+        parts.append(f'<a href="/category/{section}/">{section.title()}</a>')
+    parts.append('</div><div id="products">')
+    for i in range(links):
+        kind = rng.random()
+        section = rng.choice(SECTIONS)
+        if kind < 0.6:
+            href = f"/product/{section}/{rng.randrange(10**6)}.html?ref=list"
+        elif kind < 0.7:
+            href = f"/category/{section}/?page={rng.randrange(100)}"
+        elif kind < 0.8:
+            href = f"/media/{section}/{rng.randrange(10**6)}.jpg"
+        elif kind < 0.9:
+            href = f"https://partner{rng.randrange(20)}.example.net/{section}"
+        else:
+            href = f"/reviews/{section}/{rng.randrange(10**4)}#comments"
+        parts.append(f'<div class="item"><a href="{href}">Item {i}</a></div>')
+    parts.append('</div><div id="footer"><a href="/about">About</a></div>')
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+
+def get_rules(count):
+    rules = [
+        Rule(LinkExtractor(allow=r"/product/", deny=r"ref=ads"), callback="parse"),
+        Rule(LinkExtractor(allow=r"/category/", restrict_xpaths='//div[@id="menu"]')),
+        Rule(LinkExtractor(allow=r"page=\d+")),
+        Rule(LinkExtractor(allow=r"/reviews/"), callback="parse"),
+        Rule(LinkExtractor(allow_domains=["example.net"]), follow=False),
+    ]
+    for i in range(len(rules), count):
+        section = SECTIONS[i % len(SECTIONS)]
+        rules.append(
+            Rule(
+                LinkExtractor(
+                    allow=(rf"/product/{section}/\d+", rf"/category/{section}/"),
+                    deny=(r"\?page=9\d",),
+                    deny_domains=["example.net"],
+                ),
+                callback="parse",
+            )
+        )
+    return rules[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=15)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    class BenchSpider(CrawlSpider):
+        name = "bench"
+        rules = get_rules(args.rules)
+
+        def parse(self, response):
+            pass
+
+    spider = BenchSpider()
+    link_extractors = [rule.link_extractor for rule in spider._rules]
+    extractor_set = _LxmlLinkExtractorSet(link_extractors)
+    pages = [
+        HtmlResponse(f"https://shop.example.com/list/{i}", body=get_body(args.links, i))
+        for i in range(args.pages)
+    ]
+    for page in pages:
+        page.selector  # parse outside of the measured time
+
+    runs = {
+        "one rule at a time": lambda response: [
+            le.extract_links(response) for le in link_extractors
+        ],
+        "all rules at once": extractor_set.extract_links,
+    }
+    for name, extract in runs.items():
+        start = time.perf_counter()
+        links = sum(len(links) for page in pages for links in extract(page))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<20} {elapsed / len(pages) * 1000:>8.1f} ms/page "
+            f"({links / len(pages):.0f} links/page from {args.rules} rules)"
+        )
+
+    start = time.perf_counter()
+    requests = sum(len(list(spider._requests_to_follow(page))) for page in pages)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'_requests_to_follow':<20} {elapsed / len(pages) * 1000:>8.1f} ms/page "
+        f"({requests / len(pages):.0f} requests/page)"
+    )
+
+
+if __name__ == "__main__":
+    main()
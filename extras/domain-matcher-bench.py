@@ -0,0 +1,124 @@
+"""
+Benchmark of the matching of hosts against large lists of allowed domains.
+
+For every --domains count, the domains are matched against hosts of allowed
+domains, of their subdomains and of other sites:
+
+* by OffsiteMiddleware, with the alternation regex of get_host_regex() (only
+  up to --max-baseline domains, as compiling it takes minutes beyond that) and
+  with the DomainSet it builds when the spider is opened;
+
+* by url_is_from_any_domain(), as used by link extractors, with a list of
+  domains (only up to --max-baseline domains) and with a DomainSet.
+
+usage:
+
+    python extras/domain-matcher-bench.py [--domains 1000,100000,1000000]
+        [--hosts 10000] [--max-baseline 100000]
+
+"""
+
+import argparse
+import random
+import time
+from urllib.parse import urlparse
+
+from scrapy.spidermiddlewares.offsite import OffsiteMiddleware
+from scrapy.spiders import Spider
+from scrapy.utils.url import DomainSet, url_is_from_any_domain
+
+TLDS = ["com", "net", "org", "co.uk", "de", "fr", "io"]
+BUDGET = 2.0  # seconds of lookups per measure
+
+
+def get_domains(count):
+    return [f"site{i}.{TLDS[i % len(TLDS)]}" for i in range(count)]
+
+
+def get_urls(domains, count, seed):
+    rng = random.Random(seed)
+    urls = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            host = rng.choice(domains)
+        elif kind == 1:
+            host = f"www.shop.{rng.choice(domains)}"
+        else:
+            host = f"www.other{rng.randrange(10**6)}.example"
+        urls.append(f"https://{host}/path/{i}.html")
+    return urls
+
+
+def measure(match, items):
+    """Return the mean time of a match() call, in microseconds, and the
+    number of matching items, stopping after BUDGET seconds."""
+    matched = calls = 0
+    start = time.perf_counter()
+    for item in items:
+        matched += bool(match(item))
+        calls += 1
+        if not calls % 100 and time.perf_counter() - start > BUDGET:
+            break
+    elapsed = time.perf_counter() - start
+    return elapsed / calls * 1e6, matched / calls
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def report(name, build_time, lookup, ratio):
+    print(
+        f"  {name:<34} build {build_time * 1000:>10.1f} ms, "
+        f"match {lookup:>10.2f} us ({ratio:.0%} matched)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--domains", default="1000,100000,1000000")
+    parser.add_argument("--hosts", type=int, default=10000)
+    parser.add_argument("--max-baseline", type=int, default=100000)
+    args = parser.parse_args()
+
+    for count in (int(value) for value in args.domains.split(",")):
+        print(f"{count} domains:")
+        domains = get_domains(count)
+        urls = get_urls(domains, args.hosts, count)
+        hosts = [urlparse(url).hostname for url in urls]
+        spider = Spider("bench", allowed_domains=domains)
+        mw = OffsiteMiddleware(None)
+
+        if count <= args.max_baseline:
+            regex, build_time = timed(lambda: mw.get_host_regex(spider))
+            report(
+                "offsite, host regex",
+                build_time,
+                *measure(regex.search, hosts),
+            )
+        allowed, build_time = timed(lambda: mw.get_allowed_domains(spider))
+        report(
+            "offsite, DomainSet",
+            build_time,
+            *measure(allowed.matches, hosts),
+        )
+
+        if count <= args.max_baseline:
+            report(
+                "url_is_from_any_domain, list",
+                0,
+                *measure(lambda url: url_is_from_any_domain(url, domains), urls),
+            )
+        domain_set, build_time = timed(lambda: DomainSet(domains))
+        report(
+            "url_is_from_any_domain, DomainSet",
+            build_time,
+            *measure(lambda url: url_is_from_any_domain(url, domain_set), urls),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark of scrapy.pqueues.DownloaderAwarePriorityQueue against the previous
+implementation, which checked the active downloads of every slot with queued
+requests on each pop.
+
+Requests are spread over a synthetic set of domains following a Zipf-like
+distribution, and a fake downloader keeps a fixed number of downloads in
+flight.
+
+usage:
+
+    python extras/downloader-aware-pqueue-bench.py [--domains 50000]
+        [--requests 200000] [--concurrency 100]
+
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections import deque
+
+from scrapy import Request, Spider, signals
+from scrapy.pqueues import DownloaderAwarePriorityQueue
+from scrapy.squeues import FifoMemoryQueue
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.test import get_crawler
+
+
+class FullScanPriorityQueue(DownloaderAwarePriorityQueue):
+    """DownloaderAwarePriorityQueue as it was before slots were indexed."""
+
+    def pop(self):
+        stats = self._downloader_interface.stats(self.pqueues)
+        if not stats:
+            return
+        slot = min(stats)[1]
+        queue = self.pqueues[slot]
+        request = queue.pop()
+        if len(queue) == 0:
+            del self.pqueues[slot]
+        return request
+
+
+class FakeSlot:
+    def __init__(self):
+        self.active = set()
+
+
+class FakeDownloader:
+    def __init__(self):
+        self.slots = {}
+
+    def _get_slot_key(self, request, spider):
+        return urlparse_cached(request).hostname or ""
+
+
+class FakeEngine:
+    def __init__(self):
+        self.downloader = FakeDownloader()
+
+
+def run(queue_cls, requests, concurrency):
+    crawler = get_crawler(Spider)
+    crawler.engine = FakeEngine()
+    downloader = crawler.engine.downloader
+    queue = queue_cls.from_crawler(crawler, FifoMemoryQueue, tempfile.mkdtemp())
+    in_flight = deque()
+    start = time.perf_counter()
+    for request in requests:
+        queue.push(request)
+    while True:
+        request = queue.pop()
+        if request is None:
+            break
+        key = downloader._get_slot_key(request, None)
+        downloader.slots.setdefault(key, FakeSlot()).active.add(request)
+        crawler.signals.send_catch_log(
+            signals.request_reached_downloader, request=request, spider=None
+        )
+        in_flight.append((key, request))
+        if len(in_flight) >= concurrency:
+            key, request = in_flight.popleft()
+            crawler.signals.send_catch_log(
+                signals.request_left_downloader, request=request, spider=None
+            )
+            downloader.slots[key].active.remove(request)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--domains", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(args.domains)]
+    domains = rnd.choices(range(args.domains), weights=weights, k=args.requests)
+    requests = [
+        Request(f"http://domain{domain}.example/{i}")
+        for i, domain in enumerate(domains)
+    ]
+    print(f"{len(set(domains))} distinct domains, {len(requests)} requests")
+    for queue_cls in (FullScanPriorityQueue, DownloaderAwarePriorityQueue):
+        elapsed = run(queue_cls, requests, args.concurrency)
+        print(
+            f"{queue_cls.__name__:>28}: {elapsed:.3f}s "
+            f"({len(requests) / elapsed:.0f} requests/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
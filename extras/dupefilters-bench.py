@@ -0,0 +1,96 @@
+"""
+Memory and throughput benchmark of scrapy.dupefilters.CompactRFPDupeFilter
+against scrapy.dupefilters.RFPDupeFilter.
+
+Fingerprints are computed before the benchmark starts, so that only the
+dupefilters are measured. Half of the lookups are duplicates.
+
+usage:
+
+    python extras/dupefilters-bench.py [--requests 1000000] [--jobdir]
+
+"""
+
+import argparse
+import gc
+import hashlib
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from scrapy.dupefilters import CompactRFPDupeFilter, RFPDupeFilter
+
+
+class FakeRequest:
+    __slots__ = ("fingerprint",)
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+
+
+class PrecomputedFingerprinter:
+    def fingerprint(self, request):
+        return request.fingerprint
+
+
+def fill(dupefilter_cls, requests, path):
+    df = dupefilter_cls(path, fingerprinter=PrecomputedFingerprinter())
+    for request in requests:
+        df.request_seen(request)
+    for request in requests[::2]:
+        df.request_seen(request)
+    return df
+
+
+def run(dupefilter_cls, requests, jobdir):
+    path = tempfile.mkdtemp() if jobdir else None
+    try:
+        start = time.perf_counter()
+        df = fill(dupefilter_cls, requests, path)
+        elapsed = time.perf_counter() - start
+        df.close("finished")
+        if path:
+            shutil.rmtree(path)
+            path = tempfile.mkdtemp()
+
+        # tracemalloc slows allocations down, so memory is measured apart
+        gc.collect()
+        tracemalloc.start()
+        df = fill(dupefilter_cls, requests, path)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        df.close("finished")
+
+        start = time.perf_counter()
+        df = dupefilter_cls(path, fingerprinter=PrecomputedFingerprinter())
+        resume = time.perf_counter() - start
+        df.close("finished")
+    finally:
+        if path:
+            shutil.rmtree(path)
+    return elapsed, memory, resume
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--jobdir", action="store_true")
+    args = parser.parse_args()
+
+    requests = [
+        FakeRequest(hashlib.sha1(b"http://example.com/%d" % i).digest())
+        for i in range(args.requests)
+    ]
+    lookups = len(requests) * 1.5
+    for dupefilter_cls in (RFPDupeFilter, CompactRFPDupeFilter):
+        elapsed, memory, resume = run(dupefilter_cls, requests, args.jobdir)
+        print(
+            f"{dupefilter_cls.__name__:>20}: {lookups / elapsed:.0f} lookups/s, "
+            f"{memory / len(requests):.1f} bytes/fingerprint"
+            + (f", resumed in {resume:.3f}s" if args.jobdir else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
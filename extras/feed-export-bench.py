@@ -0,0 +1,86 @@
+"""
+Benchmark of the item export path of the feed exports.
+
+Items are passed to the feed exports extension, exporting them to several
+feeds at once (JSON, JSON lines and CSV files by default), with and without
+the buffering of FEED_EXPORT_BUFFER_ITEM_COUNT.
+
+usage:
+
+    python extras/feed-export-bench.py [--items 100000]
+        [--formats json,jsonlines,csv] [--buffer-item-counts 0,100,1000]
+
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import scrapy
+from scrapy.extensions.feedexport import FeedExporter
+from scrapy.utils.defer import deferred_from_coro
+from scrapy.utils.test import get_crawler
+
+
+class Product(scrapy.Item):
+    url = scrapy.Field()
+    name = scrapy.Field()
+    price = scrapy.Field()
+    stock = scrapy.Field()
+    tags = scrapy.Field()
+
+
+def get_items(count):
+    for i in range(count):
+        yield Product(
+            url=f"https://example.com/product/{i}",
+            name=f"Product {i}",
+            price=i / 100,
+            stock=i % 100,
+            tags=["electronics", "sale"],
+        )
+
+
+def run(items, formats, buffer_item_count, tmpdir):
+    feeds = {
+        Path(tmpdir, f"items.{format}").as_uri(): {"format": format}
+        for format in formats
+    }
+    crawler = get_crawler(
+        settings_dict={
+            "FEEDS": feeds,
+            "FEED_EXPORT_BUFFER_ITEM_COUNT": buffer_item_count,
+            "FEED_EXPORT_BUFFER_TIMEOUT": 0,
+        }
+    )
+    crawler.spider = crawler._create_spider("bench")
+    exporter = FeedExporter.from_crawler(crawler)
+    exporter.open_spider(crawler.spider)
+    start = time.perf_counter()
+    for item in items:
+        exporter.item_scraped(item, crawler.spider)
+    deferred_from_coro(exporter.close_spider(crawler.spider))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--formats", default="json,jsonlines,csv")
+    parser.add_argument("--buffer-item-counts", default="0,100,1000")
+    args = parser.parse_args()
+
+    items = list(get_items(args.items))
+    formats = args.formats.split(",")
+    for buffer_item_count in args.buffer_item_counts.split(","):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            elapsed = run(items, formats, int(buffer_item_count), tmpdir)
+        print(
+            f"FEED_EXPORT_BUFFER_ITEM_COUNT={buffer_item_count}: "
+            f"{len(items) / elapsed:.0f} items/s to {len(formats)} feeds"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark of the checks of files already stored by FilesPipeline.
+
+An S3-compatible stand-in server (tests/s3server.py), answering after
+--latency milliseconds like a remote object store, holds --stored percent of
+the files of --files media requests. FilesPipeline checks if every file is
+already stored, first with a stat_file() call per file, then with the calls
+batched (MEDIA_STORE_STAT_BATCH_SIZE), and then answered from a manifest of
+the listed store directories (MEDIA_STORE_MANIFEST), without and with
+batching.
+
+usage:
+
+    python extras/files-store-stat-bench.py [--files 5000] [--stored 95]
+        [--latency 20]
+
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scrapy.http import Request
+from scrapy.pipelines.files import FilesPipeline
+from scrapy.utils.test import get_crawler
+
+ROOT = Path(__file__).resolve().parent.parent
+CONCURRENCY = 100
+
+RUNS = {
+    "one by one": {},
+    "batched": {"MEDIA_STORE_STAT_BATCH_SIZE": 100},
+    "manifest": {"MEDIA_STORE_MANIFEST": True},
+    "batched, manifest": {
+        "MEDIA_STORE_STAT_BATCH_SIZE": 100,
+        "MEDIA_STORE_MANIFEST": True,
+    },
+}
+
+
+def get_requests(files):
+    return [Request(f"https://example.com/images/{i}.jpg") for i in range(files)]
+
+
+def run(files, endpoint_url, settings):
+    from twisted.internet import defer, reactor
+
+    crawler = get_crawler(
+        settings_dict={
+            "FILES_STORE": "s3://bench/files/",
+            "AWS_ACCESS_KEY_ID": "access_key",
+            "AWS_SECRET_ACCESS_KEY": "secret_key",
+            "AWS_ENDPOINT_URL": endpoint_url,
+            "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
+            **settings,
+        }
+    )
+    pipeline = FilesPipeline.from_crawler(crawler)
+    pipeline.open_spider(crawler._create_spider("bench"))
+    semaphore = defer.DeferredSemaphore(CONCURRENCY)
+    result = {}
+
+    @defer.inlineCallbacks
+    def check():
+        start = time.perf_counter()
+        results = yield defer.gatherResults(
+            [
+                semaphore.run(pipeline.media_to_download, request, pipeline.spiderinfo)
+                for request in get_requests(files)
+            ]
+        )
+        result["elapsed"] = time.perf_counter() - start
+        result["stored"] = sum(1 for r in results if r is not None)
+        reactor.stop()
+
+    reactor.callWhenRunning(check)
+    reactor.run()
+    return result["elapsed"], result["stored"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--stored", type=float, default=95)
+    parser.add_argument("--latency", type=float, default=20)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoint-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        elapsed, stored = run(args.files, args.endpoint_url, RUNS[args.run])
+        print(
+            f"{args.run:<18} {args.files / elapsed:>8.0f} files/s "
+            f"({stored} already stored)"
+        )
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        pipeline = FilesPipeline(directory)
+        for i, request in enumerate(get_requests(args.files)):
+            if i % 100 < args.stored:
+                path = Path(directory, "bench", "files", pipeline.file_path(request))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(request.url.encode())
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-u",
+                "-m",
+                "tests.s3server",
+                f"--directory={directory}",
+                f"--latency={args.latency}",
+            ],
+            stdout=subprocess.PIPE,
+            cwd=ROOT,
+        )
+        try:
+            endpoint_url = server.stdout.readline().strip().decode("ascii")
+            for name in RUNS:
+                subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        f"--files={args.files}",
+                        f"--run={name}",
+                        f"--endpoint-url={endpoint_url}",
+                    ],
+                    check=True,
+                )
+        finally:
+            server.kill()
+            server.communicate()
+
+
+if __name__ == "__main__":
+    main()
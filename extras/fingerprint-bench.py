@@ -0,0 +1,91 @@
+"""
+Benchmark of scrapy.utils.request.StreamingRequestFingerprinter against
+scrapy.utils.request.RequestFingerprinter.
+
+Each request is fingerprinted once by the duplicate filter, once by the HTTP
+cache middleware and once by a media pipeline, as happens in a crawl that
+enables all of them.
+
+usage:
+
+    python extras/fingerprint-bench.py [--requests 100000]
+
+"""
+
+import argparse
+import time
+
+from scrapy import Request
+from scrapy.utils.request import RequestFingerprinter, StreamingRequestFingerprinter
+from scrapy.utils.test import get_crawler
+
+CONSUMERS = ("dupefilter", "httpcache", "media pipeline")
+
+
+def run(settings, requests):
+    fingerprinter = get_crawler(settings_dict=settings).request_fingerprinter
+    start = time.perf_counter()
+    for request in requests:
+        for _ in CONSUMERS:
+            fingerprinter.fingerprint(request)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    try:
+        import xxhash  # noqa: F401
+    except ImportError:
+        hash_names = ("sha1", "blake2b")
+    else:
+        hash_names = ("sha1", "blake2b", "xxhash")
+    configurations = [
+        (
+            f"RequestFingerprinter {implementation}",
+            {
+                "REQUEST_FINGERPRINTER_CLASS": RequestFingerprinter,
+                "REQUEST_FINGERPRINTER_IMPLEMENTATION": implementation,
+            },
+        )
+        for implementation in ("2.6", "2.7")
+    ]
+    configurations += [
+        (
+            f"Streaming, {compatibility} compatibility",
+            {
+                "REQUEST_FINGERPRINTER_CLASS": StreamingRequestFingerprinter,
+                "REQUEST_FINGERPRINTER_COMPATIBILITY": compatibility,
+            },
+        )
+        for compatibility in ("2.6", "2.7")
+    ]
+    configurations += [
+        (
+            f"Streaming, {hash_name}",
+            {
+                "REQUEST_FINGERPRINTER_CLASS": StreamingRequestFingerprinter,
+                "REQUEST_FINGERPRINTER_HASH": hash_name,
+            },
+        )
+        for hash_name in hash_names
+    ]
+    for name, settings in configurations:
+        # new requests each run, so that no fingerprint is cached beforehand
+        requests = [
+            Request(
+                f"http://www.example{i % 100}.com/product/{i}?ref=listing&page=2",
+                headers={"Referer": f"http://www.example{i % 100}.com/"},
+            )
+            for i in range(args.requests)
+        ]
+        elapsed = run(settings, requests)
+        print(
+            f"{name:>32}: {elapsed:.3f}s " f"({len(requests) / elapsed:.0f} requests/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
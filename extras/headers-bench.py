@@ -0,0 +1,121 @@
+"""
+Benchmark of the construction of, and the access to, HTTP headers.
+
+Measures, per response or request, with typical browser-like request
+headers and --headers response headers (including 3 Set-Cookie headers):
+
+* building the Headers of a response from the raw headers of a Twisted
+  response, as the HTTP/1.1 download handler does (twice, for the
+  headers_received signal and for the response itself), and the response;
+
+* the header lookups of the default downloader middlewares
+  (cookies, compression, redirect, http cache) on the response;
+
+* copying and replacing a request, which copies its headers, and the header
+  changes of the default downloader middlewares on the request.
+
+usage:
+
+    python extras/headers-bench.py [--headers 15] [--iterations 20000]
+
+"""
+
+import argparse
+import time
+
+from twisted.web.http_headers import Headers as TxHeaders
+
+from scrapy import Request
+from scrapy.core.downloader.handlers.http11 import ScrapyAgent
+from scrapy.http import HtmlResponse
+
+REQUEST_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en",
+    "User-Agent": "Scrapy/2.9.0 (+https://scrapy.org)",
+    "Referer": "https://example.com/",
+}
+
+
+class TxResponse:
+    def __init__(self, headers):
+        self.headers = headers
+        self.length = 1024
+
+
+def get_raw_headers(count):
+    raw = {
+        b"content-type": [b"text/html; charset=utf-8"],
+        b"content-encoding": [b"gzip"],
+        b"set-cookie": [f"c{i}=v{i}; Path=/; HttpOnly".encode() for i in range(3)],
+        b"cache-control": [b"private, max-age=0"],
+        b"date": [b"Sun, 18 Oct 2026 07:00:00 GMT"],
+        b"server": [b"nginx"],
+        b"vary": [b"Accept-Encoding"],
+    }
+    for i in range(len(raw), count):
+        raw[f"x-custom-header-{i}".encode()] = [f"value {i}".encode()]
+    return raw
+
+
+def build_response(txresponse, request):
+    ScrapyAgent._headers_from_twisted_response(txresponse)  # headers_received
+    return HtmlResponse(
+        "https://example.com/",
+        headers=ScrapyAgent._headers_from_twisted_response(txresponse),
+        body=b"",
+        request=request,
+    )
+
+
+def access_response(response):
+    headers = response.headers
+    headers.getlist("Set-Cookie")
+    headers.getlist("Content-Encoding")
+    headers.get("Content-Type")
+    "Location" in headers
+    headers.get("Cache-Control")
+    headers.get(b"Expires")
+    headers.get(b"Last-Modified")
+    headers.get(b"ETag")
+
+
+def access_request(request):
+    headers = request.headers
+    for name, value in (
+        (b"Accept", b"*/*"),
+        (b"Accept-Language", b"en"),
+        (b"User-Agent", b"Scrapy"),
+        (b"Accept-Encoding", b"gzip, deflate"),
+    ):
+        headers.setdefault(name, value)
+    headers.get("Cookie")
+    "Authorization" in headers
+    request.copy()
+    request.replace(url="https://example.com/next")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headers", type=int, default=15)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    txresponse = TxResponse(TxHeaders(get_raw_headers(args.headers)))
+    request = Request("https://example.com/", headers=REQUEST_HEADERS)
+    response = build_response(txresponse, request)
+    runs = {
+        "response construction": lambda: build_response(txresponse, request),
+        "response header access": lambda: access_response(response),
+        "request copy and access": lambda: access_request(request),
+    }
+    for name, run in runs.items():
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<25} {elapsed / args.iterations * 1e6:>7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark of the connection pool and TLS session reuse of the HTTP/1.1
+download handler.
+
+Requests are sent to the HTTPS mock server of the test suite
+(tests/mockserver.py), --concurrency at a time:
+
+* with ``Connection: close``, so that every request opens a new connection,
+  with full and with resumed TLS handshakes
+  (DOWNLOADER_CLIENT_TLS_SESSION_REUSE);
+
+* with persistent connections, keeping as many idle connections to the host
+  as its concurrency in DOWNLOAD_SLOTS.
+
+usage:
+
+    python extras/http11-pool-bench.py [--requests 2000] [--concurrency 32]
+
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from scrapy import Request, Spider
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from scrapy.utils.misc import create_instance
+from scrapy.utils.test import get_crawler
+
+ROOT = Path(__file__).resolve().parent.parent
+HOST = "127.0.0.1"
+
+RUNS = {
+    "close, full handshakes": (
+        {"DOWNLOADER_CLIENT_TLS_SESSION_REUSE": False},
+        {"Connection": "close"},
+    ),
+    "close, resumed handshakes": ({}, {"Connection": "close"}),
+    "keep-alive": (None, {}),
+}
+
+
+def run(requests, concurrency, url, settings, headers):
+    from twisted.internet import defer, reactor
+
+    if settings is None:
+        settings = {"DOWNLOAD_SLOTS": {HOST: {"concurrency": concurrency}}}
+    crawler = get_crawler(settings_dict=settings)
+    crawler.stats.open_spider(None)
+    handler = create_instance(HTTP11DownloadHandler, None, crawler)
+    spider = Spider("bench")
+    semaphore = defer.DeferredSemaphore(concurrency)
+    result = {}
+
+    @defer.inlineCallbacks
+    def crawl():
+        start = time.perf_counter()
+        yield defer.gatherResults(
+            [
+                semaphore.run(
+                    handler.download_request, Request(url, headers=headers), spider
+                )
+                for _ in range(requests)
+            ]
+        )
+        result["elapsed"] = time.perf_counter() - start
+        yield handler.close()
+        reactor.stop()
+
+    reactor.callWhenRunning(crawl)
+    reactor.run()
+    return result["elapsed"], crawler.stats.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        elapsed, stats = run(args.requests, args.concurrency, args.url, *RUNS[args.run])
+        print(
+            f"{args.run:<30} {args.requests / elapsed:>7.0f} requests/s, "
+            f"{stats.get('downloader/pool/connections_new', 0):>5} connections, "
+            f"{stats.get('downloader/tls/handshakes/resumed', 0):>5} resumed"
+        )
+        return
+
+    server = subprocess.Popen(
+        [sys.executable, "-u", "-m", "tests.mockserver", "-t", "http"],
+        stdout=subprocess.PIPE,
+        cwd=ROOT,
+    )
+    try:
+        server.stdout.readline()  # HTTP address
+        port = server.stdout.readline().strip().decode("ascii").rsplit(":", 1)[1]
+        url = f"https://{HOST}:{port}/status?n=200"
+        for name in RUNS:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--requests={args.requests}",
+                    f"--concurrency={args.concurrency}",
+                    f"--run={name}",
+                    f"--url={url}",
+                ],
+                check=True,
+            )
+    finally:
+        server.kill()
+        server.communicate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Size and speed benchmark of the codecs of HTTPCACHE_COMPRESSION.
+
+Bodies of a sample corpus, either the files of --corpus or generated HTML
+pages that share their layout like the pages of a website do, are compressed
+and decompressed with each codec. The first half of the corpus is compressed
+first, which trains the zstd dictionary if it is large enough (about 100
+times HTTPCACHE_ZSTD_DICT_SIZE), and only the second half is measured.
+
+usage:
+
+    python extras/httpcache-compression-bench.py [--corpus DIR]
+        [--pages 8000] [--level -1]
+
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from scrapy.extensions.httpcache import _BodyCodec, zstandard
+from scrapy.http import Headers
+from scrapy.settings import Settings
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+
+def generate_page(i):
+    nav = "".join(
+        f'<li class="nav-item"><a class="nav-link" href="/category/{n}">'
+        f"Category {n}</a></li>"
+        for n in range(30)
+    )
+    paragraphs = "".join(
+        "<p>" + " ".join(random.choices(WORDS, k=random.randint(30, 80))) + "</p>"
+        for _ in range(random.randint(3, 12))
+    )
+    price = random.randint(1, 10000) / 100
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>Product {i} | Example Store</title>"
+        '<link rel="stylesheet" href="/static/css/main.css">'
+        '<script src="/static/js/app.js" defer></script></head><body>'
+        f'<header class="site-header"><ul class="nav">{nav}</ul></header>'
+        f'<main><article class="product" data-id="{i}"><h1>Product {i}</h1>'
+        f'<span class="price">${price}</span>{paragraphs}</article></main>'
+        '<footer class="site-footer"><p>© Example Store. All rights reserved.'
+        "</p></footer></body></html>"
+    ).encode()
+
+
+def bench(name, settings, bodies):
+    headers = Headers({"Content-Type": "text/html; charset=utf-8"})
+    with tempfile.TemporaryDirectory() as path:
+        codec = _BodyCodec(Settings(settings))
+        codec.open(Path(path))
+        half = len(bodies) // 2
+        for body in bodies[:half]:
+            codec.compress(body, headers)
+        measured = bodies[half:]
+
+        start = time.perf_counter()
+        stored = [codec.compress(body, headers) for body in measured]
+        compress_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for used, data in stored:
+            codec.decompress(used, data)
+        decode_time = time.perf_counter() - start
+
+    ratio = sum(map(len, measured)) / sum(len(data) for _, data in stored)
+    print(
+        f"{name:<12} {ratio:>8.2f} "
+        f"{compress_time / len(measured) * 1e6:>14.1f} "
+        f"{decode_time / len(measured) * 1e6:>12.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory of files to compress")
+    parser.add_argument("--pages", type=int, default=8000)
+    parser.add_argument("--level", type=int, default=-1)
+    args = parser.parse_args()
+
+    if args.corpus:
+        bodies = [p.read_bytes() for p in sorted(Path(args.corpus).rglob("*"))]
+        bodies = [body for body in bodies if body]
+    else:
+        random.seed(0)
+        bodies = [generate_page(i) for i in range(args.pages)]
+    print(
+        f"{len(bodies)} bodies, "
+        f"{sum(map(len, bodies)) / len(bodies) / 1024:.1f} KiB on average"
+    )
+
+    print(f"{'codec':<12} {'ratio':>8} {'compress µs':>14} {'decode µs':>12}")
+    level = {"HTTPCACHE_COMPRESSION_LEVEL": args.level}
+    bench("gzip", {"HTTPCACHE_COMPRESSION": "gzip", **level}, bodies)
+    bench("lzma", {"HTTPCACHE_COMPRESSION": "lzma", **level}, bodies)
+    if zstandard is None:
+        print("zstandard is not installed, skipping zstd")
+        return
+    zstd = {"HTTPCACHE_COMPRESSION": "zstd", **level}
+    bench("zstd", {**zstd, "HTTPCACHE_ZSTD_DICT_SIZE": 0}, bodies)
+    bench("zstd+dict", {**zstd, "HTTPCACHE_ZSTD_DICT_SIZE": 112640}, bodies)
+
+
+if __name__ == "__main__":
+    main()
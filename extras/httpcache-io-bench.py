@@ -0,0 +1,133 @@
+"""
+Reactor latency benchmark of HTTP cache I/O (HTTPCACHE_THREADS).
+
+Pages of the server of the scrapy bench command are crawled with an empty
+(cold) HTTP cache, whose storage sleeps --delay milliseconds on every
+lookup and store, like a slow network file system would take. While
+crawling, a timer measures how late the Twisted reactor runs it, first with
+the storage called from the reactor thread and then from thread pools of
+increasing size.
+
+usage:
+
+    python extras/httpcache-io-bench.py [--pages 500] [--delay 20]
+        [--threads 1,4]
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+import scrapy
+from scrapy.commands.bench import _BenchServer
+from scrapy.crawler import CrawlerProcess
+from scrapy.extensions.httpcache import FilesystemCacheStorage
+from scrapy.linkextractors import LinkExtractor
+
+PROBE_INTERVAL = 0.01
+
+
+class SlowStorage(FilesystemCacheStorage):
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.delay = settings.getfloat("BENCH_STORAGE_DELAY")
+
+    def retrieve_response(self, spider, request):
+        time.sleep(self.delay)
+        return super().retrieve_response(spider, request)
+
+    def store_response(self, spider, request, response):
+        time.sleep(self.delay)
+        return super().store_response(spider, request, response)
+
+
+class BenchSpider(scrapy.Spider):
+    name = "httpcache_io_bench"
+    link_extractor = LinkExtractor()
+
+    def start_requests(self):
+        qargs = {"total": 100000, "show": 5}
+        yield scrapy.Request(f"http://localhost:8998/?{urlencode(qargs)}")
+
+    def parse(self, response):
+        for link in self.link_extractor.extract_links(response):
+            yield response.follow(link)
+
+
+def run(pages, delay, threads):
+    with tempfile.TemporaryDirectory() as cachedir:
+        process = CrawlerProcess(
+            settings={
+                "LOG_LEVEL": "WARNING",
+                "CLOSESPIDER_PAGECOUNT": pages,
+                "CONCURRENT_REQUESTS": 32,
+                "HTTPCACHE_ENABLED": True,
+                "HTTPCACHE_DIR": cachedir,
+                "HTTPCACHE_STORAGE": f"{__name__}.SlowStorage",
+                "HTTPCACHE_THREADS": threads,
+                "BENCH_STORAGE_DELAY": delay / 1000,
+                "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
+            },
+            install_root_handler=False,
+        )
+        crawler = process.create_crawler(BenchSpider)
+        process.crawl(crawler)
+
+        from twisted.internet import reactor, task
+
+        lags = []
+        last = [time.perf_counter()]
+
+        def probe():
+            now = time.perf_counter()
+            lags.append(max(0.0, now - last[0] - PROBE_INTERVAL))
+            last[0] = now
+
+        reactor.callWhenRunning(task.LoopingCall(probe).start, PROBE_INTERVAL)
+        start = time.perf_counter()
+        process.start()
+        elapsed = time.perf_counter() - start
+    pages = crawler.stats.get_value("response_received_count", 0)
+    return pages, elapsed, sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=20)
+    parser.add_argument("--threads", default="1,4")
+    parser.add_argument("--run-threads", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_threads is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        pages, elapsed, lags = run(args.pages, args.delay, args.run_threads)
+        print(
+            f"HTTPCACHE_THREADS={args.run_threads}: {pages / elapsed:.1f} pages/s, "
+            f"reactor lag mean {statistics.mean(lags) * 1000:.1f} ms, "
+            f"p99 {lags[int(len(lags) * 0.99)] * 1000:.1f} ms, "
+            f"max {lags[-1] * 1000:.1f} ms"
+        )
+        return
+
+    with _BenchServer():
+        for threads in [0] + [int(threads) for threads in args.threads.split(",")]:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--pages={args.pages}",
+                    f"--delay={args.delay}",
+                    f"--run-threads={threads}",
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
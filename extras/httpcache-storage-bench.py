@@ -0,0 +1,137 @@
+"""
+Benchmark of the HTTP cache storage backends: write throughput, cold lookup
+latency and disk usage.
+
+Responses with random HTML bodies are stored in each backend, then the cache
+is closed, evicted from the page cache of the OS where possible
+(posix_fadvise), reopened and random responses are looked up.
+
+usage:
+
+    python extras/httpcache-storage-bench.py [--responses 20000]
+        [--body-size 15000] [--lookups 2000]
+
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from scrapy import Request, Spider
+from scrapy.http import HtmlResponse
+from scrapy.settings import Settings
+from scrapy.utils.misc import load_object
+from scrapy.utils.test import get_crawler
+
+STORAGES = [
+    "scrapy.extensions.httpcache.FilesystemCacheStorage",
+    "scrapy.extensions.httpcache.DbmCacheStorage",
+    "scrapy.extensions.httpcache.SegmentCacheStorage",
+]
+
+
+def make_body(size):
+    words = [b"<p>lorem</p>", b"ipsum", b"<a href='/x'>dolor</a>", b"sit", b"amet"]
+    body = bytearray(b"<html><body>")
+    while len(body) < size:
+        body += random.choice(words) + b" "
+    return bytes(body) + b"</body></html>"
+
+
+def disk_usage(path):
+    """Return the disk usage in bytes and the number of inodes of *path*."""
+    usage, inodes = 0, 0
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            inodes += 1
+            usage += os.lstat(os.path.join(root, name)).st_blocks * 512
+    return usage, inodes
+
+
+def evict(path):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    os.sync()
+    for root, _, files in os.walk(path):
+        for name in files:
+            with open(os.path.join(root, name), "rb") as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def bench(storage_path, responses, lookups):
+    cachedir = tempfile.mkdtemp()
+    try:
+        settings = Settings(
+            {
+                "HTTPCACHE_DIR": cachedir,
+                "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
+            }
+        )
+        crawler = get_crawler(Spider, settings.copy_to_dict())
+        spider = crawler._create_spider("bench")
+        storage_cls = load_object(storage_path)
+
+        storage = storage_cls(crawler.settings)
+        storage.open_spider(spider)
+        start = time.perf_counter()
+        for request, response in responses:
+            storage.store_response(spider, request, response)
+        storage.close_spider(spider)
+        write_time = time.perf_counter() - start
+
+        evict(cachedir)
+        storage = storage_cls(crawler.settings)
+        storage.open_spider(spider)
+        latencies = []
+        for request, response in random.sample(responses, lookups):
+            start = time.perf_counter()
+            cached = storage.retrieve_response(spider, request)
+            latencies.append(time.perf_counter() - start)
+            assert cached.body == response.body
+        storage.close_spider(spider)
+
+        usage, inodes = disk_usage(cachedir)
+    finally:
+        shutil.rmtree(cachedir)
+    latencies.sort()
+    print(
+        f"{storage_cls.__name__:<24} {len(responses) / write_time:>10.0f} "
+        f"{statistics.mean(latencies) * 1e6:>10.0f} "
+        f"{latencies[int(len(latencies) * 0.99)] * 1e6:>10.0f} "
+        f"{usage / 2**20:>10.1f} {inodes:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=20000)
+    parser.add_argument("--body-size", type=int, default=15000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    bodies = [make_body(args.body_size) for _ in range(100)]
+    responses = []
+    for i in range(args.responses):
+        url = f"https://example.com/page/{i}"
+        response = HtmlResponse(
+            url,
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            body=bodies[i % len(bodies)],
+        )
+        responses.append((Request(url), response))
+
+    print(
+        f"{'storage':<24} {'writes/s':>10} {'lookup µs':>10} {'p99 µs':>10} "
+        f"{'disk MiB':>10} {'inodes':>8}"
+    )
+    for storage_path in STORAGES:
+        bench(storage_path, responses, min(args.lookups, args.responses))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark of response decompression.
+
+Large gzip and brotli response bodies are fed to a decoder in chunks of the
+size that download handlers receive, and peak memory usage and time are
+compared between:
+
+- buffering the compressed body and decompressing it at once, as
+  HttpCompressionMiddleware used to do,
+- decompressing each chunk as it is received, as download handlers do now
+  for requests that go through HttpCompressionMiddleware, and
+- doing so with DOWNLOAD_SPOOLSIZE set to --spoolsize, so that the
+  decompressed body is moved to a temporary file.
+
+usage:
+
+    python extras/httpcompression-bench.py [--size 100] [--chunk-size 65536]
+        [--spoolsize 1048576]
+
+"""
+
+import argparse
+import gzip
+import os
+import time
+import tracemalloc
+
+from scrapy.utils._compression import _decode, _get_decoder
+from scrapy.utils.spool import BodyBuffer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def make_body(size):
+    # Repetitive HTML-like data that compresses about as well as real pages
+    row = b"<tr><td class='name'>%d</td><td>%s</td></tr>\n"
+    rows, length, i = [], 0, 0
+    while length < size:
+        rows.append(row % (i, os.urandom(8).hex().encode()))
+        length += len(rows[-1])
+        i += 1
+    return b"".join(rows)[:size]
+
+
+def chunks(data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
+
+
+def buffered(data, encoding, chunk_size):
+    buffer = BodyBuffer()
+    for chunk in chunks(data, chunk_size):
+        buffer.write(chunk)
+    return len(_decode(buffer.getvalue(), encoding))
+
+
+def incremental(data, encoding, chunk_size, spoolsize=0):
+    buffer = BodyBuffer(spoolsize, decoder=_get_decoder(encoding))
+    for chunk in chunks(data, chunk_size):
+        buffer.write(chunk)
+    return len(buffer.getvalue())
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--size", type=int, default=100, help="decompressed size, in MiB"
+    )
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--spoolsize", type=int, default=1024 * 1024)
+    args = parser.parse_args()
+
+    body = make_body(args.size * 1024 * 1024)
+    compressed = {b"gzip": gzip.compress(body)}
+    if brotli is not None:
+        compressed[b"br"] = brotli.compress(body, quality=5)
+    del body
+
+    for encoding, data in compressed.items():
+        print(f"{encoding.decode()}: {len(data) / 2**20:.1f} MiB compressed")
+        for name, func, extra_args in (
+            ("buffered", buffered, ()),
+            ("incremental", incremental, ()),
+            ("spooled", incremental, (args.spoolsize,)),
+        ):
+            size, elapsed, peak = measure(
+                func, data, encoding, args.chunk_size, *extra_args
+            )
+            print(
+                f"  {name:>11}: {elapsed:.3f}s, "
+                f"peak {peak / 2**20:.1f} MiB for {size / 2**20:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark of the image processing of the images pipeline (IMAGES_THREADS).
+
+Downloaded JPEG images are passed to ImagesPipeline, which stores them and
+their thumbnails in a temporary directory, first from the reactor thread
+(with and without decoding the thumbnails source at a reduced scale) and then
+from thread pools of increasing size. While processing, a timer measures how
+late the Twisted reactor runs it.
+
+usage:
+
+    python extras/images-pipeline-bench.py [--images 200] [--size 1600x1200]
+        [--threads 2,4]
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from scrapy.http import Request, Response
+from scrapy.pipelines.images import ImagesPipeline
+from scrapy.settings import Settings
+
+PROBE_INTERVAL = 0.01
+CONCURRENCY = 16
+THUMBS = {"small": (50, 50), "big": (270, 270)}
+
+
+class FullDecodeImagesPipeline(ImagesPipeline):
+    def _draft_thumb_source(self, body):
+        image = self._Image.open(BytesIO(body))
+        image.load()
+        return image
+
+
+def get_body(size):
+    image = Image.new("RGB", size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    width, height = size
+    for i in range(0, width, 20):
+        draw.line([(i, 0), (width - i, height)], fill=(i % 256, 64, 128), width=3)
+    buf = BytesIO()
+    image.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def run(images, body, threads, draft):
+    from twisted.internet import defer, reactor, task
+
+    pipeline_cls = ImagesPipeline if draft else FullDecodeImagesPipeline
+    with tempfile.TemporaryDirectory() as tmpdir:
+        settings = Settings({"IMAGES_THREADS": threads, "IMAGES_THUMBS": THUMBS})
+        pipeline = pipeline_cls(tmpdir, settings=settings)
+        pipeline.open_spider(None)
+        semaphore = defer.DeferredSemaphore(CONCURRENCY)
+
+        def process(i):
+            # Like downloads, every image is processed in its own reactor call
+            url = f"https://example.com/image/{i}.jpg"
+            return task.deferLater(
+                reactor,
+                0,
+                pipeline.image_downloaded,
+                Response(url, body=body),
+                Request(url),
+                pipeline.spiderinfo,
+            )
+
+        lags = []
+        last = [time.perf_counter()]
+
+        def probe():
+            now = time.perf_counter()
+            lags.append(max(0.0, now - last[0] - PROBE_INTERVAL))
+            last[0] = now
+
+        result = {}
+
+        @defer.inlineCallbacks
+        def crawl():
+            probe_task = task.LoopingCall(probe)
+            probe_task.start(PROBE_INTERVAL)
+            start = time.perf_counter()
+            yield defer.gatherResults(
+                [semaphore.run(process, i) for i in range(images)],
+                consumeErrors=True,
+            )
+            result["elapsed"] = time.perf_counter() - start
+            probe_task.stop()
+            pipeline.close_spider(None)
+            reactor.stop()
+
+        reactor.callWhenRunning(crawl)
+        reactor.run()
+    return result["elapsed"], sorted(lags)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--size", default="1600x1200")
+    parser.add_argument("--threads", default="2,4")
+    parser.add_argument("--run-threads", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--run-no-draft", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_threads is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        size = tuple(int(value) for value in args.size.split("x"))
+        elapsed, lags = run(
+            args.images, get_body(size), args.run_threads, not args.run_no_draft
+        )
+        name = f"IMAGES_THREADS={args.run_threads}"
+        if args.run_no_draft:
+            name += " (full decode)"
+        print(
+            f"{name:<30} {args.images / elapsed:>6.1f} images/s, "
+            f"reactor lag mean {statistics.mean(lags) * 1000:.1f} ms, "
+            f"p99 {lags[int(len(lags) * 0.99)] * 1000:.1f} ms, "
+            f"max {lags[-1] * 1000:.1f} ms"
+        )
+        return
+
+    runs = [["--run-threads=0", "--run-no-draft"], ["--run-threads=0"]]
+    runs += [[f"--run-threads={threads}"] for threads in args.threads.split(",")]
+    for run_args in runs:
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                f"--images={args.images}",
+                f"--size={args.size}",
+                *run_args,
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Microbenchmark of scrapy.pqueues.ScrapyPriorityQueue against the previous
+implementation, which rescanned every priority bucket whenever one of them
+became empty.
+
+usage:
+
+    python extras/pqueues-bench.py [--priorities 10000] [--requests 100000]
+
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+from scrapy import Request, Spider
+from scrapy.pqueues import ScrapyPriorityQueue
+from scrapy.squeues import FifoMemoryQueue
+from scrapy.utils.test import get_crawler
+
+
+class LinearScanPriorityQueue(ScrapyPriorityQueue):
+    """ScrapyPriorityQueue as it was before priorities were kept in a heap."""
+
+    def __init__(self, crawler, downstream_queue_cls, key, startprios=()):
+        self.crawler = crawler
+        self.downstream_queue_cls = downstream_queue_cls
+        self.key = key
+        self.queues = {}
+        self._curprio = None
+        for priority in startprios:
+            self.queues[priority] = self.qfactory(priority)
+        if startprios:
+            self._curprio = min(startprios)
+
+    @property
+    def curprio(self):
+        return self._curprio
+
+    def push(self, request):
+        priority = self.priority(request)
+        if priority not in self.queues:
+            self.queues[priority] = self.qfactory(priority)
+        self.queues[priority].push(request)
+        if self._curprio is None or priority < self._curprio:
+            self._curprio = priority
+
+    def pop(self):
+        if self._curprio is None:
+            return
+        q = self.queues[self._curprio]
+        m = q.pop()
+        if not q:
+            del self.queues[self._curprio]
+            q.close()
+            prios = [p for p, q in self.queues.items() if q]
+            self._curprio = min(prios) if prios else None
+        return m
+
+
+def run(queue_cls, requests):
+    crawler = get_crawler(Spider)
+    queue = queue_cls.from_crawler(crawler, FifoMemoryQueue, tempfile.mkdtemp())
+    start = time.perf_counter()
+    for request in requests:
+        queue.push(request)
+    # interleave pops and pushes, like a crawl does
+    for i, request in enumerate(requests):
+        queue.pop()
+        if i % 2:
+            queue.push(request)
+    while queue.pop() is not None:
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--priorities", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    requests = [
+        Request(f"http://example.com/{i}", priority=rnd.randrange(args.priorities))
+        for i in range(args.requests)
+    ]
+    for queue_cls in (LinearScanPriorityQueue, ScrapyPriorityQueue):
+        elapsed = run(queue_cls, requests)
+        print(
+            f"{queue_cls.__name__:>25}: {elapsed:.3f}s "
+            f"({len(requests) * 2.5 / elapsed:.0f} ops/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
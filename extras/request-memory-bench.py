@@ -0,0 +1,90 @@
+"""
+Benchmark of the memory used by requests waiting in the scheduler.
+
+--requests requests, like those of a broad crawl (a spider callback, a
+``depth`` meta key set by DepthMiddleware, no headers, cookies or flags), are
+fingerprinted, as the duplicates filter of the scheduler does, and pushed into
+a FifoMemoryQueue. The memory allocated per queued request is measured with
+tracemalloc, with the live references of requests tracked by trackref
+(TRACKREF_ENABLED, set_tracking()) and without.
+
+usage:
+
+    python extras/request-memory-bench.py [--requests 1000000]
+
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from scrapy import Request, Spider
+from scrapy.squeues import FifoMemoryQueue
+from scrapy.utils import trackref
+from scrapy.utils.test import get_crawler
+
+
+class BenchSpider(Spider):
+    name = "bench"
+
+    def parse(self, response):
+        pass
+
+
+def run(requests, tracking):
+    trackref.set_tracking(tracking)
+    crawler = get_crawler(BenchSpider)
+    spider = crawler._create_spider()
+    fingerprinter = crawler.request_fingerprinter
+    queue = FifoMemoryQueue.from_crawler(crawler, "")
+    urls = [
+        f"https://www{i % 1000}.example.com/category/{i % 97}/page-{i}.html"
+        for i in range(requests)
+    ]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for url in urls:
+        request = Request(url, callback=spider.parse, meta={"depth": 2})
+        fingerprinter.fingerprint(request)
+        queue.push(request)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    url_size = sum(sys.getsizeof(url) for url in urls) / requests
+    return size / requests - url_size, elapsed / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000000)
+    parser.add_argument("--run-tracking", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_tracking is not None:
+        # A single run, in a new process so that its memory starts clean
+        size, elapsed = run(args.requests, bool(args.run_tracking))
+        name = "trackref enabled" if args.run_tracking else "trackref disabled"
+        print(
+            f"{name:<18} {size:>7.0f} bytes/request, "
+            f"{size * args.requests / 2**20:>7.0f} MiB for {args.requests} "
+            f"requests, {elapsed:.1f} us/request"
+        )
+        return
+
+    for tracking in (1, 0):
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                f"--requests={args.requests}",
+                f"--run-tracking={tracking}",
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
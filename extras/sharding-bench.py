@@ -0,0 +1,115 @@
+"""
+Throughput benchmark of sharded crawls (CRAWLER_SHARDS).
+
+All the pages of the server of the scrapy bench command are crawled with a
+CPU-bound callback, that parses every page --work times with selectors,
+first in a single process and then split among an increasing number of
+shards. Requests are spread among --slots download slots, which sharding
+uses to split the crawl, as if they were sent to different domains.
+
+Sharding can only help on machines with more than one CPU.
+
+usage:
+
+    python extras/sharding-bench.py [--pages 1000] [--work 20] [--slots 16]
+        [--shards 2,4]
+
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import scrapy
+from scrapy.commands.bench import _BenchServer
+from scrapy.crawler import CrawlerProcess
+from scrapy.linkextractors import LinkExtractor
+
+
+class BenchSpider(scrapy.Spider):
+    name = "sharding_bench"
+    link_extractor = LinkExtractor()
+
+    def __init__(self, pages=1000, work=20, slots=16, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.work = work
+        self.slots = slots
+
+    def start_requests(self):
+        url = f"http://localhost:8998/?{urlencode(self._qargs())}"
+        yield scrapy.Request(url, meta={"download_slot": "0"})
+
+    def parse(self, response):
+        for _ in range(self.work):
+            selector = scrapy.Selector(text=response.text)
+            selector.css("a::attr(href)").getall()
+        for link in self.link_extractor.extract_links(response):
+            # Pages link to /follow?n=<n> URLs with all the n values of the
+            # page, keep the last one only so that there are --pages pages
+            n = parse_qs(urlparse(link.url).query)["n"][-1]
+            url = f"http://localhost:8998/follow?{urlencode(self._qargs(n=n))}"
+            slot = str(int(n) % self.slots)
+            yield scrapy.Request(url, meta={"download_slot": slot})
+
+    def _qargs(self, **kwargs):
+        return {"total": self.pages, "show": 20, **kwargs}
+
+
+def run(pages, work, slots, shards):
+    process = CrawlerProcess(
+        settings={
+            "LOG_LEVEL": "WARNING",
+            "CONCURRENT_REQUESTS": 32,
+            "CRAWLER_SHARDS": shards,
+            "REQUEST_FINGERPRINTER_IMPLEMENTATION": "2.7",
+        },
+        install_root_handler=False,
+    )
+    crawler = process.create_crawler(BenchSpider)
+    process.crawl(crawler, pages=pages, work=work, slots=slots)
+    start = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - start
+    return crawler.stats.get_value("response_received_count", 0), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--work", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--shards", default="2,4")
+    parser.add_argument("--run-shards", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_shards is not None:
+        # A single run, the Twisted reactor cannot be restarted
+        pages, elapsed = run(args.pages, args.work, args.slots, args.run_shards)
+        print(
+            f"CRAWLER_SHARDS={args.run_shards}: {pages} pages in {elapsed:.2f}s "
+            f"({pages / elapsed:.1f} pages/s)"
+        )
+        return
+
+    print(f"{os.cpu_count()} CPUs")
+    with _BenchServer():
+        for shards in [0] + [int(shards) for shards in args.shards.split(",")]:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    f"--pages={args.pages}",
+                    f"--work={args.work}",
+                    f"--slots={args.slots}",
+                    f"--run-shards={shards}",
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark of the binary scheduler disk queues against the pickle and marshal
+ones, which are backed by queuelib.
+
+usage:
+
+    python extras/squeues-bench.py [--requests 100000]
+
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from scrapy import Request, Spider
+from scrapy.squeues import (
+    BinaryFifoDiskQueue,
+    BinaryLifoDiskQueue,
+    MarshalFifoDiskQueue,
+    MarshalLifoDiskQueue,
+    PickleFifoDiskQueue,
+    PickleLifoDiskQueue,
+)
+from scrapy.utils.test import get_crawler
+
+
+class BenchSpider(Spider):
+    name = "bench"
+
+    def parse_item(self, response):
+        pass
+
+
+def disk_usage(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def run(queue_cls, requests, crawler):
+    path = tempfile.mkdtemp()
+    try:
+        key = str(Path(path, "queue"))
+        queue = queue_cls.from_crawler(crawler, key)
+        start = time.perf_counter()
+        for request in requests:
+            queue.push(request)
+        queue.close()
+        push_time = time.perf_counter() - start
+        size = disk_usage(path)
+        start = time.perf_counter()
+        queue = queue_cls.from_crawler(crawler, key)
+        while queue.pop() is not None:
+            pass
+        queue.close()
+        pop_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(path)
+    return push_time, pop_time, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    crawler = get_crawler(BenchSpider)
+    crawler.spider = spider = crawler._create_spider()
+    requests = [
+        Request(
+            f"http://www.example{i % 100}.com/product/{i}?ref=listing",
+            callback=spider.parse_item,
+            headers={"Referer": f"http://www.example{i % 100}.com/"},
+            meta={"depth": i % 5, "download_slot": f"www.example{i % 100}.com"},
+            cb_kwargs={"category": "books"},
+            priority=-(i % 5),
+        )
+        for i in range(args.requests)
+    ]
+    for name, queue_cls in (
+        ("PickleFifoDiskQueue", PickleFifoDiskQueue),
+        ("MarshalFifoDiskQueue", MarshalFifoDiskQueue),
+        ("BinaryFifoDiskQueue", BinaryFifoDiskQueue),
+        ("PickleLifoDiskQueue", PickleLifoDiskQueue),
+        ("MarshalLifoDiskQueue", MarshalLifoDiskQueue),
+        ("BinaryLifoDiskQueue", BinaryLifoDiskQueue),
+    ):
+        push_time, pop_time, size = run(queue_cls, requests, crawler)
+        print(
+            f"{name:>20}: "
+            f"push {len(requests) / push_time:.0f}/s, "
+            f"pop {len(requests) / pop_time:.0f}/s, "
+            f"{size / len(requests):.0f} bytes/request on disk"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Run spider callbacks in a pool of worker processes.
+
+See documentation in docs/topics/settings.rst (CALLBACK_POOL_SIZE).
+"""
+import inspect
+import logging
+import multiprocessing
+import pickle
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from twisted.internet.defer import CancelledError, Deferred
+from twisted.python.failure import Failure
+
+from scrapy import Spider
+from scrapy.http import Request, Response, TextResponse
+from scrapy.settings import BaseSettings, Settings
+from scrapy.utils.request import request_from_dict
+from scrapy.utils.spider import iterate_spider_output
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are pickled along with the rest of the response,
+# larger ones are copied once into a shared memory block instead.
+_SHARED_MEMORY_MIN_SIZE = 64 * 1024
+
+# Spider instance of the current worker process
+_worker_spider: Optional[Spider] = None
+
+
+def _get_spider_state(spider: Spider) -> Dict[str, Any]:
+    """Return the spider attributes that can be sent to worker processes."""
+    state = {}
+    for key, value in vars(spider).items():
+        if key in ("crawler", "settings"):
+            continue
+        try:
+            pickle.dumps(value)
+        except (AttributeError, pickle.PicklingError, TypeError):
+            logger.debug(
+                "Spider attribute %(key)r cannot be sent to callback pool "
+                "workers, it will be missing there",
+                {"key": key},
+                extra={"spider": spider},
+            )
+            continue
+        state[key] = value
+    return state
+
+
+def _init_worker(
+    spidercls: type, state: Dict[str, Any], settings: Dict[str, Any]
+) -> None:
+    global _worker_spider
+    spider = spidercls.__new__(spidercls)
+    spider.__dict__.update(state)
+    spider.settings = Settings(settings)
+    if "_rules" not in state and hasattr(spider, "_compile_rules"):
+        # CrawlSpider rules reference bound methods, and cannot be pickled
+        spider._compile_rules()
+    _worker_spider = spider
+
+
+def _get_callback_name(callback: Any) -> str:
+    # Requests without a callback use Spider._parse, which calls parse
+    name = callback.__name__
+    return "parse" if name == "_parse" else name
+
+
+def _response_to_dict(response: Response, spider: Spider) -> Dict[str, Any]:
+    d: Dict[str, Any] = {
+        "_class": type(response),
+        "url": response.url,
+        "status": response.status,
+        "headers": dict(response.headers),
+        "flags": response.flags,
+        "ip_address": response.ip_address,
+        "protocol": response.protocol,
+        "request": response.request.to_dict(spider=spider),
+    }
+    if isinstance(response, TextResponse):
+        # only an explicit encoding, workers infer it from the body otherwise
+        d["encoding"] = response._encoding
+    if shared_memory is not None and response._get_body_size() >= (
+        _SHARED_MEMORY_MIN_SIZE
+    ):
+        body = response.body
+        shm = shared_memory.SharedMemory(create=True, size=len(body))
+        shm.buf[: len(body)] = body
+        d["_shm"] = shm
+        d["body"] = (shm.name, len(body))
+    else:
+        d["body"] = response.body
+    return d
+
+
+def _response_from_dict(d: Dict[str, Any], spider: Spider) -> Response:
+    body = d.pop("body")
+    if isinstance(body, tuple):
+        name, size = body
+        shm = _attach_shared_memory(name)
+        try:
+            body = bytes(shm.buf[:size])
+        finally:
+            shm.close()
+    response_cls = d.pop("_class")
+    request = request_from_dict(d.pop("request"), spider=spider)
+    return response_cls(body=body, request=request, **d)
+
+
+def _attach_shared_memory(name: str) -> "shared_memory.SharedMemory":
+    # The block is owned, and unlinked, by the main process. Before Python
+    # 3.13, workers share its resource tracker, so registering the block
+    # again there is harmless.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _run_callback(callback: str, response_data: Dict[str, Any]) -> List[Tuple]:
+    """Run a spider callback in a worker process, and return its output with
+    requests converted to dicts."""
+    spider = _worker_spider
+    assert spider is not None
+    response = _response_from_dict(response_data, spider)
+    assert response.request is not None
+    output = getattr(spider, callback)(response, **response.request.cb_kwargs)
+    results: List[Tuple] = []
+    for result in iterate_spider_output(output):
+        if isinstance(result, Request):
+            results.append((True, result.to_dict(spider=spider)))
+        else:
+            results.append((False, result))
+    return results
+
+
+class CallbackPool:
+    """Pool of worker processes that run the spider callbacks listed in the
+    :setting:`CALLBACK_POOL_CALLBACKS` setting.
+
+    Workers get a copy of the settings and of the picklable attributes of the
+    spider, made the first time that a callback is sent to the pool.
+    """
+
+    def __init__(self, size: int, callbacks: Iterable[str]):
+        self.size = size
+        self.callbacks = frozenset(callbacks)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> "Optional[CallbackPool]":
+        size = settings.getint("CALLBACK_POOL_SIZE")
+        callbacks = settings.getlist("CALLBACK_POOL_CALLBACKS")
+        if not size or not callbacks:
+            return None
+        return cls(size, callbacks)
+
+    def open_spider(self, spider: Spider) -> None:
+        for name in self.callbacks:
+            callback = getattr(spider, name, None)
+            if not callable(callback):
+                raise ValueError(
+                    f"CALLBACK_POOL_CALLBACKS: {name!r} is not a method of "
+                    f"spider {spider.name!r}"
+                )
+            if inspect.iscoroutinefunction(callback) or inspect.isasyncgenfunction(
+                callback
+            ):
+                raise ValueError(
+                    f"CALLBACK_POOL_CALLBACKS: {name!r} is an asynchronous "
+                    f"callback, only synchronous callbacks can run in worker "
+                    f"processes"
+                )
+
+    def close_spider(self, spider: Spider) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def handles(self, callback: Any) -> bool:
+        """Return ``True`` if the given callback runs in the pool."""
+        return (
+            inspect.ismethod(callback)
+            and isinstance(callback.__self__, Spider)
+            and _get_callback_name(callback) in self.callbacks
+        )
+
+    def call(self, callback: Any, response: Response, spider: Spider) -> Deferred:
+        """Run *callback* on *response* in a worker process, and return a
+        Deferred that fires with its output."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    type(spider),
+                    _get_spider_state(spider),
+                    spider.settings.copy_to_dict(),
+                ),
+            )
+        data = _response_to_dict(response, spider)
+        shm = data.pop("_shm", None)
+        future = self._executor.submit(_run_callback, callback.__name__, data)
+        dfd = _deferred_from_future(future)
+        if shm is not None:
+            dfd.addBoth(_release_shared_memory, shm)
+        dfd.addCallback(self._process_results, spider)
+        return dfd
+
+    @staticmethod
+    def _process_results(results: List[Tuple], spider: Spider) -> List[Any]:
+        return [
+            request_from_dict(result, spider=spider) if is_request else result
+            for is_request, result in results
+        ]
+
+
+def _release_shared_memory(result: Any, shm: "shared_memory.SharedMemory") -> Any:
+    shm.close()
+    shm.unlink()
+    return result
+
+
+def _deferred_from_future(future: Future) -> Deferred:
+    from twisted.internet import reactor
+
+    dfd: Deferred = Deferred()
+
+    def done(future: Future) -> None:
+        # Called from a thread of the executor
+        if future.cancelled():
+            reactor.callFromThread(dfd.errback, Failure(CancelledError()))
+            return
+        exception = future.exception()
+        if exception is None:
+            reactor.callFromThread(dfd.callback, future.result())
+        else:
+            reactor.callFromThread(dfd.errback, Failure(exception))
+
+    future.add_done_callback(done)
+    return dfd
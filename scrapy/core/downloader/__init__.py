@@ -133,8 +133,8 @@ class Downloader:
         return key, self.slots[key]
 
     def _get_slot_key(self, request: Request, spider: Spider) -> str:
-        if self.DOWNLOAD_SLOT in request.meta:
-            return cast(str, request.meta[self.DOWNLOAD_SLOT])
+        if request._meta and self.DOWNLOAD_SLOT in request._meta:
+            return cast(str, request._meta[self.DOWNLOAD_SLOT])
 
         key = urlparse_cached(request).hostname or ""
         if self.ip_concurrency:
@@ -144,7 +144,7 @@ class Downloader:
 
     def _enqueue_request(self, request: Request, spider: Spider) -> Deferred:
         key, slot = self._get_slot(request, spider)
-        request.meta[self.DOWNLOAD_SLOT] = key
+        request._download_slot = key
 
         def _deactivate(response: Response) -> Response:
             slot.active.remove(request)
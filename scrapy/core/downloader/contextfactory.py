@@ -20,11 +20,17 @@ from scrapy.core.downloader.tls import (
     openssl_methods,
 )
 from scrapy.settings import BaseSettings
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.misc import create_instance, load_object
 
 if TYPE_CHECKING:
     from twisted.internet._sslverify import ClientTLSOptions
 
+    from scrapy.crawler import Crawler
+    from scrapy.statscollectors import StatsCollector
+
+TLS_SESSION_CACHE_SIZE = 10000
+
 
 @implementer(IPolicyForHTTPS)
 class ScrapyClientContextFactory(BrowserLikePolicyForHTTPS):
@@ -54,6 +60,11 @@ class ScrapyClientContextFactory(BrowserLikePolicyForHTTPS):
             self.tls_ciphers = AcceptableCiphers.fromOpenSSLCipherString(tls_ciphers)
         else:
             self.tls_ciphers = DEFAULT_CIPHERS
+        # TLS sessions to resume, by (hostname, port)
+        self.tls_sessions: Optional[LocalCache] = LocalCache(
+            limit=TLS_SESSION_CACHE_SIZE
+        )
+        self.stats: Optional["StatsCollector"] = None
 
     @classmethod
     def from_settings(
@@ -67,13 +78,30 @@ class ScrapyClientContextFactory(BrowserLikePolicyForHTTPS):
             "DOWNLOADER_CLIENT_TLS_VERBOSE_LOGGING"
         )
         tls_ciphers: Optional[str] = settings["DOWNLOADER_CLIENT_TLS_CIPHERS"]
-        return cls(  # type: ignore[misc]
+        context_factory = cls(  # type: ignore[misc]
             method=method,
             tls_verbose_logging=tls_verbose_logging,
             tls_ciphers=tls_ciphers,
             *args,
             **kwargs,
         )
+        if not settings.getbool("DOWNLOADER_CLIENT_TLS_SESSION_REUSE"):
+            context_factory.tls_sessions = None
+        return context_factory
+
+    @classmethod
+    def from_crawler(
+        cls,
+        crawler: "Crawler",
+        method: int = SSL.SSLv23_METHOD,
+        *args: Any,
+        **kwargs: Any,
+    ):
+        context_factory = cls.from_settings(
+            crawler.settings, *args, method=method, **kwargs
+        )
+        context_factory.stats = crawler.stats
+        return context_factory
 
     def getCertificateOptions(self) -> CertificateOptions:
         # setting verify=True will require you to provide CAs
@@ -102,10 +130,19 @@ class ScrapyClientContextFactory(BrowserLikePolicyForHTTPS):
         return ctx
 
     def creatorForNetloc(self, hostname: bytes, port: int) -> "ClientTLSOptions":
+        ctx = self.getContext()
+        tls_sessions = getattr(self, "tls_sessions", None)
+        if tls_sessions is not None:
+            # Sessions can only be resumed with the session ID context they
+            # were created with, and CertificateOptions sets a unique one
+            ctx.set_session_id(b"scrapy")
         return ScrapyClientTLSOptions(
             hostname.decode("ascii"),
-            self.getContext(),
+            ctx,
             verbose_logging=self.tls_verbose_logging,
+            sessions=tls_sessions,
+            session_key=(hostname, port),
+            stats=getattr(self, "stats", None),
         )
 
 
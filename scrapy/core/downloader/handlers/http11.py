@@ -3,8 +3,8 @@
 import ipaddress
 import logging
 import re
+from collections import OrderedDict
 from contextlib import suppress
-from io import BytesIO
 from time import time
 from urllib.parse import urldefrag, urlunparse
 
@@ -18,6 +18,7 @@ from twisted.web.client import (
     HTTPConnectionPool,
     ResponseDone,
     ResponseFailed,
+    _RetryingHTTP11ClientProtocol,
 )
 from twisted.web.http import PotentialDataLoss, _DataLoss
 from twisted.web.http_headers import Headers as TxHeaders
@@ -30,11 +31,109 @@ from scrapy.core.downloader.webclient import _parse
 from scrapy.exceptions import StopDownload
 from scrapy.http import Headers
 from scrapy.responsetypes import responsetypes
+from scrapy.utils._compression import (
+    _DecompressionMaxSizeExceeded,
+    _get_decoder,
+    _remove_decoded_content_encoding,
+)
 from scrapy.utils.python import to_bytes, to_unicode
+from scrapy.utils.spool import BodyBuffer
 
 logger = logging.getLogger(__name__)
 
 
+class ScrapyHTTPConnectionPool(HTTPConnectionPool):
+    """:class:`~twisted.web.client.HTTPConnectionPool` with a limit of idle
+    persistent connections for all hosts, per-host limits that follow the
+    concurrency of :setting:`DOWNLOAD_SLOTS`, and connection stats."""
+
+    def __init__(self, reactor, settings, stats=None):
+        super().__init__(reactor, persistent=True)
+        self.maxPersistentPerHost = settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN")
+        self.maxPersistent = settings.getint("DOWNLOAD_POOL_MAX_PERSISTENT")
+        self.cachedConnectionTimeout = settings.getfloat("DOWNLOAD_POOL_IDLE_TIMEOUT")
+        self._maxPersistentPerSlot = {
+            slot: slot_settings["concurrency"]
+            for slot, slot_settings in settings.getdict("DOWNLOAD_SLOTS").items()
+            if "concurrency" in slot_settings
+        }
+        self._stats = stats
+        self._factory.noisy = False
+        # idle connections, from the least recently used
+        self._idle = OrderedDict()
+
+    def _inc_stats(self, key, count=1):
+        if self._stats is not None:
+            self._stats.inc_value(f"downloader/pool/{key}", count)
+
+    def _getMaxPersistent(self, key):
+        host = to_unicode(key[1])
+        return self._maxPersistentPerSlot.get(host, self.maxPersistentPerHost)
+
+    def getConnection(self, key, endpoint):
+        connections = self._connections.get(key)
+        while connections:
+            connection = connections.pop(0)
+            self._timeouts.pop(connection).cancel()
+            del self._idle[connection]
+            if connection.state == "QUIESCENT":
+                self._inc_stats("connections_reused")
+                if self.retryAutomatically:
+                    connection = _RetryingHTTP11ClientProtocol(
+                        connection, lambda: self._newConnection(key, endpoint)
+                    )
+                return defer.succeed(connection)
+        return self._newConnection(key, endpoint)
+
+    def _newConnection(self, key, endpoint):
+        start_time = time()
+
+        def _connected(connection):
+            self._inc_stats("connect_time", time() - start_time)
+            return connection
+
+        self._inc_stats("connections_new")
+        return super()._newConnection(key, endpoint).addCallback(_connected)
+
+    def _removeConnection(self, key, connection):
+        super()._removeConnection(key, connection)
+        del self._idle[connection]
+        self._inc_stats("connections_expired")
+
+    def _dropConnection(self, key, connection):
+        connection.transport.loseConnection()
+        self._connections[key].remove(connection)
+        self._timeouts.pop(connection).cancel()
+        del self._idle[connection]
+        self._inc_stats("connections_discarded")
+
+    def _putConnection(self, key, connection):
+        if connection.state != "QUIESCENT":
+            super()._putConnection(key, connection)
+            return
+        connections = self._connections.setdefault(key, [])
+        max_persistent = self._getMaxPersistent(key)
+        while connections and len(connections) >= max_persistent:
+            self._dropConnection(key, connections[0])
+        if max_persistent <= 0:
+            connection.transport.loseConnection()
+            self._inc_stats("connections_discarded")
+            return
+        connections.append(connection)
+        self._timeouts[connection] = self._reactor.callLater(
+            self.cachedConnectionTimeout, self._removeConnection, key, connection
+        )
+        self._idle[connection] = key
+        if self.maxPersistent:
+            while len(self._idle) > self.maxPersistent:
+                dropped, dropped_key = next(iter(self._idle.items()))
+                self._dropConnection(dropped_key, dropped)
+
+    def closeCachedConnections(self):
+        self._idle.clear()
+        return super().closeCachedConnections()
+
+
 class HTTP11DownloadHandler:
     lazy = False
 
@@ -43,15 +142,14 @@ class HTTP11DownloadHandler:
 
         from twisted.internet import reactor
 
-        self._pool = HTTPConnectionPool(reactor, persistent=True)
-        self._pool.maxPersistentPerHost = settings.getint(
-            "CONCURRENT_REQUESTS_PER_DOMAIN"
+        self._pool = ScrapyHTTPConnectionPool(
+            reactor, settings, stats=crawler.stats if crawler else None
         )
-        self._pool._factory.noisy = False
 
         self._contextFactory = load_context_factory_from_settings(settings, crawler)
         self._default_maxsize = settings.getint("DOWNLOAD_MAXSIZE")
         self._default_warnsize = settings.getint("DOWNLOAD_WARNSIZE")
+        self._default_spoolsize = settings.getint("DOWNLOAD_SPOOLSIZE")
         self._fail_on_dataloss = settings.getbool("DOWNLOAD_FAIL_ON_DATALOSS")
         self._disconnect_timeout = 1
 
@@ -66,6 +164,7 @@ class HTTP11DownloadHandler:
             pool=self._pool,
             maxsize=getattr(spider, "download_maxsize", self._default_maxsize),
             warnsize=getattr(spider, "download_warnsize", self._default_warnsize),
+            spoolsize=getattr(spider, "download_spoolsize", self._default_spoolsize),
             fail_on_dataloss=self._fail_on_dataloss,
             crawler=self._crawler,
         )
@@ -306,6 +405,7 @@ class ScrapyAgent:
         warnsize=0,
         fail_on_dataloss=True,
         crawler=None,
+        spoolsize=0,
     ):
         self._contextFactory = contextFactory
         self._connectTimeout = connectTimeout
@@ -313,6 +413,7 @@ class ScrapyAgent:
         self._pool = pool
         self._maxsize = maxsize
         self._warnsize = warnsize
+        self._spoolsize = spoolsize
         self._fail_on_dataloss = fail_on_dataloss
         self._txresponse = None
         self._crawler = crawler
@@ -405,7 +506,13 @@ class ScrapyAgent:
         headers = Headers()
         if response.length != UNKNOWN_LENGTH:
             headers[b"Content-Length"] = str(response.length).encode()
-        headers.update(response.headers.getAllRawHeaders())
+        raw_headers = getattr(response.headers, "_rawHeaders", None)
+        if isinstance(raw_headers, dict):
+            # Headers normalizes the names, skip their capitalization by
+            # getAllRawHeaders()
+            headers.update(raw_headers)
+        else:
+            headers.update(response.headers.getAllRawHeaders())
         return headers
 
     def _cb_bodyready(self, txresponse, request):
@@ -445,6 +552,7 @@ class ScrapyAgent:
 
         maxsize = request.meta.get("download_maxsize", self._maxsize)
         warnsize = request.meta.get("download_warnsize", self._warnsize)
+        spoolsize = request.meta.get("download_spoolsize", self._spoolsize)
         expected_size = txresponse.length if txresponse.length != UNKNOWN_LENGTH else -1
         fail_on_dataloss = request.meta.get(
             "download_fail_on_dataloss", self._fail_on_dataloss
@@ -477,6 +585,13 @@ class ScrapyAgent:
             # Abort connection immediately.
             txresponse._transport._producer.abortConnection()
 
+        decoder = None
+        if request._decompress:
+            # set by HttpCompressionMiddleware
+            content_encoding = txresponse.headers.getRawHeaders(b"Content-Encoding")
+            if content_encoding:
+                decoder = _get_decoder(content_encoding[-1], max_size=maxsize)
+
         d = defer.Deferred(_cancel)
         txresponse.deliverBody(
             _ResponseReader(
@@ -487,6 +602,8 @@ class ScrapyAgent:
                 warnsize=warnsize,
                 fail_on_dataloss=fail_on_dataloss,
                 crawler=self._crawler,
+                spoolsize=spoolsize,
+                decoder=decoder,
             )
         )
 
@@ -497,6 +614,9 @@ class ScrapyAgent:
 
     def _cb_bodydone(self, result, request, url):
         headers = self._headers_from_twisted_response(result["txresponse"])
+        if result.get("decompressed_size") is not None:
+            _remove_decoded_content_encoding(headers)
+            request._decompressed_size = result["decompressed_size"]
         respcls = responsetypes.from_args(headers=headers, url=url, body=result["body"])
         try:
             version = result["txresponse"].version
@@ -546,11 +666,13 @@ class _ResponseReader(protocol.Protocol):
         warnsize,
         fail_on_dataloss,
         crawler,
+        spoolsize=0,
+        decoder=None,
     ):
         self._finished = finished
         self._txresponse = txresponse
         self._request = request
-        self._bodybuf = BytesIO()
+        self._bodybuf = BodyBuffer(spoolsize, decoder)
         self._maxsize = maxsize
         self._warnsize = warnsize
         self._fail_on_dataloss = fail_on_dataloss
@@ -562,14 +684,24 @@ class _ResponseReader(protocol.Protocol):
         self._crawler = crawler
 
     def _finish_response(self, flags=None, failure=None):
+        try:
+            body = self._bodybuf.getvalue()
+        except Exception:
+            self._bodybuf.clear()
+            self._finished.errback()
+            return
+        decompressed_size = None
+        if self._bodybuf.decoder is not None:
+            decompressed_size = self._bodybuf.size
         self._finished.callback(
             {
                 "txresponse": self._txresponse,
-                "body": self._bodybuf.getvalue(),
+                "body": body,
                 "flags": flags,
                 "certificate": self._certificate,
                 "ip_address": self._ip_address,
                 "failure": failure,
+                "decompressed_size": decompressed_size,
             }
         )
 
@@ -590,7 +722,24 @@ class _ResponseReader(protocol.Protocol):
         if self._finished.called:
             return
 
-        self._bodybuf.write(bodyBytes)
+        try:
+            self._bodybuf.write(bodyBytes)
+        except _DecompressionMaxSizeExceeded:
+            logger.warning(
+                "Cancelling download of %(request)s: decompressed response "
+                "size larger than download max size (%(maxsize)s).",
+                {"request": self._request, "maxsize": self._maxsize},
+            )
+            self._bodybuf.clear()
+            self._finished.cancel()
+            return
+        except Exception:
+            # undecodable body
+            self._bodybuf.clear()
+            self.transport.stopProducing()
+            self.transport.loseConnection()
+            self._finished.errback()
+            return
         self._bytes_received += len(bodyBytes)
 
         bytes_received_result = self._crawler.signals.send_catch_log(
@@ -621,7 +770,7 @@ class _ResponseReader(protocol.Protocol):
                 },
             )
             # Clear buffer earlier to avoid keeping data in memory for a long time.
-            self._bodybuf.truncate(0)
+            self._bodybuf.clear()
             self._finished.cancel()
 
         if (
@@ -1,5 +1,7 @@
 import logging
-from typing import Any, Dict
+import weakref
+from time import time
+from typing import TYPE_CHECKING, Any, Dict, Hashable, MutableMapping, Optional
 
 from OpenSSL import SSL
 from service_identity.exceptions import CertificateError
@@ -12,6 +14,9 @@ from twisted.internet.ssl import AcceptableCiphers
 
 from scrapy.utils.ssl import get_temp_key_info, x509name_to_string
 
+if TYPE_CHECKING:
+    from scrapy.statscollectors import StatsCollector
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,15 +43,81 @@ class ScrapyClientTLSOptions(ClientTLSOptions):
     except that VerificationError, CertificateError and ValueError
     exceptions are caught, so that the connection is not closed, only
     logging warnings. Also, HTTPS connection parameters logging is added.
+
+    If a ``sessions`` mapping is given, the TLS session of the connections is
+    stored in it under ``session_key`` and new connections try to resume it,
+    saving the certificate exchange and part of the round trips of a full
+    handshake. If ``stats`` is given, the number of full and resumed
+    handshakes and the time spent on them are recorded.
     """
 
-    def __init__(self, hostname: str, ctx: SSL.Context, verbose_logging: bool = False):
+    def __init__(
+        self,
+        hostname: str,
+        ctx: SSL.Context,
+        verbose_logging: bool = False,
+        sessions: Optional[MutableMapping[Hashable, SSL.Session]] = None,
+        session_key: Optional[Hashable] = None,
+        stats: Optional["StatsCollector"] = None,
+    ):
         super().__init__(hostname, ctx)
         self.verbose_logging: bool = verbose_logging
+        self._sessions = sessions
+        self._session_key = session_key if session_key is not None else hostname
+        self._stats = stats
+        # connection -> [handshake start time, full handshake, done]
+        self._handshakes: MutableMapping[
+            SSL.Connection, list
+        ] = weakref.WeakKeyDictionary()
+
+    def clientConnectionForTLS(self, tlsProtocol: Any) -> SSL.Connection:
+        connection = super().clientConnectionForTLS(tlsProtocol)
+        if self._sessions is not None:
+            session = self._sessions.get(self._session_key)
+            if session is not None:
+                connection.set_session(session)
+        return connection
+
+    def _store_session(self, connection: SSL.Connection) -> None:
+        session = connection.get_session()
+        if session is not None:
+            self._sessions[self._session_key] = session  # type: ignore[index]
+
+    def _track_handshake(self, connection: SSL.Connection, where: int) -> None:
+        if where & SSL.SSL_CB_HANDSHAKE_START:
+            self._handshakes.setdefault(connection, [time(), False, False])
+        elif where & SSL.SSL_CB_LOOP:
+            state = connection.get_state_string()
+            if state == b"SSLv3/TLS read server certificate":
+                handshake = self._handshakes.get(connection)
+                if handshake is not None:
+                    handshake[1] = True
+            elif (
+                state == b"SSLv3/TLS read server session ticket"
+                and self._sessions is not None
+            ):
+                # TLS 1.3 servers send tickets after the handshake
+                self._store_session(connection)
+        elif where & SSL.SSL_CB_HANDSHAKE_DONE:
+            if self._sessions is not None:
+                self._store_session(connection)
+            handshake = self._handshakes.get(connection)
+            if self._stats is None or handshake is None or handshake[2]:
+                return
+            handshake[2] = True
+            if handshake[1]:
+                self._stats.inc_value("downloader/tls/handshakes/full")
+            else:
+                self._stats.inc_value("downloader/tls/handshakes/resumed")
+            self._stats.inc_value(
+                "downloader/tls/handshake_time", time() - handshake[0]
+            )
 
     def _identityVerifyingInfoCallback(
         self, connection: SSL.Connection, where: int, ret: Any
     ) -> None:
+        if self._sessions is not None or self._stats is not None:
+            self._track_handshake(connection, where)
         if where & SSL.SSL_CB_HANDSHAKE_START:
             connection.set_tlsext_host_name(self._hostnameBytes)
         elif where & SSL.SSL_CB_HANDSHAKE_DONE:
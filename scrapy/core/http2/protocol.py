@@ -124,6 +124,7 @@ class H2ClientProtocol(Protocol, TimeoutMixin):
             # Variables taken from Project Settings
             "default_download_maxsize": settings.getint("DOWNLOAD_MAXSIZE"),
             "default_download_warnsize": settings.getint("DOWNLOAD_WARNSIZE"),
+            "default_download_spoolsize": settings.getint("DOWNLOAD_SPOOLSIZE"),
             # Counter to keep track of opened streams. This counter
             # is used to make sure that not more than MAX_CONCURRENT_STREAMS
             # streams are opened which leads to ProtocolError
@@ -189,6 +190,11 @@ class H2ClientProtocol(Protocol, TimeoutMixin):
             download_warnsize=getattr(
                 spider, "download_warnsize", self.metadata["default_download_warnsize"]
             ),
+            download_spoolsize=getattr(
+                spider,
+                "download_spoolsize",
+                self.metadata["default_download_spoolsize"],
+            ),
         )
         self.streams[stream.stream_id] = stream
         return stream
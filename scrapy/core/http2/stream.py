@@ -1,6 +1,5 @@
 import logging
 from enum import Enum
-from io import BytesIO
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
@@ -15,6 +14,12 @@ from twisted.web.client import ResponseFailed
 from scrapy.http import Request
 from scrapy.http.headers import Headers
 from scrapy.responsetypes import responsetypes
+from scrapy.utils._compression import (
+    _DecompressionMaxSizeExceeded,
+    _get_decoder,
+    _remove_decoded_content_encoding,
+)
+from scrapy.utils.spool import BodyBuffer
 
 if TYPE_CHECKING:
     from scrapy.core.http2.protocol import H2ClientProtocol
@@ -90,6 +95,7 @@ class Stream:
         protocol: "H2ClientProtocol",
         download_maxsize: int = 0,
         download_warnsize: int = 0,
+        download_spoolsize: int = 0,
     ) -> None:
         """
         Arguments:
@@ -107,6 +113,9 @@ class Stream:
         self._download_warnsize = self._request.meta.get(
             "download_warnsize", download_warnsize
         )
+        download_spoolsize = self._request.meta.get(
+            "download_spoolsize", download_spoolsize
+        )
 
         # Metadata of an HTTP/2 connection stream
         # initialized when stream is instantiated
@@ -134,12 +143,14 @@ class Stream:
         self._response: Dict = {
             # Data received frame by frame from the server is appended
             # and passed to the response Deferred when completely received.
-            "body": BytesIO(),
+            "body": BodyBuffer(download_spoolsize),
             # The amount of data received that counts against the
             # flow control window
             "flow_controlled_size": 0,
             # Headers received after sending the request
             "headers": Headers({}),
+            # Failure raised while decompressing the body, if any
+            "decoding_failure": None,
         }
 
         def _cancel(_) -> None:
@@ -322,7 +333,17 @@ class Stream:
             self.send_data()
 
     def receive_data(self, data: bytes, flow_controlled_length: int) -> None:
-        self._response["body"].write(data)
+        if self._response["decoding_failure"] is None:
+            try:
+                self._response["body"].write(data)
+            except _DecompressionMaxSizeExceeded:
+                self.reset_stream(StreamCloseReason.MAXSIZE_EXCEEDED)
+                return
+            except Exception:
+                # Undecodable body, the failure is reported once the stream
+                # is closed
+                self._response["body"].clear()
+                self._response["decoding_failure"] = Failure()
         self._response["flow_controlled_size"] += flow_controlled_length
 
         # We check maxsize here in case the Content-Length header was not received
@@ -350,6 +371,18 @@ class Stream:
         for name, value in headers:
             self._response["headers"].appendlist(name, value)
 
+        body = self._response["body"]
+        content_encoding = self._response["headers"].getlist(b"Content-Encoding")
+        if (
+            self._request._decompress  # set by HttpCompressionMiddleware
+            and content_encoding
+            and body.decoder is None
+            and not body.size
+        ):
+            body.decoder = _get_decoder(
+                content_encoding[-1], max_size=self._download_maxsize
+            )
+
         # Check if we exceed the allowed max data size which can be received
         expected_size = int(self._response["headers"].get(b"Content-Length", -1))
         if self._download_maxsize and expected_size > self._download_maxsize:
@@ -370,7 +403,7 @@ class Stream:
             raise StreamClosedError(self.stream_id)
 
         # Clear buffer earlier to avoid keeping data in memory for a long time
-        self._response["body"].truncate(0)
+        self._response["body"].clear()
 
         self.metadata["stream_closed_local"] = True
         self._protocol.conn.reset_stream(self.stream_id, ErrorCodes.REFUSED_STREAM)
@@ -471,7 +504,17 @@ class Stream:
         and fires the response deferred callback with the
         generated response instance"""
 
-        body = self._response["body"].getvalue()
+        if self._response["decoding_failure"] is not None:
+            self._deferred_response.errback(self._response["decoding_failure"])
+            return
+        try:
+            body = self._response["body"].getvalue()
+        except Exception:
+            self._deferred_response.errback()
+            return
+        if self._response["body"].decoder is not None:
+            _remove_decoded_content_encoding(self._response["headers"])
+            self._request._decompressed_size = self._response["body"].size
         response_cls = responsetypes.from_args(
             headers=self._response["headers"],
             url=self._request.url,
@@ -24,6 +24,7 @@ from twisted.internet.defer import Deferred, inlineCallbacks
 from twisted.python.failure import Failure
 
 from scrapy import Spider, signals
+from scrapy.core.callbackpool import CallbackPool
 from scrapy.core.spidermw import SpiderMiddlewareManager
 from scrapy.exceptions import CloseSpider, DropItem, IgnoreRequest
 from scrapy.http import Request, Response
@@ -71,7 +72,7 @@ class Slot:
         deferred: Deferred = Deferred()
         self.queue.append((result, request, deferred))
         if isinstance(result, Response):
-            self.active_size += max(len(result.body), self.MIN_RESPONSE_SIZE)
+            self.active_size += max(result._get_body_size(), self.MIN_RESPONSE_SIZE)
         else:
             self.active_size += self.MIN_RESPONSE_SIZE
         return deferred
@@ -86,7 +87,7 @@ class Slot:
     ) -> None:
         self.active.remove(request)
         if isinstance(result, Response):
-            self.active_size -= max(len(result.body), self.MIN_RESPONSE_SIZE)
+            self.active_size -= max(result._get_body_size(), self.MIN_RESPONSE_SIZE)
         else:
             self.active_size -= self.MIN_RESPONSE_SIZE
 
@@ -111,11 +112,16 @@ class Scraper:
         self.crawler: Crawler = crawler
         self.signals: SignalManager = crawler.signals
         self.logformatter: LogFormatter = crawler.logformatter
+        self.callback_pool: Optional[CallbackPool] = CallbackPool.from_settings(
+            crawler.settings
+        )
 
     @inlineCallbacks
     def open_spider(self, spider: Spider) -> Generator[Deferred, Any, None]:
         """Open the given spider for scraping and allocate resources for it"""
         self.slot = Slot(self.crawler.settings.getint("SCRAPER_SLOT_MAX_ACTIVE_SIZE"))
+        if self.callback_pool is not None:
+            self.callback_pool.open_spider(spider)
         yield self.itemproc.open_spider(spider)
 
     def close_spider(self, spider: Spider) -> Deferred:
@@ -123,10 +129,17 @@ class Scraper:
         if self.slot is None:
             raise RuntimeError("Scraper slot not assigned")
         self.slot.closing = Deferred()
+        if self.callback_pool is not None:
+            self.slot.closing.addCallback(self._close_callback_pool)
         self.slot.closing.addCallback(self.itemproc.close_spider)
         self._check_if_closing(spider)
         return self.slot.closing
 
+    def _close_callback_pool(self, spider: Spider) -> Spider:
+        assert self.callback_pool is not None  # typing
+        self.callback_pool.close_spider(spider)
+        return spider
+
     def is_idle(self) -> bool:
         """Return True if there isn't any more spiders to process"""
         return not self.slot
@@ -207,6 +220,9 @@ class Scraper:
                 result.request = request
             callback = result.request.callback or spider._parse
             warn_on_generator_with_return_value(spider, callback)
+            if self.callback_pool is not None and self.callback_pool.handles(callback):
+                dfd = self.callback_pool.call(callback, result, spider)
+                return dfd.addCallback(iterate_spider_output)
             dfd = defer_succeed(result)
             dfd.addCallbacks(
                 callback=callback, callbackKeywords=result.request.cb_kwargs
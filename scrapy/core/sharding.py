@@ -0,0 +1,491 @@
+"""
+Sharded crawls, where requests are split among several worker processes.
+
+See documentation in docs/topics/practices.rst (CRAWLER_SHARDS).
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+from typing import Any, Dict, List, Optional, Set, Union
+
+from twisted.internet import defer, task, threads
+
+from scrapy import Spider, signals
+from scrapy.core.scheduler import BaseScheduler
+from scrapy.crawler import Crawler, CrawlerProcess
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import Request
+from scrapy.settings import Settings
+from scrapy.utils.misc import create_instance, load_object
+from scrapy.utils.request import request_from_dict
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the message queues
+_POLL_INTERVAL = 0.1
+
+
+def _jump_hash(key: bytes, buckets: int) -> int:
+    """Return the bucket of *key* using the jump consistent hash algorithm
+    (https://arxiv.org/abs/1406.2294): when the number of buckets grows, only
+    the keys that move to the new buckets change their bucket."""
+    k = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        k = (k * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((k >> 33) + 1)))
+    return b
+
+
+def _merge_stats(stats_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the stats of all shards: numbers are added up, except maximums,
+    and the earliest start time and latest finish time are kept."""
+    merged: Dict[str, Any] = {}
+    for stats in stats_list:
+        for key, value in stats.items():
+            if key not in merged:
+                merged[key] = value
+            elif key == "start_time":
+                merged[key] = min(merged[key], value)
+            elif key in ("finish_time", "elapsed_time_seconds") or key.endswith(
+                ("_max", "/max")
+            ):
+                merged[key] = max(merged[key], value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] += value
+    return merged
+
+
+class _Shard:
+    """Data that a worker process needs to exchange messages with the other
+    processes of a sharded crawl."""
+
+    def __init__(
+        self,
+        index: int,
+        count: int,
+        inboxes: List[multiprocessing.Queue],
+        outbox: multiprocessing.Queue,
+        forward_items: bool,
+    ):
+        self.index = index
+        self.count = count
+        self.inboxes = inboxes
+        self.outbox = outbox
+        self.forward_items = forward_items
+        # Scheduler class that stores the requests of the shard
+        self.scheduler: Union[None, str, type] = None
+
+
+# Shard of the current worker process
+_worker_shard: Optional[_Shard] = None
+
+
+def _run_worker(
+    shard: _Shard,
+    spidercls: type,
+    settings: Dict[str, Any],
+    args: tuple,
+    kwargs: dict,
+) -> None:
+    global _worker_shard
+    _worker_shard = shard
+
+    worker_settings = Settings(settings)
+    spider_settings = worker_settings.copy()
+    spidercls.update_settings(spider_settings)
+    shard.scheduler = spider_settings["SCHEDULER"]
+    worker_settings.set("CRAWLER_SHARDS", 0, priority="cmdline")
+    worker_settings.set(
+        "SCHEDULER", "scrapy.core.sharding.ShardScheduler", priority="cmdline"
+    )
+    spider_middlewares = spider_settings.getdict("SPIDER_MIDDLEWARES")
+    spider_middlewares["scrapy.core.sharding.ShardStartRequestsMiddleware"] = 0
+    worker_settings.set("SPIDER_MIDDLEWARES", spider_middlewares, priority="cmdline")
+    if shard.forward_items:
+        # The parent process exports all items
+        worker_settings.set("FEEDS", {}, priority="cmdline")
+    if spider_settings.get("JOBDIR"):
+        worker_settings.set(
+            "JOBDIR",
+            os.path.join(spider_settings["JOBDIR"], f"shard{shard.index}"),
+            priority="cmdline",
+        )
+    # The parent process logs the stats of the whole crawl
+    worker_settings.set("STATS_DUMP", False, priority="cmdline")
+
+    process = CrawlerProcess(worker_settings)
+    crawler = process.create_crawler(spidercls)
+    process.crawl(crawler, *args, **kwargs)
+    process.start()
+    shard.outbox.put(("closed", shard.index, crawler.stats.get_stats()))
+
+
+class ShardScheduler(BaseScheduler):
+    """Scheduler of the worker processes of a sharded crawl.
+
+    Requests are routed to the worker that owns their download slot, and
+    the requests that the current worker owns are stored in the scheduler
+    set in the :setting:`SCHEDULER` setting.
+    """
+
+    def __init__(self, crawler: Crawler, scheduler: BaseScheduler, shard: _Shard):
+        self.crawler = crawler
+        self.scheduler = scheduler
+        self.shard = shard
+        self.sent = 0
+        self.received = 0
+        self._owners: Dict[str, int] = {}
+        # shards that finished crawling, which drop the requests they get
+        self._closed_shards: Set[int] = set()
+        self._poll_task: Optional[task.LoopingCall] = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> "ShardScheduler":
+        if _worker_shard is None:
+            raise RuntimeError(
+                "ShardScheduler can only be used in the worker processes of "
+                "a sharded crawl, see the CRAWLER_SHARDS setting."
+            )
+        scheduler_cls = load_object(_worker_shard.scheduler)
+        scheduler = create_instance(scheduler_cls, settings=None, crawler=crawler)
+        return cls(crawler, scheduler, _worker_shard)
+
+    def open(self, spider: Spider) -> Optional[defer.Deferred]:
+        self.spider = spider
+        self.crawler.signals.connect(self._spider_idle, signals.spider_idle)
+        if self.shard.forward_items:
+            self.crawler.signals.connect(self._item_scraped, signals.item_scraped)
+        self._poll_task = task.LoopingCall(self._poll)
+        self._poll_task.start(_POLL_INTERVAL, now=False)
+        return self.scheduler.open(spider) if hasattr(self.scheduler, "open") else None
+
+    def close(self, reason: str) -> Optional[defer.Deferred]:
+        if self._poll_task is not None and self._poll_task.running:
+            self._poll_task.stop()
+        if hasattr(self.scheduler, "close"):
+            return self.scheduler.close(reason)
+        return None
+
+    def has_pending_requests(self) -> bool:
+        return self.scheduler.has_pending_requests()
+
+    def __len__(self) -> int:
+        return len(self.scheduler)
+
+    def owns(self, request: Request) -> bool:
+        """Return ``True`` if *request* belongs to the current shard."""
+        return self._get_owner(request) == self.shard.index
+
+    def enqueue_request(self, request: Request) -> bool:
+        owner = self._get_owner(request)
+        if owner == self.shard.index:
+            return self.scheduler.enqueue_request(request)
+        # Requests for a download slot always go to the same shard, so the
+        # duplicates of forwarded requests can be filtered out here
+        dupefilter = getattr(self.scheduler, "df", None)
+        if (
+            dupefilter is not None
+            and not request.dont_filter
+            and dupefilter.request_seen(request)
+        ):
+            dupefilter.log(request, self.spider)
+            return False
+        if owner in self._closed_shards:
+            if not self.crawler.stats.get_value("sharding/dropped_requests"):
+                logger.warning(
+                    "Dropping %(request)s: shard %(owner)d, which owns its "
+                    "download slot, is closed. Further dropped requests are "
+                    "counted in the sharding/dropped_requests stat.",
+                    {"request": request, "owner": owner},
+                    extra={"spider": self.spider},
+                )
+            self.crawler.stats.inc_value(
+                "sharding/dropped_requests", spider=self.spider
+            )
+            return False
+        self.shard.inboxes[owner].put(("request", request.to_dict(spider=self.spider)))
+        self.sent += 1
+        self.crawler.stats.inc_value("sharding/forwarded_requests", spider=self.spider)
+        return True
+
+    def next_request(self) -> Optional[Request]:
+        return self.scheduler.next_request()
+
+    def _get_owner(self, request: Request) -> int:
+        assert self.crawler.engine is not None  # typing
+        key = self.crawler.engine.downloader._get_slot_key(request, self.spider)
+        try:
+            return self._owners[key]
+        except KeyError:
+            owner = _jump_hash(key.encode(), self.shard.count)
+            self._owners[key] = owner
+            return owner
+
+    def _poll(self) -> None:
+        assert self.crawler.engine is not None  # typing
+        inbox = self.shard.inboxes[self.shard.index]
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "request":
+                self.received += 1
+                request = request_from_dict(message[1], spider=self.spider)
+                self.crawler.engine.crawl(request)
+            elif message[0] == "shard_closed":
+                self._closed_shards.add(message[1])
+            elif message[0] == "close":
+                self.crawler.engine.close_spider(self.spider, message[1])
+                return
+        idle = self.crawler.engine.spider_is_idle()
+        self.shard.outbox.put(
+            ("status", self.shard.index, idle, self.sent, self.received)
+        )
+
+    def _spider_idle(self, spider: Spider) -> None:
+        # Other shards may still send requests, the parent process decides
+        # when the crawl is finished
+        raise DontCloseSpider
+
+    def _item_scraped(self, item: Any, spider: Spider) -> None:
+        self.shard.outbox.put(("item", item))
+
+
+class ShardStartRequestsMiddleware:
+    """Spider middleware of the worker processes of a sharded crawl, that
+    drops the start requests that belong to other shards: every worker gets
+    the same start requests from the spider."""
+
+    def __init__(self, crawler: Crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> "ShardStartRequestsMiddleware":
+        return cls(crawler)
+
+    def process_start_requests(self, start_requests, spider):
+        assert self.crawler.engine is not None  # typing
+        scheduler = self.crawler.engine.slot.scheduler
+        for request in start_requests:
+            if not isinstance(request, Request) or scheduler.owns(request):
+                yield request
+
+
+class ShardedCrawler(Crawler):
+    """Crawler that splits a crawl among :setting:`CRAWLER_SHARDS` worker
+    processes, each running its own engine.
+
+    In the main process, only the :class:`~scrapy.extensions.feedexport.FeedExporter`
+    extension is enabled, to export the items of all workers, and stats are
+    the merged stats of all workers.
+    """
+
+    def __init__(
+        self,
+        spidercls: type,
+        settings: Union[None, dict, Settings] = None,
+        init_reactor: bool = False,
+    ):
+        if isinstance(settings, dict) or settings is None:
+            settings = Settings(settings)
+        self._worker_settings = settings.copy_to_dict()
+        settings = settings.copy()
+        settings.set(
+            "EXTENSIONS_BASE",
+            {"scrapy.extensions.feedexport.FeedExporter": 0},
+            priority="cmdline",
+        )
+        settings.set("EXTENSIONS", {}, priority="cmdline")
+        super().__init__(spidercls, settings, init_reactor=init_reactor)
+        self.shards = self.settings.getint("CRAWLER_SHARDS")
+        self._processes: List[multiprocessing.Process] = []
+        self._inboxes: List[multiprocessing.Queue] = []
+        self._outbox: Optional[multiprocessing.Queue] = None
+        self._statuses: Dict[int, tuple] = {}
+        self._last_statuses: Optional[Dict[int, tuple]] = None
+        self._stats: Dict[int, Dict[str, Any]] = {}
+        self._close_reason: Optional[str] = None
+        # fired when all shards are closed, and when the crawl is over
+        self._finished: Optional[defer.Deferred] = None
+        self._closed: Optional[defer.Deferred] = None
+
+    @defer.inlineCallbacks
+    def crawl(self, *args, **kwargs):
+        if self.crawling:
+            raise RuntimeError("Crawling already taking place")
+        self.crawling = True
+
+        try:
+            self.spider = self._create_spider(*args, **kwargs)
+            self._start_workers(args, kwargs)
+        except Exception:
+            self.crawling = False
+            raise
+
+        logger.info("Crawl split among %(shards)d shards", {"shards": self.shards})
+        self.stats.open_spider(self.spider)
+        yield self.signals.send_catch_log_deferred(
+            signals.spider_opened, spider=self.spider
+        )
+        poll_task = task.LoopingCall(self._poll)
+        self._finished = defer.Deferred()
+        self._closed = defer.Deferred()
+        poll_task.start(_POLL_INTERVAL, now=False)
+        yield self._finished
+        poll_task.stop()
+        # Workers cannot exit before the messages that they sent are read,
+        # and joining them blocks
+        dropped = yield threads.deferToThread(self._join_workers)
+
+        reason = self._close_reason or "finished"
+        merged = _merge_stats([self._stats[i] for i in sorted(self._stats)])
+        merged["finish_reason"] = reason
+        if dropped:
+            logger.warning(
+                "%(count)d forwarded requests were dropped because the shards "
+                "that own them were closed",
+                {"count": dropped},
+                extra={"spider": self.spider},
+            )
+            merged["sharding/dropped_requests"] = (
+                merged.get("sharding/dropped_requests", 0) + dropped
+            )
+        for key, value in merged.items():
+            self.stats.set_value(key, value, spider=self.spider)
+        yield self.signals.send_catch_log_deferred(
+            signals.spider_closed, spider=self.spider, reason=reason
+        )
+        self.stats.close_spider(self.spider, reason=reason)
+        logger.info(
+            "Spider closed (%(reason)s)",
+            {"reason": reason},
+            extra={"spider": self.spider},
+        )
+        self.crawling = False
+        self._closed.callback(None)
+
+    def _start_workers(self, args: tuple, kwargs: dict) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._inboxes = [context.Queue() for _ in range(self.shards)]
+        self._outbox = context.Queue()
+        forward_items = bool(self.settings.getdict("FEEDS"))
+        for index in range(self.shards):
+            shard = _Shard(
+                index, self.shards, self._inboxes, self._outbox, forward_items
+            )
+            process = context.Process(
+                target=_run_worker,
+                args=(shard, self.spidercls, self._worker_settings, args, kwargs),
+                name=f"{self.spidercls.name}-shard{index}",
+            )
+            process.start()
+            self._processes.append(process)
+
+    def _join_workers(self) -> int:
+        """Wait for all worker processes to exit, reading the messages left
+        in their queues, and return the number of forwarded requests that
+        were never received."""
+        dropped = 0
+        while True:
+            alive = False
+            for process in self._processes:
+                process.join(_POLL_INTERVAL)
+                alive = alive or process.is_alive()
+            dropped += self._drain_queues()
+            if not alive:
+                return dropped
+
+    def _drain_queues(self) -> int:
+        """Read all messages left in the queues, and return the number of
+        forwarded requests among them."""
+        dropped = 0
+        for message_queue in [*self._inboxes, self._outbox]:
+            while True:
+                try:
+                    message = message_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message[0] == "request":
+                    dropped += 1
+        return dropped
+
+    def _poll(self) -> None:
+        assert self._outbox is not None  # typing
+        while True:
+            try:
+                message = self._outbox.get_nowait()
+            except queue.Empty:
+                break
+            kind, *data = message
+            if kind == "item":
+                self.signals.send_catch_log(
+                    signals.item_scraped,
+                    item=data[0],
+                    response=None,
+                    spider=self.spider,
+                )
+            elif kind == "status":
+                self._statuses[data[0]] = tuple(data[1:])
+            elif kind == "closed":
+                index, stats = data
+                self._stats[index] = stats
+                # Other shards stop forwarding requests to it
+                for other, inbox in enumerate(self._inboxes):
+                    if other not in self._stats:
+                        inbox.put(("shard_closed", index))
+                reason = stats.get("finish_reason", "finished")
+                if reason != "finished" and self._close_reason is None:
+                    # e.g. CLOSESPIDER_* limits reached in one shard
+                    self._close(reason)
+        for index, process in enumerate(self._processes):
+            if index not in self._stats and not process.is_alive():
+                logger.error(
+                    "Shard %(index)d exited unexpectedly with code %(code)s",
+                    {"index": index, "code": process.exitcode},
+                    extra={"spider": self.spider},
+                )
+                self._stats[index] = {}
+                if self._close_reason is None:
+                    self._close("shard_failed")
+        if len(self._stats) == self.shards:
+            if not self._finished.called:
+                self._finished.callback(None)
+            return
+        if self._close_reason is None and self._is_crawl_finished():
+            self._close("finished")
+
+    def _is_crawl_finished(self) -> bool:
+        """Return ``True`` if all shards are idle, and all forwarded requests
+        were received, twice in a row."""
+        if len(self._statuses) < self.shards:
+            return False
+        statuses = dict(self._statuses)
+        finished = (
+            all(idle for idle, _, _ in statuses.values())
+            and sum(sent for _, sent, _ in statuses.values())
+            == sum(received for _, _, received in statuses.values())
+            and statuses == self._last_statuses
+        )
+        self._last_statuses = statuses
+        return finished
+
+    def _close(self, reason: str) -> None:
+        self._close_reason = reason
+        for index, inbox in enumerate(self._inboxes):
+            if index not in self._stats:
+                inbox.put(("close", reason))
+
+    @defer.inlineCallbacks
+    def stop(self):
+        """Starts a graceful stop of all shards and returns a deferred that is
+        fired when they are stopped."""
+        if self.crawling:
+            if self._close_reason is None:
+                self._close("shutdown")
+            if self._closed is not None:
+                yield self._closed
@@ -26,6 +26,7 @@ from scrapy.logformatter import LogFormatter
 from scrapy.settings import Settings, overridden_settings
 from scrapy.signalmanager import SignalManager
 from scrapy.statscollectors import StatsCollector
+from scrapy.utils import trackref
 from scrapy.utils.log import (
     LogCounterHandler,
     configure_logging,
@@ -42,6 +43,7 @@ from scrapy.utils.reactor import (
     verify_installed_asyncio_event_loop,
     verify_installed_reactor,
 )
+from scrapy.utils.url import canonical_url_cache
 
 if TYPE_CHECKING:
     from scrapy.utils.request import RequestFingerprinter
@@ -325,6 +327,8 @@ class CrawlerProcess(CrawlerRunner):
         super().__init__(settings)
         configure_logging(self.settings, install_root_handler)
         log_scrapy_info(self.settings)
+        trackref.set_tracking(self.settings.getbool("TRACKREF_ENABLED"))
+        canonical_url_cache.resize(self.settings.getint("CANONICALIZE_URL_CACHE_SIZE"))
         self._initialized_reactor = False
 
     def _signal_shutdown(self, signum, _):
@@ -353,6 +357,10 @@ class CrawlerProcess(CrawlerRunner):
             spidercls = self.spider_loader.load(spidercls)
         init_reactor = not self._initialized_reactor
         self._initialized_reactor = True
+        if self.settings.getint("CRAWLER_SHARDS") > 1:
+            from scrapy.core.sharding import ShardedCrawler
+
+            return ShardedCrawler(spidercls, self.settings, init_reactor=init_reactor)
         return Crawler(spidercls, self.settings, init_reactor=init_reactor)
 
     def start(self, stop_after_crawl=True, install_signal_handlers=True):
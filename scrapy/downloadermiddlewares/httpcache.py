@@ -1,7 +1,11 @@
+import inspect
+import logging
+import threading
 from email.utils import formatdate
-from typing import Optional, Type, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
-from twisted.internet import defer
+from twisted.internet import defer, threads
+from twisted.internet.defer import Deferred
 from twisted.internet.error import (
     ConnectError,
     ConnectionDone,
@@ -11,6 +15,8 @@ from twisted.internet.error import (
     TCPTimedOutError,
     TimeoutError,
 )
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
 from twisted.web.client import ResponseFailed
 
 from scrapy import signals
@@ -21,8 +27,12 @@ from scrapy.http.response import Response
 from scrapy.settings import Settings
 from scrapy.spiders import Spider
 from scrapy.statscollectors import StatsCollector
+from scrapy.utils.defer import deferred_from_coro
+from scrapy.utils.log import failure_to_exc_info
 from scrapy.utils.misc import load_object
 
+logger = logging.getLogger(__name__)
+
 HttpCacheMiddlewareTV = TypeVar("HttpCacheMiddlewareTV", bound="HttpCacheMiddleware")
 
 
@@ -40,6 +50,10 @@ class HttpCacheMiddleware:
         IOError,
     )
 
+    # Maximum number of responses waiting to be stored by the thread pool
+    # before process_response waits for them to be stored
+    WRITE_QUEUE_SIZE = 100
+
     def __init__(self, settings: Settings, stats: StatsCollector) -> None:
         if not settings.getbool("HTTPCACHE_ENABLED"):
             raise NotConfigured
@@ -47,6 +61,20 @@ class HttpCacheMiddleware:
         self.storage = load_object(settings["HTTPCACHE_STORAGE"])(settings)
         self.ignore_missing = settings.getbool("HTTPCACHE_IGNORE_MISSING")
         self.stats = stats
+        self.threads = settings.getint("HTTPCACHE_THREADS")
+        self._threadpool: Optional[ThreadPool] = None
+        # Storages are called from one thread at a time unless they are
+        # thread-safe
+        self._lock: Optional[threading.Lock] = None
+        if not getattr(self.storage, "thread_safe", False):
+            self._lock = threading.Lock()
+        # Write-behind queue of the thread pool, and responses in it or being
+        # stored, by request fingerprint, which are retrieved from memory
+        self._write_queue: List[Tuple[Spider, Request, Response]] = []
+        self._unstored: Dict[bytes, Response] = {}
+        self._flushing = False
+        self._room_waiters: List[Deferred] = []
+        self._drain_waiters: List[Deferred] = []
 
     @classmethod
     def from_crawler(
@@ -57,13 +85,49 @@ class HttpCacheMiddleware:
         crawler.signals.connect(o.spider_closed, signal=signals.spider_closed)
         return o
 
-    def spider_opened(self, spider: Spider) -> None:
-        self.storage.open_spider(spider)
+    def spider_opened(self, spider: Spider) -> Optional[Deferred]:
+        if self.threads > 0:
+            self._threadpool = ThreadPool(
+                minthreads=0, maxthreads=self.threads, name="httpcache"
+            )
+            self._threadpool.start()
+            self._fingerprinter = spider.crawler.request_fingerprinter
+        return self._call(self.storage.open_spider, spider)
+
+    def spider_closed(self, spider: Spider) -> Optional[Deferred]:
+        if self._threadpool is None:
+            return self._call(self.storage.close_spider, spider)
+        dfd = self._wait_for_writes()
+        dfd.addCallback(lambda _: self._call(self.storage.close_spider, spider))
+        dfd.addBoth(self._stop_threadpool)
+        return dfd
+
+    def _stop_threadpool(self, result: Any) -> Any:
+        self._threadpool.stop()
+        self._threadpool = None
+        return result
+
+    def _call(self, method: Callable, *args: Any) -> Any:
+        """Call a storage method, in the thread pool if there is one and the
+        method is not a coroutine function, and return its result, or a
+        Deferred if the result is not available yet."""
+        if self._threadpool is not None and not inspect.iscoroutinefunction(method):
+            from twisted.internet import reactor
+
+            return threads.deferToThreadPool(
+                reactor, self._threadpool, self._call_blocking, method, *args
+            )
+        return deferred_from_coro(method(*args))
 
-    def spider_closed(self, spider: Spider) -> None:
-        self.storage.close_spider(spider)
+    def _call_blocking(self, method: Callable, *args: Any) -> Any:
+        if self._lock is None:
+            return method(*args)
+        with self._lock:
+            return method(*args)
 
-    def process_request(self, request: Request, spider: Spider) -> Optional[Response]:
+    def process_request(
+        self, request: Request, spider: Spider
+    ) -> Union[Optional[Response], Deferred]:
         if request.meta.get("dont_cache", False):
             return None
 
@@ -73,7 +137,21 @@ class HttpCacheMiddleware:
             return None
 
         # Look for cached response and check if expired
-        cachedresponse = self.storage.retrieve_response(spider, request)
+        if self._unstored:
+            unstored = self._unstored.get(self._fingerprinter.fingerprint(request))
+            if unstored is not None:
+                cachedresponse = unstored.replace(flags=[])
+                return self._process_cached_response(cachedresponse, request, spider)
+        cachedresponse = self._call(self.storage.retrieve_response, spider, request)
+        if isinstance(cachedresponse, Deferred):
+            return cachedresponse.addCallback(
+                self._process_cached_response, request, spider
+            )
+        return self._process_cached_response(cachedresponse, request, spider)
+
+    def _process_cached_response(
+        self, cachedresponse: Optional[Response], request: Request, spider: Spider
+    ) -> Optional[Response]:
         if cachedresponse is None:
             self.stats.inc_value("httpcache/miss", spider=spider)
             if self.ignore_missing:
@@ -95,7 +173,7 @@ class HttpCacheMiddleware:
 
     def process_response(
         self, request: Request, response: Response, spider: Spider
-    ) -> Response:
+    ) -> Union[Response, Deferred]:
         if request.meta.get("dont_cache", False):
             return response
 
@@ -113,16 +191,14 @@ class HttpCacheMiddleware:
         cachedresponse = request.meta.pop("cached_response", None)
         if cachedresponse is None:
             self.stats.inc_value("httpcache/firsthand", spider=spider)
-            self._cache_response(spider, response, request, cachedresponse)
-            return response
+            return self._cache_response(spider, response, request, cachedresponse)
 
         if self.policy.is_cached_response_valid(cachedresponse, response, request):
             self.stats.inc_value("httpcache/revalidate", spider=spider)
             return cachedresponse
 
         self.stats.inc_value("httpcache/invalidate", spider=spider)
-        self._cache_response(spider, response, request, cachedresponse)
-        return response
+        return self._cache_response(spider, response, request, cachedresponse)
 
     def process_exception(
         self, request: Request, exception: Exception, spider: Spider
@@ -141,9 +217,92 @@ class HttpCacheMiddleware:
         response: Response,
         request: Request,
         cachedresponse: Optional[Response],
-    ) -> None:
-        if self.policy.should_cache_response(response, request):
-            self.stats.inc_value("httpcache/store", spider=spider)
-            self.storage.store_response(spider, request, response)
-        else:
+    ) -> Union[Response, Deferred]:
+        """Store *response* if the policy allows it, and return it, or a
+        Deferred that fires with it once it can be processed further."""
+        if not self.policy.should_cache_response(response, request):
             self.stats.inc_value("httpcache/uncacheable", spider=spider)
+            return response
+        self.stats.inc_value("httpcache/store", spider=spider)
+        if self._threadpool is not None and not inspect.iscoroutinefunction(
+            self.storage.store_response
+        ):
+            return self._store_behind(spider, request, response)
+        result = deferred_from_coro(
+            self.storage.store_response(spider, request, response)
+        )
+        if isinstance(result, Deferred):
+            return result.addCallback(lambda _: response)
+        return response
+
+    def _store_behind(
+        self, spider: Spider, request: Request, response: Response
+    ) -> Union[Response, Deferred]:
+        """Queue *response* to be stored by the thread pool, in batches, and
+        return it, or a Deferred that fires with it once the write-behind
+        queue has room for more responses."""
+        self._write_queue.append((spider, request, response))
+        self._unstored[self._fingerprinter.fingerprint(request)] = response
+        if not self._flushing:
+            self._flush()
+        if len(self._write_queue) < self.WRITE_QUEUE_SIZE:
+            return response
+        return self._wait_for_room().addCallback(lambda _: response)
+
+    def _flush(self) -> None:
+        batch, self._write_queue = self._write_queue, []
+        self._flushing = True
+        dfd = self._call(self._store_batch, batch)
+        dfd.addBoth(self._batch_stored, batch)
+
+    def _store_batch(self, batch: List[Tuple[Spider, Request, Response]]) -> None:
+        for spider, request, response in batch:
+            try:
+                self.storage.store_response(spider, request, response)
+            except Exception:
+                logger.error(
+                    "Error storing %(response)s in the HTTP cache",
+                    {"response": response},
+                    exc_info=True,
+                    extra={"spider": spider},
+                )
+
+    def _batch_stored(
+        self, result: Any, batch: List[Tuple[Spider, Request, Response]]
+    ) -> None:
+        if isinstance(result, Failure):
+            logger.error(
+                "Error storing responses in the HTTP cache",
+                exc_info=failure_to_exc_info(result),
+            )
+        for _, request, response in batch:
+            fingerprint = self._fingerprinter.fingerprint(request)
+            if self._unstored.get(fingerprint) is response:
+                del self._unstored[fingerprint]
+        if len(self._write_queue) < self.WRITE_QUEUE_SIZE:
+            waiters, self._room_waiters = self._room_waiters, []
+            for dfd in waiters:
+                dfd.callback(None)
+        if self._write_queue:
+            self._flush()
+            return
+        self._flushing = False
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for dfd in waiters:
+            dfd.callback(None)
+
+    def _wait_for_room(self) -> Deferred:
+        """Return a Deferred that fires once the write-behind queue has room
+        for more responses."""
+        dfd = Deferred()
+        self._room_waiters.append(dfd)
+        return dfd
+
+    def _wait_for_writes(self) -> Deferred:
+        """Return a Deferred that fires once the responses in the
+        write-behind queue have been stored."""
+        if not self._flushing:
+            return defer.succeed(None)
+        dfd = Deferred()
+        self._drain_waiters.append(dfd)
+        return dfd
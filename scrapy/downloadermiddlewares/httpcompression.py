@@ -1,34 +1,24 @@
-import io
 import warnings
-import zlib
 
-from scrapy.exceptions import NotConfigured
+from scrapy.exceptions import IgnoreRequest, NotConfigured
 from scrapy.http import Response, TextResponse
 from scrapy.responsetypes import responsetypes
+from scrapy.utils._compression import _DECODERS, _decode, _DecompressionMaxSizeExceeded
 from scrapy.utils.deprecate import ScrapyDeprecationWarning
-from scrapy.utils.gz import gunzip
 
-ACCEPTED_ENCODINGS = [b"gzip", b"deflate"]
-
-try:
-    import brotli
-
-    ACCEPTED_ENCODINGS.append(b"br")
-except ImportError:
-    pass
-
-try:
-    import zstandard
-
-    ACCEPTED_ENCODINGS.append(b"zstd")
-except ImportError:
-    pass
+ACCEPTED_ENCODINGS = [
+    encoding
+    for encoding in (b"gzip", b"deflate", b"br", b"zstd")
+    if encoding in _DECODERS
+]
 
 
 class HttpCompressionMiddleware:
     """This middleware allows compressed (gzip, deflate) traffic to be
     sent/received from web sites"""
 
+    _max_size = 0
+
     def __init__(self, stats=None):
         self.stats = stats
 
@@ -37,7 +27,7 @@ class HttpCompressionMiddleware:
         if not crawler.settings.getbool("COMPRESSION_ENABLED"):
             raise NotConfigured
         try:
-            return cls(stats=crawler.stats)
+            mw = cls(stats=crawler.stats)
         except TypeError:
             warnings.warn(
                 "HttpCompressionMiddleware subclasses must either modify "
@@ -45,30 +35,47 @@ class HttpCompressionMiddleware:
                 "reimplement the 'from_crawler' method.",
                 ScrapyDeprecationWarning,
             )
-            result = cls()
-            result.stats = crawler.stats
-            return result
+            mw = cls()
+            mw.stats = crawler.stats
+        mw._max_size = crawler.settings.getint("DOWNLOAD_MAXSIZE")
+        return mw
 
     def process_request(self, request, spider):
         request.headers.setdefault("Accept-Encoding", b", ".join(ACCEPTED_ENCODINGS))
+        # Let download handlers decompress the body while it is received
+        request._decompress = True
+        request._decompressed_size = None
 
     def process_response(self, request, response, spider):
+        decompressed_size = request._decompressed_size
+        request._decompressed_size = None
         if request.method == "HEAD":
             return response
+        if decompressed_size is not None:
+            # Already decompressed by the download handler
+            self._inc_stats(decompressed_size, spider)
+            return response
         if isinstance(response, Response):
             content_encoding = response.headers.getlist("Content-Encoding")
             if content_encoding:
                 encoding = content_encoding.pop()
-                decoded_body = self._decode(response.body, encoding.lower())
-                if self.stats:
-                    self.stats.inc_value(
-                        "httpcompression/response_bytes",
-                        len(decoded_body),
-                        spider=spider,
+                max_size = request.meta.get(
+                    "download_maxsize", getattr(spider, "download_maxsize", None)
+                )
+                if max_size is None:
+                    max_size = self._max_size
+                try:
+                    decoded_body = self._decode(
+                        response.body, encoding.lower(), max_size=max_size
                     )
-                    self.stats.inc_value(
-                        "httpcompression/response_count", spider=spider
+                except _DecompressionMaxSizeExceeded:
+                    raise IgnoreRequest(
+                        f"Ignored response {response} because its body "
+                        f"({len(response.body)} B compressed) exceeded "
+                        f"DOWNLOAD_MAXSIZE ({max_size} B) during "
+                        f"decompression."
                     )
+                self._inc_stats(len(decoded_body), spider)
                 respcls = responsetypes.from_args(
                     headers=response.headers, url=response.url, body=decoded_body
                 )
@@ -83,25 +90,14 @@ class HttpCompressionMiddleware:
 
         return response
 
-    def _decode(self, body, encoding):
-        if encoding == b"gzip" or encoding == b"x-gzip":
-            body = gunzip(body)
+    def _inc_stats(self, decoded_size, spider):
+        if self.stats:
+            self.stats.inc_value(
+                "httpcompression/response_bytes",
+                decoded_size,
+                spider=spider,
+            )
+            self.stats.inc_value("httpcompression/response_count", spider=spider)
 
-        if encoding == b"deflate":
-            try:
-                body = zlib.decompress(body)
-            except zlib.error:
-                # ugly hack to work with raw deflate content that may
-                # be sent by microsoft servers. For more information, see:
-                # http://carsten.codimi.de/gzip.yaws/
-                # http://www.port80software.com/200ok/archive/2005/10/31/868.aspx
-                # http://www.gzip.org/zlib/zlib_faq.html#faq38
-                body = zlib.decompress(body, -15)
-        if encoding == b"br" and b"br" in ACCEPTED_ENCODINGS:
-            body = brotli.decompress(body)
-        if encoding == b"zstd" and b"zstd" in ACCEPTED_ENCODINGS:
-            # Using its streaming API since its simple API could handle only cases
-            # where there is content size data embedded in the frame
-            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body))
-            body = reader.read()
-        return body
+    def _decode(self, body, encoding, max_size=0):
+        return _decode(body, encoding, max_size=max_size)
@@ -43,7 +43,7 @@ class DownloaderStats:
             f"downloader/response_status_count/{response.status}", spider=spider
         )
         reslen = (
-            len(response.body)
+            response._get_body_size()
             + get_header_size(response.headers)
             + get_status_size(response.status)
             + 4
@@ -1,6 +1,12 @@
+import hashlib
 import logging
+import math
+import mmap
+import os
+import struct
+from array import array
 from pathlib import Path
-from typing import Optional, Set, Type, TypeVar
+from typing import Optional, Set, Tuple, Type, TypeVar
 from warnings import warn
 
 from twisted.internet.defer import Deferred
@@ -128,3 +134,297 @@ class RFPDupeFilter(BaseDupeFilter):
             self.logdupes = False
 
         spider.crawler.stats.inc_value("dupefilter/filtered", spider=spider)
+
+
+class _BloomFilter:
+    """Bloom filter for uniformly distributed keys, such as request
+    fingerprints, given as two 64-bit integers taken from the key."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, h1: int, h2: int) -> bool:
+        """Add a key, and return whether it might have been added before."""
+        bits, size = self.bits, self.size
+        seen = True
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                seen = False
+        return seen
+
+
+CompactRFPDupeFilterTV = TypeVar("CompactRFPDupeFilterTV", bound="CompactRFPDupeFilter")
+
+
+class CompactRFPDupeFilter(RFPDupeFilter):
+    """Request Fingerprint duplicates filter with a compact storage.
+
+    Fingerprints are kept as raw bytes in an append-only binary file,
+    ``requests.seen.bin`` in the job directory, which is read through
+    :mod:`mmap` (in memory if there is no job directory). Lookups go through
+    a :class:`Bloom filter <_BloomFilter>` first, and only fingerprints that
+    might have been seen are checked against the stored fingerprints, through
+    an in-memory hash table of record numbers.
+
+    The Bloom filter and the hash table are saved to ``requests.seen.idx`` on
+    close, so that resuming a job does not need to re-read every stored
+    fingerprint. An index that does not match the stored fingerprints, e.g.
+    because of a crash, is ignored and rebuilt from them.
+    """
+
+    _MAGIC = b"SCRAPYDF"
+    _HEADER = struct.Struct("<8sI")
+    _INDEX_MAGIC = b"SCRAPYDI"
+    _INDEX_HEADER = struct.Struct("<8sIQQdQ")
+    _FLUSH_RECORDS = 65536
+    _MAX_LOAD = 0.7
+    _MIN_TABLE_SIZE = 1024
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        debug: bool = False,
+        *,
+        fingerprinter=None,
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+    ) -> None:
+        self.fingerprinter = fingerprinter or RequestFingerprinter()
+        self.logdupes = True
+        self.debug = debug
+        self.logger = logging.getLogger(__name__)
+        self.file = None
+        self.index_path = None
+        self.record_size = 0
+        self._count = 0
+        self._mapped = 0  # number of records readable through self._mmap
+        self._mmap = None
+        self._pending = bytearray()  # records not written to self.file yet
+        self._bloom = _BloomFilter(capacity, error_rate)
+        self._table = array("I", bytes(4 * self._MIN_TABLE_SIZE))
+        if path:
+            self.index_path = Path(path, "requests.seen.idx")
+            self.file = Path(path, "requests.seen.bin").open("a+b")
+            self.file.seek(0)
+            header = self.file.read(self._HEADER.size)
+            if len(header) < self._HEADER.size:
+                # a header left partial by a crash
+                self._truncate(0)
+            else:
+                magic, self.record_size = self._HEADER.unpack(header)
+                if magic != self._MAGIC:
+                    raise ValueError(f"{self.file.name} is not a fingerprint store")
+                size = os.fstat(self.file.fileno()).st_size
+                records = (size - self._HEADER.size) // self.record_size
+                self._truncate(self._HEADER.size + records * self.record_size)
+                self._remap()
+                self._count = self._mapped
+                self._load_index()
+
+    @classmethod
+    def from_settings(
+        cls: Type[CompactRFPDupeFilterTV],
+        settings: BaseSettings,
+        *,
+        fingerprinter=None,
+    ) -> CompactRFPDupeFilterTV:
+        return cls(
+            job_dir(settings),
+            settings.getbool("DUPEFILTER_DEBUG"),
+            fingerprinter=fingerprinter,
+            capacity=settings.getint("DUPEFILTER_BLOOM_CAPACITY"),
+            error_rate=settings.getfloat("DUPEFILTER_BLOOM_ERROR_RATE"),
+        )
+
+    @staticmethod
+    def _hashes(fp: bytes) -> Tuple[int, int]:
+        if len(fp) < 16:
+            fp = hashlib.sha1(fp).digest()
+        return int.from_bytes(fp[:8], "little"), int.from_bytes(fp[8:16], "little") | 1
+
+    def _record(self, number: int) -> bytes:
+        size = self.record_size
+        if number < self._mapped:
+            offset = self._HEADER.size + number * size
+            return self._mmap[offset : offset + size]
+        offset = (number - self._mapped) * size
+        return bytes(self._pending[offset : offset + size])
+
+    def _truncate(self, size: int) -> None:
+        """Drop the data of the store after ``size`` bytes, i.e. a record
+        left partial by a crash, so that new records are appended aligned."""
+        if os.fstat(self.file.fileno()).st_size > size:
+            self.logger.warning(
+                "Dropping a partial record at the end of %(path)s",
+                {"path": self.file.name},
+            )
+            self.file.truncate(size)
+            self.file.seek(size)
+
+    def _remap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        self.file.flush()
+        length = os.fstat(self.file.fileno()).st_size
+        self._mmap = mmap.mmap(self.file.fileno(), length, access=mmap.ACCESS_READ)
+        self._mapped = (length - self._HEADER.size) // self.record_size
+
+    def _flush(self) -> None:
+        if self.file is None or not self.record_size:
+            return
+        if self.file.tell() == 0:
+            self.file.write(self._HEADER.pack(self._MAGIC, self.record_size))
+        self.file.write(self._pending)
+        self._pending = bytearray()
+        self._remap()
+
+    def _lookup(self, fp: bytes, h1: int) -> Tuple[bool, int]:
+        """Return whether ``fp`` is stored and the position of the hash table
+        where it is, or where it should be inserted."""
+        table = self._table
+        mask = len(table) - 1
+        position = h1 & mask
+        while True:
+            number = table[position]
+            if not number:
+                return False, position
+            if self._record(number - 1) == fp:
+                return True, position
+            position = (position + 1) & mask
+
+    def _index(self, number: int) -> None:
+        fp = self._record(number)
+        found, position = self._lookup(fp, self._hashes(fp)[0])
+        if not found:
+            self._table[position] = number + 1
+
+    def _grow(self) -> None:
+        if self._count + 1 > len(self._table) * self._MAX_LOAD:
+            self._table = array("I", bytes(8 * len(self._table)))
+            for number in range(self._count):
+                self._index(number)
+        if self._count + 1 > self._bloom.capacity:
+            self._bloom = _BloomFilter(2 * self._bloom.capacity, self._bloom.error_rate)
+            for number in range(self._count):
+                self._bloom.add(*self._hashes(self._record(number)))
+
+    def _read_index(self, data: bytes) -> Optional[Tuple[_BloomFilter, array, int]]:
+        """Return the Bloom filter, hash table and number of indexed records
+        of index *data*, or ``None`` if *data* is not a complete index of
+        the stored records."""
+        if len(data) < self._INDEX_HEADER.size:
+            return None
+        (
+            magic,
+            hashes,
+            count,
+            capacity,
+            error_rate,
+            size,
+        ) = self._INDEX_HEADER.unpack_from(data)
+        bloom_end = self._INDEX_HEADER.size + (size + 7) // 8
+        if (
+            magic != self._INDEX_MAGIC
+            or count > self._count
+            or not capacity
+            or bloom_end > len(data)
+        ):
+            return None
+        try:
+            bloom = _BloomFilter(capacity, error_rate)
+        except (ValueError, OverflowError):
+            return None
+        if bloom.size != size or bloom.hashes != hashes:
+            return None
+        # the hash table is grown by _grow() to the same length for the same
+        # number of records
+        entries = self._MIN_TABLE_SIZE
+        while count > entries * self._MAX_LOAD:
+            entries *= 2
+        if len(data) - bloom_end != 4 * entries:
+            return None
+        table = array("I")
+        table.frombytes(data[bloom_end:])
+        if entries - table.count(0) != count or max(table) > count:
+            return None
+        bloom.bits[:] = data[self._INDEX_HEADER.size : bloom_end]
+        return bloom, table, count
+
+    def _load_index(self) -> None:
+        index = None
+        if self.index_path.exists():
+            index = self._read_index(self.index_path.read_bytes())
+            if index is None:
+                self.logger.warning(
+                    "Ignoring the invalid index %(path)s, re-indexing the "
+                    "stored request fingerprints",
+                    {"path": str(self.index_path)},
+                )
+        if index is not None:
+            self._bloom, self._table, indexed = index
+        else:
+            indexed = 0
+        total, self._count = self._count, indexed
+        for number in range(indexed, total):
+            self._grow()
+            self._bloom.add(*self._hashes(self._record(number)))
+            self._index(number)
+            self._count += 1
+
+    def _save_index(self) -> None:
+        bloom = self._bloom
+        # Written under another name first, so that a crash cannot leave a
+        # truncated index
+        tmp_path = self.index_path.with_suffix(".idx.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(
+                self._INDEX_HEADER.pack(
+                    self._INDEX_MAGIC,
+                    bloom.hashes,
+                    self._count,
+                    bloom.capacity,
+                    bloom.error_rate,
+                    bloom.size,
+                )
+            )
+            f.write(bloom.bits)
+            f.write(self._table.tobytes())
+        os.replace(tmp_path, self.index_path)
+
+    def request_seen(self, request: Request) -> bool:
+        fp = self.fingerprinter.fingerprint(request)
+        if not self.record_size:
+            self.record_size = len(fp)
+        elif len(fp) != self.record_size:
+            raise ValueError(
+                f"Got a {len(fp)}-byte request fingerprint, but "
+                f"{self.__class__.__name__} stores {self.record_size}-byte "
+                f"fingerprints."
+            )
+        self._grow()
+        h1, h2 = self._hashes(fp)
+        if self._bloom.add(h1, h2) and self._lookup(fp, h1)[0]:
+            return True
+        _, position = self._lookup(fp, h1)
+        self._table[position] = self._count + 1
+        self._pending += fp
+        self._count += 1
+        if len(self._pending) >= self._FLUSH_RECORDS * self.record_size:
+            self._flush()
+        return False
+
+    def close(self, reason: str) -> None:
+        if self.file:
+            self._flush()
+            if self._mmap is not None:
+                self._mmap.close()
+            self.file.close()
+            if self.record_size:
+                self._save_index()
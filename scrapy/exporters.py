@@ -4,11 +4,13 @@ Item Exporters are used to export/serialize items into different formats.
 
 import csv
 import io
+import logging
 import marshal
 import pickle
 import pprint
 import warnings
 from collections.abc import Mapping
+from types import MappingProxyType
 from xml.sax.saxutils import XMLGenerator
 
 from itemadapter import ItemAdapter, is_item
@@ -18,6 +20,8 @@ from scrapy.item import Item
 from scrapy.utils.python import is_listlike, to_bytes, to_unicode
 from scrapy.utils.serialize import ScrapyJSONEncoder
 
+logger = logging.getLogger(__name__)
+
 __all__ = [
     "BaseItemExporter",
     "PprintItemExporter",
@@ -27,13 +31,19 @@ __all__ = [
     "JsonLinesItemExporter",
     "JsonItemExporter",
     "MarshalItemExporter",
+    "ParquetItemExporter",
+    "ArrowItemExporter",
 ]
 
+_EMPTY_FIELD_META = MappingProxyType({})
+
 
 class BaseItemExporter:
     def __init__(self, *, dont_fail=False, **kwargs):
         self._kwargs = kwargs
         self._configure(kwargs, dont_fail=dont_fail)
+        self._plans = {}
+        self._plans_fields_to_export = self._fields_to_export_snapshot()
 
     def _configure(self, options, dont_fail=False):
         """Configure the exporter by popping options from the ``options`` dict.
@@ -60,46 +70,99 @@ class BaseItemExporter:
     def finish_exporting(self):
         pass
 
+    def export_items(self, items):
+        """Export an iterable of items. Subclasses may override it to write
+        them at once."""
+        for item in items:
+            self.export_item(item)
+
     def _get_serialized_fields(self, item, default_value=None, include_empty=None):
         """Return the fields to export as an iterable of tuples
         (name, serialized_value)
         """
-        item = ItemAdapter(item)
-
         if include_empty is None:
             include_empty = self.export_empty_fields
+        fields, field_meta = self._get_serialization_plan(item, include_empty)
+        if not isinstance(item, (dict, Item)):
+            item = ItemAdapter(item)
 
-        if self.fields_to_export is None:
-            if include_empty:
-                field_iter = item.field_names()
-            else:
-                field_iter = item.keys()
-        elif isinstance(self.fields_to_export, Mapping):
-            if include_empty:
-                field_iter = self.fields_to_export.items()
-            else:
-                field_iter = (
-                    (x, y) for x, y in self.fields_to_export.items() if x in item
-                )
-        else:
-            if include_empty:
-                field_iter = self.fields_to_export
-            else:
-                field_iter = (x for x in self.fields_to_export if x in item)
+        if fields is None:
+            for field_name, value in item.items():
+                meta = field_meta.get(field_name, _EMPTY_FIELD_META)
+                yield field_name, self.serialize_field(meta, field_name, value)
+            return
 
-        for field_name in field_iter:
-            if isinstance(field_name, str):
-                item_field, output_field = field_name, field_name
-            else:
-                item_field, output_field = field_name
+        for item_field, output_field, meta in fields:
             if item_field in item:
-                field_meta = item.get_field_meta(item_field)
-                value = self.serialize_field(field_meta, output_field, item[item_field])
-            else:
+                value = self.serialize_field(meta, output_field, item[item_field])
+            elif include_empty:
                 value = default_value
+            else:
+                continue
 
             yield output_field, value
 
+    def _fields_to_export_snapshot(self):
+        if self.fields_to_export is None:
+            return None
+        if isinstance(self.fields_to_export, Mapping):
+            return tuple(self.fields_to_export.items())
+        return tuple(self.fields_to_export)
+
+    def _get_serialization_plan(self, item, include_empty):
+        """Return a ``(fields, field_meta)`` tuple, computed once per item
+        class, to serialize ``item``.
+
+        ``fields`` is a tuple of ``(item_field, output_field, field_meta)``
+        tuples, or ``None`` if the fields set in each item must be exported,
+        with their metadata in the ``field_meta`` dict.
+        """
+        fields_to_export = self._fields_to_export_snapshot()
+        if self._plans_fields_to_export != fields_to_export:
+            # fields_to_export can change after the exporter creation, e.g.
+            # CsvItemExporter sets it from the first item, and it may be
+            # changed in place
+            self._plans_fields_to_export = fields_to_export
+            self._plans.clear()
+        key = (type(item), include_empty)
+        try:
+            return self._plans[key]
+        except KeyError:
+            pass
+
+        adapter = ItemAdapter(item)
+        # dicts have no declared fields, their field names are their keys
+        declared = not isinstance(item, dict)
+        field_meta = {}
+        if declared:
+            for field_name in adapter.field_names():
+                field_meta[field_name] = adapter.get_field_meta(field_name)
+
+        if self.fields_to_export is None:
+            if include_empty and declared:
+                field_iter = adapter.field_names()
+            else:
+                field_iter = None
+        elif isinstance(self.fields_to_export, Mapping):
+            field_iter = self.fields_to_export.items()
+        else:
+            field_iter = self.fields_to_export
+
+        if field_iter is None:
+            fields = None
+        else:
+            fields = []
+            for field_name in field_iter:
+                if isinstance(field_name, str):
+                    item_field, output_field = field_name, field_name
+                else:
+                    item_field, output_field = field_name
+                meta = field_meta.get(item_field, _EMPTY_FIELD_META)
+                fields.append((item_field, output_field, meta))
+            fields = tuple(fields)
+        plan = self._plans[key] = (fields, field_meta)
+        return plan
+
 
 class JsonLinesItemExporter(BaseItemExporter):
     def __init__(self, file, **kwargs):
@@ -113,6 +176,14 @@ class JsonLinesItemExporter(BaseItemExporter):
         data = self.encoder.encode(itemdict) + "\n"
         self.file.write(to_bytes(data, self.encoding))
 
+    def export_items(self, items):
+        data = "".join(
+            self.encoder.encode(dict(self._get_serialized_fields(item))) + "\n"
+            for item in items
+        )
+        if data:
+            self.file.write(to_bytes(data, self.encoding))
+
 
 class JsonItemExporter(BaseItemExporter):
     def __init__(self, file, **kwargs):
@@ -151,6 +222,20 @@ class JsonItemExporter(BaseItemExporter):
         data = self.encoder.encode(itemdict)
         self.file.write(to_bytes(data, self.encoding))
 
+    def export_items(self, items):
+        separator = ",\n" if self.indent is not None else ","
+        data = separator.join(
+            self.encoder.encode(dict(self._get_serialized_fields(item)))
+            for item in items
+        )
+        if not data:
+            return
+        if self.first_item:
+            self.first_item = False
+        else:
+            data = separator + data
+        self.file.write(to_bytes(data, self.encoding))
+
 
 class XmlItemExporter(BaseItemExporter):
     def __init__(self, file, **kwargs):
@@ -231,6 +316,9 @@ class CsvItemExporter(BaseItemExporter):
             errors=errors,
         )
         self.csv_writer = csv.writer(self.stream, **self._kwargs)
+        # rows of export_items() are written to the stream at once
+        self._batch_buffer = io.StringIO(newline="")
+        self._batch_writer = csv.writer(self._batch_buffer, **self._kwargs)
         self._headers_not_written = True
         self._join_multivalued = join_multivalued
 
@@ -247,13 +335,21 @@ class CsvItemExporter(BaseItemExporter):
         return value
 
     def export_item(self, item):
+        self.csv_writer.writerow(self._get_row(item))
+
+    def export_items(self, items):
+        self._batch_buffer.seek(0)
+        self._batch_buffer.truncate()
+        self._batch_writer.writerows(self._get_row(item) for item in items)
+        self.stream.write(self._batch_buffer.getvalue())
+
+    def _get_row(self, item):
         if self._headers_not_written:
             self._headers_not_written = False
             self._write_headers_and_set_fields_to_export(item)
 
         fields = self._get_serialized_fields(item, default_value="", include_empty=True)
-        values = list(self._build_row(x for _, x in fields))
-        self.csv_writer.writerow(values)
+        return list(self._build_row(x for _, x in fields))
 
     def _build_row(self, values):
         for s in values:
@@ -313,6 +409,198 @@ class PprintItemExporter(BaseItemExporter):
         self.file.write(to_bytes(pprint.pformat(itemdict) + "\n"))
 
 
+class _ColumnarItemExporter(BaseItemExporter):
+    """Base class for exporters of the columnar formats of pyarrow_.
+
+    Items are buffered into columns, and written every ``row_group_size``
+    items. Column types come from the ``schema`` option, from the
+    ``arrow_type`` metadata of item fields or, failing those, they are
+    inferred from the first batch of items.
+
+    Values of string columns that are not strings are converted to strings,
+    with a warning. Other values that do not match the type of their column
+    raise :exc:`ValueError`.
+
+    .. _pyarrow: https://arrow.apache.org/docs/python/
+    """
+
+    # Modules that FeedExporter checks before enabling feeds of this format
+    _required_modules = ("pyarrow",)
+
+    def __init__(self, file, *, schema=None, row_group_size=10000, **kwargs):
+        super().__init__(dont_fail=True, **kwargs)
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(f"{type(self).__name__} requires pyarrow") from e
+        self._pa = pyarrow
+        self.file = file
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self._columns = None
+        self._types = {}
+        self._rows = 0
+        self._schema = None
+        self._writer = None
+
+    def serialize_field(self, field, name, value):
+        serializer = field.get("serializer", self._serialize_value)
+        return serializer(value)
+
+    def _serialize_value(self, value):
+        if isinstance(value, (str, bytes, int, float)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [self._serialize_value(v) for v in value]
+        if is_item(value):
+            return {k: self._serialize_value(v) for k, v in ItemAdapter(value).items()}
+        return value
+
+    def export_item(self, item):
+        if self._columns is None:
+            self._set_columns(item)
+        fields = self._get_serialized_fields(item, include_empty=True)
+        for column, (_, value) in zip(self._columns.values(), fields):
+            column.append(value)
+        self._rows += 1
+        if self._rows >= self.row_group_size:
+            self._write_columns()
+
+    def finish_exporting(self):
+        if self._rows:
+            self._write_columns()
+        if self._writer is None:
+            self._schema = self._get_schema()
+            self._open_writer(self._schema)
+        self._writer.close()
+
+    def _set_columns(self, item):
+        item = ItemAdapter(item)
+        if not self.fields_to_export:
+            if self.schema is not None:
+                self.fields_to_export = self.schema.names
+            else:
+                # use declared field names, or keys if the item is a dict
+                self.fields_to_export = item.field_names()
+        if isinstance(self.fields_to_export, Mapping):
+            names = self.fields_to_export.items()
+        else:
+            names = [(name, name) for name in self.fields_to_export]
+        self._columns = {}
+        for item_field, output_field in names:
+            self._columns[output_field] = []
+            if item_field in item.field_names():
+                arrow_type = item.get_field_meta(item_field).get("arrow_type")
+                if arrow_type is not None:
+                    self._types[output_field] = arrow_type
+
+    def _get_schema(self, arrays=None):
+        if self.schema is not None:
+            return self.schema
+        fields = []
+        for i, name in enumerate(self._columns or ()):
+            arrow_type = self._types.get(name)
+            if arrow_type is None:
+                if arrays is None or self._pa.types.is_null(arrays[i].type):
+                    arrow_type = self._pa.string()
+                else:
+                    arrow_type = arrays[i].type
+            fields.append(self._pa.field(name, arrow_type))
+        return self._pa.schema(fields)
+
+    def _write_columns(self):
+        columns = self._columns
+        self._columns = {name: [] for name in columns}
+        self._rows = 0
+        if self._writer is None:
+            # The first batch sets the column types of the whole file
+            arrays = [
+                self._get_array(name, values, self._types.get(name))
+                for name, values in columns.items()
+            ]
+            self._schema = self._get_schema(arrays)
+            self._open_writer(self._schema)
+        arrays = [
+            self._get_array(field.name, values, field.type)
+            for field, values in zip(self._schema, columns.values())
+        ]
+        batch = self._pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        self._write_batch(batch)
+
+    def _get_array(self, name, values, arrow_type):
+        try:
+            return self._pa.array(values, type=arrow_type)
+        except (self._pa.ArrowInvalid, self._pa.ArrowTypeError) as e:
+            if arrow_type is not None and not self._pa.types.is_string(arrow_type):
+                raise ValueError(
+                    f"Cannot export the values of the {name!r} field as "
+                    f"{arrow_type}, the type of its column: {e}. Set the "
+                    f"type of the field with the schema option or the "
+                    f"arrow_type field metadata."
+                ) from e
+            logger.warning(
+                "Converting the values of the %(name)r field to strings, as "
+                "they do not all fit in its column: %(error)s",
+                {"name": name, "error": e},
+            )
+            values = [
+                value
+                if value is None or isinstance(value, (str, bytes))
+                else str(value)
+                for value in values
+            ]
+            return self._pa.array(values, type=self._pa.string())
+
+    def _open_writer(self, schema):
+        raise NotImplementedError
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+
+class ParquetItemExporter(_ColumnarItemExporter):
+    """Exports items to a Parquet_ file, writing a row group every
+    ``row_group_size`` items. Requires pyarrow_.
+
+    Other keyword arguments are passed to :class:`pyarrow.parquet.ParquetWriter`
+    (e.g. ``compression``).
+
+    .. _Parquet: https://parquet.apache.org/
+    .. _pyarrow: https://arrow.apache.org/docs/python/
+    """
+
+    def _open_writer(self, schema):
+        import pyarrow.parquet
+
+        sink = self._pa.PythonFile(self.file, mode="w")
+        self._writer = pyarrow.parquet.ParquetWriter(sink, schema, **self._kwargs)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch, row_group_size=batch.num_rows)
+
+
+class ArrowItemExporter(_ColumnarItemExporter):
+    """Exports items to an `Arrow IPC file`_ (also known as Feather V2),
+    writing a record batch every ``row_group_size`` items. Requires pyarrow_.
+
+    Other keyword arguments are passed to :class:`pyarrow.ipc.IpcWriteOptions`
+    (e.g. ``compression``).
+
+    .. _Arrow IPC file: https://arrow.apache.org/docs/format/Columnar.html#ipc-file-format
+    .. _pyarrow: https://arrow.apache.org/docs/python/
+    """
+
+    def _open_writer(self, schema):
+        import pyarrow.ipc
+
+        sink = self._pa.PythonFile(self.file, mode="w")
+        options = pyarrow.ipc.IpcWriteOptions(**self._kwargs)
+        self._writer = pyarrow.ipc.new_file(sink, schema, options=options)
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+
+
 class PythonItemExporter(BaseItemExporter):
     """This is a base class for item exporters that extends
     :class:`BaseItemExporter` with support for nested items.
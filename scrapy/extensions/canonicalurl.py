@@ -0,0 +1,41 @@
+"""
+CanonicalURLCache extension
+
+See documentation in docs/topics/extensions.rst
+"""
+
+from scrapy import signals
+from scrapy.utils.url import canonical_url_cache
+
+
+class CanonicalURLCache:
+    # The cache is process-wide, and sized once by CrawlerProcess from the
+    # CANONICALIZE_URL_CACHE_SIZE setting
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        o = cls(crawler.stats)
+        crawler.signals.connect(o.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(o.spider_closed, signal=signals.spider_closed)
+        return o
+
+    def spider_opened(self, spider):
+        # the cache is shared by all crawlers of the process
+        self.hits = canonical_url_cache.hits
+        self.misses = canonical_url_cache.misses
+
+    def spider_closed(self, spider, reason):
+        if not canonical_url_cache.limit:
+            return
+        self.stats.set_value(
+            "canonicalize_url/cache_hit",
+            canonical_url_cache.hits - self.hits,
+            spider=spider,
+        )
+        self.stats.set_value(
+            "canonicalize_url/cache_miss",
+            canonical_url_cache.misses - self.misses,
+            spider=spider,
+        )
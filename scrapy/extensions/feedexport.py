@@ -4,17 +4,22 @@ Feed Exports extension
 See documentation in docs/topics/feed-exports.rst
 """
 
+import io
 import logging
 import re
 import sys
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from importlib import import_module
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from typing import IO, Any, Callable, List, Optional, Tuple, Union
 from urllib.parse import unquote, urlparse
 
-from twisted.internet import defer, threads
+from twisted.internet import defer, task, threads
 from twisted.internet.defer import DeferredList
 from w3lib.url import file_uri_to_path
 from zope.interface import Interface, implementer
@@ -116,6 +121,187 @@ class BlockingFeedStorage:
         raise NotImplementedError
 
 
+class _MultipartUploadFile(io.RawIOBase):
+    """Write-only file that uploads its content in parts of ``part_size``
+    bytes while it is written, using the ``_start_upload``,
+    ``_upload_part``, ``_complete_upload``, ``_abort_upload`` and ``_put``
+    methods of ``storage``.
+
+    Parts are uploaded in up to ``concurrency`` threads. Writes never block:
+    parts that cannot be uploaded yet are queued, and :meth:`wait_writable`
+    returns a Deferred to pause writing until the queue drains, which bounds
+    memory usage. Each part upload is retried up to ``retry_times`` times.
+
+    :meth:`complete` must be called, from a thread, to upload the last part
+    and finish the upload, after :meth:`close` if the file is closed.
+    Contents that fit in a single part are uploaded at once with ``_put``.
+    """
+
+    def __init__(self, storage, part_size, concurrency=1, retry_times=0):
+        super().__init__()
+        self.storage = storage
+        self.part_size = part_size
+        self.retry_times = retry_times
+        self._buffer = bytearray()
+        self._position = 0
+        self._executor = ThreadPoolExecutor(concurrency, "feed-upload")
+        self._concurrency = concurrency
+        # parts submitted and not uploaded yet, and Deferreds waiting for
+        # them to be at most as many as the upload threads
+        self._pending = 0
+        self._waiters = []
+        self._lock = threading.Lock()
+        self._upload = None
+        self._parts = []
+        self._error = None
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def write(self, data):
+        if self._error is not None:
+            raise self._error
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._submit(part)
+        return len(data)
+
+    def wait_writable(self):
+        """Return a Deferred that fires once no part waits for an upload
+        thread, or ``None`` if none does already. Must be called from the
+        reactor thread."""
+        with self._lock:
+            if self._pending <= self._concurrency:
+                return None
+            d = defer.Deferred()
+            self._waiters.append(d)
+            return d
+
+    def _submit(self, data):
+        if self._upload is None:
+            self._upload = self._executor.submit(self.storage._start_upload)
+        with self._lock:
+            self._pending += 1
+        number = len(self._parts) + 1
+        self._parts.append(self._executor.submit(self._upload_part, number, data))
+
+    def _upload_part(self, number, data):
+        try:
+            upload = self._upload.result()
+            retries = 0
+            while True:
+                try:
+                    return self.storage._upload_part(upload, number, data)
+                except Exception as e:
+                    if retries >= self.retry_times:
+                        raise
+                    retries += 1
+                    logger.warning(
+                        "Retrying upload of part %(number)d of %(storage)s "
+                        "(failed %(retries)d times): %(error)s",
+                        {
+                            "number": number,
+                            "storage": self.storage,
+                            "retries": retries,
+                            "error": e,
+                        },
+                    )
+                    time.sleep(min(2**retries / 4, 30))
+        except Exception as e:
+            # Stop accepting writes, the upload cannot be completed
+            self._error = e
+            raise
+        finally:
+            self._part_done()
+
+    def _part_done(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending > self._concurrency or not self._waiters:
+                return
+            waiters, self._waiters = self._waiters, []
+        from twisted.internet import reactor
+
+        for d in waiters:
+            reactor.callFromThread(d.callback, None)
+
+    def complete(self):
+        """Upload the remaining content and finish the upload."""
+        try:
+            if self._upload is None:
+                self.storage._put(bytes(self._buffer))
+                return
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            parts = [future.result() for future in self._parts]
+            self.storage._complete_upload(self._upload.result(), parts)
+        except Exception:
+            self._executor.shutdown()
+            if self._upload is not None and self._upload.exception() is None:
+                try:
+                    self.storage._abort_upload(self._upload.result())
+                except Exception:
+                    logger.warning(
+                        "Could not abort the upload of %(storage)s",
+                        {"storage": self.storage},
+                        exc_info=True,
+                    )
+            raise
+        else:
+            self._executor.shutdown()
+
+
+class _MultipartUploadFeedStorage(BlockingFeedStorage):
+    """Base class of storages that can upload feeds in parts while they are
+    exported, see :setting:`FEED_STORAGE_UPLOAD_PART_SIZE`."""
+
+    #: Maximum number of parts uploaded in parallel
+    max_upload_concurrency = None
+    #: Whether failed part uploads can be retried
+    retry_upload_parts = True
+
+    def open(self, spider):
+        settings = spider.crawler.settings
+        part_size = settings.getint("FEED_STORAGE_UPLOAD_PART_SIZE")
+        if not part_size:
+            return super().open(spider)
+        self.upload_part_size = part_size
+        concurrency = settings.getint("FEED_STORAGE_UPLOAD_CONCURRENCY")
+        if self.max_upload_concurrency:
+            concurrency = min(concurrency, self.max_upload_concurrency)
+        retry_times = 0
+        if self.retry_upload_parts:
+            retry_times = settings.getint("FEED_STORAGE_UPLOAD_RETRY_TIMES")
+        return _MultipartUploadFile(self, part_size, concurrency, retry_times)
+
+    def store(self, file):
+        if isinstance(file, _MultipartUploadFile):
+            return threads.deferToThread(file.complete)
+        return super().store(file)
+
+    def _start_upload(self):
+        raise NotImplementedError
+
+    def _upload_part(self, upload, number, data):
+        raise NotImplementedError
+
+    def _complete_upload(self, upload, parts):
+        raise NotImplementedError
+
+    def _abort_upload(self, upload):
+        raise NotImplementedError
+
+    def _put(self, data):
+        raise NotImplementedError
+
+
 @implementer(IFeedStorage)
 class StdoutFeedStorage:
     def __init__(self, uri, _stdout=None, *, feed_options=None):
@@ -154,7 +340,7 @@ class FileFeedStorage:
         file.close()
 
 
-class S3FeedStorage(BlockingFeedStorage):
+class S3FeedStorage(_MultipartUploadFeedStorage):
     def __init__(
         self,
         uri,
@@ -208,14 +394,51 @@ class S3FeedStorage(BlockingFeedStorage):
 
     def _store_in_thread(self, file):
         file.seek(0)
+        self._put(file)
+        file.close()
+
+    def _put(self, data):
         kwargs = {"ACL": self.acl} if self.acl else {}
         self.s3_client.put_object(
-            Bucket=self.bucketname, Key=self.keyname, Body=file, **kwargs
+            Bucket=self.bucketname, Key=self.keyname, Body=data, **kwargs
         )
-        file.close()
 
+    def _start_upload(self):
+        kwargs = {"ACL": self.acl} if self.acl else {}
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucketname, Key=self.keyname, **kwargs
+        )
+        return response["UploadId"]
+
+    def _upload_part(self, upload, number, data):
+        response = self.s3_client.upload_part(
+            Bucket=self.bucketname,
+            Key=self.keyname,
+            UploadId=upload,
+            PartNumber=number,
+            Body=data,
+        )
+        return {"ETag": response["ETag"], "PartNumber": number}
+
+    def _complete_upload(self, upload, parts):
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucketname,
+            Key=self.keyname,
+            UploadId=upload,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def _abort_upload(self, upload):
+        self.s3_client.abort_multipart_upload(
+            Bucket=self.bucketname, Key=self.keyname, UploadId=upload
+        )
+
+
+class GCSFeedStorage(_MultipartUploadFeedStorage):
+    # Resumable uploads are sequential, and retried by google-cloud-storage
+    max_upload_concurrency = 1
+    retry_upload_parts = False
 
-class GCSFeedStorage(BlockingFeedStorage):
     def __init__(self, uri, project_id, acl):
         self.project_id = project_id
         self.acl = acl
@@ -231,15 +454,45 @@ class GCSFeedStorage(BlockingFeedStorage):
             crawler.settings["FEED_STORAGE_GCS_ACL"] or None,
         )
 
-    def _store_in_thread(self, file):
-        file.seek(0)
+    def _get_blob(self):
         from google.cloud.storage import Client
 
         client = Client(project=self.project_id)
         bucket = client.get_bucket(self.bucket_name)
-        blob = bucket.blob(self.blob_name)
+        return bucket.blob(self.blob_name)
+
+    def _store_in_thread(self, file):
+        file.seek(0)
+        blob = self._get_blob()
         blob.upload_from_file(file, predefined_acl=self.acl)
 
+    def _put(self, data):
+        blob = self._get_blob()
+        blob.upload_from_string(data, predefined_acl=self.acl)
+
+    def _start_upload(self):
+        from google.cloud.storage.retry import DEFAULT_RETRY
+
+        # chunk sizes must be multiples of 256 KiB
+        chunk_size = -(-self.upload_part_size // 262144) * 262144
+        blob = self._get_blob()
+        return blob.open(
+            "wb",
+            chunk_size=chunk_size,
+            predefined_acl=self.acl,
+            retry=DEFAULT_RETRY,
+        )
+
+    def _upload_part(self, upload, number, data):
+        upload.write(data)
+
+    def _complete_upload(self, upload, parts):
+        upload.close()
+
+    def _abort_upload(self, upload):
+        # Unfinished resumable uploads expire on their own
+        pass
+
 
 class FTPFeedStorage(BlockingFeedStorage):
     def __init__(self, uri, use_active_mode=False, *, feed_options=None):
@@ -286,6 +539,8 @@ class FeedSlot:
         batch_id,
         uri_template,
         filter,
+        buffer_item_count=0,
+        buffer_timeout=0,
     ):
         self.file = file
         self.exporter = exporter
@@ -297,6 +552,11 @@ class FeedSlot:
         self.uri_template = uri_template
         self.uri = uri
         self.filter = filter
+        # buffering of items, exported in batches
+        self.buffer_item_count = buffer_item_count
+        self.buffer_timeout = buffer_timeout
+        self.buffered_since = None
+        self._buffer = []
         # flags
         self.itemcount = 0
         self._exporting = False
@@ -306,10 +566,30 @@ class FeedSlot:
             self.exporter.start_exporting()
             self._exporting = True
 
+    def export_item(self, item):
+        if self.buffer_item_count <= 1:
+            self.exporter.export_item(item)
+            return
+        if not self._buffer:
+            self.buffered_since = time.monotonic()
+        self._buffer.append(item)
+        if len(self._buffer) >= self.buffer_item_count:
+            self.flush()
+
+    def flush(self):
+        """Export the buffered items."""
+        if self._buffer:
+            items, self._buffer = self._buffer, []
+            self.buffered_since = None
+            self.exporter.export_items(items)
+
     def finish_exporting(self):
         if self._exporting:
-            self.exporter.finish_exporting()
-            self._exporting = False
+            try:
+                self.flush()
+            finally:
+                self.exporter.finish_exporting()
+                self._exporting = False
 
 
 _FeedSlot = create_deprecated_class(
@@ -335,6 +615,7 @@ class FeedExporter:
         self.feeds = {}
         self.slots = []
         self.filters = {}
+        self._flush_task = None
 
         if not self.settings["FEEDS"] and not self.settings["FEED_URI"]:
             raise NotConfigured
@@ -365,15 +646,28 @@ class FeedExporter:
 
         self.storages = self._load_components("FEED_STORAGES")
         self.exporters = self._load_components("FEED_EXPORTERS")
-        for uri, feed_options in self.feeds.items():
+        for uri, feed_options in list(self.feeds.items()):
             if not self._storage_supported(uri, feed_options):
                 raise NotConfigured
             if not self._settings_are_valid():
                 raise NotConfigured
             if not self._exporter_supported(feed_options["format"]):
                 raise NotConfigured
+            if not self._exporter_available(uri, feed_options["format"]):
+                del self.feeds[uri]
+                del self.filters[uri]
+        if not self.feeds:
+            raise NotConfigured
 
     def open_spider(self, spider):
+        timeouts = [
+            feed_options["buffer_timeout"]
+            for feed_options in self.feeds.values()
+            if feed_options["buffer_item_count"] > 1 and feed_options["buffer_timeout"]
+        ]
+        if timeouts:
+            self._flush_task = task.LoopingCall(self._flush_buffers, spider)
+            self._flush_task.start(min(timeouts), now=False)
         for uri, feed_options in self.feeds.items():
             uri_params = self._get_uri_params(spider, feed_options["uri_params"])
             self.slots.append(
@@ -387,6 +681,8 @@ class FeedExporter:
             )
 
     async def close_spider(self, spider):
+        if self._flush_task and self._flush_task.running:
+            self._flush_task.stop()
         for slot in self.slots:
             self._close_slot(slot, spider)
 
@@ -399,6 +695,25 @@ class FeedExporter:
             self.crawler.signals.send_catch_log_deferred(signals.feed_exporter_closed)
         )
 
+    def _flush_buffers(self, spider):
+        now = time.monotonic()
+        for slot in self.slots:
+            if (
+                slot.buffered_since is None
+                or not slot.buffer_timeout
+                or now - slot.buffered_since < slot.buffer_timeout
+            ):
+                continue
+            try:
+                slot.flush()
+            except Exception:
+                logger.error(
+                    "Error exporting buffered items to %s",
+                    slot.uri,
+                    exc_info=True,
+                    extra={"spider": spider},
+                )
+
     def _close_slot(self, slot, spider):
         def get_file(slot_):
             if isinstance(slot_.file, PostProcessingManager):
@@ -479,6 +794,8 @@ class FeedExporter:
             batch_id=batch_id,
             uri_template=uri_template,
             filter=self.filters[uri_template],
+            buffer_item_count=feed_options["buffer_item_count"],
+            buffer_timeout=feed_options["buffer_timeout"],
         )
         if slot.store_empty:
             slot.start_exporting()
@@ -494,7 +811,7 @@ class FeedExporter:
                 continue
 
             slot.start_exporting()
-            slot.exporter.export_item(item)
+            slot.export_item(item)
             slot.itemcount += 1
             # create new slot for each slot with itemcount == FEED_EXPORT_BATCH_ITEM_COUNT and close the old one
             if (
@@ -517,6 +834,24 @@ class FeedExporter:
             else:
                 slots.append(slot)
         self.slots = slots
+        return self._wait_writable()
+
+    def _wait_writable(self):
+        """Return a Deferred that fires once the feeds uploaded in parts can
+        take more data, to pause the export of items instead of buffering
+        parts without a bound, or ``None`` if they all can."""
+        dfds = []
+        for slot in self.slots:
+            file = slot.file
+            if isinstance(file, PostProcessingManager):
+                file = file.file
+            if isinstance(file, _MultipartUploadFile):
+                d = file.wait_writable()
+                if d is not None:
+                    dfds.append(d)
+        if not dfds:
+            return None
+        return DeferredList(dfds)
 
     def _load_components(self, setting_prefix):
         conf = without_none_values(self.settings.getwithbase(setting_prefix))
@@ -533,6 +868,21 @@ class FeedExporter:
             return True
         logger.error("Unknown feed format: %(format)s", {"format": format})
 
+    def _exporter_available(self, uri, format):
+        """Return whether the modules that the exporter of *format* requires
+        can be imported, logging an error otherwise."""
+        for module in getattr(self.exporters[format], "_required_modules", ()):
+            try:
+                import_module(module)
+            except ImportError as e:
+                logger.error(
+                    "Disabled feed %(uri)s: the %(format)s feed format requires "
+                    "the %(module)s module, which cannot be imported: %(error)s",
+                    {"uri": uri, "format": format, "module": module, "error": e},
+                )
+                return False
+        return True
+
     def _settings_are_valid(self):
         """
         If FEED_EXPORT_BATCH_ITEM_COUNT setting or FEEDS.batch_item_count is specified uri has to contain
@@ -1,10 +1,17 @@
 import gzip
+import hashlib
 import logging
+import lzma
+import mmap
+import os
 import pickle
+import struct
+import zlib
 from email.utils import mktime_tz, parsedate_tz
 from importlib import import_module
 from pathlib import Path
 from time import time
+from typing import Dict, Iterator, List, Optional, Tuple, Type
 from weakref import WeakKeyDictionary
 
 from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
@@ -17,8 +24,26 @@ from scrapy.utils.httpobj import urlparse_cached
 from scrapy.utils.project import data_path
 from scrapy.utils.python import to_bytes, to_unicode
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+_DECOMPRESSION_ERRORS: Tuple[Type[Exception], ...] = (
+    ValueError,
+    zlib.error,
+    lzma.LZMAError,
+)
+if zstandard is not None:
+    _DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
 
 class DummyPolicy:
     def __init__(self, settings):
@@ -218,16 +243,205 @@ class RFC2616Policy:
         return currentage
 
 
+class _BodyCodec:
+    """Compresses the bodies of cached responses with the codec set in
+    :setting:`HTTPCACHE_COMPRESSION`, and decompresses them with the codec
+    that was used to compress them.
+
+    Bodies that are already compressed, because of their Content-Encoding or
+    Content-Type headers, or that do not get smaller, are stored as is.
+
+    With zstd, a dictionary is trained with the first bodies that are
+    compressed, unless :setting:`HTTPCACHE_ZSTD_DICT_SIZE` is 0, and used to
+    compress the following ones. Dictionaries are saved in the directory
+    given to :meth:`open`, and found by the ID that zstd stores in its
+    frames.
+
+    Bodies that cannot be decompressed, e.g. because their dictionary is
+    missing, are logged and treated as not cached.
+    """
+
+    CODECS = ("gzip", "lzma", "zstd")
+    # Codec IDs for storages that store them as numbers, 0 is no codec
+    IDS = {name: i for i, name in enumerate(CODECS, start=1)}
+    COMPRESSED_TYPES = (
+        b"image/",
+        b"video/",
+        b"audio/",
+        b"font/woff",
+        b"application/zip",
+        b"application/gzip",
+        b"application/x-gzip",
+        b"application/x-bzip2",
+        b"application/x-xz",
+        b"application/x-7z-compressed",
+        b"application/x-rar-compressed",
+        b"application/zstd",
+        b"application/octet-stream",
+    )
+    MIN_SIZE = 128
+    # Bodies to train a dictionary with, in multiples of the dictionary size
+    TRAINING_SIZE = 100
+
+    def __init__(self, settings):
+        codec = settings.get("HTTPCACHE_COMPRESSION") or None
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "gzip"
+        if codec is not None and codec not in self.CODECS:
+            raise ValueError(f"Unsupported HTTPCACHE_COMPRESSION value: {codec!r}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError(
+                "HTTPCACHE_COMPRESSION is 'zstd' but the zstandard package is "
+                "not installed"
+            )
+        self.codec = codec
+        self.level = settings.getint("HTTPCACHE_COMPRESSION_LEVEL", -1)
+        self.dict_size = settings.getint("HTTPCACHE_ZSTD_DICT_SIZE")
+        self._dir: Optional[Path] = None
+        self._dicts: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._samples: List[bytes] = []
+        self._samples_size = 0
+        self._zstd_compressor = None
+        if codec == "zstd":
+            self._set_zstd_dict(None)
+
+    def open(self, path: Path) -> None:
+        """Load the zstd dictionaries saved in *path*."""
+        self._dir = path
+        self._load_dicts()
+        if self.codec == "zstd":
+            last = max(self._dicts.values(), key=lambda d: d.dict_id(), default=None)
+            self._set_zstd_dict(last)
+
+    def _load_dicts(self) -> None:
+        if zstandard is None or not self._dir.exists():
+            return
+        for path in self._dir.glob("*.zstdict"):
+            try:
+                dict_id = int(path.stem)
+                if dict_id not in self._dicts:
+                    data = path.read_bytes()
+                    self._dicts[dict_id] = zstandard.ZstdCompressionDict(data)
+            except (OSError, ValueError) as e:
+                logger.warning(
+                    "Could not load the HTTP cache zstd dictionary %(path)s: %(error)s",
+                    {"path": path, "error": e},
+                )
+
+    def _set_zstd_dict(self, zstd_dict) -> None:
+        level = self.level if self.level >= 0 else 3
+        if zstd_dict is not None:
+            # Otherwise the dictionary is loaded on every compression
+            zstd_dict.precompute_compress(level=level)
+            self.dict_size = 0  # no more training
+        self._zstd_compressor = zstandard.ZstdCompressor(
+            level=level, dict_data=zstd_dict
+        )
+
+    def _train(self) -> None:
+        level = self.level if self.level >= 0 else 3
+        try:
+            zstd_dict = zstandard.train_dictionary(
+                self.dict_size, self._samples, level=level
+            )
+        except zstandard.ZstdError as e:
+            logger.warning(
+                "Could not train a zstd dictionary for the HTTP cache: %s", e
+            )
+            self.dict_size = 0
+            return
+        finally:
+            self._samples = []
+        self._dir.mkdir(parents=True, exist_ok=True)
+        # Written under another name first, so that a crash cannot leave a
+        # truncated dictionary that other processes would load
+        path = self._dir / f"{zstd_dict.dict_id()}.zstdict"
+        tmp_path = path.with_suffix(".zstdict.tmp")
+        tmp_path.write_bytes(zstd_dict.as_bytes())
+        os.replace(tmp_path, path)
+        self._dicts[zstd_dict.dict_id()] = zstd_dict
+        self._set_zstd_dict(zstd_dict)
+
+    def _is_compressed(self, headers: Headers) -> bool:
+        if headers.get(b"Content-Encoding"):
+            return True
+        content_type = (headers.get(b"Content-Type") or b"").lower()
+        return content_type.startswith(self.COMPRESSED_TYPES)
+
+    def compress(self, body: bytes, headers: Headers) -> Tuple[Optional[str], bytes]:
+        """Return the codec to store *body* with, ``None`` if it is stored as
+        is, and the data to store."""
+        if (
+            self.codec is None
+            or len(body) < self.MIN_SIZE
+            or self._is_compressed(headers)
+        ):
+            return None, body
+        if self.codec == "gzip":
+            data = zlib.compress(body, self.level)
+        elif self.codec == "lzma":
+            preset = self.level if self.level >= 0 else lzma.PRESET_DEFAULT
+            data = lzma.compress(body, preset=preset)
+        else:
+            if self.dict_size and self._dir is not None:
+                self._samples.append(body)
+                self._samples_size += len(body)
+                if self._samples_size >= self.dict_size * self.TRAINING_SIZE:
+                    self._train()
+            data = self._zstd_compressor.compress(body)
+        if len(data) >= len(body):
+            return None, body
+        return self.codec, data
+
+    def decompress(self, codec: Optional[str], data: bytes) -> Optional[bytes]:
+        """Return *data* decompressed with *codec*, or ``None`` if it cannot
+        be decompressed."""
+        try:
+            return self._decompress(codec, data)
+        except _DECOMPRESSION_ERRORS as e:
+            logger.warning(
+                "Ignoring a cached response that could not be decompressed: %(error)s",
+                {"error": e},
+            )
+            return None
+
+    def _decompress(self, codec: Optional[str], data: bytes) -> bytes:
+        if codec is None:
+            return data
+        if codec == "gzip":
+            return zlib.decompress(data)
+        if codec == "lzma":
+            return lzma.decompress(data)
+        if codec == "zstd":
+            if zstandard is None:
+                raise ValueError(
+                    "Cannot decompress a zstd-compressed cached response: the "
+                    "zstandard package is not installed"
+                )
+            dict_id = zstandard.get_frame_parameters(data).dict_id
+            zstd_dict = None
+            if dict_id:
+                if dict_id not in self._dicts and self._dir is not None:
+                    self._load_dicts()
+                if dict_id not in self._dicts:
+                    raise ValueError(f"the zstd dictionary {dict_id} is missing")
+                zstd_dict = self._dicts[dict_id]
+            return zstandard.ZstdDecompressor(dict_data=zstd_dict).decompress(data)
+        raise ValueError(f"Unsupported cached response codec: {codec!r}")
+
+
 class DbmCacheStorage:
     def __init__(self, settings):
         self.cachedir = data_path(settings["HTTPCACHE_DIR"], createdir=True)
         self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
         self.dbmodule = import_module(settings["HTTPCACHE_DBM_MODULE"])
         self.db = None
+        self._codec = _BodyCodec(settings)
 
     def open_spider(self, spider: Spider):
         dbpath = Path(self.cachedir, f"{spider.name}.db")
         self.db = self.dbmodule.open(str(dbpath), "c")
+        self._codec.open(Path(self.cachedir, f"{spider.name}.dicts"))
 
         logger.debug(
             "Using DBM cache storage in %(cachepath)s",
@@ -247,19 +461,24 @@ class DbmCacheStorage:
         url = data["url"]
         status = data["status"]
         headers = Headers(data["headers"])
-        body = data["body"]
+        body = self._codec.decompress(data.get("codec"), data["body"])
+        if body is None:
+            return  # cannot be decompressed
         respcls = responsetypes.from_args(headers=headers, url=url, body=body)
         response = respcls(url=url, headers=headers, status=status, body=body)
         return response
 
     def store_response(self, spider, request, response):
         key = self._fingerprinter.fingerprint(request).hex()
+        codec, body = self._codec.compress(response.body, response.headers)
         data = {
             "status": response.status,
             "url": response.url,
             "headers": dict(response.headers),
-            "body": response.body,
+            "body": body,
         }
+        if codec is not None:
+            data["codec"] = codec
         self.db[f"{key}_data"] = pickle.dumps(data, protocol=4)
         self.db[f"{key}_time"] = str(time())
 
@@ -278,11 +497,16 @@ class DbmCacheStorage:
 
 
 class FilesystemCacheStorage:
+    # Each response is stored in its own files, so responses can be retrieved
+    # from several threads while another one stores responses
+    thread_safe = True
+
     def __init__(self, settings):
         self.cachedir = data_path(settings["HTTPCACHE_DIR"])
         self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
         self.use_gzip = settings.getbool("HTTPCACHE_GZIP")
         self._open = gzip.open if self.use_gzip else open
+        self._codec = _BodyCodec(settings)
 
     def open_spider(self, spider: Spider):
         logger.debug(
@@ -290,6 +514,7 @@ class FilesystemCacheStorage:
             {"cachedir": self.cachedir},
             extra={"spider": spider},
         )
+        self._codec.open(Path(self.cachedir, spider.name))
 
         self._fingerprinter = spider.crawler.request_fingerprinter
 
@@ -303,7 +528,9 @@ class FilesystemCacheStorage:
             return  # not cached
         rpath = Path(self._get_request_path(spider, request))
         with self._open(rpath / "response_body", "rb") as f:
-            body = f.read()
+            body = self._codec.decompress(metadata.get("body_codec"), f.read())
+        if body is None:
+            return  # cannot be decompressed
         with self._open(rpath / "response_headers", "rb") as f:
             rawheaders = f.read()
         url = metadata.get("response_url")
@@ -325,6 +552,9 @@ class FilesystemCacheStorage:
             "response_url": response.url,
             "timestamp": time(),
         }
+        codec, body = self._codec.compress(response.body, response.headers)
+        if codec is not None:
+            metadata["body_codec"] = codec
         with self._open(rpath / "meta", "wb") as f:
             f.write(to_bytes(repr(metadata)))
         with self._open(rpath / "pickled_meta", "wb") as f:
@@ -332,7 +562,7 @@ class FilesystemCacheStorage:
         with self._open(rpath / "response_headers", "wb") as f:
             f.write(headers_dict_to_raw(response.headers))
         with self._open(rpath / "response_body", "wb") as f:
-            f.write(response.body)
+            f.write(body)
         with self._open(rpath / "request_headers", "wb") as f:
             f.write(headers_dict_to_raw(request.headers))
         with self._open(rpath / "request_body", "wb") as f:
@@ -354,6 +584,477 @@ class FilesystemCacheStorage:
             return pickle.load(f)
 
 
+class _SegmentIndex:
+    """Open addressing hash table, stored in a memory-mapped file, from
+    16-byte keys to the location of records in the segment files of
+    :class:`SegmentCacheStorage`."""
+
+    MAGIC = b"SCRAPYHI"
+    # magic, capacity, used slots, bytes of segments taken by dead records
+    HEADER = struct.Struct("<8sQQQ")
+    # key, segment, offset, length, timestamp
+    SLOT = struct.Struct("<16sIQQd")
+    EMPTY = bytes(16)
+    DELETED = 0xFFFFFFFF
+
+    def __init__(self, path: Path, writable: bool):
+        self.path = path
+        self.writable = writable
+        self.file = path.open("r+b" if writable else "rb")
+        try:
+            self.inode = os.fstat(self.file.fileno()).st_ino
+            self.mmap = mmap.mmap(
+                self.file.fileno(),
+                0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+            )
+        except (OSError, ValueError):
+            self.file.close()
+            raise ValueError(f"{path} is not an HTTP cache index")
+        header = self.mmap[: self.HEADER.size]
+        if len(header) == self.HEADER.size:
+            magic, self.capacity, self.used, self.dead = self.HEADER.unpack(header)
+        if header[:8] != self.MAGIC or len(self.mmap) != self._size(self.capacity):
+            self.close()
+            raise ValueError(f"{path} is not an HTTP cache index")
+
+    @classmethod
+    def _size(cls, capacity: int) -> int:
+        return cls.HEADER.size + capacity * cls.SLOT.size
+
+    @classmethod
+    def create(cls, path: Path, capacity: int) -> "_SegmentIndex":
+        """Create an empty index, *capacity* must be a power of 2."""
+        with path.open("wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, capacity, 0, 0))
+            f.truncate(cls._size(capacity))
+        return cls(path, writable=True)
+
+    def publish(self, path: Path) -> None:
+        """Atomically replace the index at *path* with this one."""
+        self.close()
+        os.replace(self.path, path)
+        self.__init__(path, writable=True)
+
+    def replaced(self) -> bool:
+        """Return whether the index file has been replaced by another
+        process since it was opened."""
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except FileNotFoundError:
+            return True
+
+    def _find(self, key: bytes) -> Tuple[int, Optional[tuple]]:
+        """Return the slot of *key*, or the empty slot where it should be
+        inserted, and the slot contents, if not empty."""
+        mask = self.capacity - 1
+        position = int.from_bytes(key[:8], "little") & mask
+        while True:
+            slot = self.SLOT.unpack_from(
+                self.mmap, self.HEADER.size + position * self.SLOT.size
+            )
+            if slot[0] == key:
+                return position, slot
+            if slot[0] == self.EMPTY:
+                return position, None
+            position = (position + 1) & mask
+
+    def get(self, key: bytes) -> Optional[Tuple[int, int, int, float]]:
+        """Return the segment, offset, length and timestamp of the record of
+        *key*, or ``None`` if there is no such record."""
+        _, slot = self._find(key)
+        if slot is None or slot[1] == self.DELETED:
+            return None
+        return slot[1:]
+
+    def full(self) -> bool:
+        return self.used + 1 > self.capacity * 0.7
+
+    def put(
+        self, key: bytes, segment: int, offset: int, length: int, timestamp: float
+    ) -> None:
+        position, slot = self._find(key)
+        if slot is None:
+            self.used += 1
+        elif slot[1] != self.DELETED:
+            self.dead += slot[3]
+        # Readers validate records, so it does not matter if they see a
+        # partially written slot
+        self.SLOT.pack_into(
+            self.mmap,
+            self.HEADER.size + position * self.SLOT.size,
+            key,
+            segment,
+            offset,
+            length,
+            timestamp,
+        )
+        self._write_header()
+
+    def delete(self, key: bytes) -> None:
+        position, slot = self._find(key)
+        if slot is None or slot[1] == self.DELETED:
+            return
+        self.dead += slot[3]
+        self.SLOT.pack_into(
+            self.mmap,
+            self.HEADER.size + position * self.SLOT.size,
+            key,
+            self.DELETED,
+            0,
+            0,
+            0,
+        )
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self.HEADER.pack_into(
+            self.mmap, 0, self.MAGIC, self.capacity, self.used, self.dead
+        )
+
+    def __iter__(self) -> Iterator[Tuple[bytes, int, int, int, float]]:
+        """Iterate over the slots of the records in the index."""
+        with memoryview(self.mmap) as view:
+            for slot in self.SLOT.iter_unpack(view[self.HEADER.size :]):
+                if slot[0] != self.EMPTY and slot[1] != self.DELETED:
+                    yield slot
+
+    def close(self) -> None:
+        self.mmap.close()
+        self.file.close()
+
+
+class SegmentCacheStorage:
+    """HTTP cache storage that appends responses to large segment files.
+
+    Each response is stored as a single record, that is appended to the last
+    segment file of the spider. A new segment file is started when the last
+    one grows past :setting:`HTTPCACHE_SEGMENT_SIZE`. Records are found
+    through a hash table that is stored in an ``index`` file, and are read
+    through :mod:`mmap`.
+
+    Records that are replaced or that expire take disk space until the cache
+    is compacted, which happens when a spider is opened if they take more
+    than half of the segment files.
+
+    Only one process at a time can store responses, other processes open the
+    cache in read-only mode.
+    """
+
+    _RECORD_MAGIC = b"SCRAPYHR"
+    # magic, key, timestamp, crc32, status, body codec ID, URL length, headers
+    # length, body length
+    _RECORD = struct.Struct("<8s16sdIHBIIQ")
+    _INDEX_CAPACITY = 1 << 16
+    _COMPACT_RATIO = 0.5
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings["HTTPCACHE_DIR"])
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.segment_size = settings.getint("HTTPCACHE_SEGMENT_SIZE")
+        self._index: Optional[_SegmentIndex] = None
+        self._segments = {}  # segment number -> mmap
+        self._writer = None
+        self._writer_segment = -1
+        self._writer_offset = 0
+        self._lock_file = None
+        self._writable = False
+        self._codec = _BodyCodec(settings)
+        self._codecs = {i: name for name, i in _BodyCodec.IDS.items()}
+
+    def open_spider(self, spider: Spider):
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        self._dir = Path(self.cachedir, spider.name)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._codec.open(self._dir)
+        self._writable = self._lock()
+        self._open_index()
+        if self._writable:
+            size = sum(
+                self._segment_path(number).stat().st_size
+                for number in self._segment_numbers()
+            )
+            if self._index.dead > size * self._COMPACT_RATIO:
+                self.compact()
+            self._open_segment(max(self._segment_numbers(), default=0))
+
+        logger.debug(
+            "Using segment cache storage in %(cachedir)s",
+            {"cachedir": self._dir},
+            extra={"spider": spider},
+        )
+
+    def close_spider(self, spider):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._close_index()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def retrieve_response(self, spider: Spider, request: Request):
+        """Return response if present in cache, or None otherwise."""
+        key = self._key(request)
+        if self._writable:
+            record = self._read(key)
+        else:
+            record = self._read_shared(key)
+        if record is None:
+            return  # not cached
+        status, codec, url, rawheaders, body = record
+        body = self._codec.decompress(self._codecs.get(codec), body)
+        if body is None:
+            return  # cannot be decompressed
+        headers = Headers(headers_raw_to_dict(rawheaders))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        response = respcls(url=url, headers=headers, status=status, body=body)
+        return response
+
+    def store_response(self, spider: Spider, request: Request, response):
+        """Store the given response in the cache."""
+        if not self._writable:
+            return
+        key = self._key(request)
+        url = to_bytes(response.url)
+        rawheaders = headers_dict_to_raw(response.headers)
+        codec, body = self._codec.compress(response.body, response.headers)
+        timestamp = time()
+        crc = zlib.crc32(body, zlib.crc32(rawheaders, zlib.crc32(url)))
+        header = self._RECORD.pack(
+            self._RECORD_MAGIC,
+            key,
+            timestamp,
+            crc,
+            response.status,
+            _BodyCodec.IDS.get(codec, 0),
+            len(url),
+            len(rawheaders),
+            len(body),
+        )
+        parts = [header, url, rawheaders, body]
+        segment, offset = self._append(parts)
+        if self._index.full():
+            self._resize(2 * self._index.capacity)
+        self._index.put(key, segment, offset, sum(map(len, parts)), timestamp)
+
+    def compact(self) -> None:
+        """Copy the records that have not expired into new segment files,
+        and remove the old segment files."""
+        old_segments = self._segment_numbers()
+        self._open_segment(max(old_segments, default=-1) + 1)
+        index = _SegmentIndex.create(self._dir / "index.tmp", self._index.capacity)
+        now = time()
+        for key, segment, offset, length, timestamp in self._index:
+            if 0 < self.expiration_secs < now - timestamp:
+                continue
+            data = self._segment(segment, offset + length)[offset : offset + length]
+            index.put(key, *self._append([data]), length, timestamp)
+        self._replace_index(index)
+        for number in old_segments:
+            mm = self._segments.pop(number, None)
+            if mm is not None:
+                mm.close()
+            self._segment_path(number).unlink()
+
+    def _key(self, request: Request) -> bytes:
+        fingerprint = self._fingerprinter.fingerprint(request)
+        return hashlib.blake2b(fingerprint, digest_size=16).digest()
+
+    def _lock(self) -> bool:
+        """Return whether this process can store responses."""
+        self._lock_file = (self._dir / "lock").open("a+b")
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logger.warning(
+                "The HTTP cache in %(cachedir)s is being written by another "
+                "process, responses will not be stored",
+                {"cachedir": self._dir},
+            )
+            return False
+        return True
+
+    def _open_index(self) -> None:
+        path = self._dir / "index"
+        try:
+            self._index = _SegmentIndex(path, self._writable)
+        except (FileNotFoundError, ValueError):
+            if self._writable:
+                self._rebuild_index()
+
+    def _close_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        for mm in self._segments.values():
+            mm.close()
+        self._segments = {}
+
+    def _replace_index(self, index: _SegmentIndex) -> None:
+        self._index.close()
+        index.publish(self._dir / "index")
+        self._index = index
+
+    def _resize(self, capacity: int) -> None:
+        index = _SegmentIndex.create(self._dir / "index.tmp", capacity)
+        for slot in self._index:
+            index.put(*slot)
+        index.dead += self._index.dead
+        index._write_header()
+        self._replace_index(index)
+
+    def _rebuild_index(self) -> None:
+        """Build the index from the records of the segment files."""
+        count = sum(1 for _ in self._scan())
+        capacity = self._INDEX_CAPACITY
+        while count + 1 > capacity * 0.7:
+            capacity *= 2
+        index = _SegmentIndex.create(self._dir / "index.tmp", capacity)
+        for location in self._scan():
+            index.put(*location)
+        index.publish(self._dir / "index")
+        self._index = index
+        if count:
+            logger.info(
+                "Rebuilt the HTTP cache index of %(cachedir)s, %(count)d records",
+                {"cachedir": self._dir, "count": count},
+            )
+
+    def _scan(self) -> Iterator[Tuple[bytes, int, int, int, float]]:
+        """Iterate over the key, location and timestamp of the valid records
+        of the segment files, skipping any corrupted data."""
+        for number in self._segment_numbers():
+            mm = self._segment(number, 0)
+            offset = 0
+            while 0 <= offset < len(mm):
+                record = self._parse(mm, offset)
+                if record is None:
+                    offset = mm.find(self._RECORD_MAGIC, offset + 1)
+                    continue
+                key, timestamp, length = record[:3]
+                yield key, number, offset, length, timestamp
+                offset += length
+
+    def _parse(self, mm, offset: int, key: Optional[bytes] = None) -> Optional[tuple]:
+        """Return the key, timestamp, length, status, body codec ID, URL, raw
+        headers and body of the record at *offset*, or ``None`` if there is no
+        valid record there."""
+        if offset + self._RECORD.size > len(mm):
+            return None
+        (
+            magic,
+            rkey,
+            timestamp,
+            crc,
+            status,
+            codec,
+            url_length,
+            headers_length,
+            body_length,
+        ) = self._RECORD.unpack_from(mm, offset)
+        if magic != self._RECORD_MAGIC or key is not None and rkey != key:
+            return None
+        start = offset + self._RECORD.size
+        end = start + url_length + headers_length + body_length
+        if end > len(mm):
+            return None
+        url = mm[start : start + url_length]
+        rawheaders = mm[start + url_length : start + url_length + headers_length]
+        body = mm[end - body_length : end]
+        if zlib.crc32(body, zlib.crc32(rawheaders, zlib.crc32(url))) != crc:
+            return None
+        return (
+            rkey,
+            timestamp,
+            end - offset,
+            status,
+            codec,
+            to_unicode(url),
+            rawheaders,
+            body,
+        )
+
+    def _read(self, key: bytes) -> Optional[Tuple[int, int, str, bytes, bytes]]:
+        if self._index is None:
+            return None
+        location = self._index.get(key)
+        if location is None:
+            return None  # not found
+        segment, offset, length, timestamp = location
+        if 0 < self.expiration_secs < time() - timestamp:
+            if self._writable:
+                self._index.delete(key)
+            return None  # expired
+        record = self._parse(self._segment(segment, offset + length), offset, key)
+        if record is None:
+            logger.warning(
+                "Corrupted record in segment %(segment)d of the HTTP cache "
+                "in %(cachedir)s",
+                {"segment": segment, "cachedir": self._dir},
+            )
+            return None
+        return record[3:]
+
+    def _read_shared(self, key: bytes) -> Optional[Tuple[int, int, str, bytes, bytes]]:
+        """Read a record while another process may be storing responses,
+        compacting the segment files or replacing the index."""
+        for attempt in range(2):
+            try:
+                record = self._read(key)
+            except (OSError, ValueError, struct.error):
+                record = None
+            if record is not None:
+                return record
+            if self._index is not None and not self._index.replaced():
+                return None
+            self._close_index()
+            self._open_index()
+        return None
+
+    def _segment_path(self, number: int) -> Path:
+        return self._dir / f"{number:08d}.seg"
+
+    def _segment_numbers(self) -> List[int]:
+        return sorted(int(path.stem) for path in self._dir.glob("*.seg"))
+
+    def _segment(self, number: int, end: int):
+        """Return a memory map of segment *number* that is at least *end*
+        bytes long, unless the segment is shorter."""
+        mm = self._segments.get(number)
+        if mm is None or len(mm) < end:
+            if mm is not None:
+                mm.close()
+            with self._segment_path(number).open("rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._segments[number] = mm
+        return mm
+
+    def _open_segment(self, number: int) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = self._segment_path(number).open("ab")
+        self._writer_segment = number
+        self._writer_offset = self._writer.seek(0, os.SEEK_END)
+
+    def _append(self, parts: List[bytes]) -> Tuple[int, int]:
+        """Write a record to the last segment, and return its segment and
+        offset."""
+        length = sum(map(len, parts))
+        if self._writer_offset and self._writer_offset + length > self.segment_size:
+            self._open_segment(self._writer_segment + 1)
+        offset = self._writer_offset
+        for part in parts:
+            self._writer.write(part)
+        self._writer.flush()
+        self._writer_offset += length
+        return self._writer_segment, offset
+
+
 def parse_cachecontrol(header):
     """Parse Cache-Control header
 
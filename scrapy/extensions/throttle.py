@@ -52,7 +52,7 @@ class AutoThrottle:
         self._adjust_delay(slot, latency, response)
         if self.debug:
             diff = slot.delay - olddelay
-            size = len(response.body)
+            size = response._get_body_size()
             conc = len(slot.transferring)
             logger.info(
                 "slot: %(slot)s | conc:%(concurrency)2d | "
@@ -70,7 +70,7 @@ class AutoThrottle:
             )
 
     def _get_slot(self, request, spider):
-        key = request.meta.get("download_slot")
+        key = request._download_slot
         return key, self.crawler.engine.downloader.slots.get(key)
 
     def _adjust_delay(self, slot, latency, response):
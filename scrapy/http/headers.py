@@ -1,28 +1,55 @@
 from collections.abc import Mapping
+from typing import AnyStr, Dict
 
 from w3lib.http import headers_dict_to_raw
 
 from scrapy.utils.datatypes import CaselessDict
 from scrapy.utils.python import to_unicode
 
+# encoding -> header name -> normalized header name, shared by all headers so
+# that the names of headers are normalized once and stored once
+_normalized_keys: Dict[str, Dict[AnyStr, bytes]] = {}
+_NORMALIZED_KEYS_LIMIT = 10000
+
 
 class Headers(CaselessDict):
     """Case insensitive http headers dictionary"""
 
+    __slots__ = ("encoding",)
+
     def __init__(self, seq=None, encoding="utf-8"):
         self.encoding = encoding
         super().__init__(seq)
 
     def update(self, seq):
+        if type(seq) is type(self):
+            # already normalized, only the value lists need to be copied
+            for k, v in dict.items(seq):
+                dict.__setitem__(self, k, list(v))
+            return
         seq = seq.items() if isinstance(seq, Mapping) else seq
         iseq = {}
         for k, v in seq:
-            iseq.setdefault(self.normkey(k), []).extend(self.normvalue(v))
-        super().update(iseq)
+            k = self.normkey(k)
+            if k in iseq:
+                iseq[k].extend(self.normvalue(v))
+            else:
+                iseq[k] = self.normvalue(v)
+        dict.update(self, iseq)
 
     def normkey(self, key):
         """Normalize key to bytes"""
-        return self._tobytes(key.title())
+        try:
+            keys = _normalized_keys[self.encoding]
+        except KeyError:
+            keys = _normalized_keys[self.encoding] = {}
+        try:
+            return keys[key]
+        except KeyError:
+            normalized_key = self._tobytes(key.title())
+            if len(keys) < _NORMALIZED_KEYS_LIMIT:
+                keys[key] = normalized_key
+            return normalized_key
 
     def normvalue(self, value):
         """Normalize values to bytes"""
@@ -33,7 +60,7 @@ class Headers(CaselessDict):
         elif not hasattr(value, "__iter__"):
             value = [value]
 
-        return [self._tobytes(x) for x in value]
+        return [x if type(x) is bytes else self._tobytes(x) for x in value]
 
     def _tobytes(self, x):
         if isinstance(x, bytes):
@@ -100,3 +127,8 @@ class Headers(CaselessDict):
         return self.__class__(self)
 
     copy = __copy__
+
+    def __reduce__(self):
+        # pickle restores dict items before the instance state, i.e. before
+        # encoding, which normkey() needs
+        return self.__class__, (dict(self), self.encoding)
@@ -72,6 +72,45 @@ class Request(object_ref):
     :func:`~scrapy.utils.request.request_from_dict`.
     """
 
+    # Instances only get a __dict__ if attributes not listed here are set, and
+    # headers, cookies, flags, meta and cb_kwargs are only created on access.
+    __slots__ = (
+        "_encoding",
+        "method",
+        "_url",
+        "_body",
+        "priority",
+        "callback",
+        "errback",
+        "_cookies",
+        "_headers",
+        "dont_filter",
+        "_meta",
+        "_cb_kwargs",
+        "_flags",
+        "_fingerprints",
+        "_download_slot",
+        "_decompress",
+        "_decompressed_size",
+        "__dict__",
+        "__weakref__",
+    )
+
+    #: Fingerprints stored by
+    #: :class:`~scrapy.utils.request.StreamingRequestFingerprinter`.
+    _fingerprints: Optional[dict]
+
+    #: Download slot of the request, set by the downloader.
+    _download_slot: Optional[str]
+
+    #: Whether download handlers may decompress the response body, set by
+    #: :class:`~scrapy.downloadermiddlewares.httpcompression.HttpCompressionMiddleware`.
+    _decompress: bool
+
+    #: Decompressed size of the response body, set by download handlers that
+    #: decompressed it.
+    _decompressed_size: Optional[int]
+
     def __init__(
         self,
         url: str,
@@ -105,13 +144,47 @@ class Request(object_ref):
         self.callback = callback
         self.errback = errback
 
-        self.cookies = cookies or {}
-        self.headers = Headers(headers or {}, encoding=encoding)
+        self._cookies = cookies or None
+        self._headers = Headers(headers, encoding=encoding) if headers else None
         self.dont_filter = dont_filter
 
         self._meta = dict(meta) if meta else None
         self._cb_kwargs = dict(cb_kwargs) if cb_kwargs else None
-        self.flags = [] if flags is None else list(flags)
+        self._flags = list(flags) if flags else None
+        self._fingerprints = None
+        self._download_slot = None
+        self._decompress = False
+        self._decompressed_size = None
+
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers(encoding=self._encoding)
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Headers) -> None:
+        self._headers = value
+
+    @property
+    def cookies(self) -> Union[dict, List[dict]]:
+        if self._cookies is None:
+            self._cookies = {}
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value: Union[dict, List[dict]]) -> None:
+        self._cookies = value
+
+    @property
+    def flags(self) -> List[str]:
+        if self._flags is None:
+            self._flags = []
+        return self._flags
+
+    @flags.setter
+    def flags(self, value: List[str]) -> None:
+        self._flags = value
 
     @property
     def cb_kwargs(self) -> dict:
@@ -236,6 +309,12 @@ def _find_method(obj, func):
     """Helper function for Request.to_dict"""
     # Only instance methods contain ``__func__``
     if obj and hasattr(func, "__func__"):
+        # Fast path: the method is usually reachable by its own name.
+        name = getattr(func.__func__, "__name__", None)
+        if name and getattr(getattr(obj, name, None), "__func__", None) is (
+            func.__func__
+        ):
+            return name
         members = inspect.getmembers(obj, predicate=inspect.ismethod)
         for name, obj_func in members:
             # We need to use __func__ to access the original function object because instance
@@ -4,7 +4,8 @@ responses in Scrapy.
 
 See documentation in docs/topics/request-response.rst
 """
-from typing import Generator, Tuple
+from io import BytesIO
+from typing import BinaryIO, Generator, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
 from scrapy.exceptions import NotSupported
@@ -12,6 +13,7 @@ from scrapy.http.common import obsolete_setter
 from scrapy.http.headers import Headers
 from scrapy.http.request import Request
 from scrapy.link import Link
+from scrapy.utils.spool import SpooledBody
 from scrapy.utils.trackref import object_ref
 
 
@@ -38,6 +40,26 @@ class Response(object_ref):
     Currently used by :meth:`Response.replace`.
     """
 
+    # Instances only get a __dict__ if attributes not listed here are set, and
+    # headers and flags are only created on access.
+    __slots__ = (
+        "_headers",
+        "status",
+        "_body",
+        "_spooled_body",
+        "_url",
+        "request",
+        "_flags",
+        "certificate",
+        "ip_address",
+        "protocol",
+        "__dict__",
+        "__weakref__",
+    )
+
+    #: Body stored in a temporary file, see :setting:`DOWNLOAD_SPOOLSIZE`.
+    _spooled_body: Optional[SpooledBody]
+
     def __init__(
         self,
         url: str,
@@ -50,16 +72,37 @@ class Response(object_ref):
         ip_address=None,
         protocol=None,
     ):
-        self.headers = Headers(headers or {})
+        self._headers = Headers(headers) if headers else None
         self.status = int(status)
+        self._spooled_body = None
         self._set_body(body)
         self._set_url(url)
         self.request = request
-        self.flags = [] if flags is None else list(flags)
+        self._flags = list(flags) if flags else None
         self.certificate = certificate
         self.ip_address = ip_address
         self.protocol = protocol
 
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers()
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Headers) -> None:
+        self._headers = value
+
+    @property
+    def flags(self) -> List[str]:
+        if self._flags is None:
+            self._flags = []
+        return self._flags
+
+    @flags.setter
+    def flags(self, value: List[str]) -> None:
+        self._flags = value
+
     @property
     def cb_kwargs(self):
         try:
@@ -94,11 +137,17 @@ class Response(object_ref):
     url = property(_get_url, obsolete_setter(_set_url, "url"))
 
     def _get_body(self):
+        if self._body is None:
+            self._body = self._spooled_body.read()
         return self._body
 
     def _set_body(self, body):
         if body is None:
             self._body = b""
+        elif isinstance(body, SpooledBody):
+            # read on first access
+            self._body = None
+            self._spooled_body = body
         elif not isinstance(body, bytes):
             raise TypeError(
                 "Response body must be bytes. "
@@ -113,12 +162,40 @@ class Response(object_ref):
     def __repr__(self):
         return f"<{self.status} {self.url}>"
 
+    def iter_body(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """Return an iterator over the response body, in :class:`bytes`
+        chunks of up to *chunk_size* bytes.
+
+        Unlike :attr:`body`, it does not load bodies stored in a temporary file
+        (see :setting:`DOWNLOAD_SPOOLSIZE`) in memory.
+        """
+        if self._body is None:
+            return self._spooled_body.iter_chunks(chunk_size)
+        body = self._body
+        return (body[i : i + chunk_size] for i in range(0, len(body), chunk_size))
+
+    def _get_body_size(self) -> int:
+        # The length of the body, without loading bodies stored in a temporary
+        # file in memory.
+        if self._body is None:
+            return len(self._spooled_body)
+        return len(self._body)
+
+    def _open_body(self) -> BinaryIO:
+        # A BytesIO-like file object with the body, that does not load bodies
+        # stored in a temporary file in memory.
+        if self._body is None:
+            return self._spooled_body.open()
+        return BytesIO(self._body)
+
     def copy(self):
         """Return a copy of this Response"""
         return self.replace()
 
     def replace(self, *args, **kwargs):
         """Create a new Response with the same attributes except for those given new values"""
+        if self._body is None and "body" not in kwargs:
+            kwargs["body"] = self._spooled_body
         for x in self.attributes:
             kwargs.setdefault(x, getattr(self, x))
         cls = kwargs.pop("cls", self.__class__)
@@ -43,7 +43,9 @@ class TextResponse(Response):
 
     def _set_url(self, url):
         if isinstance(url, str):
-            self._url = to_unicode(url, self.encoding)
+            # str URLs need no decoding, so the encoding, which may require
+            # reading the body, is not determined here
+            self._url = url
         else:
             super()._set_url(url)
 
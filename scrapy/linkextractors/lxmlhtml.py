@@ -9,7 +9,7 @@ from urllib.parse import urljoin, urlparse
 from lxml import etree
 from parsel.csstranslator import HTMLTranslator
 from w3lib.html import strip_html5_whitespace
-from w3lib.url import canonicalize_url, safe_url_string
+from w3lib.url import safe_url_string
 
 from scrapy.link import Link
 from scrapy.linkextractors import (
@@ -22,7 +22,12 @@ from scrapy.linkextractors import (
 from scrapy.utils.misc import arg_to_iter, rel_has_nofollow
 from scrapy.utils.python import unique as unique_list
 from scrapy.utils.response import get_base_url
-from scrapy.utils.url import url_has_any_extension, url_is_from_any_domain
+from scrapy.utils.url import (
+    DomainSet,
+    canonicalize_url,
+    url_has_any_extension,
+    url_is_from_any_domain,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +48,12 @@ def _identity(x):
     return x
 
 
+def _domain_set(domains):
+    if isinstance(domains, DomainSet):
+        return domains  # shared, e.g. with the spider
+    return DomainSet(arg_to_iter(domains))
+
+
 def _canonicalize_link_url(link):
     return canonicalize_url(link.url, keep_fragments=True)
 
@@ -76,29 +87,32 @@ class LxmlParserLinkExtractor:
                     continue
                 yield (el, attrib, attribs[attrib])
 
+    def _link_url(self, attr_val, response_url, response_encoding, base_url):
+        # pseudo lxml.html.HtmlElement.make_links_absolute(base_url)
+        try:
+            if self.strip:
+                attr_val = strip_html5_whitespace(attr_val)
+            attr_val = urljoin(base_url, attr_val)
+        except ValueError:
+            return None  # skipping bogus links
+        url = self.process_attr(attr_val)
+        if url is None:
+            return None
+        try:
+            url = safe_url_string(url, encoding=response_encoding)
+        except ValueError:
+            logger.debug(f"Skipping extraction of link with bad URL {url!r}")
+            return None
+        # to fix relative links after process_value
+        return urljoin(response_url, url)
+
     def _extract_links(self, selector, response_url, response_encoding, base_url):
         links = []
         # hacky way to get the underlying lxml parsed document
         for el, attr, attr_val in self._iter_links(selector.root):
-            # pseudo lxml.html.HtmlElement.make_links_absolute(base_url)
-            try:
-                if self.strip:
-                    attr_val = strip_html5_whitespace(attr_val)
-                attr_val = urljoin(base_url, attr_val)
-            except ValueError:
-                continue  # skipping bogus links
-            else:
-                url = self.process_attr(attr_val)
-                if url is None:
-                    continue
-            try:
-                url = safe_url_string(url, encoding=response_encoding)
-            except ValueError:
-                logger.debug(f"Skipping extraction of link with bad URL {url!r}")
+            url = self._link_url(attr_val, response_url, response_encoding, base_url)
+            if url is None:
                 continue
-
-            # to fix relative links after process_value
-            url = urljoin(response_url, url)
             link = Link(
                 url,
                 _collect_string_content(el) or "",
@@ -147,6 +161,7 @@ class LxmlLinkExtractor:
         restrict_text=None,
     ):
         tags, attrs = set(arg_to_iter(tags)), set(arg_to_iter(attrs))
+        self._scan = (frozenset(tags), frozenset(attrs))
         self.link_extractor = LxmlParserLinkExtractor(
             tag=partial(operator.contains, tags),
             attr=partial(operator.contains, attrs),
@@ -162,8 +177,8 @@ class LxmlLinkExtractor:
             x if isinstance(x, _re_type) else re.compile(x) for x in arg_to_iter(deny)
         ]
 
-        self.allow_domains = set(arg_to_iter(allow_domains))
-        self.deny_domains = set(arg_to_iter(deny_domains))
+        self.allow_domains = _domain_set(allow_domains)
+        self.deny_domains = _domain_set(deny_domains)
 
         self.restrict_xpaths = tuple(arg_to_iter(restrict_xpaths))
         self.restrict_xpaths += tuple(
@@ -250,3 +265,254 @@ class LxmlLinkExtractor:
         if self.link_extractor.unique:
             return unique_list(all_links)
         return all_links
+
+
+_global_flags_re = re.compile(r"\(\?[aiLmsux]+\)")
+_group_reference_re = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+def _merge_regexes(regexes):
+    """Return a regular expression that matches wherever any of ``regexes``
+    matches, or ``None`` if they cannot be merged into one."""
+    if len(regexes) == 1:
+        return regexes[0]
+    flags = {regex.flags for regex in regexes}
+    patterns = [regex.pattern for regex in regexes]
+    if len(flags) != 1 or not all(isinstance(p, str) for p in patterns):
+        return None
+    if any(
+        _global_flags_re.search(p) or _group_reference_re.search(p) for p in patterns
+    ):
+        # inline global flags and group references do not survive merging
+        return None
+    flags = flags.pop()
+    end = "\n)" if flags & re.VERBOSE else ")"
+    try:
+        return re.compile("|".join(f"(?:{p}{end}" for p in patterns), flags)
+    except re.error:  # e.g. a group name used by several patterns
+        return None
+
+
+class _CompiledLinkExtractor:
+    """The filters of a :class:`LxmlLinkExtractor`, with its allow and deny
+    regular expressions merged and their results cached by URL."""
+
+    def __init__(self, link_extractor):
+        self.link_extractor = link_extractor
+        self.parser = link_extractor.link_extractor
+        self.allow_re = _merge_regexes(link_extractor.allow_res)
+        self.deny_re = _merge_regexes(link_extractor.deny_res)
+        # str.endswith() checks a tuple of suffixes at once
+        self.deny_extensions = tuple(link_extractor.deny_extensions)
+        self._allowed_urls = {}
+
+    def _search(self, url, merged_re, regexes):
+        if merged_re is not None:
+            return merged_re.search(url) is not None
+        return _matches(url, regexes)
+
+    def url_allowed(self, url, parse):
+        try:
+            return self._allowed_urls[url]
+        except KeyError:
+            pass
+        le = self.link_extractor
+        if not _is_valid_url(url):
+            allowed = False
+        elif le.allow_res and not self._search(url, self.allow_re, le.allow_res):
+            allowed = False
+        elif le.deny_res and self._search(url, self.deny_re, le.deny_res):
+            allowed = False
+        else:
+            parsed_url = parse(url)
+            allowed = not (
+                (
+                    le.allow_domains
+                    and not url_is_from_any_domain(parsed_url, le.allow_domains)
+                )
+                or (
+                    le.deny_domains
+                    and url_is_from_any_domain(parsed_url, le.deny_domains)
+                )
+                or (
+                    self.deny_extensions
+                    and parsed_url.path.lower().endswith(self.deny_extensions)
+                )
+            )
+        self._allowed_urls[url] = allowed
+        return allowed
+
+    def reset(self):
+        self._allowed_urls.clear()
+
+
+def _is_compilable(link_extractor):
+    overridable = ("extract_links", "_extract_links", "_process_links", "_link_allowed")
+    return (
+        isinstance(link_extractor, LxmlLinkExtractor)
+        and hasattr(link_extractor, "_scan")
+        and all(
+            getattr(type(link_extractor), name) is getattr(LxmlLinkExtractor, name)
+            for name in overridable
+        )
+        and type(link_extractor.link_extractor) is LxmlParserLinkExtractor
+    )
+
+
+class _LxmlLinkExtractorSet:
+    """Extracts the links of several link extractors from a response at once.
+
+    The result is the same as calling ``extract_links()`` on each of them,
+    but the document is walked once for all of them, the URL of each link is
+    built once per attribute value, and each URL is checked once against the
+    filters of each link extractor, with its allow and deny regular
+    expressions merged into one.
+
+    Link extractors that are not :class:`LxmlLinkExtractor` instances, or
+    that override how links are extracted or filtered, use their own
+    ``extract_links()`` method.
+    """
+
+    def __init__(self, link_extractors):
+        self.link_extractors = list(link_extractors)
+        self._compiled = [
+            _CompiledLinkExtractor(le) if _is_compilable(le) else None
+            for le in self.link_extractors
+        ]
+        self._scans = unique_list(
+            le._scan
+            for le, compiled in zip(self.link_extractors, self._compiled)
+            if compiled is not None
+        )
+
+    def _walk(self, root):
+        """Return the (element, attribute value) pairs of every scan in
+        document order."""
+        found = {scan: [] for scan in self._scans}
+        scans = list(found.items())
+        for el in root.iter(etree.Element):
+            attribs = el.attrib
+            if not attribs:
+                continue
+            tag = _nons(el.tag)
+            for (tags, attrs), candidates in scans:
+                if tag not in tags:
+                    continue
+                for attrib in attribs:
+                    if attrib in attrs:
+                        candidates.append((el, attribs[attrib]))
+        return found
+
+    def extract_links(self, response):
+        """Return a list with the links of every link extractor, in the
+        order of :attr:`link_extractors`."""
+        if not self._scans:
+            return [le.extract_links(response) for le in self.link_extractors]
+        base_url = get_base_url(response)
+        response_url, response_encoding = response.url, response.encoding
+        found = self._walk(response.selector.root)
+        positions = {}  # scan -> element -> candidate indexes
+        link_urls = {}  # (strip, process_value) -> attribute value -> URL
+        texts = {}
+        parsed_urls = {}
+        link_keys = {}
+
+        def get_positions(scan):
+            if scan not in positions:
+                by_element = positions[scan] = {}
+                for i, (el, _) in enumerate(found[scan]):
+                    by_element.setdefault(el, []).append(i)
+            return positions[scan]
+
+        def get_links(compiled, candidates):
+            parser = compiled.parser
+            urls = link_urls.setdefault((parser.strip, parser.process_attr), {})
+            links = []
+            for el, attr_val in candidates:
+                try:
+                    url = urls[attr_val]
+                except KeyError:
+                    url = urls[attr_val] = parser._link_url(
+                        attr_val, response_url, response_encoding, base_url
+                    )
+                if url is None:
+                    continue
+                try:
+                    text, nofollow = texts[el]
+                except KeyError:
+                    text, nofollow = texts[el] = (
+                        _collect_string_content(el) or "",
+                        rel_has_nofollow(el.get("rel")),
+                    )
+                links.append(Link(url, text, nofollow=nofollow))
+            return links
+
+        def link_key(link):
+            try:
+                return link_keys[link.url]
+            except KeyError:
+                key = link_keys[link.url] = _canonicalize_link_url(link)
+                return key
+
+        def deduplicate(parser, links):
+            # like parser._deduplicate_if_needed(), reusing canonical URLs
+            if not parser.unique:
+                return links
+            if parser.link_key is _canonicalize_link_url:
+                return unique_list(links, key=link_key)
+            return unique_list(links, key=parser.link_key)
+
+        def parse(url):
+            try:
+                return parsed_urls[url]
+            except KeyError:
+                parsed_url = parsed_urls[url] = urlparse(url)
+                return parsed_url
+
+        results = []
+        for le, compiled in zip(self.link_extractors, self._compiled):
+            if compiled is None:
+                results.append(le.extract_links(response))
+                continue
+            compiled.reset()
+            candidates = found[le._scan]
+            if le.restrict_xpaths:
+                docs = [
+                    subdoc for x in le.restrict_xpaths for subdoc in response.xpath(x)
+                ]
+            else:
+                docs = [None]
+            all_links = []
+            for doc in docs:
+                if doc is None:
+                    doc_candidates = candidates
+                elif isinstance(doc.root, etree._Element):
+                    by_element = get_positions(le._scan)
+                    doc_candidates = [
+                        candidates[i]
+                        for el in doc.root.iter(etree.Element)
+                        for i in by_element.get(el, ())
+                    ]
+                else:
+                    links = le._extract_links(
+                        doc, response_url, response_encoding, base_url
+                    )
+                    all_links.extend(le._process_links(links))
+                    continue
+                links = deduplicate(
+                    compiled.parser, get_links(compiled, doc_candidates)
+                )
+                links = [
+                    link
+                    for link in links
+                    if compiled.url_allowed(link.url, parse)
+                    and (not le.restrict_text or _matches(link.text, le.restrict_text))
+                ]
+                if le.canonicalize:
+                    for link in links:
+                        link.url = canonicalize_url(link.url)
+                all_links.extend(deduplicate(compiled.parser, links))
+            if compiled.parser.unique:
+                all_links = unique_list(all_links)
+            results.append(all_links)
+        return results
@@ -9,11 +9,13 @@ import hashlib
 import logging
 import mimetypes
 import os
+import shutil
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import Future
 from contextlib import suppress
 from ftplib import FTP
-from io import BytesIO
 from os import PathLike
 from pathlib import Path
 from typing import DefaultDict, Optional, Set, Union
@@ -21,6 +23,7 @@ from urllib.parse import urlparse
 
 from itemadapter import ItemAdapter
 from twisted.internet import defer, threads
+from twisted.python.failure import Failure
 
 from scrapy.exceptions import IgnoreRequest, NotConfigured
 from scrapy.http import Request
@@ -46,6 +49,120 @@ class FileException(Exception):
     """General media error exception"""
 
 
+def _stat_files_one_by_one(store, paths, info):
+    """Implement ``stat_files()`` with concurrent ``stat_file()`` calls."""
+    dfds = [defer.maybeDeferred(store.stat_file, path, info) for path in paths]
+
+    def _get_stats(results):
+        return {path: stat if ok else {} for path, (ok, stat) in zip(paths, results)}
+
+    dfd = defer.DeferredList(dfds, consumeErrors=True)
+    return dfd.addCallback(_get_stats)
+
+
+class _FilesManifest:
+    """Index of the files of a store, filled by listing the directories of the
+    store the first time that one of their files is checked, so that other
+    files of the same directories are checked without requests to the store.
+
+    ``list_directory`` must return the stats of the files of a directory, as
+    a ``{path: stat}`` dict. Methods are called from threads.
+
+    Directories are listed without holding the lock, so that checks of files
+    of other directories, or of directories already listed, do not wait for
+    them. Checks of files of a directory being listed wait for its listing.
+    """
+
+    def __init__(self, list_directory):
+        self._list_directory = list_directory
+        self._files = {}
+        # directory -> Future of its listing
+        self._directories = {}
+        self._lock = threading.Lock()
+
+    def stat_files(self, paths):
+        paths = [(path, _to_string(path)) for path in paths]
+        for directory in {key.rpartition("/")[0] for _, key in paths}:
+            self._wait_for_listing(directory)
+        with self._lock:
+            return {path: self._files.get(key, {}) for path, key in paths}
+
+    def _wait_for_listing(self, directory):
+        with self._lock:
+            listing = self._directories.get(directory)
+            owner = listing is None
+            if owner:
+                listing = self._directories[directory] = Future()
+        if not owner:
+            listing.result()
+            return
+        try:
+            files = self._list_directory(directory)
+        except BaseException as e:
+            with self._lock:
+                # let a later check list the directory again
+                del self._directories[directory]
+            listing.set_exception(e)
+            raise
+        with self._lock:
+            for key, stat in files.items():
+                # files stored while listing are newer than the listing
+                self._files.setdefault(key, stat)
+        listing.set_result(None)
+
+    def add(self, path, stat):
+        with self._lock:
+            self._files[_to_string(path)] = stat
+
+
+class _StatFileBatcher:
+    """Coalesce the ``stat_file()`` calls made within ``delay`` seconds, up to
+    ``size`` different paths, into ``stat_files()`` calls of ``store``."""
+
+    def __init__(self, store, size, delay):
+        self.store = store
+        self.size = size
+        self.delay = delay
+        self._pending = {}
+        self._info = None
+        self._call = None
+
+    def stat_file(self, path, info):
+        dfd = defer.Deferred()
+        self._pending.setdefault(path, []).append(dfd)
+        self._info = info
+        if len(self._pending) >= self.size:
+            self.flush()
+        elif self._call is None:
+            from twisted.internet import reactor
+
+            self._call = reactor.callLater(self.delay, self.flush)
+        return dfd
+
+    def flush(self):
+        if self._call is not None:
+            if self._call.active():
+                self._call.cancel()
+            self._call = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        def _callback(stats):
+            for path, dfds in pending.items():
+                stat = stats.get(path, {})
+                for dfd in dfds:
+                    dfd.callback(stat)
+
+        def _errback(failure):
+            for dfds in pending.values():
+                for dfd in dfds:
+                    dfd.errback(failure)
+
+        dfd = defer.maybeDeferred(self.store.stat_files, list(pending), self._info)
+        dfd.addCallbacks(_callback, _errback)
+
+
 class FSFilesStore:
     def __init__(self, basedir: Union[str, PathLike]):
         basedir = _to_string(basedir)
@@ -60,7 +177,9 @@ class FSFilesStore:
     ):
         absolute_path = self._get_filesystem_path(path)
         self._mkdir(absolute_path.parent, info)
-        absolute_path.write_bytes(buf.getvalue())
+        buf.seek(0)
+        with absolute_path.open("wb") as f:
+            shutil.copyfileobj(buf, f)
 
     def stat_file(self, path: Union[str, PathLike], info):
         absolute_path = self._get_filesystem_path(path)
@@ -74,6 +193,12 @@ class FSFilesStore:
 
         return {"last_modified": last_modified, "checksum": checksum}
 
+    def stat_files(self, paths, info):
+        def _stat_files():
+            return {path: self.stat_file(path, info) for path in paths}
+
+        return threads.deferToThread(_stat_files)
+
     def _get_filesystem_path(self, path: Union[str, PathLike]) -> Path:
         path_comps = _to_string(path).split("/")
         return Path(self.basedir, *path_comps)
@@ -96,6 +221,7 @@ class S3FilesStore:
     AWS_VERIFY = None
 
     POLICY = "private"  # Overridden from settings.FILES_STORE_S3_ACL in FilesPipeline.from_settings
+    MANIFEST = False  # Overridden from settings.MEDIA_STORE_MANIFEST in FilesPipeline.from_settings
     HEADERS = {
         "Cache-Control": "max-age=172800",
     }
@@ -119,15 +245,35 @@ class S3FilesStore:
         if not uri.startswith("s3://"):
             raise ValueError(f"Incorrect URI scheme in {uri}, expected 's3'")
         self.bucket, self.prefix = uri[5:].split("/", 1)
+        self._manifest = _FilesManifest(self._list_directory) if self.MANIFEST else None
 
     def stat_file(self, path, info):
-        def _onsuccess(boto_key):
-            checksum = boto_key["ETag"].strip('"')
-            last_modified = boto_key["LastModified"]
-            modified_stamp = time.mktime(last_modified.timetuple())
-            return {"checksum": checksum, "last_modified": modified_stamp}
-
-        return self._get_boto_key(path).addCallback(_onsuccess)
+        if self._manifest is not None:
+            return self.stat_files([path], info).addCallback(lambda stats: stats[path])
+        return self._get_boto_key(path).addCallback(self._get_stat)
+
+    def stat_files(self, paths, info):
+        if self._manifest is None:
+            return _stat_files_one_by_one(self, paths, info)
+        return threads.deferToThread(self._manifest.stat_files, paths)
+
+    def _get_stat(self, boto_key):
+        checksum = boto_key["ETag"].strip('"')
+        last_modified = boto_key["LastModified"]
+        modified_stamp = time.mktime(last_modified.timetuple())
+        return {"checksum": checksum, "last_modified": modified_stamp}
+
+    def _list_directory(self, directory):
+        prefix = f"{self.prefix}{directory}/" if directory else self.prefix
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        stats = {}
+        for page in paginator.paginate(
+            Bucket=self.bucket, Prefix=prefix, Delimiter="/"
+        ):
+            for boto_key in page.get("Contents", ()):
+                path = boto_key["Key"][len(self.prefix) :]
+                stats[path] = self._get_stat(boto_key)
+        return stats
 
     def _get_boto_key(self, path):
         key_name = f"{self.prefix}{path}"
@@ -142,7 +288,7 @@ class S3FilesStore:
         extra = self._headers_to_botocore_kwargs(self.HEADERS)
         if headers:
             extra.update(self._headers_to_botocore_kwargs(headers))
-        return threads.deferToThread(
+        dfd = threads.deferToThread(
             self.s3_client.put_object,
             Bucket=self.bucket,
             Key=key_name,
@@ -151,6 +297,14 @@ class S3FilesStore:
             ACL=self.POLICY,
             **extra,
         )
+        if self._manifest is not None:
+            dfd.addCallback(self._add_to_manifest, path)
+        return dfd
+
+    def _add_to_manifest(self, response, path):
+        checksum = response["ETag"].strip('"')
+        self._manifest.add(path, {"checksum": checksum, "last_modified": time.time()})
+        return response
 
     def _headers_to_botocore_kwargs(self, headers):
         """Convert headers to botocore keyword arguments."""
@@ -203,6 +357,7 @@ class GCSFilesStore:
     # The bucket's default object ACL will be applied to the object.
     # Overridden from settings.FILES_STORE_GCS_ACL in FilesPipeline.from_settings.
     POLICY = None
+    MANIFEST = False  # Overridden from settings.MEDIA_STORE_MANIFEST in FilesPipeline.from_settings
 
     def __init__(self, uri):
         from google.cloud import storage
@@ -225,20 +380,33 @@ class GCSFilesStore:
                 "No 'storage.objects.create' permission for GSC bucket %(bucket)s. Saving files will be impossible!",
                 {"bucket": bucket},
             )
+        self._manifest = _FilesManifest(self._list_directory) if self.MANIFEST else None
 
     def stat_file(self, path, info):
-        def _onsuccess(blob):
-            if blob:
-                checksum = base64.b64decode(blob.md5_hash).hex()
-                last_modified = time.mktime(blob.updated.timetuple())
-                return {"checksum": checksum, "last_modified": last_modified}
-            return {}
-
+        if self._manifest is not None:
+            return self.stat_files([path], info).addCallback(lambda stats: stats[path])
         blob_path = self._get_blob_path(path)
         return threads.deferToThread(self.bucket.get_blob, blob_path).addCallback(
-            _onsuccess
+            self._get_stat
         )
 
+    def stat_files(self, paths, info):
+        if self._manifest is None:
+            return _stat_files_one_by_one(self, paths, info)
+        return threads.deferToThread(self._manifest.stat_files, paths)
+
+    def _get_stat(self, blob):
+        if blob:
+            checksum = base64.b64decode(blob.md5_hash).hex()
+            last_modified = time.mktime(blob.updated.timetuple())
+            return {"checksum": checksum, "last_modified": last_modified}
+        return {}
+
+    def _list_directory(self, directory):
+        prefix = self._get_blob_path(f"{directory}/" if directory else "")
+        blobs = self.bucket.list_blobs(prefix=prefix, delimiter="/")
+        return {blob.name[len(self.prefix) :]: self._get_stat(blob) for blob in blobs}
+
     def _get_content_type(self, headers):
         if headers and "Content-Type" in headers:
             return headers["Content-Type"]
@@ -252,12 +420,15 @@ class GCSFilesStore:
         blob = self.bucket.blob(blob_path)
         blob.cache_control = self.CACHE_CONTROL
         blob.metadata = {k: str(v) for k, v in (meta or {}).items()}
-        return threads.deferToThread(
+        dfd = threads.deferToThread(
             blob.upload_from_string,
             data=buf.getvalue(),
             content_type=self._get_content_type(headers),
             predefined_acl=self.POLICY,
         )
+        if self._manifest is not None:
+            dfd.addCallback(lambda _: self._manifest.add(path, self._get_stat(blob)))
+        return dfd
 
 
 class FTPFilesStore:
@@ -363,6 +534,14 @@ class FilesPipeline(MediaPipeline):
         self.files_result_field = settings.get(
             resolve("FILES_RESULT_FIELD"), self.FILES_RESULT_FIELD
         )
+        self._stat_batcher = None
+        stat_batch_size = settings.getint("MEDIA_STORE_STAT_BATCH_SIZE")
+        if stat_batch_size > 1 and hasattr(self.store, "stat_files"):
+            self._stat_batcher = _StatFileBatcher(
+                self.store,
+                stat_batch_size,
+                settings.getfloat("MEDIA_STORE_STAT_BATCH_DELAY"),
+            )
 
         super().__init__(download_func=download_func, settings=settings)
 
@@ -387,6 +566,8 @@ class FilesPipeline(MediaPipeline):
         ftp_store.FTP_PASSWORD = settings["FTP_PASSWORD"]
         ftp_store.USE_ACTIVE_MODE = settings.getbool("FEED_STORAGE_FTP_ACTIVE")
 
+        s3store.MANIFEST = gcs_store.MANIFEST = settings.getbool("MEDIA_STORE_MANIFEST")
+
         store_uri = settings["FILES_STORE"]
         return cls(store_uri, settings=settings)
 
@@ -430,7 +611,10 @@ class FilesPipeline(MediaPipeline):
             }
 
         path = self.file_path(request, info=info, item=item)
-        dfd = defer.maybeDeferred(self.store.stat_file, path, info)
+        if self._stat_batcher is None:
+            dfd = defer.maybeDeferred(self.store.stat_file, path, info)
+        else:
+            dfd = self._stat_batcher.stat_file(path, info)
         dfd.addCallbacks(_onsuccess, lambda _: None)
         dfd.addErrback(
             lambda f: logger.error(
@@ -470,7 +654,7 @@ class FilesPipeline(MediaPipeline):
             )
             raise FileException("download-error")
 
-        if not response.body:
+        if not response._get_body_size():
             logger.warning(
                 "File (empty-content): Empty file from %(request)s referred "
                 "in <%(referer)s>: no-content",
@@ -491,31 +675,47 @@ class FilesPipeline(MediaPipeline):
         try:
             path = self.file_path(request, response=response, info=info, item=item)
             checksum = self.file_downloaded(response, request, info, item=item)
-        except FileException as exc:
+        except Exception:
+            self._file_processing_failed(Failure(), request, info)
+
+        def _get_result(checksum):
+            return {
+                "url": request.url,
+                "path": path,
+                "checksum": checksum,
+                "status": status,
+            }
+
+        if isinstance(checksum, defer.Deferred):
+            # file_downloaded() may process the file out of the reactor thread
+            dfd = checksum.addCallback(_get_result)
+            return dfd.addErrback(self._file_processing_failed, request, info)
+        return _get_result(checksum)
+
+    def _file_processing_failed(self, failure, request, info):
+        referer = referer_str(request)
+        exc_info = failure_to_exc_info(failure)
+        if failure.check(FileException):
             logger.warning(
                 "File (error): Error processing file from %(request)s "
                 "referred in <%(referer)s>: %(errormsg)s",
-                {"request": request, "referer": referer, "errormsg": str(exc)},
-                extra={"spider": info.spider},
-                exc_info=True,
-            )
-            raise
-        except Exception as exc:
-            logger.error(
-                "File (unknown-error): Error processing file from %(request)s "
-                "referred in <%(referer)s>",
-                {"request": request, "referer": referer},
-                exc_info=True,
+                {
+                    "request": request,
+                    "referer": referer,
+                    "errormsg": str(failure.value),
+                },
                 extra={"spider": info.spider},
+                exc_info=exc_info,
             )
-            raise FileException(str(exc))
-
-        return {
-            "url": request.url,
-            "path": path,
-            "checksum": checksum,
-            "status": status,
-        }
+            failure.raiseException()
+        logger.error(
+            "File (unknown-error): Error processing file from %(request)s "
+            "referred in <%(referer)s>",
+            {"request": request, "referer": referer},
+            exc_info=exc_info,
+            extra={"spider": info.spider},
+        )
+        raise FileException(str(failure.value))
 
     def inc_stats(self, spider, status):
         spider.crawler.stats.inc_value("file_count", spider=spider)
@@ -528,7 +728,7 @@ class FilesPipeline(MediaPipeline):
 
     def file_downloaded(self, response, request, info, *, item=None):
         path = self.file_path(request, response=response, info=info, item=item)
-        buf = BytesIO(response.body)
+        buf = response._open_body()
         checksum = md5sum(buf)
         buf.seek(0)
         self.store.persist_file(path, buf, info)
@@ -10,6 +10,8 @@ from contextlib import suppress
 from io import BytesIO
 
 from itemadapter import ItemAdapter
+from twisted.internet import threads
+from twisted.python.threadpool import ThreadPool
 
 from scrapy.exceptions import DropItem, NotConfigured, ScrapyDeprecationWarning
 from scrapy.http import Request
@@ -88,6 +90,8 @@ class ImagesPipeline(FilesPipeline):
         self.min_width = settings.getint(resolve("IMAGES_MIN_WIDTH"), self.MIN_WIDTH)
         self.min_height = settings.getint(resolve("IMAGES_MIN_HEIGHT"), self.MIN_HEIGHT)
         self.thumbs = settings.get(resolve("IMAGES_THUMBS"), self.THUMBS)
+        self.threads = settings.getint(resolve("IMAGES_THREADS"))
+        self._threadpool = None
 
         self._deprecated_convert_image = None
 
@@ -112,19 +116,64 @@ class ImagesPipeline(FilesPipeline):
         ftp_store.FTP_PASSWORD = settings["FTP_PASSWORD"]
         ftp_store.USE_ACTIVE_MODE = settings.getbool("FEED_STORAGE_FTP_ACTIVE")
 
+        s3store.MANIFEST = gcs_store.MANIFEST = settings.getbool("MEDIA_STORE_MANIFEST")
+
         store_uri = settings["IMAGES_STORE"]
         return cls(store_uri, settings=settings)
 
+    def open_spider(self, spider):
+        super().open_spider(spider)
+        if self.threads > 0:
+            self._threadpool = ThreadPool(
+                minthreads=0, maxthreads=self.threads, name="images"
+            )
+            self._threadpool.start()
+
+    def close_spider(self, spider):
+        super().close_spider(spider)
+        if self._threadpool is not None:
+            self._threadpool.stop()
+            self._threadpool = None
+
     def file_downloaded(self, response, request, info, *, item=None):
         return self.image_downloaded(response, request, info, item=item)
 
     def image_downloaded(self, response, request, info, *, item=None):
+        if self._threadpool is None:
+            images = self._process_images(response, request, info, item)
+            return self._store_images(images, info)
+
+        from twisted.internet import reactor
+
+        # Pillow releases the GIL while decoding, resizing and encoding, but
+        # stores are not thread-safe, so files are persisted from the reactor
+        dfd = threads.deferToThreadPool(
+            reactor,
+            self._threadpool,
+            self._process_images,
+            response,
+            request,
+            info,
+            item,
+        )
+        return dfd.addCallback(self._store_images, info)
+
+    def _process_images(self, response, request, info, item):
+        """Return the checksum of the image and a list of ``(path, image,
+        buf)`` tuples, with the output of :meth:`get_images`."""
+        images = list(self.get_images(response, request, info, item=item))
         checksum = None
-        for path, image, buf in self.get_images(response, request, info, item=item):
-            if checksum is None:
-                buf.seek(0)
-                checksum = md5sum(buf)
+        if images:
+            buf = images[0][2]
+            buf.seek(0)
+            checksum = md5sum(buf)
+        return checksum, images
+
+    def _store_images(self, images, info):
+        checksum, images = images
+        for path, image, buf in images:
             width, height = image.size
+            buf.seek(0)
             self.store.persist_file(
                 path,
                 buf,
@@ -165,16 +214,39 @@ class ImagesPipeline(FilesPipeline):
             )
         yield path, image, buf
 
+        if not self.thumbs:
+            return
+        thumb_source = image
+        if (
+            not self._deprecated_convert_image
+            and image is orig_image
+            and orig_image.format == "JPEG"
+        ):
+            # The original JPEG has not been decoded, so the thumbnails can
+            # be made from a single copy decoded at a reduced scale. Other
+            # images were decoded to be converted to JPEG.
+            thumb_source = self._draft_thumb_source(response.body)
         for thumb_id, size in self.thumbs.items():
             thumb_path = self.thumb_path(
                 request, thumb_id, response=response, info=info, item=item
             )
             if self._deprecated_convert_image:
-                thumb_image, thumb_buf = self.convert_image(image, size)
+                thumb_image, thumb_buf = self.convert_image(thumb_source, size)
             else:
-                thumb_image, thumb_buf = self.convert_image(image, size, buf)
+                thumb_image, thumb_buf = self.convert_image(thumb_source, size, buf)
             yield thumb_path, thumb_image, thumb_buf
 
+    def _draft_thumb_source(self, body):
+        """Return the image of ``body``, a JPEG image, decoded at the smallest
+        scale that still has twice the size of the biggest thumbnail, as
+        :meth:`PIL.Image.Image.thumbnail` would do."""
+        image = self._Image.open(BytesIO(body))
+        width = max(size[0] for size in self.thumbs.values())
+        height = max(size[1] for size in self.thumbs.values())
+        image.draft("RGB", (width * 2, height * 2))
+        image.load()
+        return image
+
     def convert_image(self, image, size=None, response_body=None):
         if response_body is None:
             warnings.warn(
@@ -1,7 +1,10 @@
+import dbm
 import functools
 import logging
-from collections import defaultdict
+import pickle
+from collections import OrderedDict, defaultdict
 from inspect import signature
+from pathlib import Path
 from warnings import warn
 
 from twisted.internet.defer import Deferred, DeferredList
@@ -12,24 +15,111 @@ from scrapy.settings import Settings
 from scrapy.utils.datatypes import SequenceExclude
 from scrapy.utils.defer import defer_result, mustbe_deferred
 from scrapy.utils.deprecate import ScrapyDeprecationWarning
+from scrapy.utils.job import job_dir
 from scrapy.utils.log import failure_to_exc_info
-from scrapy.utils.misc import arg_to_iter
+from scrapy.utils.misc import arg_to_iter, load_object
 
 logger = logging.getLogger(__name__)
 
 
+_MISSING = object()
+
+
 def _DUMMY_CALLBACK(response):
     return response
 
 
+class MediaResultCache:
+    """Cache of media request results, keyed by request fingerprint.
+
+    Beyond ``MEDIA_RESULT_CACHE_SIZE`` results, the least recently used ones
+    are evicted. If ``MEDIA_RESULT_CACHE_PERSIST`` is enabled and ``JOBDIR``
+    is set, evicted results, and the remaining ones when the spider is
+    closed, are stored in a DBM database of the job directory, named after
+    ``name``, so that they are found again after they are evicted and when
+    the job is resumed. Only results that are dictionaries, like those of the
+    files and images pipelines, are stored there.
+    """
+
+    def __init__(self, settings, name):
+        self.size = settings.getint("MEDIA_RESULT_CACHE_SIZE")
+        self.results = OrderedDict()
+        self.stats = None
+        self.db = None
+        self.dbpath = None
+        jobdir = job_dir(settings)
+        if jobdir and settings.getbool("MEDIA_RESULT_CACHE_PERSIST"):
+            self.dbpath = Path(jobdir, f"{name}.results.db")
+
+    def open_spider(self, spider):
+        crawler = getattr(spider, "crawler", None)
+        self.spider = spider
+        self.stats = getattr(crawler, "stats", None)
+        if self.dbpath is not None:
+            self.db = dbm.open(str(self.dbpath), "c")
+
+    def close_spider(self, spider):
+        if self.db is None:
+            return
+        for fp, result in self.results.items():
+            self._store(fp, result)
+        self.db.close()
+        self.db = None
+
+    def _inc_stats(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(f"media_result_cache/{key}", spider=self.spider)
+
+    def _store(self, fp, result):
+        if isinstance(result, dict):
+            self.db[fp] = pickle.dumps(result, protocol=4)
+
+    def get(self, fp, default=None):
+        result = self.results.get(fp, _MISSING)
+        if result is not _MISSING:
+            self.results.move_to_end(fp)
+            self._inc_stats("hit")
+            return result
+        if self.db is not None:
+            data = self.db.get(fp)
+            if data is not None:
+                self._inc_stats("disk_hit")
+                result = pickle.loads(data)
+                self[fp] = result
+                return result
+        self._inc_stats("miss")
+        return default
+
+    def __contains__(self, fp):
+        return fp in self.results or (self.db is not None and fp in self.db)
+
+    def __getitem__(self, fp):
+        result = self.get(fp, _MISSING)
+        if result is _MISSING:
+            raise KeyError(fp)
+        return result
+
+    def __setitem__(self, fp, result):
+        self.results[fp] = result
+        self.results.move_to_end(fp)
+        if self.size and len(self.results) > self.size:
+            evicted_fp, evicted = self.results.popitem(last=False)
+            self._inc_stats("eviction")
+            if self.db is not None:
+                self._store(evicted_fp, evicted)
+
+    def __len__(self):
+        return len(self.results)
+
+
 class MediaPipeline:
     LOG_FAILED_RESULTS = True
 
     class SpiderInfo:
-        def __init__(self, spider):
+        def __init__(self, spider, downloaded=None):
             self.spider = spider
             self.downloading = set()
-            self.downloaded = {}
+            self.downloaded = {} if downloaded is None else downloaded
             self.waiting = defaultdict(list)
 
     def __init__(self, download_func=None, settings=None):
@@ -43,6 +133,7 @@ class MediaPipeline:
         )
         self.allow_redirects = settings.getbool(resolve("MEDIA_ALLOW_REDIRECTS"), False)
         self._handle_statuses(self.allow_redirects)
+        self._settings = settings
 
         # Check if deprecated methods are being used and make them compatible
         self._make_compatible()
@@ -83,7 +174,15 @@ class MediaPipeline:
         return pipe
 
     def open_spider(self, spider):
-        self.spiderinfo = self.SpiderInfo(spider)
+        crawler = getattr(self, "crawler", None)
+        settings = crawler.settings if crawler else self._settings
+        cache_cls = load_object(settings["MEDIA_RESULT_CACHE"])
+        downloaded = cache_cls(settings, self.__class__.__name__.lower())
+        downloaded.open_spider(spider)
+        self.spiderinfo = self.SpiderInfo(spider, downloaded)
+
+    def close_spider(self, spider):
+        self.spiderinfo.downloaded.close_spider(spider)
 
     def process_item(self, item, spider):
         info = self.spiderinfo
@@ -103,8 +202,9 @@ class MediaPipeline:
         request.errback = None
 
         # Return cached result if request was already seen
-        if fp in info.downloaded:
-            return defer_result(info.downloaded[fp]).addCallbacks(cb, eb)
+        result = info.downloaded.get(fp, _MISSING)
+        if result is not _MISSING:
+            return defer_result(result).addCallbacks(cb, eb)
 
         # Otherwise, wait for result
         wad = Deferred().addCallbacks(cb, eb)
@@ -1,6 +1,9 @@
 import hashlib
+import heapq
 import logging
+from itertools import count
 
+from scrapy import signals
 from scrapy.utils.misc import create_instance
 
 logger = logging.getLogger(__name__)
@@ -48,6 +51,11 @@ class ScrapyPriorityQueue:
     previously closed leaving some priority buckets non-empty, those priorities
     should be passed in startprios.
 
+    Priorities of the allocated internal queues are kept in a heap, so
+    selecting the next priority after a bucket is exhausted takes
+    O(log n) time in the number of distinct priorities, instead of a scan
+    over all of them.
+
     """
 
     @classmethod
@@ -59,17 +67,23 @@ class ScrapyPriorityQueue:
         self.downstream_queue_cls = downstream_queue_cls
         self.key = key
         self.queues = {}
-        self.curprio = None
+        self._prios = []  # heap of the priorities present in self.queues
         self.init_prios(startprios)
 
+    @property
+    def curprio(self):
+        return self._prios[0] if self._prios else None
+
     def init_prios(self, startprios):
         if not startprios:
             return
 
         for priority in startprios:
-            self.queues[priority] = self.qfactory(priority)
+            if priority not in self.queues:
+                self.queues[priority] = self.qfactory(priority)
+                self._prios.append(priority)
 
-        self.curprio = min(startprios)
+        heapq.heapify(self._prios)
 
     def qfactory(self, key):
         return create_instance(
@@ -86,22 +100,24 @@ class ScrapyPriorityQueue:
         priority = self.priority(request)
         if priority not in self.queues:
             self.queues[priority] = self.qfactory(priority)
+            heapq.heappush(self._prios, priority)
         q = self.queues[priority]
         q.push(request)  # this may fail (eg. serialization error)
-        if self.curprio is None or priority < self.curprio:
-            self.curprio = priority
 
     def pop(self):
-        if self.curprio is None:
-            return
-        q = self.queues[self.curprio]
-        m = q.pop()
-        if not q:
-            del self.queues[self.curprio]
-            q.close()
-            prios = [p for p, q in self.queues.items() if q]
-            self.curprio = min(prios) if prios else None
-        return m
+        # Buckets can be empty (e.g. left behind by a failed push), so keep
+        # going until a request is found or there are no buckets left.
+        while self._prios:
+            priority = self._prios[0]
+            q = self.queues[priority]
+            m = q.pop()
+            if not q:
+                heapq.heappop(self._prios)
+                del self.queues[priority]
+                q.close()
+            if m is not None:
+                return m
+        return None
 
     def peek(self):
         """Returns the next object to be returned by :meth:`pop`,
@@ -147,6 +163,15 @@ class DownloaderAwarePriorityQueue:
     """PriorityQueue which takes Downloader activity into account:
     domains (slots) with the least amount of active downloads are dequeued
     first.
+
+    Slots are kept in a heap keyed by their number of active downloads,
+    which is updated from the :signal:`request_reached_downloader` and
+    :signal:`request_left_downloader` signals, so that picking the next slot
+    does not require checking every slot with queued requests.
+
+    Until both signals have been received, e.g. with a downloader that does
+    not send them, the slot with the least active downloads is found by
+    checking every slot instead.
     """
 
     @classmethod
@@ -176,8 +201,24 @@ class DownloaderAwarePriorityQueue:
         self.crawler = crawler
 
         self.pqueues = {}  # slot -> priority queue
+        self._slot_heap = []  # (active downloads, entry id, slot)
+        self._slot_entries = {}  # slot -> id of its current heap entry
+        self._entry_ids = count()
+        # signals received from the downloader, the heap is only kept up to
+        # date once the downloader is known to send both of them
+        self._signals_received = set()
         for slot, startprios in (slot_startprios or {}).items():
             self.pqueues[slot] = self.pqfactory(slot, startprios)
+            self._update_slot(slot)
+
+        crawler.signals.connect(
+            self._request_reached_downloader,
+            signal=signals.request_reached_downloader,
+        )
+        crawler.signals.connect(
+            self._request_left_downloader,
+            signal=signals.request_left_downloader,
+        )
 
     def pqfactory(self, slot, startprios=()):
         return ScrapyPriorityQueue(
@@ -187,23 +228,87 @@ class DownloaderAwarePriorityQueue:
             startprios,
         )
 
-    def pop(self):
-        stats = self._downloader_interface.stats(self.pqueues)
+    def _update_slot(self, slot, active=None):
+        if active is None:
+            active = self._downloader_interface._active_downloads(slot)
+        entry_id = next(self._entry_ids)
+        self._slot_entries[slot] = entry_id
+        heapq.heappush(self._slot_heap, (active, entry_id, slot))
+        if len(self._slot_heap) > 2 * len(self._slot_entries) + 64:
+            self._slot_heap = [
+                entry
+                for entry in self._slot_heap
+                if self._slot_entries.get(entry[2]) == entry[1]
+            ]
+            heapq.heapify(self._slot_heap)
+
+    def _signal_received(self, signal):
+        if len(self._signals_received) < 2:
+            self._signals_received.add(signal)
+            if len(self._signals_received) == 2:
+                self._rebuild_slot_heap()
+
+    def _rebuild_slot_heap(self):
+        self._slot_entries = {}
+        self._slot_heap = []
+        for slot in self.pqueues:
+            entry_id = next(self._entry_ids)
+            self._slot_entries[slot] = entry_id
+            active = self._downloader_interface._active_downloads(slot)
+            self._slot_heap.append((active, entry_id, slot))
+        heapq.heapify(self._slot_heap)
+
+    def _request_reached_downloader(self, request, spider):
+        self._signal_received(signals.request_reached_downloader)
+        slot = self._downloader_interface.get_slot_key(request)
+        if slot in self.pqueues:
+            self._update_slot(slot)
 
-        if not stats:
-            return
+    def _request_left_downloader(self, request, spider):
+        self._signal_received(signals.request_left_downloader)
+        slot = self._downloader_interface.get_slot_key(request)
+        if slot in self.pqueues:
+            # the request is still counted as active when the signal is sent
+            active = self._downloader_interface._active_downloads(slot)
+            self._update_slot(slot, max(active - 1, 0))
+
+    def _next_slot(self):
+        if len(self._signals_received) < 2:
+            return min(
+                self.pqueues,
+                key=self._downloader_interface._active_downloads,
+                default=None,
+            )
+        heap = self._slot_heap
+        while heap:
+            active, entry_id, slot = heap[0]
+            if self._slot_entries.get(slot) != entry_id:
+                heapq.heappop(heap)  # stale entry
+                continue
+            current = self._downloader_interface._active_downloads(slot)
+            if current != active:
+                heapq.heappop(heap)
+                self._update_slot(slot, current)
+                continue
+            return slot
+        return None
 
-        slot = min(stats)[1]
+    def pop(self):
+        slot = self._next_slot()
+        if slot is None:
+            return
         queue = self.pqueues[slot]
         request = queue.pop()
         if len(queue) == 0:
             del self.pqueues[slot]
+            del self._slot_entries[slot]
         return request
 
     def push(self, request):
         slot = self._downloader_interface.get_slot_key(request)
         if slot not in self.pqueues:
             self.pqueues[slot] = self.pqfactory(slot)
+            self._update_slot(slot)
         queue = self.pqueues[slot]
         queue.push(request)
 
@@ -214,16 +319,25 @@ class DownloaderAwarePriorityQueue:
         Raises :exc:`NotImplementedError` if the underlying queue class does
         not implement a ``peek`` method, which is optional for queues.
         """
-        stats = self._downloader_interface.stats(self.pqueues)
-        if not stats:
+        slot = self._next_slot()
+        if slot is None:
             return None
-        slot = min(stats)[1]
         queue = self.pqueues[slot]
         return queue.peek()
 
     def close(self):
+        self.crawler.signals.disconnect(
+            self._request_reached_downloader,
+            signal=signals.request_reached_downloader,
+        )
+        self.crawler.signals.disconnect(
+            self._request_left_downloader,
+            signal=signals.request_left_downloader,
+        )
         active = {slot: queue.close() for slot, queue in self.pqueues.items()}
         self.pqueues.clear()
+        self._slot_heap.clear()
+        self._slot_entries.clear()
         return active
 
     def __len__(self):
@@ -29,6 +29,11 @@ AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
 
 BOT_NAME = "scrapybot"
 
+CALLBACK_POOL_CALLBACKS = []
+CALLBACK_POOL_SIZE = 0
+
+CANONICALIZE_URL_CACHE_SIZE = 10000
+
 CLOSESPIDER_TIMEOUT = 0
 CLOSESPIDER_PAGECOUNT = 0
 CLOSESPIDER_ITEMCOUNT = 0
@@ -44,6 +49,8 @@ CONCURRENT_REQUESTS = 16
 CONCURRENT_REQUESTS_PER_DOMAIN = 8
 CONCURRENT_REQUESTS_PER_IP = 0
 
+CRAWLER_SHARDS = 0
+
 COOKIES_ENABLED = True
 COOKIES_DEBUG = False
 
@@ -79,6 +86,10 @@ DOWNLOAD_TIMEOUT = 180  # 3mins
 
 DOWNLOAD_MAXSIZE = 1024 * 1024 * 1024  # 1024m
 DOWNLOAD_WARNSIZE = 32 * 1024 * 1024  # 32m
+DOWNLOAD_SPOOLSIZE = 0
+
+DOWNLOAD_POOL_IDLE_TIMEOUT = 240
+DOWNLOAD_POOL_MAX_PERSISTENT = 0
 
 DOWNLOAD_FAIL_ON_DATALOSS = True
 
@@ -93,6 +104,7 @@ DOWNLOADER_CLIENTCONTEXTFACTORY = (
 DOWNLOADER_CLIENT_TLS_CIPHERS = "DEFAULT"
 # Use highest TLS/SSL protocol version supported by the platform, also allowing negotiation:
 DOWNLOADER_CLIENT_TLS_METHOD = "TLS"
+DOWNLOADER_CLIENT_TLS_SESSION_REUSE = True
 DOWNLOADER_CLIENT_TLS_VERBOSE_LOGGING = False
 
 DOWNLOADER_MIDDLEWARES = {}
@@ -118,6 +130,8 @@ DOWNLOADER_MIDDLEWARES_BASE = {
 
 DOWNLOADER_STATS = True
 
+DUPEFILTER_BLOOM_CAPACITY = 1000000
+DUPEFILTER_BLOOM_ERROR_RATE = 0.001
 DUPEFILTER_CLASS = "scrapy.dupefilters.RFPDupeFilter"
 
 EDITOR = "vi"
@@ -136,6 +150,7 @@ EXTENSIONS_BASE = {
     "scrapy.extensions.logstats.LogStats": 0,
     "scrapy.extensions.spiderstate.SpiderState": 0,
     "scrapy.extensions.throttle.AutoThrottle": 0,
+    "scrapy.extensions.canonicalurl.CanonicalURLCache": 0,
 }
 
 FEED_TEMPDIR = None
@@ -154,6 +169,8 @@ FEED_STORAGES_BASE = {
     "stdout": "scrapy.extensions.feedexport.StdoutFeedStorage",
 }
 FEED_EXPORT_BATCH_ITEM_COUNT = 0
+FEED_EXPORT_BUFFER_ITEM_COUNT = 0
+FEED_EXPORT_BUFFER_TIMEOUT = 1.0
 FEED_EXPORTERS = {}
 FEED_EXPORTERS_BASE = {
     "json": "scrapy.exporters.JsonItemExporter",
@@ -164,12 +181,17 @@ FEED_EXPORTERS_BASE = {
     "xml": "scrapy.exporters.XmlItemExporter",
     "marshal": "scrapy.exporters.MarshalItemExporter",
     "pickle": "scrapy.exporters.PickleItemExporter",
+    "parquet": "scrapy.exporters.ParquetItemExporter",
+    "arrow": "scrapy.exporters.ArrowItemExporter",
 }
 FEED_EXPORT_INDENT = 0
 
 FEED_STORAGE_FTP_ACTIVE = False
 FEED_STORAGE_GCS_ACL = ""
 FEED_STORAGE_S3_ACL = ""
+FEED_STORAGE_UPLOAD_CONCURRENCY = 4
+FEED_STORAGE_UPLOAD_PART_SIZE = 0
+FEED_STORAGE_UPLOAD_RETRY_TIMES = 2
 
 FILES_STORE_S3_ACL = "private"
 FILES_STORE_GCS_ACL = ""
@@ -192,12 +214,18 @@ HTTPCACHE_IGNORE_RESPONSE_CACHE_CONTROLS = []
 HTTPCACHE_DBM_MODULE = "dbm"
 HTTPCACHE_POLICY = "scrapy.extensions.httpcache.DummyPolicy"
 HTTPCACHE_GZIP = False
+HTTPCACHE_COMPRESSION = None
+HTTPCACHE_COMPRESSION_LEVEL = -1
+HTTPCACHE_ZSTD_DICT_SIZE = 112640
+HTTPCACHE_SEGMENT_SIZE = 256 * 1024 * 1024
+HTTPCACHE_THREADS = 0
 
 HTTPPROXY_ENABLED = True
 HTTPPROXY_AUTH_ENCODING = "latin-1"
 
 IMAGES_STORE_S3_ACL = "private"
 IMAGES_STORE_GCS_ACL = ""
+IMAGES_THREADS = 0
 
 ITEM_PROCESSOR = "scrapy.pipelines.ItemPipelineManager"
 
@@ -225,6 +253,13 @@ MAIL_FROM = "scrapy@localhost"
 MAIL_PASS = None
 MAIL_USER = None
 
+MEDIA_RESULT_CACHE = "scrapy.pipelines.media.MediaResultCache"
+MEDIA_RESULT_CACHE_PERSIST = False
+MEDIA_RESULT_CACHE_SIZE = 100000
+MEDIA_STORE_MANIFEST = False
+MEDIA_STORE_STAT_BATCH_DELAY = 0.01
+MEDIA_STORE_STAT_BATCH_SIZE = 0
+
 MEMDEBUG_ENABLED = False  # enable memory debugging
 MEMDEBUG_NOTIFY = []  # send memory debugging report by mail at engine shutdown
 
@@ -252,7 +287,11 @@ REFERER_ENABLED = True
 REFERRER_POLICY = "scrapy.spidermiddlewares.referer.DefaultReferrerPolicy"
 
 REQUEST_FINGERPRINTER_CLASS = "scrapy.utils.request.RequestFingerprinter"
+REQUEST_FINGERPRINTER_COMPATIBILITY = None
+REQUEST_FINGERPRINTER_HASH = "sha1"
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.6"
+REQUEST_FINGERPRINTER_INCLUDE_HEADERS = []
+REQUEST_FINGERPRINTER_KEEP_FRAGMENTS = False
 
 RETRY_ENABLED = True
 RETRY_TIMES = 2  # initial response + 2 retries = 3 requests
@@ -304,6 +343,8 @@ TELNETCONSOLE_HOST = "127.0.0.1"
 TELNETCONSOLE_USERNAME = "scrapy"
 TELNETCONSOLE_PASSWORD = None
 
+TRACKREF_ENABLED = True
+
 TWISTED_REACTOR = None
 
 SPIDER_CONTRACTS = {}
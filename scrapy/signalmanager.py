@@ -43,8 +43,11 @@ class SignalManager:
         The keyword arguments are passed to the signal handlers (connected
         through the :meth:`connect` method).
         """
-        kwargs.setdefault("sender", self.sender)
-        return _signal.send_catch_log(signal, **kwargs)
+        sender = kwargs.pop("sender", self.sender)
+        receivers = _signal._get_receivers(sender, signal)
+        if not receivers:
+            return []  # the most common case for some signals sent per request
+        return _signal._send_catch_log(receivers, signal, sender, (), kwargs)
 
     def send_catch_log_deferred(self, signal: Any, **kwargs: Any) -> Deferred:
         """
@@ -10,11 +10,17 @@ import warnings
 from scrapy import signals
 from scrapy.http import Request
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.url import DomainSet
 
 logger = logging.getLogger(__name__)
 
 
 class OffsiteMiddleware:
+    _spider = None
+    _host_regex = None
+    # whether host_regex, rather than allowed_domains, decides what to follow
+    _use_host_regex = False
+
     def __init__(self, stats):
         self.stats = stats
 
@@ -50,23 +56,55 @@ class OffsiteMiddleware:
         return False
 
     def should_follow(self, request, spider):
-        regex = self.host_regex
         # hostname can be None for wrong urls (like javascript links)
         host = urlparse_cached(request).hostname or ""
-        return bool(regex.search(host))
+        if self._use_host_regex:
+            return bool(self.host_regex.search(host))
+        return self.allowed_domains is None or self.allowed_domains.matches(host)
+
+    @property
+    def host_regex(self):
+        """The regular expression of the allowed hosts, from
+        :meth:`get_host_regex`. Unless a subclass overrides that method, it
+        is only built when accessed, :attr:`allowed_domains` being used to
+        filter requests instead."""
+        if self._host_regex is None and self._spider is not None:
+            self._host_regex = self.get_host_regex(self._spider)
+        return self._host_regex
+
+    @host_regex.setter
+    def host_regex(self, value):
+        self._host_regex = value
+        self._use_host_regex = value is not None
 
     def get_host_regex(self, spider):
         """Override this method to implement a different offsite policy"""
         allowed_domains = getattr(spider, "allowed_domains", None)
         if not allowed_domains:
             return re.compile("")  # allow all by default
+        domains = [re.escape(d) for d in self._valid_domains(allowed_domains)]
+        regex = rf'^(.*\.)?({"|".join(domains)})$'
+        return re.compile(regex)
+
+    def get_allowed_domains(self, spider):
+        """Return the :class:`~scrapy.utils.url.DomainSet` of the domains
+        allowed for *spider*, or ``None`` to allow all domains."""
+        allowed_domains = getattr(spider, "allowed_domains", None)
+        if not allowed_domains:
+            return None  # allow all by default
+        if isinstance(allowed_domains, DomainSet):
+            return allowed_domains  # shared with the spider, which may update it
+        return DomainSet(self._valid_domains(allowed_domains))
+
+    def _valid_domains(self, allowed_domains):
         url_pattern = re.compile(r"^https?://.*$")
         port_pattern = re.compile(r":\d+$")
-        domains = []
         for domain in allowed_domains:
             if domain is None:
                 continue
-            if url_pattern.match(domain):
+            if ":" not in domain:
+                yield domain  # neither a URL nor a port, the common case
+            elif url_pattern.match(domain):
                 message = (
                     "allowed_domains accepts only domains, not URLs. "
                     f"Ignoring URL entry {domain} in allowed_domains."
@@ -79,12 +117,17 @@ class OffsiteMiddleware:
                 )
                 warnings.warn(message, PortWarning)
             else:
-                domains.append(re.escape(domain))
-        regex = rf'^(.*\.)?({"|".join(domains)})$'
-        return re.compile(regex)
+                yield domain
 
     def spider_opened(self, spider):
-        self.host_regex = self.get_host_regex(spider)
+        self._spider = spider
+        if type(self).get_host_regex is OffsiteMiddleware.get_host_regex:
+            self.host_regex = None
+            self.allowed_domains = self.get_allowed_domains(spider)
+        else:
+            # a subclass implements its own policy
+            self.host_regex = self.get_host_regex(spider)
+            self.allowed_domains = None
         self.domains_seen = set()
 
 
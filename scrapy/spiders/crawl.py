@@ -10,6 +10,7 @@ from typing import AsyncIterable, Awaitable, Sequence
 
 from scrapy.http import HtmlResponse, Request, Response
 from scrapy.linkextractors import LinkExtractor
+from scrapy.linkextractors.lxmlhtml import _LxmlLinkExtractorSet
 from scrapy.spiders import Spider
 from scrapy.utils.asyncgen import collect_asyncgen
 from scrapy.utils.spider import iterate_spider_output
@@ -92,12 +93,9 @@ class CrawlSpider(Spider):
         if not isinstance(response, HtmlResponse):
             return
         seen = set()
+        rule_links = self._link_extractors.extract_links(response)
         for rule_index, rule in enumerate(self._rules):
-            links = [
-                lnk
-                for lnk in rule.link_extractor.extract_links(response)
-                if lnk not in seen
-            ]
+            links = [lnk for lnk in rule_links[rule_index] if lnk not in seen]
             for link in rule.process_links(links):
                 seen.add(link)
                 request = self._build_request(rule_index, link)
@@ -139,6 +137,10 @@ class CrawlSpider(Spider):
         for rule in self.rules:
             self._rules.append(copy.copy(rule))
             self._rules[-1]._compile(self)
+        # the links of all rules are extracted in a single pass
+        self._link_extractors = _LxmlLinkExtractorSet(
+            rule.link_extractor for rule in self._rules
+        )
 
     @classmethod
     def from_crawler(cls, crawler, *args, **kwargs):
@@ -2,8 +2,13 @@
 Scheduler queues
 """
 
+import json
 import marshal
+import mmap
+import os
 import pickle
+import struct
+from collections import deque
 from os import PathLike
 from pathlib import Path
 from typing import Union
@@ -136,11 +141,290 @@ _MarshalLifoSerializationDiskQueue = _serializable_queue(
     _with_mkdir(queue.LifoDiskQueue), marshal.dumps, marshal.loads
 )
 
+
+class _NotInternable(Exception):
+    pass
+
+
+class _BinaryDiskQueue:
+    """Disk queue of request dicts, as returned by
+    :meth:`~scrapy.Request.to_dict`, stored in a compact binary format.
+
+    The queue is a directory with:
+
+    -   ``records``: the queued requests, each one encoded with :mod:`marshal`
+        and framed by its length at both ends, so that it can be read in
+        either direction. The keys of the request dict and of its headers,
+        ``meta`` and ``cb_kwargs``, as well as callback names, are replaced
+        by indexes of the ``strings`` file.
+
+    -   ``strings``: the strings interned by the records of this queue.
+
+    -   ``info.json``: the read and write positions, saved on close.
+
+    Pushed records are buffered and written in batches of ``batch_size``
+    bytes, and read through :mod:`mmap`. Values that :mod:`marshal` cannot
+    serialize make the record fall back to :mod:`pickle` for the
+    ``meta``, ``cb_kwargs``, ``cookies`` and request-class-specific values.
+    """
+
+    _lifo = False
+    _LENGTH = struct.Struct("<I")
+    _COMPACT_SIZE = 64 * 1024 * 1024
+    _COPY_CHUNK_SIZE = 1024 * 1024
+    _INTERNED_VALUES = frozenset(
+        ("callback", "errback", "method", "encoding", "_class")
+    )
+    _INTERNED_DICTS = frozenset(("headers", "meta", "cb_kwargs"))
+    _PLAIN, _PICKLED = 0, 1
+
+    def __init__(self, path: Union[str, PathLike], batch_size: int = 1024 * 1024):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        info = {"head": 0, "size": 0, "count": 0}
+        info_path = self.path / "info.json"
+        if info_path.exists():
+            info = json.loads(info_path.read_text(encoding="utf-8"))
+        self._head = info["head"]  # start of the records not popped yet
+        self._size = info["size"]  # end of the records not popped yet
+        self._count = info["count"]
+        self._buffer = deque()  # encoded records not written yet
+        self._buffered = 0
+        self._file = (self.path / "records").open("a+b")
+        self._file.truncate(self._size)
+        self._mmap = None
+        self._remap()
+        self._strings_file = (self.path / "strings").open("a+b")
+        self._strings = []
+        self._string_ids = {}
+        self._new_strings = []
+        self._schemas = {}
+        self._load_strings()
+
+    def _load_strings(self) -> None:
+        self._strings_file.seek(0)
+        data = self._strings_file.read()
+        offset = 0
+        while offset < len(data):
+            (length,) = self._LENGTH.unpack_from(data, offset)
+            offset += self._LENGTH.size
+            self._strings.extend(marshal.loads(data[offset : offset + length]))
+            offset += length
+        self._string_ids = {
+            (type(string), string): i for i, string in enumerate(self._strings)
+        }
+
+    def _remap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.flush()
+        if self._size:
+            self._mmap = mmap.mmap(
+                self._file.fileno(), self._size, access=mmap.ACCESS_READ
+            )
+
+    def _intern(self, value):
+        """Return the index of ``value`` in the strings of this queue. Only
+        strings, bytes and tuples of them can be interned."""
+        key = (type(value), value)
+        try:
+            return self._string_ids[key]
+        except KeyError:
+            values = value if key[0] is tuple else (value,)
+            if any(type(v) not in (str, bytes) for v in values):
+                raise _NotInternable
+            string_id = self._string_ids[key] = len(self._strings)
+            self._strings.append(value)
+            self._new_strings.append(value)
+            return string_id
+
+    def _schema(self, keys: tuple):
+        """Return the index of the interned ``keys`` of a request dict, and
+        the positions of its values that need to be interned."""
+        try:
+            return self._schemas[keys]
+        except KeyError:
+            schema = self._schemas[keys] = (
+                self._intern(keys),
+                [i for i, key in enumerate(keys) if key in self._INTERNED_VALUES],
+                [i for i, key in enumerate(keys) if key in self._INTERNED_DICTS],
+            )
+            return schema
+
+    def _encode(self, request: dict) -> bytes:
+        # Dicts are encoded as the index of their interned key tuple, and the
+        # tuple of their values.
+        intern = self._intern
+        keys_id, interned_values, interned_dicts = self._schema(tuple(request))
+        values = list(request.values())
+        for i in interned_values:
+            if values[i] is not None:
+                values[i] = intern(values[i])
+        for i in interned_dicts:
+            value = values[i]
+            if value is not None:
+                values[i] = (intern(tuple(value)), tuple(value.values()))
+        try:
+            return marshal.dumps((self._PLAIN, keys_id, tuple(values)), 4)
+        except ValueError:
+            return self._encode_pickled(request)
+
+    def _encode_pickled(self, request: dict) -> bytes:
+        return marshal.dumps((self._PICKLED, _pickle_serialize(request), None), 4)
+
+    def _decode(self, data: bytes) -> dict:
+        kind, keys, values = marshal.loads(data)
+        if kind == self._PICKLED:
+            return pickle.loads(keys)
+        strings = self._strings
+        request = dict(zip(strings[keys], values))
+        for key, value in request.items():
+            if value is None:
+                continue
+            if key in self._INTERNED_VALUES:
+                request[key] = strings[value]
+            elif key in self._INTERNED_DICTS:
+                request[key] = dict(zip(strings[value[0]], value[1]))
+        return request
+
+    def push(self, request: dict) -> None:
+        try:
+            data = self._encode(request)
+        except _NotInternable:
+            data = self._encode_pickled(request)
+        self._buffer.append(data)
+        self._buffered += len(data) + 2 * self._LENGTH.size
+        self._count += 1
+        if self._buffered >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._new_strings:
+            data = marshal.dumps(self._new_strings, 4)
+            self._strings_file.write(self._LENGTH.pack(len(data)) + data)
+            self._strings_file.flush()
+            self._new_strings = []
+        if not self._buffer:
+            return
+        if self._head >= self._COMPACT_SIZE and self._head * 2 >= self._size:
+            self._compact()
+        frames = []
+        for data in self._buffer:
+            length = self._LENGTH.pack(len(data))
+            frames.extend((length, data, length))
+        self._buffer.clear()
+        self._buffered = 0
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        data = b"".join(frames)
+        self._file.truncate(self._size)
+        self._file.write(data)
+        self._size += len(data)
+        self._remap()
+
+    def _compact(self) -> None:
+        """Drop the records popped from the start of the records file, by
+        copying the others to a new records file, a chunk at a time."""
+        path = self.path / "records"
+        tmp_path = self.path / "records.tmp"
+        with tmp_path.open("wb") as f:
+            for start in range(self._head, self._size, self._COPY_CHUNK_SIZE):
+                end = min(start + self._COPY_CHUNK_SIZE, self._size)
+                f.write(self._mmap[start:end])
+        self._mmap.close()
+        self._mmap = None
+        self._file.close()
+        os.replace(tmp_path, path)
+        self._file = path.open("a+b")
+        self._head, self._size = 0, self._size - self._head
+
+    def _read(self, pop: bool):
+        if self._lifo and self._buffer:
+            data = self._buffer[-1]
+            if pop:
+                self._buffer.pop()
+                self._buffered -= len(data) + 2 * self._LENGTH.size
+        elif self._head < self._size:
+            if self._lifo:
+                end = self._size - self._LENGTH.size
+                (length,) = self._LENGTH.unpack_from(self._mmap, end)
+                start = end - length
+                if pop:
+                    self._size = start - self._LENGTH.size
+            else:
+                start = self._head + self._LENGTH.size
+                (length,) = self._LENGTH.unpack_from(self._mmap, self._head)
+                if pop:
+                    self._head = start + length + self._LENGTH.size
+            data = self._mmap[start : start + length]
+        elif self._buffer:
+            data = self._buffer[0]
+            if pop:
+                self._buffer.popleft()
+                self._buffered -= len(data) + 2 * self._LENGTH.size
+        else:
+            return None
+        request = self._decode(data)
+        if pop:
+            self._count -= 1
+            if not self._count:
+                self._reset()
+        return request
+
+    def _reset(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.truncate(0)
+        self._strings_file.truncate(0)
+        self._head = self._size = 0
+        self._strings, self._string_ids, self._new_strings = [], {}, []
+        self._schemas = {}
+
+    def pop(self):
+        return self._read(pop=True)
+
+    def peek(self):
+        return self._read(pop=False)
+
+    def close(self) -> None:
+        self._flush()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.truncate(self._size)
+        self._file.close()
+        self._strings_file.close()
+        info = {"head": self._head, "size": self._size, "count": self._count}
+        if self._count:
+            (self.path / "info.json").write_text(json.dumps(info), encoding="utf-8")
+        else:
+            for name in ("info.json", "records", "strings"):
+                (self.path / name).unlink(missing_ok=True)
+            if not any(self.path.iterdir()):
+                self.path.rmdir()
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _BinaryFifoSerializationDiskQueue(_BinaryDiskQueue):
+    pass
+
+
+class _BinaryLifoSerializationDiskQueue(_BinaryDiskQueue):
+    _lifo = True
+
+
 # public queue classes
 PickleFifoDiskQueue = _scrapy_serialization_queue(_PickleFifoSerializationDiskQueue)
 PickleLifoDiskQueue = _scrapy_serialization_queue(_PickleLifoSerializationDiskQueue)
 MarshalFifoDiskQueue = _scrapy_serialization_queue(_MarshalFifoSerializationDiskQueue)
 MarshalLifoDiskQueue = _scrapy_serialization_queue(_MarshalLifoSerializationDiskQueue)
+BinaryFifoDiskQueue = _scrapy_serialization_queue(_BinaryFifoSerializationDiskQueue)
+BinaryLifoDiskQueue = _scrapy_serialization_queue(_BinaryLifoSerializationDiskQueue)
 FifoMemoryQueue = _scrapy_non_serialization_queue(queue.FifoMemoryQueue)
 LifoMemoryQueue = _scrapy_non_serialization_queue(queue.LifoMemoryQueue)
 
@@ -0,0 +1,212 @@
+"""Incremental decoders for the content codings of HTTP responses"""
+
+import zlib
+from typing import Dict, Optional, Type
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _DecompressionMaxSizeExceeded(ValueError):
+    pass
+
+
+class _Decoder:
+    """Decompresses data as it arrives, keeping track of the decompressed
+    size.
+
+    If *max_size* is not 0, :exc:`_DecompressionMaxSizeExceeded` is raised as
+    soon as the decompressed size exceeds it, without decompressing the rest
+    of the data.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self.max_size = max_size
+        self.size = 0
+
+    def decompress(self, data: bytes) -> bytes:
+        max_length = self.max_size - self.size + 1 if self.max_size else 0
+        return self._count(self._decompress(data, max_length))
+
+    def flush(self) -> bytes:
+        """Return the decompressed data still buffered, once all data has been
+        passed to :meth:`decompress`."""
+        return self._count(self._flush())
+
+    def _count(self, output: bytes) -> bytes:
+        self.size += len(output)
+        if self.max_size and self.size > self.max_size:
+            raise _DecompressionMaxSizeExceeded(
+                f"The number of bytes decompressed so far ({self.size} B) "
+                f"exceeded the specified maximum ({self.max_size} B)."
+            )
+        return output
+
+    def _decompress(self, data: bytes, max_length: int) -> bytes:
+        raise NotImplementedError
+
+    def _flush(self) -> bytes:
+        return b""
+
+
+class _GzipDecoder(_Decoder):
+    """Decoder for gzip data, that supports multiple members and, like
+    :func:`scrapy.utils.gz.gunzip`, returns as much data as possible from
+    broken data instead of failing."""
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._broken = False
+
+    def _decompress(self, data: bytes, max_length: int) -> bytes:
+        output = b""
+        while data and not self._broken:
+            length = max_length - len(output) if max_length else 0
+            try:
+                output += self._obj.decompress(data, length)
+            except zlib.error as e:
+                if not (self.size or output):
+                    raise OSError(f"Not a gzipped file ({e})") from e
+                self._broken = True
+                break
+            if not self._obj.eof or (max_length and len(output) >= max_length):
+                break
+            # the rest of the data belongs to the next member
+            data = self._obj.unused_data
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return output
+
+    def _flush(self) -> bytes:
+        if self._broken:
+            return b""
+        return self._obj.flush()
+
+
+class _DeflateDecoder(_Decoder):
+    """Decoder for zlib data, or raw deflate data as sent by some Microsoft
+    servers. For more information, see:
+
+    - http://carsten.codimi.de/gzip.yaws/
+    - http://www.port80software.com/200ok/archive/2005/10/31/868.aspx
+    - http://www.gzip.org/zlib/zlib_faq.html#faq38
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._obj = zlib.decompressobj()
+        # input received until the format is known
+        self._head: Optional[bytes] = b""
+
+    def _decompress(self, data: bytes, max_length: int) -> bytes:
+        if self._head is None:
+            return self._obj.decompress(data, max_length)
+        self._head += data
+        try:
+            output = self._obj.decompress(data, max_length)
+        except zlib.error:
+            self._obj = zlib.decompressobj(-15)
+            output = self._obj.decompress(self._head, max_length)
+            self._head = None
+            return output
+        if output:
+            self._head = None
+        return output
+
+    def _flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliDecoder(_Decoder):
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._obj = brotli.Decompressor()
+        # brotli 1.2.0+
+        self._limit_output = hasattr(self._obj, "can_accept_more_data")
+
+    def _decompress(self, data: bytes, max_length: int) -> bytes:
+        if max_length and self._limit_output:
+            return self._obj.process(data, output_buffer_limit=max_length)
+        return self._obj.process(data)
+
+
+# A zstd block decompresses to at most 128 KiB and takes at least 4 bytes
+# (an RLE block), so every input byte decompresses to at most 32 KiB.
+_ZSTD_MAX_BLOCK_SIZE = 128 * 1024
+_ZSTD_MAX_RATIO = _ZSTD_MAX_BLOCK_SIZE // 4
+
+
+class _ZstdDecoder(_Decoder):
+    """Decoder for zstd data.
+
+    The decompression objects of zstandard do not limit their output, so if
+    there is a maximum output length, the input is passed in slices small
+    enough for the output not to exceed that length by more than one block
+    (128 KiB).
+    """
+
+    def __init__(self, max_size: int = 0):
+        super().__init__(max_size)
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def _decompress(self, data: bytes, max_length: int) -> bytes:
+        if not max_length:
+            return self._obj.decompress(data)
+        output = []
+        length = 0
+        view = memoryview(data)
+        while view and length < max_length:
+            size = max(1, (max_length - length) // _ZSTD_MAX_RATIO)
+            chunk = self._obj.decompress(view[:size])
+            view = view[size:]
+            output.append(chunk)
+            length += len(chunk)
+        return b"".join(output)
+
+
+_DECODERS: Dict[bytes, Type[_Decoder]] = {
+    b"gzip": _GzipDecoder,
+    b"x-gzip": _GzipDecoder,
+    b"deflate": _DeflateDecoder,
+}
+if brotli is not None:
+    _DECODERS[b"br"] = _BrotliDecoder
+if zstandard is not None:
+    _DECODERS[b"zstd"] = _ZstdDecoder
+
+
+def _get_decoder(encoding: bytes, max_size: int = 0) -> Optional[_Decoder]:
+    """Return a decoder for the given Content-Encoding value, or ``None`` if
+    it is not supported."""
+    decoder_cls = _DECODERS.get(encoding.strip().lower())
+    if decoder_cls is None:
+        return None
+    return decoder_cls(max_size)
+
+
+def _decode(data: bytes, encoding: bytes, max_size: int = 0) -> bytes:
+    """Return *data* decompressed with the given Content-Encoding value, or
+    unchanged if it is not supported."""
+    decoder = _get_decoder(encoding, max_size)
+    if decoder is None:
+        return data
+    output = decoder.decompress(data)
+    tail = decoder.flush()
+    return output + tail if tail else output
+
+
+def _remove_decoded_content_encoding(headers) -> None:
+    """Remove the last Content-Encoding value from *headers*, once a download
+    handler has decoded the body accordingly."""
+    encodings = headers.getlist("Content-Encoding")
+    if len(encodings) > 1:
+        headers.setlist("Content-Encoding", encodings[:-1])
+    else:
+        headers.pop("Content-Encoding", None)
@@ -125,6 +125,10 @@ def get_sources(use_closest=True) -> List[str]:
 def feed_complete_default_values_from_settings(feed, settings):
     out = feed.copy()
     out.setdefault("batch_item_count", settings.getint("FEED_EXPORT_BATCH_ITEM_COUNT"))
+    out.setdefault(
+        "buffer_item_count", settings.getint("FEED_EXPORT_BUFFER_ITEM_COUNT")
+    )
+    out.setdefault("buffer_timeout", settings.getfloat("FEED_EXPORT_BUFFER_TIMEOUT"))
     out.setdefault("encoding", settings["FEED_EXPORT_ENCODING"])
     out.setdefault("fields", settings.getdictorlist("FEED_EXPORT_FIELDS") or None)
     out.setdefault("store_empty", settings.getbool("FEED_STORE_EMPTY"))
@@ -1,33 +1,24 @@
-import struct
-from gzip import GzipFile
-from io import BytesIO
+import zlib
 
+from scrapy.utils._compression import _GzipDecoder
 
-def gunzip(data):
+
+def gunzip(data: bytes, *, max_size: int = 0) -> bytes:
     """Gunzip the given data and return as much data as possible.
 
     This is resilient to CRC checksum errors.
+
+    If *max_size* is not 0, decompression stops, raising
+    :exc:`scrapy.utils._compression._DecompressionMaxSizeExceeded`, as soon
+    as the output exceeds *max_size* bytes.
     """
-    f = GzipFile(fileobj=BytesIO(data))
-    output_list = []
-    chunk = b"."
-    while chunk:
-        try:
-            chunk = f.read1(8196)
-            output_list.append(chunk)
-        except (IOError, EOFError, struct.error):
-            # complete only if there is some data, otherwise re-raise
-            # see issue 87 about catching struct.error
-            # some pages are quite small so output_list is empty and f.extrabuf
-            # contains the whole page content
-            if output_list or getattr(f, "extrabuf", None):
-                try:
-                    output_list.append(f.extrabuf[-f.extrasize :])
-                finally:
-                    break
-            else:
-                raise
-    return b"".join(output_list)
+    decoder = _GzipDecoder(max_size)
+    try:
+        output = decoder.decompress(data)
+        tail = decoder.flush()
+    except zlib.error as e:
+        raise OSError(f"Not a gzipped file ({e})") from e
+    return output + tail if tail else output
 
 
 def gzip_magic_number(response):
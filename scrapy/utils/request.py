@@ -5,19 +5,22 @@ scrapy.http.Request objects
 
 import hashlib
 import json
+import struct
 import warnings
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from functools import partial
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from urllib.parse import urlunparse
 from weakref import WeakKeyDictionary
 
 from w3lib.http import basic_auth_header
-from w3lib.url import canonicalize_url
 
 from scrapy import Request, Spider
 from scrapy.exceptions import ScrapyDeprecationWarning
 from scrapy.utils.httpobj import urlparse_cached
 from scrapy.utils.misc import load_object
 from scrapy.utils.python import to_bytes, to_unicode
+from scrapy.utils.url import canonicalize_url
 
 _deprecated_fingerprint_cache: "WeakKeyDictionary[Request, Dict[Tuple[Optional[Tuple[bytes, ...]], bool], str]]"
 _deprecated_fingerprint_cache = WeakKeyDictionary()
@@ -269,6 +272,164 @@ class RequestFingerprinter:
         return self._fingerprint(request)
 
 
+_LENGTH = struct.Struct(">Q")
+
+
+def _get_hash_factory(name: str) -> Callable[[], Any]:
+    if name == "blake2b":
+        # 20-byte digests, the size of SHA1 digests
+        return partial(hashlib.blake2b, digest_size=20)
+    if name == "xxhash":
+        try:
+            import xxhash
+        except ImportError:
+            raise ValueError(
+                "The 'xxhash' value of the REQUEST_FINGERPRINTER_HASH setting "
+                "requires the xxhash library to be installed."
+            )
+        return xxhash.xxh3_128
+    try:
+        hashlib.new(name)
+    except ValueError:
+        raise ValueError(
+            f"Got an invalid value on setting 'REQUEST_FINGERPRINTER_HASH': "
+            f"{name!r}. Valid values are 'blake2b', 'xxhash' and the names of "
+            f"the algorithms of the hashlib module."
+        )
+    return partial(hashlib.new, name)
+
+
+class StreamingRequestFingerprinter:
+    """Request fingerprinter that feeds request data directly into a hash.
+
+    Like :class:`RequestFingerprinter`, it takes into account a canonical
+    version (:func:`w3lib.url.canonicalize_url`) of :attr:`request.url
+    <scrapy.http.Request.url>` and the values of :attr:`request.method
+    <scrapy.http.Request.method>` and :attr:`request.body
+    <scrapy.http.Request.body>`, plus the headers listed in the
+    :setting:`REQUEST_FINGERPRINTER_INCLUDE_HEADERS` setting. Each of them is
+    prefixed with its length and fed into the hash selected by the
+    :setting:`REQUEST_FINGERPRINTER_HASH` setting, without building any
+    intermediate JSON document.
+
+    Fingerprints are stored on the request object, so they are computed once
+    per request no matter how many components ask for them, and freed with
+    the request.
+
+    The fingerprints it generates are different from those of
+    :class:`RequestFingerprinter`, unless the
+    :setting:`REQUEST_FINGERPRINTER_COMPATIBILITY` setting is set.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            hash_name=settings.get("REQUEST_FINGERPRINTER_HASH"),
+            include_headers=settings.getlist("REQUEST_FINGERPRINTER_INCLUDE_HEADERS"),
+            keep_fragments=settings.getbool("REQUEST_FINGERPRINTER_KEEP_FRAGMENTS"),
+            compatibility=settings.get("REQUEST_FINGERPRINTER_COMPATIBILITY"),
+        )
+
+    def __init__(
+        self,
+        *,
+        hash_name: str = "sha1",
+        include_headers: Optional[Iterable[Union[bytes, str]]] = None,
+        keep_fragments: bool = False,
+        compatibility: Optional[str] = None,
+    ):
+        self.include_headers: Tuple[bytes, ...] = tuple(
+            to_bytes(h.lower()) for h in sorted(include_headers or ())
+        )
+        self.keep_fragments = keep_fragments
+        if compatibility not in (None, "2.6", "2.7"):
+            raise ValueError(
+                f"Got an invalid value on setting "
+                f"'REQUEST_FINGERPRINTER_COMPATIBILITY': {compatibility!r}. "
+                f"Valid values are None, '2.6' and '2.7'."
+            )
+        if compatibility and hash_name != "sha1":
+            raise ValueError(
+                f"The {compatibility!r} value of the "
+                f"REQUEST_FINGERPRINTER_COMPATIBILITY setting requires the "
+                f"'sha1' value of the REQUEST_FINGERPRINTER_HASH setting, got "
+                f"{hash_name!r}."
+            )
+        self.compatibility = compatibility
+        self._hash_factory = _get_hash_factory(hash_name)
+        self._update = {
+            None: self._update,
+            "2.6": self._update_2_6,
+            "2.7": self._update_2_7,
+        }[compatibility]
+        # Identifies the fingerprints of this configuration among those
+        # stored on a request.
+        self._key = (hash_name, self.include_headers, keep_fragments, compatibility)
+
+    def fingerprint(self, request: Request) -> bytes:
+        fingerprints = request._fingerprints
+        if fingerprints is None:
+            fingerprints = request._fingerprints = {}
+        else:
+            try:
+                return fingerprints[self._key]
+            except KeyError:
+                pass
+        fp = self._hash_factory()
+        self._update(fp, request)
+        result = fingerprints[self._key] = fp.digest()
+        return result
+
+    def _headers(self, request: Request) -> Iterable[Tuple[bytes, List[bytes]]]:
+        for header in self.include_headers:
+            if header in request.headers:
+                yield header, request.headers.getlist(header)
+
+    def _update(self, fp, request: Request) -> None:
+        url = canonicalize_url(request.url, keep_fragments=self.keep_fragments)
+        parts = [to_bytes(request.method), to_bytes(url), request.body or b""]
+        for header, values in self._headers(request):
+            parts.append(header)
+            parts.extend(values)
+        for part in parts:
+            fp.update(_LENGTH.pack(len(part)))
+            fp.update(part)
+
+    def _update_2_6(self, fp, request: Request) -> None:
+        fp.update(to_bytes(request.method))
+        fp.update(
+            to_bytes(canonicalize_url(request.url, keep_fragments=self.keep_fragments))
+        )
+        fp.update(request.body or b"")
+        for header, values in self._headers(request):
+            fp.update(header)
+            for value in values:
+                fp.update(value)
+
+    def _update_2_7(self, fp, request: Request) -> None:
+        # The JSON document that fingerprint() hashes, written without
+        # building a dict first. Keys are sorted, as with sort_keys=True.
+        headers = "{}"
+        if self.include_headers:
+            headers = json.dumps(
+                {
+                    header.hex(): [value.hex() for value in values]
+                    for header, values in self._headers(request)
+                },
+                sort_keys=True,
+            )
+        url = canonicalize_url(request.url, keep_fragments=self.keep_fragments)
+        fp.update(
+            (
+                f'{{"body": "{(request.body or b"").hex()}", '
+                f'"headers": {headers}, '
+                f'"method": {encode_basestring_ascii(to_unicode(request.method))}, '
+                f'"url": {encode_basestring_ascii(url)}}}'
+            ).encode()
+        )
+
+
 def request_authenticate(
     request: Request,
     username: str,
@@ -1,18 +1,21 @@
 """Helper functions for working with signals"""
 import collections.abc
+import inspect
 import logging
 from typing import Any as TypingAny
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from pydispatch import dispatcher
 from pydispatch.dispatcher import (
+    WEAKREF_TYPES,
     Anonymous,
     Any,
     disconnect,
     getAllReceivers,
     liveReceivers,
 )
-from pydispatch.robustapply import robustApply
-from twisted.internet.defer import Deferred, DeferredList
+from pydispatch.robustapply import function, robustApply
+from twisted.internet.defer import Deferred, DeferredList, succeed
 from twisted.python.failure import Failure
 
 from scrapy.exceptions import StopDownload
@@ -22,27 +25,121 @@ from scrapy.utils.log import failure_to_exc_info
 logger = logging.getLogger(__name__)
 
 
+_ANY_ARGUMENT = object()
+_ANY_KEY = id(Any)
+_NO_SIGNALS: Dict[TypingAny, list] = {}
+
+# id(sender) -> signal -> (receivers connected in pydispatch, compiled receivers)
+_receivers_cache: Dict[int, Dict[TypingAny, tuple]] = {}
+
+
+def _get_accepted_arguments(receiver) -> Optional[TypingAny]:
+    """Return the names of the keyword arguments that robustApply would pass
+    to *receiver*, _ANY_ARGUMENT if it accepts any, or None if robustApply
+    must be called to find out."""
+    try:
+        _, code, start = function(receiver)
+    except ValueError:
+        return None  # let robustApply raise it when sending
+    if code.co_flags & inspect.CO_VARKEYWORDS:
+        return _ANY_ARGUMENT
+    return frozenset(code.co_varnames[start : code.co_argcount])
+
+
+def _compile_receivers(sender, signal) -> list:
+    compiled = []
+    for ref in getAllReceivers(sender, signal):
+        weak = isinstance(ref, WEAKREF_TYPES)
+        receiver = ref() if weak else ref
+        if receiver is not None:
+            compiled.append((ref, weak, _get_accepted_arguments(receiver)))
+    return compiled
+
+
+def _get_receivers(sender, signal) -> list:
+    """Return the receivers of *signal* from *sender* as a list of
+    ``(receiver, weak, accepted_arguments)`` tuples.
+
+    The list is compiled once and reused until the receivers connected in
+    pydispatch for *signal* or *sender* change, so that sending a signal
+    does not resolve its receivers nor introspect their signatures every
+    time.
+    """
+    connections = dispatcher.connections
+    sender_key = id(sender)
+    sender_signals = connections.get(sender_key, _NO_SIGNALS)
+    any_signals = connections.get(_ANY_KEY, _NO_SIGNALS)
+    connected = (
+        tuple(sender_signals.get(signal, ())),
+        tuple(sender_signals.get(Any, ())),
+        tuple(any_signals.get(signal, ())),
+        tuple(any_signals.get(Any, ())),
+    )
+    cache = _receivers_cache.get(sender_key)
+    if cache is None:
+        # Forget senders gone from pydispatch. Reused ids are harmless, as
+        # cached receivers are only used if their connections are unchanged.
+        for key in [key for key in _receivers_cache if key not in connections]:
+            del _receivers_cache[key]
+        cache = _receivers_cache[sender_key] = {}
+    cached = cache.get(signal)
+    if cached is not None and cached[0] == connected:
+        return cached[1]
+    if any(connected):
+        compiled = _compile_receivers(sender, signal)
+    else:
+        compiled = []
+    cache[signal] = (connected, compiled)
+    return compiled
+
+
+def _live_receivers(receivers):
+    for ref, weak, accepted in receivers:
+        receiver = ref() if weak else ref
+        if receiver is not None:
+            yield receiver, accepted
+
+
+def _apply(receiver, accepted, arguments, named):
+    if accepted is None or arguments:
+        return robustApply(receiver, *arguments, **named)
+    if accepted is not _ANY_ARGUMENT:
+        named = {k: v for k, v in named.items() if k in accepted}
+    return receiver(**named)
+
+
 def send_catch_log(
     signal=Any, sender=Anonymous, *arguments, **named
 ) -> List[Tuple[TypingAny, TypingAny]]:
     """Like pydispatcher.robust.sendRobust but it also logs errors and returns
     Failures instead of exceptions.
     """
-    dont_log = named.pop("dont_log", ())
-    dont_log = (
-        tuple(dont_log)
-        if isinstance(dont_log, collections.abc.Sequence)
-        else (dont_log,)
-    )
-    dont_log += (StopDownload,)
+    receivers = _get_receivers(sender, signal)
+    if not receivers:
+        return []
+    return _send_catch_log(receivers, signal, sender, arguments, named)
+
+
+def _send_catch_log(
+    receivers, signal, sender, arguments, named
+) -> List[Tuple[TypingAny, TypingAny]]:
+    dont_log = named.pop("dont_log", None)
+    if dont_log is None:
+        dont_log = (StopDownload,)
+    else:
+        dont_log = (
+            tuple(dont_log)
+            if isinstance(dont_log, collections.abc.Sequence)
+            else (dont_log,)
+        )
+        dont_log += (StopDownload,)
     spider = named.get("spider", None)
     responses: List[Tuple[TypingAny, TypingAny]] = []
-    for receiver in liveReceivers(getAllReceivers(sender, signal)):
+    named = {"signal": signal, "sender": sender, **named}
+    for receiver, accepted in _live_receivers(receivers):
         result: TypingAny
         try:
-            response = robustApply(
-                receiver, signal=signal, sender=sender, *arguments, **named
-            )
+            response = _apply(receiver, accepted, arguments, named)
             if isinstance(response, Deferred):
                 logger.error(
                     "Cannot return deferreds from signal handler: %(receiver)s",
@@ -81,13 +178,15 @@ def send_catch_log_deferred(signal=Any, sender=Anonymous, *arguments, **named):
             )
         return failure
 
+    receivers = _get_receivers(sender, signal)
+    if not receivers:
+        return succeed([])
     dont_log = named.pop("dont_log", None)
     spider = named.get("spider", None)
+    named = {"signal": signal, "sender": sender, **named}
     dfds = []
-    for receiver in liveReceivers(getAllReceivers(sender, signal)):
-        d = maybeDeferred_coro(
-            robustApply, receiver, signal=signal, sender=sender, *arguments, **named
-        )
+    for receiver, accepted in _live_receivers(receivers):
+        d = maybeDeferred_coro(_apply, receiver, accepted, arguments, named)
         d.addErrback(logerror, receiver)
         d.addBoth(lambda result: (receiver, result))
         dfds.append(d)
@@ -102,3 +201,4 @@ def disconnect_all(signal=Any, sender=Any):
     """
     for receiver in liveReceivers(getAllReceivers(sender, signal)):
         disconnect(receiver, signal=signal, sender=sender)
+    _receivers_cache.clear()
@@ -0,0 +1,107 @@
+"""Helpers to keep large response bodies in temporary files instead of memory"""
+
+import mmap
+import tempfile
+from io import BytesIO
+from typing import BinaryIO, Iterator, Optional, Union
+
+from scrapy.utils._compression import _Decoder
+
+
+class SpooledBody:
+    """Response body stored in a temporary file.
+
+    The file is memory-mapped on first access, so that reading parts of the
+    body does not load the rest of it in memory. Slicing returns
+    :class:`bytes`.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._size = file.seek(0, 2)
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: slice) -> bytes:
+        if not isinstance(key, slice):
+            raise TypeError(f"{type(self).__name__} only supports slicing")
+        return self._map()[key]
+
+    def _map(self) -> Union[bytes, mmap.mmap]:
+        if self._mmap is None:
+            if not self._size:  # empty files cannot be memory-mapped
+                return b""
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def read(self) -> bytes:
+        """Return the whole body."""
+        return self._map()[:]
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        data = self._map()
+        for start in range(0, self._size, chunk_size):
+            yield data[start : start + chunk_size]
+
+    def open(self) -> BinaryIO:
+        """Return a new read-only file object for the body, which also has the
+        ``getvalue()`` method of :class:`~io.BytesIO`."""
+        if not self._size:
+            return BytesIO()
+        return _SpooledBodyFile(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _SpooledBodyFile(mmap.mmap):
+    def getvalue(self) -> bytes:
+        return self[:]
+
+
+class BodyBuffer:
+    """Buffer for response bodies being downloaded.
+
+    Data is kept in memory until it exceeds *spoolsize* bytes, and is then
+    moved to a temporary file. A *spoolsize* of 0 keeps all data in memory.
+
+    If a *decoder* (see :mod:`scrapy.utils._compression`) is given, data is
+    decompressed as it is written, and only decompressed data is kept.
+    """
+
+    def __init__(self, spoolsize: int = 0, decoder: Optional[_Decoder] = None):
+        self._spoolsize = spoolsize
+        self._buffer: BinaryIO = BytesIO()
+        self._spooled = False
+        self.decoder = decoder
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        if self.decoder is not None:
+            data = self.decoder.decompress(data)
+        self._buffer.write(data)
+        self.size += len(data)
+        if self._spoolsize and not self._spooled and self.size > self._spoolsize:
+            file = tempfile.TemporaryFile()
+            file.write(self._buffer.getbuffer())
+            self._buffer = file
+            self._spooled = True
+
+    def clear(self) -> None:
+        """Discard all data, e.g. after exceeding the maximum download size."""
+        self._buffer.close()
+        self._buffer = BytesIO()
+        self._spooled = False
+        self.size = 0
+
+    def getvalue(self) -> Union[bytes, SpooledBody]:
+        """Return the body as :class:`bytes`, or as a :class:`SpooledBody` if
+        it was moved to a temporary file."""
+        if self.decoder is not None:
+            tail = self.decoder.flush()
+            if tail:
+                self._buffer.write(tail)
+                self.size += len(tail)
+        if self._spooled:
+            self._buffer.flush()
+            return SpooledBody(self._buffer)
+        return self._buffer.getvalue()
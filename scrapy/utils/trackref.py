@@ -5,8 +5,8 @@ If you want live objects for a particular class to be tracked, you only have to
 subclass from object_ref (instead of object).
 
 About performance: This library has a minimal performance impact when enabled,
-and no performance penalty at all when disabled (as object_ref becomes just an
-alias to object in that case).
+and tracking can be disabled at runtime with set_tracking(), or the
+TRACKREF_ENABLED setting, in which case new objects are not tracked at all.
 """
 
 from collections import defaultdict
@@ -17,6 +17,7 @@ from weakref import WeakKeyDictionary
 
 NoneType = type(None)
 live_refs: DefaultDict[type, WeakKeyDictionary] = defaultdict(WeakKeyDictionary)
+_tracking = True
 
 
 class object_ref:
@@ -26,10 +27,17 @@ class object_ref:
 
     def __new__(cls, *args, **kwargs):
         obj = object.__new__(cls)
-        live_refs[cls][obj] = time()
+        if _tracking:
+            live_refs[cls][obj] = time()
         return obj
 
 
+def set_tracking(enabled):
+    """Enable or disable the tracking of new live instances"""
+    global _tracking
+    _tracking = enabled
+
+
 def format_live_refs(ignore=NoneType):
     """Return a tabular representation of tracked objects"""
     s = "Live References\n\n"
@@ -6,21 +6,139 @@ Some of the functions that used to be imported from this module have been moved
 to the w3lib.url module. Always import those from there instead.
 """
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import MutableSet
 from urllib.parse import ParseResult, urldefrag, urlparse, urlunparse
 
 # scrapy.utils.url was moved to w3lib.url and import * ensures this
 # move doesn't break old code
 from w3lib.url import *
 from w3lib.url import _safe_chars, _unquotepath  # noqa: F401
+from w3lib.url import canonicalize_url as _canonicalize_url
 
 from scrapy.utils.python import to_unicode
 
 
+class CanonicalURLCache:
+    """Bounded cache of :func:`w3lib.url.canonicalize_url` results.
+
+    When full, the least recently used URL is evicted first. A *limit* of 0
+    disables caching. It can be used from several threads, e.g. by cache
+    storages that fingerprint requests in a thread pool.
+    """
+
+    def __init__(self, limit=10000):
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def resize(self, limit):
+        """Set the maximum number of cached URLs to *limit*, evicting the
+        least recently used ones if needed."""
+        with self._lock:
+            self.limit = limit
+            while len(self._cache) > limit:
+                self._cache.popitem(last=False)
+
+    def canonicalize_url(self, url, keep_fragments=False, encoding=None):
+        if not self.limit or encoding is not None or not isinstance(url, str):
+            return _canonicalize_url(
+                url, keep_fragments=keep_fragments, encoding=encoding
+            )
+        key = (url, keep_fragments)
+        with self._lock:
+            canonical_url = self._cache.get(key)
+            if canonical_url is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return canonical_url
+            self.misses += 1
+        canonical_url = _canonicalize_url(url, keep_fragments=keep_fragments)
+        with self._lock:
+            self._cache[key] = canonical_url
+            while len(self._cache) > self.limit:
+                self._cache.popitem(last=False)
+        return canonical_url
+
+
+canonical_url_cache = CanonicalURLCache()
+
+
+def canonicalize_url(url, keep_fragments=False, encoding=None):
+    """Return :func:`w3lib.url.canonicalize_url` of *url*, reading it from
+    :data:`canonical_url_cache` when possible.
+
+    The size of the cache is set by the :setting:`CANONICALIZE_URL_CACHE_SIZE`
+    setting.
+    """
+    return canonical_url_cache.canonicalize_url(url, keep_fragments, encoding)
+
+
+class DomainSet(MutableSet):
+    """Set of domains that tells whether a host belongs to any of them.
+
+    Domains are stored lowercased in a hash set, and :meth:`matches` looks up
+    the host and each of its parent domains in it, so matching a host costs
+    one lookup per label of the host, no matter how many domains the set
+    holds. Domains can be added and removed at any time.
+    """
+
+    def __init__(self, domains=()):
+        self._domains = {domain.lower() for domain in domains}
+
+    def __contains__(self, domain):
+        return isinstance(domain, str) and domain.lower() in self._domains
+
+    def __iter__(self):
+        return iter(self._domains)
+
+    def __len__(self):
+        return len(self._domains)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({sorted(self._domains)!r})"
+
+    def add(self, domain):
+        self._domains.add(domain.lower())
+
+    def discard(self, domain):
+        self._domains.discard(domain.lower())
+
+    def matches(self, host):
+        """Return True if *host*, which must be lowercase, is one of the
+        domains of the set or a subdomain of one of them."""
+        domains = self._domains
+        if host in domains:
+            return True
+        dot = host.find(".")
+        while dot != -1:
+            if host[dot + 1 :] in domains:
+                return True
+            dot = host.find(".", dot + 1)
+        return False
+
+
 def url_is_from_any_domain(url, domains):
-    """Return True if the url belongs to any of the given domains"""
+    """Return True if the url belongs to any of the given domains
+
+    *domains* can also be a :class:`DomainSet`, which is faster to match
+    against when there are many domains.
+    """
     host = parse_url(url).netloc.lower()
     if not host:
         return False
+    if isinstance(domains, DomainSet):
+        return domains.matches(host)
     domains = [d.lower() for d in domains]
     return any((host == d) or (host.endswith(f".{d}")) for d in domains)
 
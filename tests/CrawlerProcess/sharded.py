@@ -0,0 +1,32 @@
+import os
+import sys
+
+import scrapy
+from scrapy.crawler import CrawlerProcess
+
+
+class ShardedSpider(scrapy.Spider):
+    name = "sharded"
+
+    def start_requests(self):
+        yield scrapy.Request(f"{self.url}/follow?total=100&show=20&order=rand")
+
+    def parse(self, response):
+        for href in response.css("a::attr(href)").getall():
+            url = response.urljoin(href)
+            # spread requests among download slots, as if they were for
+            # different domains
+            slot = str(sum(url.encode()) % 8)
+            yield scrapy.Request(url, meta={"download_slot": slot})
+        yield {"url": response.url, "pid": os.getpid()}
+
+
+if __name__ == "__main__":
+    process = CrawlerProcess(
+        settings={
+            "CRAWLER_SHARDS": 2,
+            "FEEDS": {sys.argv[2]: {"format": "jsonlines"}},
+        }
+    )
+    process.crawl(ShardedSpider, url=sys.argv[1])
+    process.start()
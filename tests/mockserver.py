@@ -347,6 +347,27 @@ class MockFTPServer:
         return "ftp://127.0.0.1:2121/" + path
 
 
+class MockS3Server:
+    """Runs an S3-compatible server, which stores objects in a temporary
+    root path that you can read from the :attr:`path` attribute, and whose
+    URL is :attr:`endpoint_url`."""
+
+    def __enter__(self):
+        self.path = Path(mkdtemp())
+        self.proc = Popen(
+            [sys.executable, "-u", "-m", "tests.s3server", "-d", str(self.path)],
+            stdout=PIPE,
+            env=get_testenv(),
+        )
+        self.endpoint_url = self.proc.stdout.readline().strip().decode("ascii")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        rmtree(str(self.path))
+        self.proc.kill()
+        self.proc.communicate()
+
+
 def ssl_context_factory(
     keyfile="keys/localhost.key", certfile="keys/localhost.crt", cipher_string=None
 ):
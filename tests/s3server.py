@@ -0,0 +1,213 @@
+"""A minimal S3-compatible server, for feed storage tests.
+
+It supports the PutObject, GetObject, HeadObject, ListObjectsV2 and
+multipart upload operations on path-style URLs, without authentication,
+storing objects as files of the given directory
+(``<directory>/<bucket>/<key>``) and unfinished multipart uploads in memory.
+
+Responses can be delayed by a given latency, in milliseconds, to emulate the
+round trips of a remote object store.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from argparse import ArgumentParser
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+_uploads = {}
+_uploads_lock = threading.Lock()
+
+
+class S3RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # needed by "Expect: 100-continue"
+    directory: Path
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _parse(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        bucket, _, key = url.path.lstrip("/").partition("/")
+        query = {k: v[0] for k, v in parse_qs(url.query, True).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        return self.directory / bucket / key, query, body
+
+    def _respond(self, status=200, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _etag(self, data):
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def _object_headers(self, path, data):
+        return {
+            **self._etag(data),
+            "Last-Modified": formatdate(path.stat().st_mtime, usegmt=True),
+        }
+
+    def _list_objects(self, bucket, query):
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter", "")
+        start = query.get("continuation-token") or query.get("start-after", "")
+        max_keys = int(query.get("max-keys", 1000))
+        keys = sorted(
+            path.relative_to(bucket).as_posix()
+            for path in bucket.rglob("*")
+            if path.is_file()
+        )
+        contents, prefixes = [], set()
+        truncated = False
+        for key in keys:
+            if not key.startswith(prefix) or key <= start:
+                continue
+            rest = key[len(prefix) :]
+            if delimiter and delimiter in rest:
+                prefixes.add(prefix + rest.split(delimiter, 1)[0] + delimiter)
+                continue
+            if len(contents) == max_keys:
+                truncated = True
+                break
+            path = bucket / key
+            data = path.read_bytes()
+            last_modified = time.gmtime(path.stat().st_mtime)
+            contents.append(
+                (
+                    key,
+                    "<Contents>"
+                    f"<Key>{escape(key)}</Key>"
+                    "<LastModified>"
+                    f"{time.strftime('%Y-%m-%dT%H:%M:%S.000Z', last_modified)}"
+                    "</LastModified>"
+                    f"<ETag>&quot;{hashlib.md5(data).hexdigest()}&quot;</ETag>"
+                    f"<Size>{len(data)}</Size>"
+                    "</Contents>",
+                )
+            )
+        body = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<Name>{escape(bucket.name)}</Name>"
+            f"<Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(contents)}</KeyCount>"
+            f"<MaxKeys>{max_keys}</MaxKeys>"
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>"
+        )
+        if truncated:
+            token = escape(contents[-1][0])
+            body += f"<NextContinuationToken>{token}</NextContinuationToken>"
+        body += "".join(content for _, content in contents)
+        body += "".join(
+            f"<CommonPrefixes><Prefix>{escape(p)}</Prefix></CommonPrefixes>"
+            for p in sorted(prefixes)
+        )
+        body += "</ListBucketResult>"
+        return body.encode()
+
+    def do_GET(self):
+        path, query, _ = self._parse()
+        if query.get("list-type") == "2":
+            self._respond(body=self._list_objects(path, query))
+            return
+        if not path.is_file():
+            self._respond(404)
+            return
+        data = path.read_bytes()
+        self._respond(body=data, headers=self._object_headers(path, data))
+
+    def do_HEAD(self):
+        path, _, _ = self._parse()
+        if not path.is_file():
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = path.read_bytes()
+        self.send_response(200)
+        for name, value in self._object_headers(path, data).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+
+    def do_PUT(self):
+        path, query, body = self._parse()
+        if "uploadId" in query:
+            with _uploads_lock:
+                upload = _uploads.get(query["uploadId"])
+                if upload is None:
+                    self._respond(404)
+                    return
+                upload[int(query["partNumber"])] = body
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(body)
+        self._respond(headers=self._etag(body))
+
+    def do_POST(self):
+        path, query, body = self._parse()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with _uploads_lock:
+                _uploads[upload_id] = {}
+            self._respond(
+                body=(
+                    "<InitiateMultipartUploadResult>"
+                    f"<UploadId>{upload_id}</UploadId>"
+                    "</InitiateMultipartUploadResult>"
+                ).encode()
+            )
+            return
+        with _uploads_lock:
+            upload = _uploads.pop(query.get("uploadId"), None)
+        if upload is None:
+            self._respond(404)
+            return
+        root = ElementTree.fromstring(body)
+        numbers = [
+            int(element.text)
+            for element in root.iter()
+            if element.tag.endswith("PartNumber")
+        ]
+        data = b"".join(upload[number] for number in numbers)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self._respond(
+            body=b"<CompleteMultipartUploadResult></CompleteMultipartUploadResult>",
+            headers=self._etag(data),
+        )
+
+    def do_DELETE(self):
+        _, query, _ = self._parse()
+        with _uploads_lock:
+            _uploads.pop(query.get("uploadId"), None)
+        self._respond(204)
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("-d", "--directory")
+    parser.add_argument("-l", "--latency", type=float, default=0)
+    args = parser.parse_args()
+
+    S3RequestHandler.directory = Path(args.directory)
+    S3RequestHandler.latency = args.latency / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), S3RequestHandler)
+    host, port = server.server_address
+    print(f"http://{host}:{port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Some spiders used for testing and benchmarking
 """
 import asyncio
+import os
 import time
 from urllib.parse import urlencode
 
@@ -490,3 +491,23 @@ class HeadersReceivedErrbackSpider(HeadersReceivedCallbackSpider):
     def headers_received(self, headers, body_length, request, spider):
         self.meta["headers_received"] = headers
         raise StopDownload(fail=True)
+
+
+class CallbackPoolSpider(MetaSpider):
+    name = "callback_pool"
+    custom_settings = {
+        "CALLBACK_POOL_SIZE": 2,
+        "CALLBACK_POOL_CALLBACKS": ["parse"],
+    }
+
+    def __init__(self, total=10, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.total = total
+        qargs = {"total": total, "show": 20}
+        url = self.mockserver.url(f"/follow?{urlencode(qargs)}")
+        self.start_urls = [url]
+
+    def parse(self, response):
+        for link in LinkExtractor().extract_links(response):
+            yield Request(link.url, callback=self.parse)
+        yield {"url": response.url, "pid": os.getpid(), "total": self.total}
@@ -0,0 +1,132 @@
+import os
+
+from twisted.internet import defer
+from twisted.trial.unittest import TestCase
+
+from scrapy import Request, Spider, signals
+from scrapy.core.callbackpool import (
+    _SHARED_MEMORY_MIN_SIZE,
+    CallbackPool,
+    _release_shared_memory,
+    _response_from_dict,
+    _response_to_dict,
+    shared_memory,
+)
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import CallbackPoolSpider, ErrorSpider
+
+
+class TestSpider(Spider):
+    name = "test"
+
+    def parse(self, response):
+        pass
+
+    async def parse_async(self, response):
+        pass
+
+
+class CallbackPoolTest(TestCase):
+    def test_from_settings(self):
+        crawler = get_crawler(TestSpider)
+        self.assertIsNone(CallbackPool.from_settings(crawler.settings))
+        crawler = get_crawler(TestSpider, {"CALLBACK_POOL_SIZE": 2})
+        self.assertIsNone(CallbackPool.from_settings(crawler.settings))
+        crawler = get_crawler(
+            TestSpider,
+            {"CALLBACK_POOL_SIZE": 2, "CALLBACK_POOL_CALLBACKS": ["parse"]},
+        )
+        pool = CallbackPool.from_settings(crawler.settings)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(pool.callbacks, {"parse"})
+
+    def test_open_spider_invalid_callbacks(self):
+        spider = TestSpider()
+        CallbackPool(1, ["parse"]).open_spider(spider)
+        with self.assertRaises(ValueError):
+            CallbackPool(1, ["missing"]).open_spider(spider)
+        with self.assertRaises(ValueError):
+            CallbackPool(1, ["parse_async"]).open_spider(spider)
+
+    def test_handles(self):
+        spider = TestSpider()
+        pool = CallbackPool(1, ["parse"])
+        self.assertTrue(pool.handles(spider.parse))
+        self.assertTrue(pool.handles(spider._parse))
+        self.assertFalse(pool.handles(spider.parse_async))
+        self.assertFalse(pool.handles(lambda response: None))
+
+    def _test_response_roundtrip(self, size):
+        spider = TestSpider()
+        request = Request(
+            "https://example.com",
+            callback=spider.parse,
+            meta={"a": 1},
+            cb_kwargs={"b": 2},
+        )
+        response = HtmlResponse(
+            "https://example.com",
+            body=b"x" * size,
+            headers={"X-Foo": "bar"},
+            request=request,
+        )
+        data = _response_to_dict(response, spider)
+        shm = data.pop("_shm", None)
+        try:
+            response2 = _response_from_dict(data, spider)
+        finally:
+            if shm is not None:
+                _release_shared_memory(None, shm)
+        self.assertIs(type(response2), HtmlResponse)
+        self.assertEqual(response2.url, response.url)
+        self.assertEqual(response2.body, response.body)
+        self.assertEqual(response2.headers, response.headers)
+        self.assertEqual(response2.meta, {"a": 1})
+        self.assertEqual(response2.cb_kwargs, {"b": 2})
+        self.assertEqual(response2.request.callback, spider.parse)
+        return shm
+
+    def test_response_roundtrip(self):
+        self.assertIsNone(self._test_response_roundtrip(10))
+
+    def test_response_roundtrip_shared_memory(self):
+        if shared_memory is None:
+            raise self.skipTest("multiprocessing.shared_memory is not available")
+        shm = self._test_response_roundtrip(_SHARED_MEMORY_MIN_SIZE)
+        self.assertIsNotNone(shm)
+
+
+class CallbackPoolCrawlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mockserver = MockServer()
+        cls.mockserver.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mockserver.__exit__(None, None, None)
+
+    @defer.inlineCallbacks
+    def test_crawl(self):
+        items = []
+
+        def item_scraped(item):
+            items.append(item)
+
+        crawler = get_crawler(CallbackPoolSpider)
+        crawler.signals.connect(item_scraped, signal=signals.item_scraped)
+        yield crawler.crawl(total=10, mockserver=self.mockserver)
+        self.assertEqual(len(items), 11)
+        self.assertEqual(crawler.stats.get_value("response_received_count"), 11)
+        pids = {item["pid"] for item in items}
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual({item["total"] for item in items}, {10})
+
+    @defer.inlineCallbacks
+    def test_crawl_error(self):
+        settings = {"CALLBACK_POOL_SIZE": 1, "CALLBACK_POOL_CALLBACKS": ["parse"]}
+        crawler = get_crawler(ErrorSpider, settings)
+        yield crawler.crawl(total=10, mockserver=self.mockserver)
+        self.assertEqual(crawler.stats.get_value("spider_exceptions/DefaultError"), 1)
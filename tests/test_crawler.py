@@ -1,7 +1,9 @@
+import json
 import logging
 import platform
 import subprocess
 import sys
+import tempfile
 import warnings
 from pathlib import Path
 
@@ -20,6 +22,7 @@ from scrapy.extensions import telnet
 from scrapy.extensions.throttle import AutoThrottle
 from scrapy.settings import Settings, default_settings
 from scrapy.spiderloader import SpiderLoader
+from scrapy.utils import trackref
 from scrapy.utils.log import configure_logging, get_scrapy_root_handler
 from scrapy.utils.misc import load_object
 from scrapy.utils.spider import DefaultSpider
@@ -204,6 +207,18 @@ class CrawlerProcessTest(BaseCrawlerTest):
         runner = CrawlerProcess()
         self.assertOptionIsDefault(runner.settings, "RETRY_ENABLED")
 
+    def test_trackref_enabled(self):
+        try:
+            CrawlerProcess({"TRACKREF_ENABLED": False})
+            self.assertFalse(trackref._tracking)
+            # crawlers do not change it
+            get_crawler(DefaultSpider, {"TRACKREF_ENABLED": True})
+            self.assertFalse(trackref._tracking)
+            CrawlerProcess()
+            self.assertTrue(trackref._tracking)
+        finally:
+            trackref.set_tracking(True)
+
 
 class ExceptionSpider(scrapy.Spider):
     name = "exception"
@@ -415,6 +430,20 @@ class CrawlerProcessSubprocess(ScriptRunnerMixin, unittest.TestCase):
             self.assertNotIn("TimeoutError", log)
             self.assertNotIn("twisted.internet.error.DNSLookupError", log)
 
+    def test_sharded(self):
+        with MockServer() as mock_server, tempfile.TemporaryDirectory() as tmpdir:
+            http_address = mock_server.http_address.replace("0.0.0.0", "127.0.0.1")
+            feed_path = Path(tmpdir, "items.jsonl")
+            log = self.run_script("sharded.py", http_address, str(feed_path))
+            self.assertIn("Crawl split among 2 shards", log)
+            self.assertIn("Spider closed (finished)", log)
+            self.assertIn("'item_scraped_count': 101", log)
+            self.assertIn("'sharding/forwarded_requests'", log)
+            items = [json.loads(line) for line in feed_path.read_text().splitlines()]
+        self.assertEqual(len(items), 101)
+        self.assertEqual(len({item["url"] for item in items}), 101)
+        self.assertEqual(len({item["pid"] for item in items}), 2)
+
     def test_twisted_reactor_select(self):
         log = self.run_script("twisted_reactor_select.py")
         self.assertIn("Spider closed (finished)", log)
@@ -1,4 +1,5 @@
 import contextlib
+import gzip
 import os
 import shutil
 import sys
@@ -10,6 +11,7 @@ from unittest import SkipTest, mock
 from testfixtures import LogCapture
 from twisted.cred import checkers, credentials, portal
 from twisted.internet import defer, error, reactor
+from twisted.internet.task import deferLater
 from twisted.protocols.policies import WrappingFactory
 from twisted.trial import unittest
 from twisted.web import resource, server, static, util
@@ -209,6 +211,14 @@ class LargeChunkedFileResource(resource.Resource):
         return server.NOT_DONE_YET
 
 
+class GzipResource(resource.Resource):
+    def render(self, request):
+        request.setHeader(b"Content-Encoding", b"gzip")
+        if request.args.get(b"broken"):
+            return b"not gzipped"
+        return gzip.compress(b"x" * 1000)
+
+
 class DuplicateHeaderResource(resource.Resource):
     def render(self, request):
         request.responseHeaders.setRawHeaders(b"Set-Cookie", [b"a=b", b"c=d"])
@@ -241,6 +251,7 @@ class HttpTestCase(unittest.TestCase):
         r.putChild(b"nocontenttype", EmptyContentTypeHeaderResource())
         r.putChild(b"largechunkedfile", LargeChunkedFileResource())
         r.putChild(b"duplicate-header", DuplicateHeaderResource())
+        r.putChild(b"gzip", GzipResource())
         r.putChild(b"echo", Echo())
         self.site = server.Site(r, timeout=None)
         self.wrapper = WrappingFactory(self.site)
@@ -521,6 +532,61 @@ class Http11TestCase(HttpTestCase):
         d.addCallback(self.assertEqual, b"0123456789")
         return d
 
+    @defer.inlineCallbacks
+    def test_download_with_spoolsize(self):
+        request = Request(self.getURL("largechunkedfile"))
+        spider = Spider("foo", download_spoolsize=1024)
+        response = yield self.download_request(request, spider)
+        self.assertIsNotNone(response._spooled_body)
+        chunks = list(response.iter_body(1024 * 512))
+        self.assertEqual(chunks, [b"x" * 1024 * 512] * 2)
+        self.assertEqual(response.body, b"x" * 1024 * 1024)
+
+    @defer.inlineCallbacks
+    def test_download_with_spoolsize_per_req(self):
+        request = Request(self.getURL("file"), meta={"download_spoolsize": 9})
+        response = yield self.download_request(request, Spider("foo"))
+        self.assertIsNotNone(response._spooled_body)
+        self.assertEqual(response.body, b"0123456789")
+
+        request = Request(self.getURL("file"), meta={"download_spoolsize": 10})
+        response = yield self.download_request(request, Spider("foo"))
+        self.assertIsNone(response._spooled_body)
+        self.assertEqual(response.body, b"0123456789")
+
+    @defer.inlineCallbacks
+    def test_download_gzip_not_decompressed(self):
+        request = Request(self.getURL("gzip"))
+        response = yield self.download_request(request, Spider("foo"))
+        self.assertEqual(response.headers[b"Content-Encoding"], b"gzip")
+        self.assertEqual(gzip.decompress(response.body), b"x" * 1000)
+        self.assertIsNone(request._decompressed_size)
+
+    @defer.inlineCallbacks
+    def test_download_gzip_decompressed(self):
+        request = Request(self.getURL("gzip"))
+        request._decompress = True
+        response = yield self.download_request(request, Spider("foo"))
+        self.assertNotIn(b"Content-Encoding", response.headers)
+        self.assertEqual(response.body, b"x" * 1000)
+        self.assertEqual(request._decompressed_size, 1000)
+
+    @defer.inlineCallbacks
+    def test_download_gzip_decompressed_maxsize(self):
+        # the compressed body is smaller than download_maxsize, but not the
+        # decompressed one
+        request = Request(self.getURL("gzip"))
+        request._decompress = True
+        d = self.download_request(request, Spider("foo", download_maxsize=500))
+        yield self.assertFailure(d, defer.CancelledError, error.ConnectionAborted)
+
+    @defer.inlineCallbacks
+    def test_download_gzip_decompressed_broken(self):
+        request = Request(self.getURL("gzip?broken=1"))
+        request._decompress = True
+        d = self.download_request(request, Spider("foo"))
+        yield self.assertFailure(d, OSError)
+
     def test_download_chunked_content(self):
         request = Request(self.getURL("chunked"))
         d = self.download_request(request, Spider("foo"))
@@ -576,6 +642,65 @@ class Http11TestCase(HttpTestCase):
         d.addCallback(self.assertEqual, "HTTP/1.1")
         return d
 
+    @defer.inlineCallbacks
+    def _download_with_settings(
+        self, settings_dict, concurrency=1, requests=2, idle_wait=None
+    ):
+        crawler = get_crawler(settings_dict=settings_dict)
+        crawler.stats.open_spider(None)
+        download_handler = create_instance(self.download_handler_cls, None, crawler)
+        try:
+            for _ in range(requests // concurrency):
+                responses = yield defer.gatherResults(
+                    [
+                        download_handler.download_request(
+                            Request(self.getURL("file")), Spider("foo")
+                        )
+                        for _ in range(concurrency)
+                    ]
+                )
+                for response in responses:
+                    self.assertEqual(response.body, b"0123456789")
+            if idle_wait is not None:
+                yield deferLater(reactor, idle_wait, lambda: None)
+            idle = sum(map(len, download_handler._pool._connections.values()))
+        finally:
+            yield download_handler.close()
+        return crawler.stats, idle
+
+    @defer.inlineCallbacks
+    def test_pool_stats(self):
+        stats, idle = yield self._download_with_settings({})
+        self.assertEqual(idle, 1)
+        self.assertEqual(stats.get_value("downloader/pool/connections_new"), 1)
+        self.assertEqual(stats.get_value("downloader/pool/connections_reused"), 1)
+        self.assertGreater(stats.get_value("downloader/pool/connect_time"), 0)
+
+    @defer.inlineCallbacks
+    def test_pool_download_slots_concurrency(self):
+        stats, idle = yield self._download_with_settings(
+            {"DOWNLOAD_SLOTS": {self.host: {"concurrency": 1}}}, concurrency=2
+        )
+        self.assertEqual(idle, 1)
+        self.assertEqual(stats.get_value("downloader/pool/connections_new"), 2)
+        self.assertEqual(stats.get_value("downloader/pool/connections_discarded"), 1)
+
+    @defer.inlineCallbacks
+    def test_pool_max_persistent(self):
+        stats, idle = yield self._download_with_settings(
+            {"DOWNLOAD_POOL_MAX_PERSISTENT": 1}, concurrency=2
+        )
+        self.assertEqual(idle, 1)
+        self.assertEqual(stats.get_value("downloader/pool/connections_discarded"), 1)
+
+    @defer.inlineCallbacks
+    def test_pool_idle_timeout(self):
+        stats, idle = yield self._download_with_settings(
+            {"DOWNLOAD_POOL_IDLE_TIMEOUT": 0.01}, requests=1, idle_wait=0.1
+        )
+        self.assertEqual(idle, 0)
+        self.assertEqual(stats.get_value("downloader/pool/connections_expired"), 1)
+
 
 class Https11TestCase(Http11TestCase):
     scheme = "https"
@@ -604,6 +729,37 @@ class Https11TestCase(Http11TestCase):
         finally:
             yield download_handler.close()
 
+    @defer.inlineCallbacks
+    def _download_with_new_connections(self, settings_dict):
+        crawler = get_crawler(settings_dict=settings_dict)
+        crawler.stats.open_spider(None)
+        download_handler = create_instance(self.download_handler_cls, None, crawler)
+        try:
+            for _ in range(2):
+                response = yield download_handler.download_request(
+                    Request(self.getURL("file")), Spider("foo")
+                )
+                self.assertEqual(response.body, b"0123456789")
+                yield download_handler._pool.closeCachedConnections()
+        finally:
+            yield download_handler.close()
+        self.assertGreater(crawler.stats.get_value("downloader/tls/handshake_time"), 0)
+        return crawler.stats
+
+    @defer.inlineCallbacks
+    def test_tls_session_reuse(self):
+        stats = yield self._download_with_new_connections({})
+        self.assertEqual(stats.get_value("downloader/tls/handshakes/full"), 1)
+        self.assertEqual(stats.get_value("downloader/tls/handshakes/resumed"), 1)
+
+    @defer.inlineCallbacks
+    def test_tls_session_reuse_disabled(self):
+        stats = yield self._download_with_new_connections(
+            {"DOWNLOADER_CLIENT_TLS_SESSION_REUSE": False}
+        )
+        self.assertEqual(stats.get_value("downloader/tls/handshakes/full"), 2)
+        self.assertIsNone(stats.get_value("downloader/tls/handshakes/resumed"))
+
 
 class Https11WrongHostnameTestCase(Http11TestCase):
     scheme = "https"
@@ -1,17 +1,30 @@
 import email.utils
+import os
 import shutil
 import tempfile
 import time
 import unittest
 from contextlib import contextmanager
+from pathlib import Path
+
+from testfixtures import LogCapture
+from twisted.internet import defer
+from twisted.trial.unittest import TestCase as TrialTestCase
 
 from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
 from scrapy.exceptions import IgnoreRequest
-from scrapy.http import HtmlResponse, Request, Response
+from scrapy.extensions.httpcache import _BodyCodec
+from scrapy.http import Headers, HtmlResponse, Request, Response
 from scrapy.settings import Settings
 from scrapy.spiders import Spider
+from scrapy.utils.defer import deferred_from_coro
 from scrapy.utils.test import get_crawler
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 class _BaseTest(unittest.TestCase):
     storage_class = "scrapy.extensions.httpcache.DbmCacheStorage"
@@ -171,6 +184,435 @@ class FilesystemStorageGzipTest(FilesystemStorageTest):
         return super()._get_settings(**new_settings)
 
 
+class _CompressionMixin:
+    codec = "gzip"
+
+    def setUp(self):
+        super().setUp()
+        self.response = self.response.replace(body=b"test body " * 100)
+
+    def _get_settings(self, **new_settings):
+        new_settings.setdefault("HTTPCACHE_COMPRESSION", self.codec)
+        return super()._get_settings(**new_settings)
+
+
+class DbmStorageCompressionTest(_CompressionMixin, DbmStorageTest):
+    pass
+
+
+class FilesystemStorageCompressionTest(_CompressionMixin, FilesystemStorageTest):
+    codec = "lzma"
+
+    def test_compressed_on_disk(self):
+        with self._storage() as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            rpath = Path(storage._get_request_path(self.spider, self.request))
+            self.assertLess(
+                (rpath / "response_body").stat().st_size, len(self.response.body)
+            )
+            self.assertEqual(
+                storage._read_meta(self.spider, self.request)["body_codec"], "lzma"
+            )
+
+    def test_undecodable_body(self):
+        with self._storage() as storage:
+            storage.store_response(self.spider, self.request, self.response)
+            rpath = Path(storage._get_request_path(self.spider, self.request))
+            (rpath / "response_body").write_bytes(b"corrupted")
+            with LogCapture() as log:
+                self.assertIsNone(storage.retrieve_response(self.spider, self.request))
+            self.assertIn("could not be decompressed", str(log))
+
+
+class SegmentStorageTest(DefaultStorageTest):
+    storage_class = "scrapy.extensions.httpcache.SegmentCacheStorage"
+
+    def _requests(self, count):
+        return [Request(f"http://www.example.com/{i}") for i in range(count)]
+
+    def _responses(self, count, body=b"body"):
+        return [
+            Response(
+                f"http://www.example.com/{i}",
+                headers={"Content-Type": "text/html"},
+                body=body * i,
+            )
+            for i in range(count)
+        ]
+
+    def _segment_dir(self):
+        return Path(self.tmpdir, self.spider.name)
+
+    def test_segments(self):
+        requests, responses = self._requests(100), self._responses(100)
+        with self._storage(
+            HTTPCACHE_EXPIRATION_SECS=0, HTTPCACHE_SEGMENT_SIZE=1024
+        ) as storage:
+            for request, response in zip(requests, responses):
+                storage.store_response(self.spider, request, response)
+            for request, response in zip(requests, responses):
+                cached = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(response, cached)
+        self.assertGreater(len(list(self._segment_dir().glob("*.seg"))), 1)
+
+    def test_index_resize(self):
+        requests, responses = self._requests(1000), self._responses(1000, b"")
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            storage._INDEX_CAPACITY = 16
+            storage._close_index()
+            os.remove(self._segment_dir() / "index")
+            storage._open_index()
+            for request, response in zip(requests, responses):
+                storage.store_response(self.spider, request, response)
+            self.assertGreater(storage._index.capacity, 1000)
+            for request, response in zip(requests, responses):
+                cached = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(response, cached)
+
+    def test_rebuild_index(self):
+        requests, responses = self._requests(10), self._responses(10)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            for request, response in zip(requests, responses):
+                storage.store_response(self.spider, request, response)
+            storage.store_response(self.spider, requests[0], responses[1])
+        index = self._segment_dir() / "index"
+        index.write_bytes(b"corrupted")
+        # A partially written record
+        with Path(self._segment_dir(), "00000000.seg").open("ab") as f:
+            f.write(b"SCRAPYHR\x00\x01")
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            cached = storage.retrieve_response(self.spider, requests[0])
+            self.assertEqualResponse(responses[1], cached)
+            for request, response in zip(requests[1:], responses[1:]):
+                cached = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(response, cached)
+            storage.store_response(self.spider, requests[0], responses[2])
+            cached = storage.retrieve_response(self.spider, requests[0])
+            self.assertEqualResponse(responses[2], cached)
+
+    def test_compact(self):
+        requests, responses = self._requests(10), self._responses(10)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            for _ in range(3):
+                for request, response in zip(requests, responses):
+                    storage.store_response(self.spider, request, response)
+            segments = list(self._segment_dir().glob("*.seg"))
+            size = sum(path.stat().st_size for path in segments)
+        # Opening the spider compacts the cache, because 2/3 of it is dead
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as storage:
+            for segment in segments:
+                self.assertFalse(segment.exists())
+            segments = list(self._segment_dir().glob("*.seg"))
+            self.assertEqual(sum(path.stat().st_size for path in segments), size // 3)
+            self.assertEqual(storage._index.dead, 0)
+            for request, response in zip(requests, responses):
+                cached = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(response, cached)
+
+    def test_compact_expired(self):
+        requests, responses = self._requests(10), self._responses(10)
+        with self._storage() as storage:
+            for request, response in zip(requests[:5], responses[:5]):
+                storage.store_response(self.spider, request, response)
+            time.sleep(1.5)
+            for request, response in zip(requests[5:], responses[5:]):
+                storage.store_response(self.spider, request, response)
+            storage.compact()
+            self.assertEqual(len(list(storage._index)), 5)
+            for request in requests[:5]:
+                self.assertIsNone(storage.retrieve_response(self.spider, request))
+            for request, response in zip(requests[5:], responses[5:]):
+                cached = storage.retrieve_response(self.spider, request)
+                self.assertEqualResponse(response, cached)
+
+    def test_concurrent_reader(self):
+        if os.name == "nt":
+            raise unittest.SkipTest("Locking is not supported on Windows")
+        requests, responses = self._requests(10), self._responses(10)
+        with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as writer:
+            with self._storage(HTTPCACHE_EXPIRATION_SECS=0) as reader:
+                self.assertIsNone(reader.retrieve_response(self.spider, requests[0]))
+                for request, response in zip(requests, responses):
+                    writer.store_response(self.spider, request, response)
+                # Responses are not stored by readers
+                reader.store_response(self.spider, requests[0], responses[1])
+                for request, response in zip(requests, responses):
+                    cached = reader.retrieve_response(self.spider, request)
+                    self.assertEqualResponse(response, cached)
+                writer.store_response(self.spider, requests[0], responses[2])
+                writer.compact()
+                for request, response in zip(requests[1:], responses[1:]):
+                    cached = reader.retrieve_response(self.spider, request)
+                    self.assertEqualResponse(response, cached)
+                cached = reader.retrieve_response(self.spider, requests[0])
+                self.assertEqualResponse(responses[2], cached)
+
+
+class SegmentStorageCompressionTest(_CompressionMixin, SegmentStorageTest):
+    codec = "zstd"
+
+    def setUp(self):
+        if zstandard is None:
+            raise unittest.SkipTest("zstandard is not installed")
+        super().setUp()
+
+
+class BodyCodecTest(unittest.TestCase):
+    body = b"<html><body>" + b"<p>Some text</p>" * 100 + b"</body></html>"
+    headers = Headers({"Content-Type": "text/html"})
+
+    def _codec(self, **settings):
+        return _BodyCodec(Settings(settings))
+
+    def test_disabled(self):
+        codec = self._codec()
+        self.assertEqual(codec.compress(self.body, self.headers), (None, self.body))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self._codec(HTTPCACHE_COMPRESSION="bzip2")
+
+    def test_roundtrip(self):
+        codecs = ["gzip", "lzma"]
+        if zstandard is not None:
+            codecs.append("zstd")
+        for name in codecs:
+            codec = self._codec(HTTPCACHE_COMPRESSION=name)
+            used, data = codec.compress(self.body, self.headers)
+            self.assertEqual(used, name)
+            self.assertLess(len(data), len(self.body))
+            self.assertEqual(codec.decompress(used, data), self.body)
+
+    def test_auto(self):
+        codec = self._codec(HTTPCACHE_COMPRESSION="auto")
+        self.assertEqual(codec.codec, "zstd" if zstandard is not None else "gzip")
+
+    def test_skip(self):
+        codec = self._codec(HTTPCACHE_COMPRESSION="gzip")
+        for headers in (
+            {"Content-Type": "image/png"},
+            {"Content-Type": "application/zip"},
+            {"Content-Type": "text/html", "Content-Encoding": "gzip"},
+        ):
+            self.assertEqual(
+                codec.compress(self.body, Headers(headers)), (None, self.body)
+            )
+        # Small and incompressible bodies
+        self.assertEqual(codec.compress(b"small", self.headers), (None, b"small"))
+        body = os.urandom(1000)
+        self.assertEqual(codec.compress(body, self.headers), (None, body))
+
+    def test_zstd_dictionary(self):
+        if zstandard is None:
+            raise unittest.SkipTest("zstandard is not installed")
+        bodies = [
+            b"<html><head><title>Page %d</title></head><body>%s</body></html>"
+            % (i, os.urandom(8).hex().encode() * 10)
+            for i in range(2000)
+        ]
+        with tempfile.TemporaryDirectory() as path:
+            codec = self._codec(
+                HTTPCACHE_COMPRESSION="zstd", HTTPCACHE_ZSTD_DICT_SIZE=1024
+            )
+            codec.open(Path(path))
+            stored = [codec.compress(body, self.headers) for body in bodies]
+            dicts = list(Path(path).glob("*.zstdict"))
+            self.assertEqual(len(dicts), 1)
+            self.assertEqual(list(Path(path).glob("*.tmp")), [])
+            dict_id = int(dicts[0].stem)
+            self.assertEqual(zstandard.get_frame_parameters(stored[0][1]).dict_id, 0)
+            self.assertEqual(
+                zstandard.get_frame_parameters(stored[-1][1]).dict_id, dict_id
+            )
+
+            # A new codec, e.g. in a new crawl, uses the saved dictionary
+            codec = self._codec(
+                HTTPCACHE_COMPRESSION="zstd", HTTPCACHE_ZSTD_DICT_SIZE=1024
+            )
+            codec.open(Path(path))
+            for (used, data), body in zip(stored, bodies):
+                self.assertEqual(codec.decompress(used, data), body)
+            used, data = codec.compress(bodies[0], self.headers)
+            self.assertEqual(zstandard.get_frame_parameters(data).dict_id, dict_id)
+
+            # Without the dictionary, bodies compressed with it are not cached
+            dicts[0].unlink()
+            codec = self._codec(HTTPCACHE_COMPRESSION="zstd")
+            codec.open(Path(path))
+            with LogCapture() as log:
+                self.assertIsNone(codec.decompress(*stored[-1]))
+            self.assertIn(f"the zstd dictionary {dict_id} is missing", str(log))
+            self.assertEqual(codec.decompress(*stored[0]), bodies[0])
+
+    def test_undecodable(self):
+        for name in ("gzip", "lzma", "zstd"):
+            if name == "zstd" and zstandard is None:
+                continue
+            codec = self._codec(HTTPCACHE_COMPRESSION=name)
+            with LogCapture() as log:
+                self.assertIsNone(codec.decompress(name, b"corrupted"))
+            self.assertIn("could not be decompressed", str(log))
+
+
+class AsyncCacheStorage:
+    def __init__(self, settings):
+        self.responses = {}
+
+    async def open_spider(self, spider):
+        self.opened = True
+
+    async def close_spider(self, spider):
+        self.opened = False
+
+    async def retrieve_response(self, spider, request):
+        return self.responses.get(request.url)
+
+    def store_response(self, spider, request, response):
+        self.responses[request.url] = response.replace(flags=[])
+        return defer.succeed(None)
+
+
+class AsyncStorageTest(_BaseTest, TrialTestCase):
+    storage_class = AsyncCacheStorage
+    policy_class = "scrapy.extensions.httpcache.DummyPolicy"
+
+    @defer.inlineCallbacks
+    def test_middleware(self):
+        mw = HttpCacheMiddleware(self._get_settings(), self.crawler.stats)
+        yield deferred_from_coro(mw.spider_opened(self.spider))
+        self.assertTrue(mw.storage.opened)
+        response = yield mw.process_request(self.request, self.spider)
+        self.assertIsNone(response)
+        response = yield mw.process_response(self.request, self.response, self.spider)
+        self.assertIs(response, self.response)
+        cached = yield mw.process_request(self.request, self.spider)
+        self.assertEqualResponse(self.response, cached)
+        self.assertIn("cached", cached.flags)
+        yield deferred_from_coro(mw.spider_closed(self.spider))
+        self.assertFalse(mw.storage.opened)
+
+    @defer.inlineCallbacks
+    def test_dont_cache(self):
+        mw = HttpCacheMiddleware(self._get_settings(), self.crawler.stats)
+        yield deferred_from_coro(mw.spider_opened(self.spider))
+        self.request.meta["dont_cache"] = True
+        response = yield mw.process_response(self.request, self.response, self.spider)
+        self.assertIs(response, self.response)
+        cached = yield deferred_from_coro(
+            mw.storage.retrieve_response(self.spider, self.request)
+        )
+        self.assertIsNone(cached)
+        yield deferred_from_coro(mw.spider_closed(self.spider))
+
+
+class ThreadPoolTest(_BaseTest, TrialTestCase):
+    storage_class = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+    policy_class = "scrapy.extensions.httpcache.DummyPolicy"
+
+    @defer.inlineCallbacks
+    def _opened_middleware(self, **new_settings):
+        new_settings.setdefault("HTTPCACHE_THREADS", 2)
+        new_settings.setdefault("HTTPCACHE_EXPIRATION_SECS", 0)
+        mw = HttpCacheMiddleware(self._get_settings(**new_settings), self.crawler.stats)
+        yield mw.spider_opened(self.spider)
+        self.addCleanup(self._stop_threadpool, mw)
+        return mw
+
+    def _stop_threadpool(self, mw):
+        if mw._threadpool is not None:
+            mw._threadpool.stop()
+
+    def _requests(self, count):
+        return [
+            (
+                Request(f"http://www.example.com/{i}"),
+                Response(f"http://www.example.com/{i}", body=str(i).encode()),
+            )
+            for i in range(count)
+        ]
+
+    @defer.inlineCallbacks
+    def test_middleware(self):
+        pairs = self._requests(20)
+        mw = yield self._opened_middleware()
+        for request, response in pairs:
+            cached = yield mw.process_request(request, self.spider)
+            self.assertIsNone(cached)
+        for request, response in pairs:
+            stored = mw.process_response(request, response, self.spider)
+            self.assertIs(stored, response)
+        # Responses that are being stored are retrieved from memory
+        cached = mw.process_request(pairs[-1][0], self.spider)
+        self.assertEqualResponse(pairs[-1][1], cached)
+        self.assertEqual(cached.flags, ["cached"])
+        self.assertEqual(pairs[-1][1].flags, [])
+        yield mw.spider_closed(self.spider)
+        self.assertEqual(mw._unstored, {})
+
+        mw = yield self._opened_middleware()
+        for request, response in pairs:
+            cached = yield mw.process_request(request, self.spider)
+            self.assertEqualResponse(response, cached)
+        yield mw.spider_closed(self.spider)
+        self.assertEqual(self.crawler.stats.get_value("httpcache/store"), 20)
+        self.assertEqual(self.crawler.stats.get_value("httpcache/hit"), 21)
+
+    @defer.inlineCallbacks
+    def test_dont_cache(self):
+        mw = yield self._opened_middleware()
+        self.request.meta["dont_cache"] = True
+        mw.process_response(self.request, self.response, self.spider)
+        yield mw.spider_closed(self.spider)
+        mw = yield self._opened_middleware()
+        del self.request.meta["dont_cache"]
+        cached = yield mw.process_request(self.request, self.spider)
+        self.assertIsNone(cached)
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_ignore_missing(self):
+        mw = yield self._opened_middleware(HTTPCACHE_IGNORE_MISSING=True)
+        with self.assertRaises(IgnoreRequest):
+            yield mw.process_request(self.request, self.spider)
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_write_queue_size(self):
+        mw = yield self._opened_middleware(HTTPCACHE_THREADS=1)
+        mw.WRITE_QUEUE_SIZE = 2
+        results = [
+            mw.process_response(request, response, self.spider)
+            for request, response in self._requests(4)
+        ]
+        # The first response is being stored, the second and third ones are
+        # queued, and the queue is full
+        self.assertIsInstance(results[0], Response)
+        self.assertIsInstance(results[1], Response)
+        self.assertIsInstance(results[2], defer.Deferred)
+        self.assertIsInstance(results[3], defer.Deferred)
+        response = yield results[3]
+        self.assertIsInstance(response, Response)
+        yield mw.spider_closed(self.spider)
+
+    @defer.inlineCallbacks
+    def test_serialized_storage(self):
+        self.storage_class = "scrapy.extensions.httpcache.SegmentCacheStorage"
+        pairs = self._requests(10)
+        mw = yield self._opened_middleware(HTTPCACHE_THREADS=4)
+        self.assertIsNotNone(mw._lock)
+        for request, response in pairs:
+            mw.process_response(request, response, self.spider)
+        yield mw.spider_closed(self.spider)
+        mw = yield self._opened_middleware(HTTPCACHE_THREADS=4)
+        cached = yield defer.DeferredList(
+            [mw.process_request(request, self.spider) for request, _ in pairs]
+        )
+        for (_, response), (success, cached_response) in zip(pairs, cached):
+            self.assertTrue(success)
+            self.assertEqualResponse(response, cached_response)
+        yield mw.spider_closed(self.spider)
+
+
 class DummyPolicyTest(_BaseTest):
     policy_class = "scrapy.extensions.httpcache.DummyPolicy"
 
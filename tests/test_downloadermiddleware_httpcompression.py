@@ -10,10 +10,11 @@ from scrapy.downloadermiddlewares.httpcompression import (
     ACCEPTED_ENCODINGS,
     HttpCompressionMiddleware,
 )
-from scrapy.exceptions import NotConfigured, ScrapyDeprecationWarning
+from scrapy.exceptions import IgnoreRequest, NotConfigured, ScrapyDeprecationWarning
 from scrapy.http import HtmlResponse, Request, Response
 from scrapy.responsetypes import responsetypes
 from scrapy.spiders import Spider
+from scrapy.utils._compression import _DecompressionMaxSizeExceeded, _get_decoder
 from scrapy.utils.gz import gunzip
 from scrapy.utils.test import get_crawler
 from tests import tests_datadir
@@ -102,6 +103,8 @@ class HttpCompressionTest(TestCase):
         self.assertEqual(
             request.headers.get("Accept-Encoding"), b", ".join(ACCEPTED_ENCODINGS)
         )
+        self.assertTrue(request._decompress)
+        self.assertIsNone(request._meta)
 
     def test_process_response_gzip(self):
         response = self._getresponse("gzip")
@@ -373,6 +376,75 @@ class HttpCompressionTest(TestCase):
         self.assertStatsEqual("httpcompression/response_count", None)
         self.assertStatsEqual("httpcompression/response_bytes", None)
 
+    def test_process_response_decompressed_by_download_handler(self):
+        request = Request("http://scrapytest.org")
+        request._decompressed_size = 5
+        response = Response("http://scrapytest.org", body=b"plain", request=request)
+        newresponse = self.mw.process_response(request, response, self.spider)
+        self.assertIs(newresponse, response)
+        self.assertIsNone(request._decompressed_size)
+        self.assertStatsEqual("httpcompression/response_count", 1)
+        self.assertStatsEqual("httpcompression/response_bytes", 5)
+
+    def _test_max_size(self, coding, crawler=None, spider=None, meta=None):
+        crawler = crawler or self.crawler
+        spider = spider or self.spider
+        mw = HttpCompressionMiddleware.from_crawler(crawler)
+        response = self._getresponse(coding)
+        request = response.request
+        request.meta.update(meta or {})
+        with self.assertRaises(IgnoreRequest):
+            mw.process_response(request, response, spider)
+
+    def test_max_size_setting(self):
+        crawler = get_crawler(Spider, {"DOWNLOAD_MAXSIZE": 10000})
+        for coding in ("gzip", "rawdeflate", "zlibdeflate"):
+            self._test_max_size(coding, crawler=crawler)
+
+    def test_max_size_spider_attribute(self):
+        spider = Spider("scrapytest.org", download_maxsize=10000)
+        self._test_max_size("gzip", spider=spider)
+
+    def test_max_size_meta(self):
+        self._test_max_size("gzip", meta={"download_maxsize": 10000})
+
+    def test_max_size_br(self):
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            raise SkipTest("no brotli")
+        self._test_max_size("br", meta={"download_maxsize": 10000})
+
+    def test_max_size_zstd(self):
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise SkipTest("no zstd support (zstandard)")
+        self._test_max_size(
+            "zstd-static-content-size", meta={"download_maxsize": 10000}
+        )
+
+    def test_max_size_zstd_bounded_output(self):
+        try:
+            import zstandard
+        except ImportError:
+            raise SkipTest("no zstd support (zstandard)")
+        max_size = 2**20
+        body = zstandard.ZstdCompressor().compress(b"a" * 2**28)
+        decoder = _get_decoder(b"zstd", max_size=max_size)
+        output = b""
+        with self.assertRaises(_DecompressionMaxSizeExceeded):
+            output += decoder.decompress(body)
+        self.assertEqual(output, b"")
+        self.assertLessEqual(decoder.size, max_size + 2 * 128 * 1024)
+
+    def test_max_size_not_exceeded(self):
+        response = self._getresponse("gzip")
+        request = response.request
+        request.meta["download_maxsize"] = 74837
+        newresponse = self.mw.process_response(request, response, self.spider)
+        self.assertEqual(len(newresponse.body), 74837)
+
 
 class HttpCompressionSubclassTest(TestCase):
     def test_init_missing_stats(self):
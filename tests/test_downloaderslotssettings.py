@@ -1,10 +1,13 @@
 import time
+from unittest import mock
 
 from twisted.internet import defer
 from twisted.trial.unittest import TestCase
 
+from scrapy.core.downloader import Downloader
 from scrapy.crawler import CrawlerRunner
 from scrapy.http import Request
+from scrapy.utils.test import get_crawler
 from tests.mockserver import MockServer
 from tests.spiders import MetaSpider
 
@@ -70,3 +73,27 @@ class CrawlTestCase(TestCase):
         }
 
         self.assertTrue(max(list(error_delta.values())) < tolerance)
+
+
+class DownloaderSlotKeyTestCase(TestCase):
+    def setUp(self):
+        self.downloader = Downloader(get_crawler())
+
+    def tearDown(self):
+        self.downloader.close()
+
+    def test_hostname(self):
+        request = Request("https://example.com/page")
+        self.assertEqual(self.downloader._get_slot_key(request, None), "example.com")
+        self.assertIsNone(request._meta)
+
+    def test_meta(self):
+        request = Request("https://example.com/page", meta={"download_slot": "foo"})
+        self.assertEqual(self.downloader._get_slot_key(request, None), "foo")
+
+    def test_enqueue_request(self):
+        request = Request("https://example.com/page")
+        with mock.patch.object(self.downloader, "_process_queue"):
+            self.downloader._enqueue_request(request, None)
+        self.assertEqual(request._download_slot, "example.com")
+        self.assertIsNone(request._meta)
@@ -8,7 +8,7 @@ from pathlib import Path
 from testfixtures import LogCapture
 
 from scrapy.core.scheduler import Scheduler
-from scrapy.dupefilters import RFPDupeFilter
+from scrapy.dupefilters import CompactRFPDupeFilter, RFPDupeFilter
 from scrapy.http import Request
 from scrapy.utils.python import to_bytes
 from scrapy.utils.test import get_crawler
@@ -276,3 +276,162 @@ class RFPDupeFilterTest(unittest.TestCase):
             )
 
             dupefilter.close("finished")
+
+
+class CompactRFPDupeFilterTest(unittest.TestCase):
+    settings = {"DUPEFILTER_CLASS": "scrapy.dupefilters.CompactRFPDupeFilter"}
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _get_dupefilter(self, **settings):
+        return _get_dupefilter(settings={**self.settings, **settings})
+
+    def test_filter(self):
+        dupefilter = self._get_dupefilter()
+        self.assertIsInstance(dupefilter, CompactRFPDupeFilter)
+        r1 = Request("http://scrapytest.org/1")
+        r2 = Request("http://scrapytest.org/2")
+        r3 = Request("http://scrapytest.org/2")
+
+        assert not dupefilter.request_seen(r1)
+        assert dupefilter.request_seen(r1)
+
+        assert not dupefilter.request_seen(r2)
+        assert dupefilter.request_seen(r3)
+
+        dupefilter.close("finished")
+
+    def test_growth(self):
+        dupefilter = self._get_dupefilter(DUPEFILTER_BLOOM_CAPACITY=10)
+        requests = [Request(f"http://scrapytest.org/{i}") for i in range(3000)]
+        for request in requests:
+            assert not dupefilter.request_seen(request)
+        for request in requests:
+            assert dupefilter.request_seen(request)
+        self.assertGreaterEqual(dupefilter._bloom.capacity, 3000)
+        dupefilter.close("finished")
+
+    def test_false_positives(self):
+        # with a tiny filter almost every lookup is a false positive, which
+        # must not filter any request
+        dupefilter = self._get_dupefilter(DUPEFILTER_BLOOM_ERROR_RATE=0.9)
+        for i in range(500):
+            assert not dupefilter.request_seen(Request(f"http://scrapytest.org/{i}"))
+        dupefilter.close("finished")
+
+    def _resume(self, count, flush_records=None):
+        requests = [Request(f"http://scrapytest.org/{i}") for i in range(count)]
+        df = self._get_dupefilter(JOBDIR=self.path)
+        if flush_records:
+            df._FLUSH_RECORDS = flush_records
+        for request in requests:
+            assert not df.request_seen(request)
+        df.close("finished")
+
+        df = self._get_dupefilter(JOBDIR=self.path)
+        for request in requests:
+            assert df.request_seen(request)
+        assert not df.request_seen(Request("http://scrapytest.org/new"))
+        df.close("finished")
+
+        df = self._get_dupefilter(JOBDIR=self.path)
+        assert df.request_seen(Request("http://scrapytest.org/new"))
+        df.close("finished")
+
+        data = Path(self.path, "requests.seen.bin").read_bytes()
+        self.assertEqual(len(data), 12 + 20 * (count + 1))
+
+    def test_dupefilter_path(self):
+        self._resume(2)
+
+    def test_dupefilter_path_flushes(self):
+        self._resume(1000, flush_records=64)
+
+    def test_dupefilter_path_without_index(self):
+        requests = [Request(f"http://scrapytest.org/{i}") for i in range(100)]
+        df = self._get_dupefilter(JOBDIR=self.path)
+        for request in requests:
+            df.request_seen(request)
+        df.close("finished")
+        Path(self.path, "requests.seen.idx").unlink()
+
+        df = self._get_dupefilter(JOBDIR=self.path)
+        for request in requests:
+            assert df.request_seen(request)
+        df.close("finished")
+
+    def test_dupefilter_path_truncated_index(self):
+        requests = [Request(f"http://scrapytest.org/{i}") for i in range(1000)]
+        idx_path = Path(self.path, "requests.seen.idx")
+        for trimmed in (3, 4096, 100_000):
+            shutil.rmtree(self.path)
+            Path(self.path).mkdir()
+            df = self._get_dupefilter(JOBDIR=self.path)
+            for request in requests:
+                df.request_seen(request)
+            df.close("finished")
+            self.assertEqual(list(Path(self.path).glob("*.tmp")), [])
+            # a crash while saving the index
+            data = idx_path.read_bytes()
+            idx_path.write_bytes(data[:-trimmed])
+
+            with LogCapture() as log:
+                df = self._get_dupefilter(JOBDIR=self.path)
+            self.assertIn("Ignoring the invalid index", str(log))
+            for request in requests:
+                assert df.request_seen(request)
+            df.close("finished")
+
+    def test_dupefilter_path_partial_record(self):
+        requests = [Request(f"http://scrapytest.org/{i}") for i in range(10)]
+        df = self._get_dupefilter(JOBDIR=self.path)
+        for request in requests:
+            df.request_seen(request)
+        df.close("finished")
+        # a crash while appending a record
+        bin_path = Path(self.path, "requests.seen.bin")
+        with bin_path.open("ab") as f:
+            f.write(b"\x00" * 7)
+
+        with LogCapture() as log:
+            df = self._get_dupefilter(JOBDIR=self.path)
+        self.assertIn("Dropping a partial record", str(log))
+        self.assertEqual(bin_path.stat().st_size, 12 + 20 * 10)
+        new = [Request(f"http://scrapytest.org/new/{i}") for i in range(3)]
+        for request in new:
+            assert not df.request_seen(request)
+        df.close("finished")
+
+        df = self._get_dupefilter(JOBDIR=self.path)
+        for request in requests + new:
+            assert df.request_seen(request)
+        df.close("finished")
+
+    def test_dupefilter_path_partial_header(self):
+        Path(self.path, "requests.seen.bin").write_bytes(b"SCRAP")
+        df = self._get_dupefilter(JOBDIR=self.path)
+        request = Request("http://scrapytest.org/1")
+        assert not df.request_seen(request)
+        df.close("finished")
+
+        df = self._get_dupefilter(JOBDIR=self.path)
+        assert df.request_seen(request)
+        df.close("finished")
+
+    def test_fingerprint_size_mismatch(self):
+        class RequestFingerprinter:
+            def fingerprint(self, request):
+                return to_bytes(request.url)
+
+        dupefilter = self._get_dupefilter(
+            REQUEST_FINGERPRINTER_CLASS=RequestFingerprinter
+        )
+        assert not dupefilter.request_seen(Request("http://scrapytest.org/1"))
+        assert dupefilter.request_seen(Request("http://scrapytest.org/1"))
+        with self.assertRaises(ValueError):
+            dupefilter.request_seen(Request("http://scrapytest.org/10"))
+        dupefilter.close("finished")
@@ -14,11 +14,13 @@ from itemadapter import ItemAdapter
 
 from scrapy.exceptions import ScrapyDeprecationWarning
 from scrapy.exporters import (
+    ArrowItemExporter,
     BaseItemExporter,
     CsvItemExporter,
     JsonItemExporter,
     JsonLinesItemExporter,
     MarshalItemExporter,
+    ParquetItemExporter,
     PickleItemExporter,
     PprintItemExporter,
     PythonItemExporter,
@@ -27,6 +29,13 @@ from scrapy.exporters import (
 from scrapy.item import Field, Item
 from scrapy.utils.python import to_unicode
 
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 
 def custom_serializer(value):
     return str(int(value) + 2)
@@ -98,6 +107,16 @@ class BaseItemExporterTest(unittest.TestCase):
     def test_export_dict_item(self):
         self.assertItemExportWorks(ItemAdapter(self.i).asdict())
 
+    def test_export_items(self):
+        self.ie.start_exporting()
+        try:
+            self.ie.export_items([self.i])
+        except NotImplementedError:
+            if self.ie.__class__ is not BaseItemExporter:
+                raise
+        self.ie.finish_exporting()
+        self._check_output()
+
     def test_serialize_field(self):
         a = ItemAdapter(self.i)
         res = self.ie.serialize_field(a.get_field_meta("name"), "name", a["name"])
@@ -120,6 +139,29 @@ class BaseItemExporterTest(unittest.TestCase):
         ie = self._get_exporter(fields_to_export={"name": "名稱"})
         self.assertEqual(list(ie._get_serialized_fields(self.i)), [("名稱", "John\xa3")])
 
+    def test_fields_to_export_changed(self):
+        ie = self._get_exporter()
+        self.assertEqual(
+            list(ie._get_serialized_fields(self.i)),
+            [("name", "John\xa3"), ("age", "22")],
+        )
+        ie.fields_to_export = ["age"]
+        self.assertEqual(list(ie._get_serialized_fields(self.i)), [("age", "22")])
+        ie.fields_to_export.append("name")
+        self.assertEqual(
+            list(ie._get_serialized_fields(self.i)),
+            [("age", "22"), ("name", "John\xa3")],
+        )
+
+        ie = self._get_exporter(fields_to_export={"name": "Name"})
+        self.assertEqual(
+            list(ie._get_serialized_fields(self.i)), [("Name", "John\xa3")]
+        )
+        ie.fields_to_export["name"] = "Full name"
+        self.assertEqual(
+            list(ie._get_serialized_fields(self.i)), [("Full name", "John\xa3")]
+        )
+
     def test_field_custom_serializer(self):
         i = self.custom_field_item_class(name="John\xa3", age="22")
         a = ItemAdapter(i)
@@ -400,6 +442,18 @@ class CsvItemExporterTest(BaseItemExporterTest):
             errors="xmlcharrefreplace",
         )
 
+    def test_export_items_batches(self):
+        items = [self.item_class(name=f"John{i}", age=str(i)) for i in range(5)]
+        self.ie = self._get_exporter()
+        self.ie.export_items(items[:2])
+        self.ie.export_items([])
+        self.ie.export_items(items[2:])
+        self.output.seek(0)
+        self.assertCsvEqual(
+            self.output.read(),
+            "age,name\r\n" + "".join(f"{i},John{i}\r\n" for i in range(5)),
+        )
+
 
 class CsvItemExporterDataclassTest(CsvItemExporterTest):
     item_class = TestDataClass
@@ -554,6 +608,26 @@ class JsonLinesItemExporterTest(BaseItemExporterTest):
         item["time"] = str(item["time"])
         self.assertEqual(exported, item)
 
+    def test_export_items_batches(self):
+        items = [self.item_class(name=f"John{i}", age=str(i)) for i in range(5)]
+        for indent in (None, 2):
+            self.ie = self._get_exporter(indent=indent)
+            self.ie.start_exporting()
+            for item in items:
+                self.ie.export_item(item)
+            self.ie.finish_exporting()
+            expected = self.output.getvalue()
+
+            self.output = BytesIO()
+            self.ie = self._get_exporter(indent=indent)
+            self.ie.start_exporting()
+            self.ie.export_items(items[:2])
+            self.ie.export_items([])
+            self.ie.export_items(items[2:])
+            self.ie.finish_exporting()
+            self.assertEqual(self.output.getvalue(), expected)
+            self.output = BytesIO()
+
 
 class JsonLinesItemExporterDataclassTest(JsonLinesItemExporterTest):
     item_class = TestDataClass
@@ -626,6 +700,163 @@ class JsonItemExporterDataclassTest(JsonItemExporterTest):
     custom_field_item_class = CustomFieldDataclass
 
 
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class ParquetItemExporterTest(BaseItemExporterTest):
+    def _get_exporter(self, **kwargs):
+        self.output = BytesIO()
+        return ParquetItemExporter(self.output, **kwargs)
+
+    def _read_table(self):
+        return pyarrow.parquet.read_table(BytesIO(self.output.getvalue()))
+
+    def _check_output(self):
+        (exported,) = self._read_table().to_pylist()
+        self.assertEqual(exported, ItemAdapter(self.i).asdict())
+
+    def _export(self, items, **kwargs):
+        self.ie = self._get_exporter(**kwargs)
+        self.ie.start_exporting()
+        for item in items:
+            self.ie.export_item(item)
+        self.ie.finish_exporting()
+        return self._read_table()
+
+    def _row_groups(self):
+        return pyarrow.parquet.ParquetFile(
+            BytesIO(self.output.getvalue())
+        ).num_row_groups
+
+    def test_nonstring_types_item(self):
+        item = self._get_nonstring_types_item()
+        (exported,) = self._export([item]).to_pylist()
+        self.assertEqual(exported, item)
+
+    def test_nested_item(self):
+        i1 = self.item_class(name="Joseph", age="22")
+        i2 = dict(name="Maria", age=[i1])
+        i3 = self.item_class(name="Jesus", age=i2)
+        (exported,) = self._export([i3]).to_pylist()
+        self.assertEqual(
+            exported,
+            {
+                "name": "Jesus",
+                "age": {"name": "Maria", "age": [ItemAdapter(i1).asdict()]},
+            },
+        )
+
+    def test_mismatching_types(self):
+        items = [{"age": 1}, {"age": 2}, {"age": "x"}]
+        with self.assertRaisesRegex(ValueError, "'age' field as int64") as cm:
+            self._export(items, row_group_size=2)
+        self.assertIsInstance(cm.exception.__cause__, pyarrow.ArrowInvalid)
+
+    def test_mismatching_types_string(self):
+        items = [{"age": None}, {"age": "b"}, {"age": 3}, {"age": [4]}]
+        with self.assertLogs("scrapy.exporters", level="WARNING") as logs:
+            table = self._export(items, row_group_size=2)
+        self.assertIn("'age' field to strings", logs.output[0])
+        self.assertEqual(
+            table.to_pylist(),
+            [{"age": None}, {"age": "b"}, {"age": "3"}, {"age": "[4]"}],
+        )
+
+    def test_mismatching_types_first_batch(self):
+        items = [{"age": 1}, {"age": "b"}]
+        with self.assertLogs("scrapy.exporters", level="WARNING"):
+            table = self._export(items)
+        self.assertEqual(table.to_pylist(), [{"age": "1"}, {"age": "b"}])
+
+    def test_row_groups(self):
+        items = [{"name": str(i), "age": i} for i in range(5)]
+        table = self._export(items, row_group_size=2)
+        self.assertEqual(table.to_pylist(), items)
+        self.assertEqual(self._row_groups(), 3)
+
+    def test_missing_and_extra_fields(self):
+        items = [{"name": "a"}, {"age": 1}, {"name": "b", "age": 2}]
+        table = self._export(items)
+        self.assertEqual(table.column_names, ["name"])
+        self.assertEqual(
+            table.to_pylist(), [{"name": "a"}, {"name": None}, {"name": "b"}]
+        )
+
+        table = self._export(items, fields_to_export={"age": "Age", "name": "Name"})
+        self.assertEqual(
+            table.to_pylist(),
+            [
+                {"Age": None, "Name": "a"},
+                {"Age": 1, "Name": None},
+                {"Age": 2, "Name": "b"},
+            ],
+        )
+
+    def test_inferred_schema(self):
+        items = [{"name": "a", "age": None}, {"name": "b", "age": None}]
+        items += [{"name": "c", "age": "22"}]
+        table = self._export(items, row_group_size=2)
+        self.assertEqual(
+            table.schema,
+            pyarrow.schema([("name", pyarrow.string()), ("age", pyarrow.string())]),
+        )
+        with self.assertRaisesRegex(ValueError, "'age' field as int64"):
+            self._export([{"age": 1}, {"age": "22"}], row_group_size=1)
+
+    def test_field_schema(self):
+        class ArrowTypeItem(Item):
+            name = Field()
+            age = Field(arrow_type=pyarrow.int8())
+
+        table = self._export([ArrowTypeItem(name="John", age=22)])
+        self.assertEqual(table.schema.field("age").type, pyarrow.int8())
+        self.assertEqual(table.to_pylist(), [{"name": "John", "age": 22}])
+
+    def test_schema(self):
+        schema = pyarrow.schema([("age", pyarrow.int16()), ("name", pyarrow.string())])
+        table = self._export([{"name": "John", "age": 22}], schema=schema)
+        self.assertEqual(table.schema, schema)
+        self.assertEqual(table.to_pylist(), [{"age": 22, "name": "John"}])
+
+    def test_no_items(self):
+        table = self._export([])
+        self.assertEqual(table.num_columns, 0)
+        schema = pyarrow.schema([("name", pyarrow.string())])
+        table = self._export([], schema=schema)
+        self.assertEqual(table.schema, schema)
+
+    def test_writer_options(self):
+        self._export([{"name": "John"}], compression="zstd")
+        metadata = pyarrow.parquet.read_metadata(BytesIO(self.output.getvalue()))
+        self.assertEqual(metadata.row_group(0).column(0).compression, "ZSTD")
+
+
+class ParquetItemExporterDataclassTest(ParquetItemExporterTest):
+    item_class = TestDataClass
+    custom_field_item_class = CustomFieldDataclass
+
+
+class ArrowItemExporterTest(ParquetItemExporterTest):
+    def _get_exporter(self, **kwargs):
+        self.output = BytesIO()
+        return ArrowItemExporter(self.output, **kwargs)
+
+    def _read_table(self):
+        return pyarrow.ipc.open_file(self.output.getvalue()).read_all()
+
+    def _row_groups(self):
+        return pyarrow.ipc.open_file(self.output.getvalue()).num_record_batches
+
+    def test_writer_options(self):
+        self._export([{"name": "John"}], compression="zstd")
+        self.assertEqual(self._read_table().to_pylist(), [{"name": "John"}])
+        with self.assertRaises(TypeError):
+            self._export([{"name": "John"}], foo_unknown_keyword_bar=True)
+
+
+class ArrowItemExporterDataclassTest(ArrowItemExporterTest):
+    item_class = TestDataClass
+    custom_field_item_class = CustomFieldDataclass
+
+
 class CustomExporterItemTest(unittest.TestCase):
     item_class = TestItem
 
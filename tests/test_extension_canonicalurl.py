@@ -0,0 +1,57 @@
+import unittest
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.extensions.canonicalurl import CanonicalURLCache
+from scrapy.spiders import Spider
+from scrapy.utils.test import get_crawler
+from scrapy.utils.url import canonical_url_cache, canonicalize_url
+
+
+class CanonicalURLCacheExtensionTest(unittest.TestCase):
+    def setUp(self):
+        self.limit = canonical_url_cache.limit
+
+    def tearDown(self):
+        canonical_url_cache.resize(self.limit)
+
+    def _get_extension(self, settings=None):
+        crawler = get_crawler(Spider, settings)
+        crawler.spider = crawler._create_spider("foo")
+        crawler.stats.open_spider(crawler.spider)
+        return crawler, CanonicalURLCache.from_crawler(crawler)
+
+    def test_stats(self):
+        crawler, extension = self._get_extension()
+        canonicalize_url("http://a.example/?unique=test_stats")
+        extension.spider_opened(crawler.spider)
+        canonicalize_url("http://b.example/?unique=test_stats")
+        canonicalize_url("http://b.example/?unique=test_stats")
+        canonicalize_url("http://a.example/?unique=test_stats")
+        extension.spider_closed(crawler.spider, "finished")
+        self.assertEqual(crawler.stats.get_value("canonicalize_url/cache_hit"), 2)
+        self.assertEqual(crawler.stats.get_value("canonicalize_url/cache_miss"), 1)
+
+    def test_size(self):
+        CrawlerProcess({"CANONICALIZE_URL_CACHE_SIZE": 5})
+        self.assertEqual(canonical_url_cache.limit, 5)
+        # crawlers do not change it
+        self._get_extension({"CANONICALIZE_URL_CACHE_SIZE": 7})
+        self.assertEqual(canonical_url_cache.limit, 5)
+
+    def test_resize(self):
+        for i in range(10):
+            canonicalize_url(f"http://a.example/?unique=test_resize{i}")
+        canonical_url_cache.resize(5)
+        self.assertEqual(len(canonical_url_cache), 5)
+        canonical_url_cache.resize(0)
+        self.assertEqual(len(canonical_url_cache), 0)
+
+    def test_disabled(self):
+        canonical_url_cache.resize(0)
+        crawler, extension = self._get_extension()
+        extension.spider_opened(crawler.spider)
+        canonicalize_url("http://a.example/?unique=test_disabled")
+        canonicalize_url("http://a.example/?unique=test_disabled")
+        extension.spider_closed(crawler.spider, "finished")
+        self.assertEqual(len(canonical_url_cache), 0)
+        self.assertIsNone(crawler.stats.get_value("canonicalize_url/cache_hit"))
@@ -8,6 +8,7 @@ import shutil
 import string
 import sys
 import tempfile
+import threading
 import warnings
 from abc import ABC, abstractmethod
 from collections import defaultdict
@@ -25,7 +26,7 @@ from urllib.request import pathname2url
 import lxml.etree
 import pytest
 from testfixtures import LogCapture
-from twisted.internet import defer
+from twisted.internet import defer, threads
 from twisted.trial import unittest
 from w3lib.url import file_uri_to_path, path_to_file_uri
 from zope.interface import implementer
@@ -43,15 +44,24 @@ from scrapy.extensions.feedexport import (
     FTPFeedStorage,
     GCSFeedStorage,
     IFeedStorage,
+    ItemFilter,
     S3FeedStorage,
     StdoutFeedStorage,
+    _MultipartUploadFile,
 )
+from scrapy.extensions.postprocessing import PostProcessingManager
 from scrapy.settings import Settings
 from scrapy.utils.python import to_unicode
 from scrapy.utils.test import get_crawler, mock_google_cloud_storage, skip_if_no_boto
-from tests.mockserver import MockFTPServer, MockServer
+from tests.mockserver import MockFTPServer, MockS3Server, MockServer
 from tests.spiders import ItemSpider
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 
 def path_to_url(path):
     return urljoin("file:", pathname2url(str(path)))
@@ -311,6 +321,53 @@ class S3FeedStorageTest(unittest.TestCase):
                 ],
             )
 
+    @defer.inlineCallbacks
+    def _test_store_multipart(self, data, chunk_size, postprocessing=None):
+        skip_if_no_boto()
+
+        with MockS3Server() as server:
+            settings = {
+                "AWS_ACCESS_KEY_ID": "access_key",
+                "AWS_SECRET_ACCESS_KEY": "secret_key",
+                "AWS_ENDPOINT_URL": server.endpoint_url,
+                "FEED_STORAGE_UPLOAD_PART_SIZE": 10,
+                "FEED_STORAGE_UPLOAD_CONCURRENCY": 2,
+            }
+            crawler = get_crawler(settings_dict=settings)
+            spider = scrapy.Spider.from_crawler(crawler, "default")
+            storage = S3FeedStorage.from_crawler(crawler, "s3://mybucket/export.csv")
+            file = storage.open(spider)
+            self.assertIsInstance(file, _MultipartUploadFile)
+            if postprocessing:
+                file = PostProcessingManager(postprocessing, file, {})
+            for i in range(0, len(data), chunk_size):
+                file.write(data[i : i + chunk_size])
+            file.close()
+            yield storage.store(getattr(file, "file", file))
+            return (server.path / "mybucket" / "export.csv").read_bytes()
+
+    @defer.inlineCallbacks
+    def test_store_multipart(self):
+        data = bytes(range(256)) * 3
+        stored = yield self._test_store_multipart(data, 7)
+        self.assertEqual(stored, data)
+
+    @defer.inlineCallbacks
+    def test_store_multipart_single_part(self):
+        stored = yield self._test_store_multipart(b"content", 3)
+        self.assertEqual(stored, b"content")
+
+        stored = yield self._test_store_multipart(b"", 1)
+        self.assertEqual(stored, b"")
+
+    @defer.inlineCallbacks
+    def test_store_multipart_postprocessing(self):
+        data = b"".join(b"line %d\n" % i for i in range(100))
+        stored = yield self._test_store_multipart(
+            data, 50, postprocessing=["scrapy.extensions.postprocessing.GzipPlugin"]
+        )
+        self.assertEqual(gzip.decompress(stored), data)
+
     def test_init_without_acl(self):
         storage = S3FeedStorage("s3://mybucket/export.csv", "access_key", "secret_key")
         self.assertEqual(storage.access_key, "access_key")
@@ -497,6 +554,134 @@ class GCSFeedStorageTest(unittest.TestCase):
             bucket_mock.blob.assert_called_once_with("export.csv")
             blob_mock.upload_from_file.assert_called_once_with(f, predefined_acl=acl)
 
+    @defer.inlineCallbacks
+    def test_store_multipart(self):
+        try:
+            from google.cloud.storage import Client  # noqa
+        except ImportError:
+            raise unittest.SkipTest("GCSFeedStorage requires google-cloud-storage")
+
+        crawler = get_crawler(settings_dict={"FEED_STORAGE_UPLOAD_PART_SIZE": 10})
+        spider = scrapy.Spider.from_crawler(crawler, "default")
+        (client_mock, bucket_mock, blob_mock) = mock_google_cloud_storage()
+        with mock.patch("google.cloud.storage.Client") as m:
+            m.return_value = client_mock
+
+            storage = GCSFeedStorage("gs://mybucket/export.csv", "123", "publicRead")
+            file = storage.open(spider)
+            file.write(b"x" * 25)
+            yield storage.store(file)
+
+            writer = blob_mock.open.return_value
+            self.assertEqual(
+                writer.write.call_args_list,
+                [mock.call(b"x" * 10), mock.call(b"x" * 10), mock.call(b"x" * 5)],
+            )
+            writer.close.assert_called_once_with()
+            self.assertEqual(blob_mock.open.call_args.kwargs["chunk_size"], 262144)
+            blob_mock.upload_from_file.assert_not_called()
+
+
+class MultipartUploadStorage:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.parts = {}
+        self.calls = []
+
+    def _start_upload(self):
+        self.calls.append("start")
+        return "upload"
+
+    def _upload_part(self, upload, number, data):
+        if number in self.failures:
+            self.failures.remove(number)
+            raise OSError(f"part {number} failed")
+        self.parts[number] = data
+        return number
+
+    def _complete_upload(self, upload, parts):
+        self.calls.append(("complete", parts))
+
+    def _abort_upload(self, upload):
+        self.calls.append("abort")
+
+    def _put(self, data):
+        self.calls.append(("put", data))
+
+
+class MultipartUploadFileTest(unittest.TestCase):
+    def test_upload(self):
+        storage = MultipartUploadStorage()
+        file = _MultipartUploadFile(storage, 4, concurrency=2)
+        file.write(b"abcdefghij")
+        self.assertEqual(file.tell(), 10)
+        file.close()
+        file.complete()
+        self.assertEqual(storage.parts, {1: b"abcd", 2: b"efgh", 3: b"ij"})
+        self.assertEqual(storage.calls, ["start", ("complete", [1, 2, 3])])
+
+    def test_put(self):
+        storage = MultipartUploadStorage()
+        file = _MultipartUploadFile(storage, 4)
+        file.write(b"abc")
+        file.complete()
+        self.assertEqual(storage.calls, [("put", b"abc")])
+
+    def test_retry(self):
+        storage = MultipartUploadStorage(failures=[2])
+        file = _MultipartUploadFile(storage, 4, retry_times=1)
+        with LogCapture() as log:
+            file.write(b"abcdefghij")
+            file.complete()
+        self.assertIn("Retrying upload of part 2", str(log))
+        self.assertEqual(storage.parts, {1: b"abcd", 2: b"efgh", 3: b"ij"})
+        self.assertEqual(storage.calls, ["start", ("complete", [1, 2, 3])])
+
+    def test_failure(self):
+        storage = MultipartUploadStorage(failures=[1, 1])
+        file = _MultipartUploadFile(storage, 4, retry_times=1)
+        file.write(b"abcd")
+        with self.assertRaises(OSError):
+            file.complete()
+        self.assertEqual(storage.calls, ["start", "abort"])
+        with self.assertRaises(OSError):
+            file.write(b"efgh")
+
+    @defer.inlineCallbacks
+    def test_wait_writable(self):
+        release = threading.Event()
+        started = []
+
+        class SlowStorage(MultipartUploadStorage):
+            def _upload_part(self, upload, number, data):
+                started.append(number)
+                release.wait(10)
+                return number
+
+        file = _MultipartUploadFile(SlowStorage(), 4, concurrency=2)
+        file.write(b"x" * 8)
+        self.assertIsNone(file.wait_writable())
+        # writes do not block, the third part waits for an upload thread
+        file.write(b"x" * 4)
+        d = file.wait_writable()
+        self.assertIsNotNone(d)
+        self.assertFalse(d.called)
+
+        feeds = {"file:///tmp/x.jl": {"format": "jsonlines"}}
+        crawler = get_crawler(settings_dict={"FEEDS": feeds})
+        exporter = FeedExporter.from_crawler(crawler)
+        slot = mock.Mock(file=PostProcessingManager([], file, {}))
+        exporter.slots = [slot, mock.Mock(file=BytesIO())]
+        exporter_d = exporter._wait_writable()
+        self.assertIsNotNone(exporter_d)
+
+        release.set()
+        yield d
+        yield exporter_d
+        self.assertIsNone(file.wait_writable())
+        yield threads.deferToThread(file.complete)
+        self.assertEqual(sorted(started), [1, 2, 3])
+
 
 class StdoutFeedStorageTest(unittest.TestCase):
     @defer.inlineCallbacks
@@ -939,6 +1124,22 @@ class FeedExportTest(FeedExportTestBase):
         header = self.MyItem.fields.keys()
         yield self.assertExported(items, header, rows)
 
+    @defer.inlineCallbacks
+    def test_export_items_buffered(self):
+        items = [
+            self.MyItem({"foo": "bar1", "egg": "spam1"}),
+            self.MyItem({"foo": "bar2", "egg": "spam2", "baz": "quux2"}),
+            self.MyItem({"foo": "bar3", "baz": "quux3"}),
+        ]
+        rows = [
+            {"egg": "spam1", "foo": "bar1", "baz": ""},
+            {"egg": "spam2", "foo": "bar2", "baz": "quux2"},
+            {"foo": "bar3", "baz": "quux3", "egg": ""},
+        ]
+        header = self.MyItem.fields.keys()
+        settings = {"FEED_EXPORT_BUFFER_ITEM_COUNT": 2}
+        yield self.assertExported(items, header, rows, settings=settings)
+
     @defer.inlineCallbacks
     def test_export_no_items_not_store_empty(self):
         for fmt in ("json", "jsonlines", "xml", "csv"):
@@ -2029,6 +2230,24 @@ class FeedPostProcessedExportsTest(FeedExportTestBase):
         result = lzma.decompress(data[filename])
         self.assertEqual(self.expected, result)
 
+    @pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+    @defer.inlineCallbacks
+    def test_gzip_plugin_parquet(self):
+        filename = self._named_tempfile("parquet_gzip_file")
+
+        settings = {
+            "FEEDS": {
+                filename: {
+                    "format": "parquet",
+                    "postprocessing": ["scrapy.extensions.postprocessing.GzipPlugin"],
+                },
+            },
+        }
+
+        data = yield self.exported_data(self.items, settings)
+        table = pyarrow.parquet.read_table(BytesIO(gzip.decompress(data[filename])))
+        self.assertEqual(self.items, table.to_pylist())
+
     @defer.inlineCallbacks
     def test_bz2_plugin(self):
         filename = self._named_tempfile("bz2_file")
@@ -2536,6 +2755,32 @@ class BatchDeliveriesTest(FeedExportTestBase):
             for expected_batch, got_batch in zip(expected, data[fmt]):
                 self.assertEqual(expected_batch, got_batch)
 
+    @pytest.mark.skipif(pyarrow is None, reason="pyarrow is not installed")
+    @defer.inlineCallbacks
+    def test_batch_item_count_parquet(self):
+        items = [{"foo": f"FOO{i}", "bar": i} for i in range(5)]
+        settings = {
+            "FEEDS": {
+                self._random_temp_filename()
+                / "parquet"
+                / self._file_mark: {
+                    "format": "parquet",
+                    "batch_item_count": 2,
+                    "item_export_kwargs": {"row_group_size": 1},
+                },
+            },
+        }
+        data = yield self.exported_data(items, settings)
+        self.assertEqual(len(data["parquet"]), 3)
+        exported = []
+        for batch in data["parquet"]:
+            parquet_file = pyarrow.parquet.ParquetFile(BytesIO(batch))
+            self.assertEqual(
+                parquet_file.num_row_groups, parquet_file.metadata.num_rows
+            )
+            exported.extend(parquet_file.read().to_pylist())
+        self.assertEqual(items, exported)
+
     @pytest.mark.skipif(
         sys.platform == "win32", reason="Odd behaviour on file creation/output"
     )
@@ -2653,6 +2898,63 @@ class BatchDeliveriesTest(FeedExportTestBase):
 
 
 # Test that the FeedExporer sends the feed_exporter_closed and feed_slot_closed signals
+class FeedSlotBufferTest(unittest.TestCase):
+    def _get_slot(self, **kwargs):
+        return FeedSlot(
+            file=BytesIO(),
+            exporter=mock.Mock(),
+            storage=None,
+            uri="file:///tmp/items.jl",
+            format="jl",
+            store_empty=False,
+            batch_id=1,
+            uri_template="file:///tmp/items.jl",
+            filter=ItemFilter(None),
+            **kwargs,
+        )
+
+    def test_unbuffered(self):
+        slot = self._get_slot()
+        slot.start_exporting()
+        slot.export_item({"a": 1})
+        slot.exporter.export_item.assert_called_once_with({"a": 1})
+        slot.exporter.export_items.assert_not_called()
+
+    def test_flush_on_size_and_close(self):
+        slot = self._get_slot(buffer_item_count=2)
+        slot.start_exporting()
+        slot.export_item({"a": 1})
+        self.assertIsNotNone(slot.buffered_since)
+        slot.exporter.export_items.assert_not_called()
+        slot.export_item({"a": 2})
+        slot.exporter.export_items.assert_called_once_with([{"a": 1}, {"a": 2}])
+        self.assertIsNone(slot.buffered_since)
+        slot.export_item({"a": 3})
+        slot.finish_exporting()
+        slot.exporter.export_items.assert_called_with([{"a": 3}])
+        slot.exporter.finish_exporting.assert_called_once_with()
+        slot.exporter.export_item.assert_not_called()
+
+    def test_flush_on_timeout(self):
+        crawler = get_crawler(
+            settings_dict={
+                "FEEDS": {"file:///tmp/items.jl": {"format": "jl"}},
+                "FEED_EXPORT_BUFFER_ITEM_COUNT": 10,
+                "FEED_EXPORT_BUFFER_TIMEOUT": 5,
+            }
+        )
+        feed_exporter = FeedExporter.from_crawler(crawler)
+        slot = self._get_slot(buffer_item_count=10, buffer_timeout=5)
+        feed_exporter.slots = [slot]
+        slot.start_exporting()
+        slot.export_item({"a": 1})
+        feed_exporter._flush_buffers(None)
+        slot.exporter.export_items.assert_not_called()
+        slot.buffered_since -= 5
+        feed_exporter._flush_buffers(None)
+        slot.exporter.export_items.assert_called_once_with([{"a": 1}])
+
+
 class FeedExporterSignalsTest(unittest.TestCase):
     items = [
         {"foo": "bar1", "egg": "spam1"},
@@ -2740,6 +3042,25 @@ class FeedExportInitTest(unittest.TestCase):
         with self.assertRaises(NotConfigured):
             FeedExporter.from_crawler(crawler)
 
+    def test_missing_required_module(self):
+        settings = {
+            "FEEDS": {
+                "file:///tmp/items.parquet": {"format": "parquet"},
+                "file:///tmp/items.jsonl": {"format": "jsonlines"},
+            },
+        }
+        crawler = get_crawler(settings_dict=settings)
+        with mock.patch.dict(sys.modules, {"pyarrow": None}), LogCapture() as log:
+            exporter = FeedExporter.from_crawler(crawler)
+        self.assertEqual(list(exporter.feeds), ["file:///tmp/items.jsonl"])
+        self.assertIn("Disabled feed file:///tmp/items.parquet", str(log))
+
+        settings = {"FEEDS": {"file:///tmp/items.parquet": {"format": "parquet"}}}
+        crawler = get_crawler(settings_dict=settings)
+        with mock.patch.dict(sys.modules, {"pyarrow": None}):
+            with self.assertRaises(NotConfigured):
+                FeedExporter.from_crawler(crawler)
+
     def test_unsupported_format(self):
         settings = {
             "FEEDS": {
@@ -1,4 +1,5 @@
 import copy
+import pickle
 import unittest
 
 from scrapy.http import Headers
@@ -102,6 +103,24 @@ class HeadersTest(unittest.TestCase):
         self.assertEqual(h.getlist("Content-Type"), [b"text/html"])
         self.assertEqual(h.getlist("X-Forwarded-For"), [b"ip1", b"ip2"])
 
+    def test_update_from_headers(self):
+        h1 = Headers({"Content-Type": "text/html", "X-Forwarded-For": ["ip1", "ip2"]})
+        h2 = Headers({"content-type": "text/plain", "Accept": "*/*"})
+        h2.update(h1)
+        self.assertEqual(h2.getlist("Content-Type"), [b"text/html"])
+        self.assertEqual(h2.getlist("Accept"), [b"*/*"])
+        h2.appendlist("X-Forwarded-For", "ip3")
+        self.assertEqual(h1.getlist("X-Forwarded-For"), [b"ip1", b"ip2"])
+        self.assertEqual(h2.getlist("X-Forwarded-For"), [b"ip1", b"ip2", b"ip3"])
+
+    def test_normkey_encoding(self):
+        self.assertEqual(Headers().normkey("x-\xe9"), "X-\xc9".encode("utf-8"))
+        self.assertEqual(
+            Headers(encoding="latin1").normkey("x-\xe9"), "X-\xc9".encode("latin1")
+        )
+        self.assertEqual(Headers().normkey(b"content-TYPE"), b"Content-Type")
+        self.assertEqual(Headers().normkey("content-TYPE"), b"Content-Type")
+
     def test_copy(self):
         h1 = Headers({"header1": ["value1", "value2"]})
         h2 = copy.copy(h1)
@@ -110,6 +129,13 @@ class HeadersTest(unittest.TestCase):
         assert h1.getlist("header1") is not h2.getlist("header1")
         assert isinstance(h2, Headers)
 
+    def test_pickle(self):
+        h1 = Headers({"header1": ["value1", "value2"]}, encoding="latin1")
+        h2 = pickle.loads(pickle.dumps(h1))
+        self.assertEqual(h1, h2)
+        self.assertEqual(h2.encoding, "latin1")
+        assert isinstance(h2, Headers)
+
     def test_appendlist(self):
         h1 = Headers({"header1": "value1"})
         h1.appendlist("header1", "value3")
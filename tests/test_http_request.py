@@ -1,4 +1,5 @@
 import json
+import pickle
 import re
 import unittest
 import warnings
@@ -197,6 +198,22 @@ class RequestTest(unittest.TestCase):
             r.url, "http://www.example.com/ajax.html?_escaped_fragment_=key%3Dvalue"
         )
 
+    def test_pickle(self):
+        r1 = self.request_class(
+            "http://www.example.com",
+            headers={"X-Header": "value"},
+            cookies={"name": "value"},
+            flags=["f1"],
+        )
+        r1.meta["foo"] = "bar"
+        r2 = pickle.loads(pickle.dumps(r1))
+        self.assertEqual(r2.url, r1.url)
+        self.assertEqual(r2.headers, r1.headers)
+        self.assertEqual(r2.cookies, r1.cookies)
+        self.assertEqual(r2.flags, r1.flags)
+        self.assertEqual(r2.meta, r1.meta)
+        self.assertEqual(r2.body, r1.body)
+
     def test_copy(self):
         """Test Request copy"""
 
@@ -286,6 +303,41 @@ class RequestTest(unittest.TestCase):
         self.assertRaises(AttributeError, setattr, r, "url", "http://example2.com")
         self.assertRaises(AttributeError, setattr, r, "body", "xxx")
 
+    def test_lazy_attributes(self):
+        r = self.request_class("http://example.com")
+        r.headers[b"X-Foo"] = b"bar"
+        r.cookies["foo"] = "bar"
+        r.flags.append("foo")
+        self.assertEqual(r.headers.getlist("X-Foo"), [b"bar"])
+        self.assertEqual(r.cookies, {"foo": "bar"})
+        self.assertEqual(r.flags, ["foo"])
+
+        r2 = self.request_class("http://example.com")
+        self.assertEqual(r2.cookies, {})
+        self.assertEqual(r2.flags, [])
+        self.assertNotIn(b"X-Foo", r2.headers)
+        self.assertEqual(r2.headers.encoding, r2.encoding)
+
+        r2.headers = Headers({"X-Foo": "baz"})
+        r2.cookies = [{"name": "foo", "value": "baz"}]
+        r2.flags = ["bar"]
+        self.assertEqual(r2.headers.getlist("X-Foo"), [b"baz"])
+        self.assertEqual(r2.cookies, [{"name": "foo", "value": "baz"}])
+        self.assertEqual(r2.flags, ["bar"])
+
+    def test_download_slot_not_in_meta(self):
+        r = self.request_class("http://example.com")
+        self.assertIsNone(r._download_slot)
+        r._download_slot = "example.com"
+        self.assertNotIn("download_slot", r.meta)
+        self.assertIsNone(r.copy()._download_slot)
+
+    def test_arbitrary_attributes(self):
+        r = self.request_class("http://example.com")
+        r.foo = "bar"
+        self.assertEqual(r.foo, "bar")
+        self.assertNotIn("foo", self.request_class("http://example.com").__dict__)
+
     def test_callback_and_errback(self):
         def a_function():
             pass
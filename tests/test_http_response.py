@@ -1,4 +1,5 @@
 import codecs
+import tempfile
 import unittest
 from unittest import mock
 
@@ -19,6 +20,7 @@ from scrapy.http import (
 from scrapy.link import Link
 from scrapy.selector import Selector
 from scrapy.utils.python import to_unicode
+from scrapy.utils.spool import SpooledBody
 from tests import get_testdata
 
 
@@ -104,6 +106,36 @@ class BaseResponseTest(unittest.TestCase):
         ), "headers must be a shallow copy, not identical"
         self.assertEqual(r1.headers, r2.headers)
 
+    def _spooled_body(self, data):
+        file = tempfile.TemporaryFile()
+        file.write(data)
+        return SpooledBody(file)
+
+    def test_spooled_body(self):
+        body = b"<html><body>" + b"x" * 100000 + b"</body></html>"
+        r1 = self.response_class(
+            "http://www.example.com", body=self._spooled_body(body)
+        )
+        self.assertIsNone(r1._body)
+        self.assertEqual(b"".join(r1.iter_body(4096)), body)
+        self.assertEqual(len(list(r1.iter_body(4096))), 25)
+        self.assertIsNone(r1._body)
+        self.assertEqual(r1._open_body().getvalue(), body)
+        r2 = r1.copy()
+        self.assertIsNone(r2._body)
+        self.assertEqual(r1.body, body)
+        self.assertEqual(r2.body, body)
+        r3 = r1.replace(body=b"other body")
+        self.assertEqual(r3.body, b"other body")
+        self.assertIsNone(r3._spooled_body)
+
+    def test_iter_body(self):
+        r1 = self.response_class("http://www.example.com", body=b"Some body")
+        self.assertEqual(list(r1.iter_body(4)), [b"Some", b" bod", b"y"])
+        self.assertEqual(
+            list(self.response_class("http://www.example.com").iter_body()), []
+        )
+
     def test_copy_meta(self):
         req = Request("http://www.example.com")
         req.meta["foo"] = "bar"
@@ -182,6 +214,22 @@ class BaseResponseTest(unittest.TestCase):
         self.assertRaises(AttributeError, setattr, r, "url", "http://example2.com")
         self.assertRaises(AttributeError, setattr, r, "body", "xxx")
 
+    def test_lazy_attributes(self):
+        r = self.response_class("http://example.com")
+        r.headers[b"X-Foo"] = b"bar"
+        r.flags.append("foo")
+        self.assertEqual(r.headers.getlist("X-Foo"), [b"bar"])
+        self.assertEqual(r.flags, ["foo"])
+
+        r2 = self.response_class("http://example.com")
+        self.assertEqual(r2.flags, [])
+        self.assertNotIn(b"X-Foo", r2.headers)
+
+        r2.headers = Headers({"X-Foo": "baz"})
+        r2.flags = ["bar"]
+        self.assertEqual(r2.headers.getlist("X-Foo"), [b"baz"])
+        self.assertEqual(r2.flags, ["bar"])
+
     def test_urljoin(self):
         """Test urljoin shortcut (only for existence, since behavior equals urljoin)"""
         joined = self.response_class("http://www.example.com").urljoin("/test")
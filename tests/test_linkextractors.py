@@ -8,7 +8,12 @@ from w3lib import __version__ as w3lib_version
 
 from scrapy.http import HtmlResponse, XmlResponse
 from scrapy.link import Link
-from scrapy.linkextractors.lxmlhtml import LxmlLinkExtractor
+from scrapy.linkextractors.lxmlhtml import (
+    LxmlLinkExtractor,
+    _LxmlLinkExtractorSet,
+    _merge_regexes,
+)
+from scrapy.utils.url import DomainSet
 from tests import get_testdata
 
 
@@ -142,6 +147,19 @@ class Base:
                 ],
             )
 
+        def test_extract_filter_allowed_domain_set(self):
+            domains = DomainSet(["google.com"])
+            lx = self.extractor_cls(allow_domains=domains)
+            self.assertIs(lx.allow_domains, domains)
+            self.assertEqual(
+                [link.url for link in lx.extract_links(self.response)],
+                ["http://www.google.com/something"],
+            )
+            domains.discard("google.com")
+            domains.add("example.com")
+            self.assertTrue(lx.matches("http://example.com/sample1.html"))
+            self.assertFalse(lx.matches("http://www.google.com/something"))
+
         def test_extraction_using_single_values(self):
             """Test the extractor's behaviour among different situations"""
 
@@ -850,3 +868,99 @@ class LxmlLinkExtractorTestCase(Base.LinkExtractorTestCase):
                 ),
             ],
         )
+
+
+class DenyAllLinkExtractor(LxmlLinkExtractor):
+    def _link_allowed(self, link):
+        return False
+
+
+class LxmlLinkExtractorSetTestCase(unittest.TestCase):
+    def get_link_extractors(self):
+        return [
+            LxmlLinkExtractor(),
+            LxmlLinkExtractor(allow=(r"sample",)),
+            LxmlLinkExtractor(allow=(r"sample\d", r"page"), deny=(r"3", r"4")),
+            LxmlLinkExtractor(allow=(re.compile("SAMPLE", re.I), r"page")),
+            LxmlLinkExtractor(allow=(r"(sample)\d\1",)),
+            LxmlLinkExtractor(allow_domains=("example.com",)),
+            LxmlLinkExtractor(deny_domains=("example.com",)),
+            LxmlLinkExtractor(restrict_xpaths='//div[@id="subwrapper"]'),
+            LxmlLinkExtractor(
+                restrict_xpaths=('//div[@id="subwrapper"]', "//div"),
+                unique=False,
+            ),
+            LxmlLinkExtractor(restrict_css=("#subwrapper a",)),
+            LxmlLinkExtractor(tags="img", attrs="src"),
+            LxmlLinkExtractor(tags=("a", "img"), attrs=("href", "src")),
+            LxmlLinkExtractor(canonicalize=True),
+            LxmlLinkExtractor(unique=False),
+            LxmlLinkExtractor(deny_extensions=()),
+            LxmlLinkExtractor(restrict_text="sample"),
+            LxmlLinkExtractor(
+                process_value=lambda v: v.replace("sample", "example"), strip=False
+            ),
+            DenyAllLinkExtractor(),
+        ]
+
+    def assertSameLinks(self, response):
+        link_extractors = self.get_link_extractors()
+        self.assertEqual(
+            _LxmlLinkExtractorSet(link_extractors).extract_links(response),
+            [le.extract_links(response) for le in link_extractors],
+        )
+
+    def test_same_links(self):
+        for name in (
+            "linkextractor.html",
+            "linkextractor_latin1.html",
+            "linkextractor_no_href.html",
+            "linkextractor_noenc.html",
+        ):
+            body = get_testdata("link_extractor", name)
+            with self.subTest(name=name):
+                self.assertSameLinks(
+                    HtmlResponse(url="http://example.com/index", body=body)
+                )
+
+    def test_same_links_duplicates(self):
+        html = b"""
+        <base href="http://example.org/base/">
+        <a href="item1.html">Item 1</a>
+        <a href="item1.html" rel="nofollow">Item 1</a>
+        <a href="  item1.html#top ">Item 1 top</a>
+        <a href="http://[example.org/item2.html">Item 2</a>
+        <a href="http://example.org:non-port">Item 3</a>
+        <a href="HTTP://Example.ORG/?b=2&amp;a=1">Sample 4</a>
+        <area href="mailto:someone@example.org">
+        <img src="image.png">
+        """
+        self.assertSameLinks(HtmlResponse("http://example.org/index.html", body=html))
+
+    def test_no_link_extractors(self):
+        response = HtmlResponse("http://example.org", body=b"<a href='/'>Home</a>")
+        self.assertEqual(_LxmlLinkExtractorSet([]).extract_links(response), [])
+
+    def test_merge_regexes(self):
+        merged = _merge_regexes([re.compile("a+b"), re.compile("^c$")])
+        self.assertEqual(merged.pattern, "(?:a+b)|(?:^c$)")
+        self.assertIsNotNone(merged.search("xaab"))
+        self.assertIsNotNone(merged.search("c"))
+        self.assertIsNone(merged.search("cc"))
+
+    def test_merge_regexes_verbose(self):
+        merged = _merge_regexes(
+            [re.compile("a # letter", re.VERBOSE), re.compile("b", re.VERBOSE)]
+        )
+        self.assertIsNotNone(merged.search("b"))
+        self.assertIsNone(merged.search("c"))
+
+    def test_merge_regexes_unmergeable(self):
+        for regexes in (
+            [re.compile("a", re.I), re.compile("b")],
+            [re.compile("(?i)a"), re.compile("b")],
+            [re.compile(r"(a)\1"), re.compile("b")],
+            [re.compile("(?P<x>a)"), re.compile("(?P<x>b)")],
+        ):
+            with self.subTest(regexes=regexes):
+                self.assertIsNone(_merge_regexes(regexes))
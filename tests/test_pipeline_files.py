@@ -1,12 +1,14 @@
 import dataclasses
+import hashlib
 import os
 import random
+import threading
 import time
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 from shutil import rmtree
-from tempfile import mkdtemp
+from tempfile import TemporaryFile, mkdtemp
 from unittest import mock
 from urllib.parse import urlparse
 
@@ -23,8 +25,10 @@ from scrapy.pipelines.files import (
     FTPFilesStore,
     GCSFilesStore,
     S3FilesStore,
+    _FilesManifest,
 )
 from scrapy.settings import Settings
+from scrapy.utils.spool import SpooledBody
 from scrapy.utils.test import (
     assert_gcs_environ,
     get_crawler,
@@ -32,6 +36,7 @@ from scrapy.utils.test import (
     get_gcs_content_and_delete,
     skip_if_no_boto,
 )
+from tests.mockserver import MockS3Server
 
 from .test_pipeline_media import _mocked_download_func
 
@@ -207,6 +212,65 @@ class FilesPipelineTestCase(unittest.TestCase):
         for p in patchers:
             p.stop()
 
+    @defer.inlineCallbacks
+    def test_stat_file_batched(self):
+        settings = {"FILES_STORE": self.tempdir, "MEDIA_STORE_STAT_BATCH_SIZE": 100}
+        crawler = get_crawler(spidercls=None, settings_dict=settings)
+        pipeline = FilesPipeline.from_crawler(crawler)
+        pipeline.download_func = _mocked_download_func
+        pipeline.open_spider(None)
+        item_urls = [f"http://example.com/file{i}.pdf" for i in range(3)]
+        item = _create_item_with_files(*item_urls)
+        patchers = [
+            mock.patch.object(FilesPipeline, "inc_stats", return_value=True),
+            mock.patch.object(
+                FSFilesStore,
+                "stat_file",
+                return_value={"checksum": "abc", "last_modified": time.time()},
+            ),
+            mock.patch.object(
+                FSFilesStore,
+                "stat_files",
+                autospec=True,
+                side_effect=FSFilesStore.stat_files,
+            ),
+            mock.patch.object(
+                FilesPipeline,
+                "get_media_requests",
+                return_value=[_prepare_request_object(url) for url in item_urls],
+            ),
+        ]
+        for p in patchers:
+            p.start()
+
+        result = yield pipeline.process_item(item, None)
+        self.assertEqual([file["status"] for file in result["files"]], ["uptodate"] * 3)
+        FSFilesStore.stat_files.assert_called_once()
+        paths = FSFilesStore.stat_files.call_args[0][1]
+        self.assertEqual(paths, [file["path"] for file in result["files"]])
+
+        for p in patchers:
+            p.stop()
+
+    def test_stat_file_not_batched(self):
+        self.assertIsNone(self.pipeline._stat_batcher)
+        settings = {"FILES_STORE": self.tempdir, "MEDIA_STORE_STAT_BATCH_SIZE": 100}
+        crawler = get_crawler(spidercls=None, settings_dict=settings)
+        pipeline = FilesPipeline.from_crawler(crawler)
+        self.assertIsNotNone(pipeline._stat_batcher)
+
+    def test_file_downloaded_spooled_body(self):
+        body = os.urandom(100000)
+        file = TemporaryFile()
+        file.write(body)
+        request = Request("http://example.com/file.bin")
+        response = Response(request.url, body=SpooledBody(file), request=request)
+        checksum = self.pipeline.file_downloaded(response, request, None)
+        self.assertEqual(checksum, hashlib.md5(body).hexdigest())
+        path = Path(self.tempdir, self.pipeline.file_path(request))
+        self.assertEqual(path.read_bytes(), body)
+        self.assertIsNone(response._body)
+
     def test_file_path_from_item(self):
         """
         Custom file path based on item data, overriding default implementation
@@ -497,6 +561,52 @@ class FilesPipelineTestCaseCustomSettings(unittest.TestCase):
         self.assertEqual(fs_store.basedir, str(path))
 
 
+class FilesManifestTest(unittest.TestCase):
+    def test_listing_does_not_block_other_directories(self):
+        listing = threading.Event()
+        release = threading.Event()
+
+        def list_directory(directory):
+            if directory == "full":
+                listing.set()
+                release.wait(10)
+                return {"full/a.jpg": {"checksum": "old"}}
+            return {f"{directory}/b.jpg": {"checksum": "b"}}
+
+        manifest = _FilesManifest(list_directory)
+        results = {}
+
+        def stat(name, paths):
+            results[name] = manifest.stat_files(paths)
+
+        first = threading.Thread(target=stat, args=("first", ["full/a.jpg"]))
+        first.start()
+        self.assertTrue(listing.wait(10))
+        # other directories are listed meanwhile...
+        stats = manifest.stat_files(["thumbs/b.jpg"])
+        self.assertEqual(stats, {"thumbs/b.jpg": {"checksum": "b"}})
+        # ...files are added...
+        manifest.add("full/a.jpg", {"checksum": "new"})
+        # ...and checks of the directory being listed wait for the listing
+        second = threading.Thread(target=stat, args=("second", ["full/c.jpg"]))
+        second.start()
+        second.join(0.2)
+        self.assertTrue(second.is_alive())
+        release.set()
+        first.join(10)
+        second.join(10)
+        self.assertEqual(results["first"], {"full/a.jpg": {"checksum": "new"}})
+        self.assertEqual(results["second"], {"full/c.jpg": {}})
+
+    def test_listing_error(self):
+        list_directory = mock.Mock(side_effect=[OSError, {"full/a.jpg": {"x": 1}}])
+        manifest = _FilesManifest(list_directory)
+        with self.assertRaises(OSError):
+            manifest.stat_files(["full/a.jpg"])
+        self.assertEqual(manifest.stat_files(["full/a.jpg"]), {"full/a.jpg": {"x": 1}})
+        self.assertEqual(list_directory.call_count, 2)
+
+
 class TestS3FilesStore(unittest.TestCase):
     @defer.inlineCallbacks
     def test_persist(self):
@@ -582,6 +692,77 @@ class TestS3FilesStore(unittest.TestCase):
 
             stub.assert_no_pending_responses()
 
+    @defer.inlineCallbacks
+    def test_stat_files(self):
+        skip_if_no_boto()
+
+        with MockS3Server() as server:
+
+            class TestS3FilesStore(S3FilesStore):
+                AWS_ACCESS_KEY_ID = "access_key"
+                AWS_SECRET_ACCESS_KEY = "secret_key"
+                AWS_ENDPOINT_URL = server.endpoint_url
+
+            store = TestS3FilesStore("s3://mybucket/prefix/")
+            directory = server.path / "mybucket" / "prefix" / "full"
+            directory.mkdir(parents=True)
+            (directory / "a.jpg").write_bytes(b"a")
+            stats = yield store.stat_files(["full/a.jpg", "full/b.jpg"], info=None)
+            self.assertEqual(
+                stats["full/a.jpg"]["checksum"], hashlib.md5(b"a").hexdigest()
+            )
+            self.assertIn("last_modified", stats["full/a.jpg"])
+            self.assertEqual(stats["full/b.jpg"], {})
+
+    @defer.inlineCallbacks
+    def test_stat_files_manifest(self):
+        skip_if_no_boto()
+
+        with MockS3Server() as server:
+
+            class TestS3FilesStore(S3FilesStore):
+                AWS_ACCESS_KEY_ID = "access_key"
+                AWS_SECRET_ACCESS_KEY = "secret_key"
+                AWS_ENDPOINT_URL = server.endpoint_url
+                MANIFEST = True
+
+            store = TestS3FilesStore("s3://mybucket/prefix/")
+            directory = server.path / "mybucket" / "prefix" / "full"
+            directory.mkdir(parents=True)
+            for i in range(1005):
+                (directory / f"{i}.jpg").write_bytes(str(i).encode())
+            (directory / "sub").mkdir()
+            (directory / "sub" / "0.jpg").write_bytes(b"")
+            paths = ["full/0.jpg", "full/1004.jpg", "full/missing.jpg"]
+            with mock.patch.object(
+                store.s3_client, "head_object", side_effect=AssertionError
+            ):
+                stats = yield store.stat_files(paths, info=None)
+            self.assertEqual(
+                stats["full/1004.jpg"]["checksum"], hashlib.md5(b"1004").hexdigest()
+            )
+            self.assertIn("last_modified", stats["full/0.jpg"])
+            self.assertEqual(stats["full/missing.jpg"], {})
+
+            # files added to the store by other means are not seen anymore...
+            (directory / "missing.jpg").write_bytes(b"")
+            stats = yield store.stat_files(["full/missing.jpg"], info=None)
+            self.assertEqual(stats, {"full/missing.jpg": {}})
+
+            # ...but persisted files are
+            yield store.persist_file("full/new.jpg", BytesIO(b"new"), info=None)
+            stats = yield store.stat_files(["full/new.jpg"], info=None)
+            self.assertEqual(
+                stats["full/new.jpg"]["checksum"], hashlib.md5(b"new").hexdigest()
+            )
+
+            # single checks use the manifest too
+            with mock.patch.object(
+                store.s3_client, "head_object", side_effect=AssertionError
+            ):
+                stat = yield store.stat_file("full/1.jpg", info=None)
+            self.assertEqual(stat["checksum"], hashlib.md5(b"1").hexdigest())
+
 
 class TestGCSFilesStore(unittest.TestCase):
     @defer.inlineCallbacks
@@ -635,6 +816,41 @@ class TestGCSFilesStore(unittest.TestCase):
                     store.bucket.blob.assert_called_with(expected_blob_path)
                     store.bucket.get_blob.assert_called_with(expected_blob_path)
 
+    @defer.inlineCallbacks
+    def test_stat_files_manifest(self):
+        assert_gcs_environ()
+        try:
+            import google.cloud.storage  # noqa
+        except ModuleNotFoundError:
+            raise unittest.SkipTest("google-cloud-storage is not installed")
+        else:
+            with mock.patch("google.cloud.storage") as _:
+                uri = "gs://my_bucket/my_prefix/"
+                with mock.patch.object(GCSFilesStore, "MANIFEST", True):
+                    store = GCSFilesStore(uri)
+                store.bucket = mock.Mock()
+                blob = mock.Mock()
+                blob.name = "my_prefix/full/a.jpg"
+                blob.md5_hash = "DMF1ucDxtqgxw5niaXcmYQ=="
+                blob.updated = datetime(2019, 12, 1)
+                store.bucket.list_blobs.return_value = [blob]
+                paths = ["full/a.jpg", "full/b.jpg"]
+                stats = yield store.stat_files(paths, info=None)
+                store.bucket.list_blobs.assert_called_once_with(
+                    prefix="my_prefix/full/", delimiter="/"
+                )
+                store.bucket.get_blob.assert_not_called()
+                self.assertEqual(
+                    stats,
+                    {
+                        "full/a.jpg": {
+                            "checksum": "0cc175b9c0f1b6a831c399e269772661",
+                            "last_modified": time.mktime(blob.updated.timetuple()),
+                        },
+                        "full/b.jpg": {},
+                    },
+                )
+
 
 class TestFTPFileStore(unittest.TestCase):
     @defer.inlineCallbacks
@@ -3,20 +3,26 @@ import hashlib
 import io
 import random
 import warnings
+from pathlib import Path
 from shutil import rmtree
 from tempfile import mkdtemp
 from unittest.mock import patch
 
 import attr
 from itemadapter import ItemAdapter
+from testfixtures import LogCapture
+from twisted.internet import defer
 from twisted.trial import unittest
 
 from scrapy.exceptions import ScrapyDeprecationWarning
 from scrapy.http import Request, Response
 from scrapy.item import Field, Item
+from scrapy.pipelines.files import FileException
 from scrapy.pipelines.images import ImageException, ImagesPipeline, NoimagesDrop
 from scrapy.settings import Settings
+from scrapy.spiders import Spider
 from scrapy.utils.python import to_bytes
+from scrapy.utils.test import get_crawler
 
 try:
     from PIL import Image
@@ -182,6 +188,56 @@ class ImagesPipelineTestCase(unittest.TestCase):
         self.assertEqual(thumb_img, thumb_img)
         self.assertEqual(orig_thumb_buf.getvalue(), thumb_buf.getvalue())
 
+    def test_get_images_thumbs_draft(self):
+        self.pipeline.thumbs = {"small": (50, 50), "big": (150, 100)}
+        orig_im, buf = _create_image("JPEG", "RGB", (1600, 1200), (255, 0, 0))
+        resp = Response(url="https://dev.mydeco.com/mydeco.gif", body=buf.getvalue())
+        req = Request(url="https://dev.mydeco.com/mydeco.gif")
+
+        source = self.pipeline._draft_thumb_source(buf.getvalue())
+        self.assertEqual(source.size, (400, 300))
+        images = list(self.pipeline.get_images(response=resp, request=req, info=None))
+        self.assertEqual(len(images), 3)
+        self.assertEqual(images[0][1].size, (1600, 1200))
+        self.assertEqual(buf.getvalue(), images[0][2].getvalue())
+        for (_, thumb_img, thumb_buf), size in zip(
+            images[1:], self.pipeline.thumbs.values()
+        ):
+            expected = orig_im.copy()
+            expected.thumbnail(size)
+            self.assertEqual(thumb_img.size, expected.size)
+            self.assertEqual(Image.open(thumb_buf).size, expected.size)
+            self.assertGreater(thumb_img.getpixel((0, 0))[0], 250)
+
+    def test_get_images_thumbs_converted(self):
+        self.pipeline.thumbs = {"small": (50, 50)}
+        orig_im, buf = _create_image("PNG", "RGBA", (400, 300), (255, 0, 0, 255))
+        resp = Response(url="https://dev.mydeco.com/mydeco.gif", body=buf.getvalue())
+        req = Request(url="https://dev.mydeco.com/mydeco.gif")
+
+        with patch.object(self.pipeline, "_draft_thumb_source") as draft:
+            images = list(
+                self.pipeline.get_images(response=resp, request=req, info=None)
+            )
+        draft.assert_not_called()
+        self.assertEqual([image.size for _, image, _ in images], [(400, 300), (50, 38)])
+
+    def test_get_images_thumbs_rgb_png(self):
+        # RGB PNG images are returned as is by convert_image(), but decoded
+        # to be saved as JPEG
+        self.pipeline.thumbs = {"small": (50, 50)}
+        orig_im, buf = _create_image("PNG", "RGB", (400, 300), (255, 0, 0))
+        resp = Response(url="https://dev.mydeco.com/mydeco.png", body=buf.getvalue())
+        req = Request(url="https://dev.mydeco.com/mydeco.png")
+
+        with patch.object(self.pipeline, "_draft_thumb_source") as draft:
+            images = list(
+                self.pipeline.get_images(response=resp, request=req, info=None)
+            )
+        draft.assert_not_called()
+        self.assertEqual([image.size for _, image, _ in images], [(400, 300), (50, 38)])
+        self.assertEqual(Image.open(images[0][2]).format, "JPEG")
+
     def test_get_images_old(self):
         self.pipeline.thumbs = {"small": (20, 20)}
         orig_im, buf = _create_image("JPEG", "RGB", (50, 50), (0, 0, 0))
@@ -310,6 +366,66 @@ class ImagesPipelineTestCase(unittest.TestCase):
         self.assertEqual(converted.getcolors(), [(10000, (205, 230, 255))])
 
 
+class ImagesPipelineThreadsTestCase(unittest.TestCase):
+    skip = skip_pillow
+
+    def setUp(self):
+        self.tempdir = mkdtemp()
+        settings = Settings({"IMAGES_THREADS": 2, "IMAGES_THUMBS": {"small": (20, 20)}})
+        self.pipeline = ImagesPipeline(self.tempdir, settings=settings)
+        self.pipeline.open_spider(None)
+        self.info = self.pipeline.spiderinfo
+
+    def tearDown(self):
+        self.pipeline.close_spider(None)
+        rmtree(self.tempdir)
+
+    def _get_response(self, *args):
+        _, buf = _create_image(*args)
+        return Response(url="https://dev.mydeco.com/mydeco.gif", body=buf.getvalue())
+
+    @defer.inlineCallbacks
+    def test_image_downloaded(self):
+        response = self._get_response("JPEG", "RGB", (50, 50), (0, 0, 0))
+        request = Request(url="https://dev.mydeco.com/mydeco.gif")
+        checksum = yield self.pipeline.image_downloaded(response, request, self.info)
+        self.assertEqual(checksum, hashlib.md5(response.body).hexdigest())
+        path = Path(self.tempdir, "full/3fd165099d8e71b8a48b2683946e64dbfad8b52d.jpg")
+        self.assertEqual(path.read_bytes(), response.body)
+        path = Path(
+            self.tempdir, "thumbs/small/3fd165099d8e71b8a48b2683946e64dbfad8b52d.jpg"
+        )
+        self.assertEqual(Image.open(path).size, (20, 20))
+
+    @defer.inlineCallbacks
+    def test_media_downloaded(self):
+        response = self._get_response("PNG", "RGBA", (50, 50), (0, 0, 0, 0))
+        request = Request(url="https://dev.mydeco.com/mydeco.gif")
+        self.pipeline.spiderinfo.spider = get_crawler(Spider)._create_spider("test")
+        result = yield self.pipeline.media_downloaded(response, request, self.info)
+        self.assertEqual(
+            result,
+            {
+                "url": request.url,
+                "path": "full/3fd165099d8e71b8a48b2683946e64dbfad8b52d.jpg",
+                "checksum": result["checksum"],
+                "status": "downloaded",
+            },
+        )
+        self.assertNotEqual(result["checksum"], hashlib.md5(response.body).hexdigest())
+
+    @defer.inlineCallbacks
+    def test_media_downloaded_error(self):
+        response = Response(url="https://dev.mydeco.com/mydeco.gif", body=b"foo")
+        request = Request(url="https://dev.mydeco.com/mydeco.gif")
+        self.pipeline.spiderinfo.spider = get_crawler(Spider)._create_spider("test")
+        self.pipeline.min_width = 0
+        with LogCapture() as log:
+            with self.assertRaises(FileException):
+                yield self.pipeline.media_downloaded(response, request, self.info)
+        self.assertIn("File (unknown-error)", str(log))
+
+
 class DeprecatedImagesPipeline(ImagesPipeline):
     def file_key(self, url):
         return self.image_key(url)
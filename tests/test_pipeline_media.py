@@ -1,4 +1,6 @@
 import io
+from shutil import rmtree
+from tempfile import mkdtemp
 from typing import Optional
 
 from testfixtures import LogCapture
@@ -12,7 +14,7 @@ from scrapy.http import Request, Response
 from scrapy.http.request import NO_CALLBACK
 from scrapy.pipelines.files import FileException
 from scrapy.pipelines.images import ImagesPipeline
-from scrapy.pipelines.media import MediaPipeline
+from scrapy.pipelines.media import MediaPipeline, MediaResultCache
 from scrapy.settings import Settings
 from scrapy.spiders import Spider
 from scrapy.utils.deprecate import ScrapyDeprecationWarning
@@ -378,6 +380,94 @@ class MediaPipelineTestCase(BaseMediaPipelineTestCase):
         )
 
 
+class MediaPipelineResultCacheSizeTestCase(BaseMediaPipelineTestCase):
+    pipeline_class = MockedMediaPipeline
+    settings = {"MEDIA_RESULT_CACHE_SIZE": 1}
+
+    @inlineCallbacks
+    def test_results_are_evicted(self):
+        self.assertIsInstance(self.info.downloaded, MediaResultCache)
+        req1 = Request("http://url1")
+        req2 = Request("http://url2")
+        yield self.pipe.process_item(dict(requests=req1), self.spider)
+        yield self.pipe.process_item(dict(requests=req2), self.spider)
+        self.assertNotIn(self.fingerprint(req1), self.info.downloaded)
+        self.assertIn(self.fingerprint(req2), self.info.downloaded)
+
+        # evicted results are downloaded again
+        yield self.pipe.process_item(dict(requests=req1), self.spider)
+        self.assertEqual(self.pipe._mockcalled.count("media_downloaded"), 3)
+
+
+class MediaResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.jobdir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.jobdir)
+
+    def _get_cache(self, **settings):
+        crawler = get_crawler(Spider, settings)
+        spider = crawler._create_spider("test")
+        crawler.stats.open_spider(spider)
+        cache = MediaResultCache(crawler.settings, "testpipeline")
+        cache.open_spider(spider)
+        return cache, crawler.stats
+
+    def test_eviction(self):
+        cache, stats = self._get_cache(MEDIA_RESULT_CACHE_SIZE=2)
+        cache[b"a"] = {"path": "a"}
+        cache[b"b"] = {"path": "b"}
+        self.assertEqual(cache.get(b"a"), {"path": "a"})
+        cache[b"c"] = {"path": "c"}
+        self.assertEqual(len(cache), 2)
+        self.assertIn(b"a", cache)
+        self.assertNotIn(b"b", cache)
+        self.assertIsNone(cache.get(b"b"))
+        with self.assertRaises(KeyError):
+            cache[b"b"]
+        self.assertEqual(cache[b"c"], {"path": "c"})
+        self.assertEqual(stats.get_value("media_result_cache/hit"), 2)
+        self.assertEqual(stats.get_value("media_result_cache/miss"), 2)
+        self.assertEqual(stats.get_value("media_result_cache/eviction"), 1)
+        cache.close_spider(None)
+
+    def test_no_size_limit(self):
+        cache, stats = self._get_cache(MEDIA_RESULT_CACHE_SIZE=0)
+        for i in range(100):
+            cache[str(i).encode()] = {}
+        self.assertEqual(len(cache), 100)
+        self.assertIsNone(stats.get_value("media_result_cache/eviction"))
+
+    def test_persist(self):
+        settings = {
+            "JOBDIR": self.jobdir,
+            "MEDIA_RESULT_CACHE_PERSIST": True,
+            "MEDIA_RESULT_CACHE_SIZE": 1,
+        }
+        cache, stats = self._get_cache(**settings)
+        cache[b"a"] = {"path": "a"}
+        cache[b"b"] = {"path": "b"}
+        self.assertEqual(len(cache), 1)
+        self.assertIn(b"a", cache)
+        self.assertEqual(cache.get(b"a"), {"path": "a"})
+        self.assertEqual(stats.get_value("media_result_cache/disk_hit"), 1)
+        cache[b"c"] = Failure(ValueError())
+        cache.close_spider(None)
+
+        cache, stats = self._get_cache(**settings)
+        self.assertEqual(cache.get(b"a"), {"path": "a"})
+        self.assertEqual(cache.get(b"b"), {"path": "b"})
+        self.assertIsNone(cache.get(b"c"))
+        self.assertEqual(stats.get_value("media_result_cache/disk_hit"), 2)
+        self.assertEqual(stats.get_value("media_result_cache/miss"), 1)
+        cache.close_spider(None)
+
+    def test_persist_without_jobdir(self):
+        cache, _ = self._get_cache(MEDIA_RESULT_CACHE_PERSIST=True)
+        self.assertIsNone(cache.db)
+
+
 class MockedMediaPipelineDeprecatedMethods(ImagesPipeline):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -3,6 +3,7 @@ import unittest
 
 import queuelib
 
+from scrapy import signals
 from scrapy.http.request import Request
 from scrapy.pqueues import DownloaderAwarePriorityQueue, ScrapyPriorityQueue
 from scrapy.spiders import Spider
@@ -93,13 +94,58 @@ class PriorityQueueTest(unittest.TestCase):
         self.assertEqual(dequeued.priority, req3.priority)
         self.assertEqual(queue.close(), [-1, -2])
 
+    def test_queue_push_pop_many_priorities(self):
+        temp_dir = tempfile.mkdtemp()
+        queue = ScrapyPriorityQueue.from_crawler(
+            self.crawler, FifoMemoryQueue, temp_dir
+        )
+        priorities = [7, -3, 0, 7, 12, -3, 5, 100, -50, 0]
+        for i, priority in enumerate(priorities):
+            queue.push(Request(f"https://example.org/{i}", priority=priority))
+        self.assertEqual(len(queue), len(priorities))
+        self.assertEqual(queue.curprio, -100)
+        dequeued = []
+        while len(queue):
+            dequeued.append(queue.pop().priority)
+        self.assertEqual(dequeued, sorted(priorities, reverse=True))
+        self.assertIsNone(queue.curprio)
+        self.assertIsNone(queue.pop())
+        self.assertEqual(queue.close(), [])
+
+    def test_queue_push_after_pop(self):
+        temp_dir = tempfile.mkdtemp()
+        queue = ScrapyPriorityQueue.from_crawler(
+            self.crawler, FifoMemoryQueue, temp_dir
+        )
+        queue.push(Request("https://example.org/1", priority=1))
+        queue.push(Request("https://example.org/2", priority=2))
+        self.assertEqual(queue.pop().url, "https://example.org/2")
+        queue.push(Request("https://example.org/3", priority=3))
+        queue.push(Request("https://example.org/2", priority=2))
+        self.assertEqual(queue.pop().url, "https://example.org/3")
+        self.assertEqual(queue.pop().url, "https://example.org/2")
+        self.assertEqual(queue.pop().url, "https://example.org/1")
+        self.assertIsNone(queue.pop())
+
+    def test_queue_empty_startprios(self):
+        temp_dir = tempfile.mkdtemp()
+        queue = ScrapyPriorityQueue.from_crawler(
+            self.crawler, FifoMemoryQueue, temp_dir, [-5, -1, -5]
+        )
+        self.assertEqual(queue.curprio, -5)
+        req = Request("https://example.org/1", priority=0)
+        queue.push(req)
+        self.assertEqual(queue.pop().url, req.url)
+        self.assertIsNone(queue.curprio)
+        self.assertEqual(queue.close(), [])
+
 
 class DownloaderAwarePriorityQueueTest(unittest.TestCase):
     def setUp(self):
-        crawler = get_crawler(Spider)
-        crawler.engine = MockEngine(downloader=MockDownloader())
+        self.crawler = get_crawler(Spider)
+        self.crawler.engine = MockEngine(downloader=MockDownloader())
         self.queue = DownloaderAwarePriorityQueue.from_crawler(
-            crawler=crawler,
+            crawler=self.crawler,
             downstream_queue_cls=FifoMemoryQueue,
             key="foo/bar",
         )
@@ -155,3 +201,75 @@ class DownloaderAwarePriorityQueueTest(unittest.TestCase):
         self.assertEqual(self.queue.peek().url, req3.url)
         self.assertEqual(self.queue.pop().url, req3.url)
         self.assertIsNone(self.queue.peek())
+
+    def test_slot_activity_signals(self):
+        downloader = self.crawler.engine.downloader
+        for url in ("https://a.example/1", "https://a.example/2"):
+            downloader.increment("a.example")
+            self.queue.push(Request(url))
+        downloader.increment("b.example")
+        self.queue.push(Request("https://b.example/1"))
+
+        # downloads finish in a.example; the request is still counted as
+        # active when request_left_downloader is sent
+        for i in range(2):
+            self.crawler.signals.send_catch_log(
+                signal=signals.request_left_downloader,
+                request=Request(f"https://a.example/{i}"),
+                spider=None,
+            )
+            downloader.decrement("a.example")
+
+        self.assertEqual(self.queue.pop().url, "https://a.example/1")
+
+        # a new download starts in a.example
+        downloader.increment("a.example")
+        downloader.increment("a.example")
+        self.crawler.signals.send_catch_log(
+            signal=signals.request_reached_downloader,
+            request=Request("https://a.example/3"),
+            spider=None,
+        )
+        self.assertEqual(self.queue.pop().url, "https://b.example/1")
+        self.assertEqual(self.queue.pop().url, "https://a.example/2")
+        self.assertIsNone(self.queue.pop())
+
+    def test_slot_heap_rebuilt_on_signals(self):
+        downloader = self.crawler.engine.downloader
+        for domain in ("a", "b", "c"):
+            self.queue.push(Request(f"https://{domain}.example/1"))
+        downloader.increment("a.example")
+        downloader.increment("c.example")
+        # without signals, slots are not re-ordered in the heap
+        self.assertEqual(self.queue.peek().url, "https://b.example/1")
+        self.assertEqual(self.queue._slot_heap[0][2], "a.example")
+
+        for signal in (
+            signals.request_reached_downloader,
+            signals.request_left_downloader,
+        ):
+            self.crawler.signals.send_catch_log(
+                signal=signal, request=Request("https://d.example"), spider=None
+            )
+        self.assertEqual(len(self.queue._slot_heap), 3)
+        self.assertEqual(self.queue._slot_heap[0][2], "b.example")
+        self.assertEqual(self.queue.pop().url, "https://b.example/1")
+
+    def test_slot_activity_without_signals(self):
+        downloader = self.crawler.engine.downloader
+        for _ in range(3):
+            downloader.increment("b.example")
+        downloader.increment("a.example")
+        self.queue.push(Request("https://a.example/1"))
+        self.queue.push(Request("https://b.example/1"))
+        self.queue.push(Request("https://c.example/1"))
+        self.assertEqual(self.queue.pop().url, "https://c.example/1")
+
+        # downloads finish in b.example, and start in a.example, without
+        # request_left_downloader and request_reached_downloader signals
+        for _ in range(3):
+            downloader.decrement("b.example")
+        downloader.increment("a.example")
+        self.assertEqual(self.queue.pop().url, "https://b.example/1")
+        self.assertEqual(self.queue.pop().url, "https://a.example/1")
+        self.assertIsNone(self.queue.pop())
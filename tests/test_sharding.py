@@ -0,0 +1,141 @@
+import queue
+from datetime import datetime
+from unittest import TestCase, mock
+
+from testfixtures import LogCapture
+
+from scrapy import Request, Spider
+from scrapy.core.sharding import (
+    ShardedCrawler,
+    ShardScheduler,
+    _jump_hash,
+    _merge_stats,
+    _Shard,
+)
+from scrapy.utils.test import get_crawler
+from tests.test_scheduler import MockDownloader
+
+
+class JumpHashTest(TestCase):
+    def test_range(self):
+        for buckets in (1, 2, 7, 32):
+            for i in range(100):
+                self.assertIn(
+                    _jump_hash(f"example{i}.com".encode(), buckets), range(buckets)
+                )
+
+    def test_stable(self):
+        self.assertEqual(_jump_hash(b"example.com", 8), _jump_hash(b"example.com", 8))
+
+    def test_distribution(self):
+        counts = [0] * 4
+        for i in range(4000):
+            counts[_jump_hash(f"example{i}.com".encode(), 4)] += 1
+        for count in counts:
+            self.assertGreater(count, 800)
+
+    def test_consistent(self):
+        # Adding a bucket only moves keys to the new bucket
+        for i in range(1000):
+            key = f"example{i}.com".encode()
+            before, after = _jump_hash(key, 4), _jump_hash(key, 5)
+            self.assertIn(after, (before, 4))
+
+
+class MergeStatsTest(TestCase):
+    def test_merge(self):
+        stats = [
+            {
+                "start_time": datetime(2023, 1, 1, 0, 0, 1),
+                "finish_time": datetime(2023, 1, 1, 0, 1),
+                "elapsed_time_seconds": 59.0,
+                "item_scraped_count": 3,
+                "request_depth_max": 2,
+                "memusage/max": 100,
+                "finish_reason": "finished",
+            },
+            {
+                "start_time": datetime(2023, 1, 1, 0, 0, 0),
+                "finish_time": datetime(2023, 1, 1, 0, 2),
+                "elapsed_time_seconds": 120.0,
+                "item_scraped_count": 4,
+                "request_depth_max": 5,
+                "memusage/max": 50,
+                "finish_reason": "finished",
+                "log_count/ERROR": 1,
+            },
+        ]
+        self.assertEqual(
+            _merge_stats(stats),
+            {
+                "start_time": datetime(2023, 1, 1, 0, 0, 0),
+                "finish_time": datetime(2023, 1, 1, 0, 2),
+                "elapsed_time_seconds": 120.0,
+                "item_scraped_count": 7,
+                "request_depth_max": 5,
+                "memusage/max": 100,
+                "finish_reason": "finished",
+                "log_count/ERROR": 1,
+            },
+        )
+
+
+class ShardSchedulerTest(TestCase):
+    def test_outside_sharded_crawl(self):
+        crawler = get_crawler(settings_dict={"SCHEDULER": ShardScheduler})
+        with self.assertRaises(RuntimeError):
+            ShardScheduler.from_crawler(crawler)
+
+    def test_closed_shard(self):
+        crawler = get_crawler(Spider)
+        crawler.engine = mock.Mock(downloader=MockDownloader())
+        spider = crawler._create_spider("foo")
+        crawler.stats.open_spider(spider)
+        inboxes = [queue.Queue(), queue.Queue()]
+        shard = _Shard(0, 2, inboxes, queue.Queue(), forward_items=False)
+        scheduler = ShardScheduler(crawler, mock.Mock(df=None), shard)
+        scheduler.spider = spider
+        slots = [str(i) for i in range(10)]
+        owners = {slot: _jump_hash(slot.encode(), 2) for slot in slots}
+        other = next(slot for slot in slots if owners[slot] == 1)
+
+        request = Request("https://example.com", meta={"download_slot": other})
+        self.assertTrue(scheduler.enqueue_request(request))
+        self.assertEqual(inboxes[1].get_nowait()[0], "request")
+
+        inboxes[0].put(("shard_closed", 1))
+        scheduler._poll()
+        with LogCapture() as log:
+            for _ in range(2):
+                self.assertFalse(scheduler.enqueue_request(request.copy()))
+        self.assertEqual(str(log).count("Dropping"), 1)
+        self.assertTrue(inboxes[1].empty())
+        self.assertEqual(crawler.stats.get_value("sharding/dropped_requests"), 2)
+        self.assertEqual(crawler.stats.get_value("sharding/forwarded_requests"), 1)
+
+
+class _FakeProcess:
+    def __init__(self, polls):
+        self.polls = polls
+
+    def join(self, timeout=None):
+        self.polls -= 1
+
+    def is_alive(self):
+        return self.polls > 0
+
+
+class ShardedCrawlerTest(TestCase):
+    def test_join_workers(self):
+        crawler = ShardedCrawler(Spider, {"CRAWLER_SHARDS": 2})
+        crawler._inboxes = [queue.Queue(), queue.Queue()]
+        crawler._outbox = queue.Queue()
+        crawler._processes = [_FakeProcess(1), _FakeProcess(3)]
+        crawler._inboxes[0].put(("request", {}))
+        crawler._inboxes[1].put(("shard_closed", 0))
+        crawler._inboxes[1].put(("request", {}))
+        crawler._outbox.put(("status", 1, True, 0, 0))
+        self.assertEqual(crawler._join_workers(), 2)
+        self.assertFalse(any(process.is_alive() for process in crawler._processes))
+        for message_queue in [*crawler._inboxes, crawler._outbox]:
+            self.assertTrue(message_queue.empty())
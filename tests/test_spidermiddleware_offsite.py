@@ -1,3 +1,4 @@
+import re
 import warnings
 from unittest import TestCase
 from urllib.parse import urlparse
@@ -6,6 +7,7 @@ from scrapy.http import Request, Response
 from scrapy.spidermiddlewares.offsite import OffsiteMiddleware, PortWarning, URLWarning
 from scrapy.spiders import Spider
 from scrapy.utils.test import get_crawler
+from scrapy.utils.url import DomainSet
 
 
 class TestOffsiteMiddleware(TestCase):
@@ -100,3 +102,81 @@ class TestOffsiteMiddleware6(TestOffsiteMiddleware4):
             warnings.simplefilter("always")
             self.mw.get_host_regex(self.spider)
             assert issubclass(w[-1].category, PortWarning)
+
+
+class TestOffsiteMiddleware7(TestOffsiteMiddleware):
+    def _get_spiderargs(self):
+        return dict(name="foo", allowed_domains=["http://scrapytest.org"])
+
+    def test_process_spider_output(self):
+        res = Response("http://scrapytest.org")
+        reqs = [Request("http://scrapytest.org/1"), Request("http://scrapy.org/1")]
+        out = list(self.mw.process_spider_output(res, reqs, self.spider))
+        self.assertEqual(out, [])
+
+
+class TestOffsiteMiddlewareDomainSet(TestOffsiteMiddleware):
+    def _get_spiderargs(self):
+        return dict(
+            name="foo",
+            allowed_domains=DomainSet(
+                ["scrapytest.org", "scrapy.org", "scrapy.test.org"]
+            ),
+        )
+
+    def test_update(self):
+        self.assertIs(self.mw.allowed_domains, self.spider.allowed_domains)
+        res = Response("http://scrapytest.org")
+        reqs = [Request("http://scrapy.org/1"), Request("http://example.com/1")]
+        out = list(self.mw.process_spider_output(res, reqs, self.spider))
+        self.assertEqual(out, reqs[:1])
+        self.spider.allowed_domains.add("example.com")
+        self.spider.allowed_domains.discard("scrapy.org")
+        out = list(self.mw.process_spider_output(res, reqs, self.spider))
+        self.assertEqual(out, reqs[1:])
+
+
+class HostRegexOffsiteMiddleware(OffsiteMiddleware):
+    def get_host_regex(self, spider):
+        return re.compile(r"^(.*\.)?scrapytest\.org$")
+
+
+class TestOffsiteMiddlewareHostRegex(TestCase):
+    def test_get_host_regex_override(self):
+        crawler = get_crawler(Spider)
+        spider = crawler._create_spider(name="foo", allowed_domains=["scrapy.org"])
+        mw = HostRegexOffsiteMiddleware.from_crawler(crawler)
+        mw.spider_opened(spider)
+        res = Response("http://scrapytest.org")
+        reqs = [Request("http://www.scrapytest.org/1"), Request("http://scrapy.org/1")]
+        out = list(mw.process_spider_output(res, reqs, spider))
+        self.assertEqual(out, reqs[:1])
+
+    def test_host_regex(self):
+        crawler = get_crawler(Spider)
+        spider = crawler._create_spider(name="foo", allowed_domains=["scrapy.org"])
+        mw = OffsiteMiddleware.from_crawler(crawler)
+        mw.spider_opened(spider)
+        self.assertTrue(mw.host_regex.search("www.scrapy.org"))
+        self.assertFalse(mw.host_regex.search("scrapytest.org"))
+
+        mw.host_regex = re.compile(r"^scrapytest\.org$")
+        res = Response("http://scrapytest.org")
+        reqs = [Request("http://scrapytest.org/1"), Request("http://scrapy.org/1")]
+        out = list(mw.process_spider_output(res, reqs, spider))
+        self.assertEqual(out, reqs[:1])
+
+    def test_should_follow_override(self):
+        class ShouldFollowOffsiteMiddleware(OffsiteMiddleware):
+            def should_follow(self, request, spider):
+                host = urlparse(request.url).hostname
+                return host.startswith("www.") and bool(self.host_regex.search(host))
+
+        crawler = get_crawler(Spider)
+        spider = crawler._create_spider(name="foo", allowed_domains=["scrapy.org"])
+        mw = ShouldFollowOffsiteMiddleware.from_crawler(crawler)
+        mw.spider_opened(spider)
+        res = Response("http://scrapy.org")
+        reqs = [Request("http://www.scrapy.org/1"), Request("http://scrapy.org/1")]
+        out = list(mw.process_spider_output(res, reqs, spider))
+        self.assertEqual(out, reqs[:1])
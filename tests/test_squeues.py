@@ -1,5 +1,9 @@
 import pickle
+import shutil
 import sys
+import tempfile
+import unittest
+from pathlib import Path
 
 from queuelib.tests import test_queue as t
 
@@ -8,6 +12,8 @@ from scrapy.item import Field, Item
 from scrapy.loader import ItemLoader
 from scrapy.selector import Selector
 from scrapy.squeues import (
+    _BinaryFifoSerializationDiskQueue,
+    _BinaryLifoSerializationDiskQueue,
     _MarshalFifoSerializationDiskQueue,
     _MarshalLifoSerializationDiskQueue,
     _PickleFifoSerializationDiskQueue,
@@ -185,3 +191,147 @@ class PickleLifoDiskQueueTest(t.LifoDiskQueueTest, LifoDiskQueueTestMixin):
         assert isinstance(r2, Request)
         self.assertEqual(r.url, r2.url)
         assert r2.meta["request"] is r2
+
+
+def _request_dict(i, **kwargs):
+    request = Request(
+        f"http://www.example.com/{i}",
+        headers={"Accept": "text/html", "X-Number": str(i)},
+        meta={"depth": i, "download_slot": "www.example.com"},
+        cb_kwargs={"page": i},
+        **kwargs,
+    )
+    return request.to_dict()
+
+
+class BinaryDiskQueueTestMixin:
+    batch_size = 1024 * 1024
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="scrapy-queue-tests-")
+        self.qpath = Path(self.tmpdir, "queue")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def queue(self):
+        return self.queue_class(self.qpath, batch_size=self.batch_size)
+
+    def ordered(self, items):
+        return items
+
+    def test_serialize(self):
+        q = self.queue()
+        requests = [_request_dict(i) for i in range(5)]
+        for request in requests:
+            q.push(request)
+        self.assertEqual(len(q), 5)
+        self.assertEqual(q.peek(), self.ordered(requests)[0])
+        self.assertEqual([q.pop() for _ in range(5)], self.ordered(requests))
+        self.assertEqual(len(q), 0)
+        self.assertIsNone(q.peek())
+        self.assertIsNone(q.pop())
+        q.close()
+        self.assertFalse(self.qpath.exists())
+
+    def test_pickle_fallback(self):
+        q = self.queue()
+        request = _request_dict(1)
+        request["meta"][1] = {"set": {1, 2}}
+        request["meta"]["item"] = TestItem(name="foo")
+        q.push(request)
+        request2 = q.pop()
+        self.assertEqual(request2, request)
+        self.assertIsInstance(request2["meta"]["item"], TestItem)
+        q.close()
+
+    def test_nonserializable_object(self):
+        q = self.queue()
+        request = _request_dict(1)
+        request["meta"]["rejected_key"] = lambda x: x
+        self.assertRaises(ValueError, q.push, request)
+        self.assertEqual(len(q), 0)
+        q.push(_request_dict(2))
+        q.close()
+        q = self.queue()
+        self.assertEqual(q.pop(), _request_dict(2))
+        q.close()
+
+    def test_close_open(self):
+        requests = [_request_dict(i, priority=i) for i in range(100)]
+        q = self.queue()
+        for request in requests[:50]:
+            q.push(request)
+        q.close()
+        q = self.queue()
+        self.assertEqual(len(q), 50)
+        for request in requests[50:]:
+            q.push(request)
+        q.close()
+        q = self.queue()
+        self.assertEqual(len(q), 100)
+        self.assertEqual([q.pop() for _ in range(100)], self.ordered(requests))
+        q.close()
+
+    def test_interleaved(self):
+        q = self.queue()
+        expected = self.ordered([_request_dict(i) for i in range(20)])
+        q.push(_request_dict(0))
+        q.push(_request_dict(1))
+        popped = [q.pop()]
+        for i in range(2, 20):
+            q.push(_request_dict(i))
+            if i % 3 == 0:
+                popped.append(q.pop())
+        popped.extend(q.pop() for _ in range(len(q)))
+        self.assertCountEqual(popped, expected)
+        q.close()
+
+    def test_strings_are_interned(self):
+        q = self.queue()
+        for i in range(100):
+            q.push(_request_dict(i))
+        q.close()
+        strings = (self.qpath / "strings").read_bytes()
+        self.assertEqual(strings.count(b"download_slot"), 1)
+        self.assertEqual(strings.count(b"X-Number"), 1)
+
+
+class BinaryFifoDiskQueueTest(BinaryDiskQueueTestMixin, unittest.TestCase):
+    queue_class = _BinaryFifoSerializationDiskQueue
+
+    def test_compact(self):
+        q = self.queue()
+        q._COMPACT_SIZE = 1
+        q._COPY_CHUNK_SIZE = 7
+        requests = [_request_dict(i) for i in range(10)]
+        for request in requests:
+            q.push(request)
+        q._flush()
+        self.assertEqual([q.pop() for _ in range(6)], requests[:6])
+        size = q._size
+        q.push(_request_dict(10))
+        q._flush()
+        self.assertEqual(q._head, 0)
+        self.assertLess(q._size, size)
+        self.assertEqual((self.qpath / "records").stat().st_size, q._size)
+        self.assertFalse((self.qpath / "records.tmp").exists())
+        self.assertEqual(
+            [q.pop() for _ in range(5)], requests[6:] + [_request_dict(10)]
+        )
+        q.close()
+
+
+class BinaryFifoDiskQueueSmallBatchTest(BinaryFifoDiskQueueTest):
+    batch_size = 1
+
+
+class BinaryLifoDiskQueueTest(BinaryDiskQueueTestMixin, unittest.TestCase):
+    queue_class = _BinaryLifoSerializationDiskQueue
+
+    def ordered(self, items):
+        return items[::-1]
+
+
+class BinaryLifoDiskQueueSmallBatchTest(BinaryLifoDiskQueueTest):
+    batch_size = 1
@@ -7,6 +7,8 @@ import queuelib
 from scrapy.http import Request
 from scrapy.spiders import Spider
 from scrapy.squeues import (
+    BinaryFifoDiskQueue,
+    BinaryLifoDiskQueue,
     FifoMemoryQueue,
     LifoMemoryQueue,
     MarshalFifoDiskQueue,
@@ -216,6 +218,16 @@ class MarshalLifoDiskQueueRequestTest(LifoQueueMixin, BaseQueueTestCase):
         )
 
 
+class BinaryFifoDiskQueueRequestTest(FifoQueueMixin, BaseQueueTestCase):
+    def queue(self):
+        return BinaryFifoDiskQueue.from_crawler(crawler=self.crawler, key="binary/fifo")
+
+
+class BinaryLifoDiskQueueRequestTest(LifoQueueMixin, BaseQueueTestCase):
+    def queue(self):
+        return BinaryLifoDiskQueue.from_crawler(crawler=self.crawler, key="binary/lifo")
+
+
 class FifoMemoryQueueRequestTest(FifoQueueMixin, BaseQueueTestCase):
     def queue(self):
         return FifoMemoryQueue.from_crawler(crawler=self.crawler)
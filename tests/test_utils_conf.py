@@ -212,6 +212,8 @@ class FeedExportConfigTestCase(unittest.TestCase):
                 "store_empty": True,
                 "uri_params": (1, 2, 3, 4),
                 "batch_item_count": 2,
+                "buffer_item_count": 0,
+                "buffer_timeout": 1.0,
                 "item_export_kwargs": {},
             },
         )
@@ -240,6 +242,8 @@ class FeedExportConfigTestCase(unittest.TestCase):
                 "store_empty": True,
                 "uri_params": None,
                 "batch_item_count": 2,
+                "buffer_item_count": 0,
+                "buffer_timeout": 1.0,
                 "item_export_kwargs": {},
             },
         )
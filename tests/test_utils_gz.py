@@ -1,9 +1,11 @@
+import gzip
 import unittest
 from pathlib import Path
 
 from w3lib.encoding import html_to_unicode
 
 from scrapy.http import Response
+from scrapy.utils._compression import _DecompressionMaxSizeExceeded, _GzipDecoder
 from scrapy.utils.gz import gunzip, gzip_magic_number
 from tests import tests_datadir
 
@@ -55,3 +57,25 @@ class GunzipTest(unittest.TestCase):
         )
         self.assertEqual(len(text), len(expected_text))
         self.assertEqual(text, expected_text)
+
+    def test_gunzip_max_size(self):
+        data = (SAMPLEDIR / "feed-sample1.xml.gz").read_bytes()
+        size = len(gunzip(data))
+        self.assertEqual(len(gunzip(data, max_size=size)), size)
+        self.assertRaises(
+            _DecompressionMaxSizeExceeded, gunzip, data, max_size=size - 1
+        )
+
+    def test_gunzip_multiple_members(self):
+        data = gzip.compress(b"foo") + gzip.compress(b"bar")
+        self.assertEqual(gunzip(data), b"foobar")
+
+    def test_gzip_decoder_chunks(self):
+        body = (SAMPLEDIR / "feed-sample1.xml").read_bytes()
+        data = gzip.compress(body)
+        decoder = _GzipDecoder()
+        output = b"".join(
+            decoder.decompress(data[i : i + 7]) for i in range(0, len(data), 7)
+        )
+        self.assertEqual(output + decoder.flush(), body)
+        self.assertEqual(decoder.size, len(body))
@@ -12,6 +12,7 @@ from scrapy.http import Request
 from scrapy.utils.deprecate import ScrapyDeprecationWarning
 from scrapy.utils.python import to_bytes
 from scrapy.utils.request import (
+    StreamingRequestFingerprinter,
     _deprecated_fingerprint_cache,
     _fingerprint_cache,
     _request_fingerprint_as_bytes,
@@ -370,6 +371,139 @@ class RequestFingerprintAsBytesTest(FingerprintTest):
         self.assertEqual(actual, expected)
 
 
+def _streaming_fingerprint(request, compatibility=None, **kwargs):
+    fingerprinter = StreamingRequestFingerprinter(compatibility=compatibility, **kwargs)
+    return fingerprinter.fingerprint(request)
+
+
+class StreamingRequestFingerprinterTest(FingerprintTest):
+    function = staticmethod(_streaming_fingerprint)
+    known_hashes = (
+        (
+            Request("http://example.org"),
+            b"\x15Y\xf7K\xe6Uaq\xcf\x7f(\xb3\xc8\xec\x16Qep^\xaf",
+            {},
+        ),
+        (
+            Request("https://example.org?a=b&a=c"),
+            b"\x82\x14Z\x08*O\xc9\x07X\x14u\xd9\x1b\xefd+\xcd`\xcb\\",
+            {},
+        ),
+        (
+            Request("https://example.org", method="POST", body=b"a"),
+            b"\x8a\xfb\xbf\x8f\xed\x9aA\x98^A,j~\xd6Y\x8el\x05I\x1d",
+            {},
+        ),
+        (
+            Request("https://example.org#a", headers={"A": b"B"}),
+            b"\x8c\x80\x8f.\xef\x1c\xe4\x9bFrU\xc6N\x9f#\xaa9\xa2\x88t",
+            {"include_headers": ["A"], "keep_fragments": True},
+        ),
+        (
+            Request("https://example.org/a", body=b"b"),
+            b"9\xa0\x0f\xf5\xee \x03F\x9au\x01\xf2\xd0\xdb\xf7\x9f\x13\xa0\x02y",
+            {},
+        ),
+    )
+
+    def test_caching(self):
+        fingerprinter = StreamingRequestFingerprinter()
+        r1 = Request("http://www.example.com/hnnoticiaj1.aspx?78160,199")
+        fp = fingerprinter.fingerprint(r1)
+        self.assertEqual(list(r1._fingerprints.values()), [fp])
+        r1._fingerprints[fingerprinter._key] = b"cached"
+        self.assertEqual(fingerprinter.fingerprint(r1), b"cached")
+        self.assertEqual(
+            StreamingRequestFingerprinter(hash_name="blake2b").fingerprint(r1),
+            StreamingRequestFingerprinter(hash_name="blake2b").fingerprint(r1.copy()),
+        )
+        self.assertEqual(len(r1._fingerprints), 2)
+
+    def test_hash_name(self):
+        request = Request("http://www.example.com")
+        fingerprints = {
+            StreamingRequestFingerprinter(hash_name=hash_name).fingerprint(request)
+            for hash_name in ("sha1", "blake2b", "sha256")
+        }
+        self.assertEqual(len(fingerprints), 3)
+        self.assertEqual(
+            len(
+                StreamingRequestFingerprinter(hash_name="blake2b").fingerprint(request)
+            ),
+            20,
+        )
+
+    def test_xxhash(self):
+        xxhash = pytest.importorskip("xxhash")
+        request = Request("http://www.example.com")
+        fingerprint = StreamingRequestFingerprinter(hash_name="xxhash").fingerprint(
+            request
+        )
+        self.assertEqual(len(fingerprint), xxhash.xxh3_128().digest_size)
+
+    def test_invalid_hash_name(self):
+        with self.assertRaises(ValueError):
+            StreamingRequestFingerprinter(hash_name="foo")
+
+    def test_invalid_compatibility(self):
+        with self.assertRaises(ValueError):
+            StreamingRequestFingerprinter(compatibility="2.5")
+        with self.assertRaises(ValueError):
+            StreamingRequestFingerprinter(hash_name="blake2b", compatibility="2.7")
+
+    def test_from_crawler(self):
+        settings = {
+            "REQUEST_FINGERPRINTER_CLASS": StreamingRequestFingerprinter,
+            "REQUEST_FINGERPRINTER_HASH": "blake2b",
+            "REQUEST_FINGERPRINTER_INCLUDE_HEADERS": ["X-ID"],
+            "REQUEST_FINGERPRINTER_KEEP_FRAGMENTS": True,
+        }
+        crawler = get_crawler(settings_dict=settings)
+        request = Request("http://www.example.com#a", headers={"X-ID": "1"})
+        self.assertEqual(
+            crawler.request_fingerprinter.fingerprint(request),
+            _streaming_fingerprint(
+                request.copy(),
+                hash_name="blake2b",
+                include_headers=["X-ID"],
+                keep_fragments=True,
+            ),
+        )
+
+
+def _streaming_fingerprint_2_7(request, **kwargs):
+    return _streaming_fingerprint(request, compatibility="2.7", **kwargs)
+
+
+class StreamingRequestFingerprinter27Test(FingerprintTest):
+    function = staticmethod(_streaming_fingerprint_2_7)
+
+    def test_caching(self):
+        r1 = Request("http://www.example.com/hnnoticiaj1.aspx?78160,199")
+        self.assertEqual(self.function(r1), *r1._fingerprints.values())
+
+    def test_non_ascii(self):
+        request = Request(
+            'http://www.example.com/\u00e9"?q=\\', headers={"X": ["\u00e9", "b"]}
+        )
+        self.assertEqual(
+            self.function(request, include_headers=["X"]),
+            fingerprint(request, include_headers=["X"]),
+        )
+
+
+def _streaming_fingerprint_2_6(request, **kwargs):
+    return _streaming_fingerprint(request, compatibility="2.6", **kwargs)
+
+
+class StreamingRequestFingerprinter26Test(RequestFingerprintAsBytesTest):
+    function = staticmethod(_streaming_fingerprint_2_6)
+
+    def test_caching(self):
+        r1 = Request("http://www.example.com/hnnoticiaj1.aspx?78160,199")
+        self.assertEqual(self.function(r1), *r1._fingerprints.values())
+
+
 _fingerprint_cache_2_6: Mapping[Request, Tuple[None, bool]] = WeakKeyDictionary()
 
 
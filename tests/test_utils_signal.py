@@ -7,7 +7,7 @@ from twisted.internet import defer, reactor
 from twisted.python.failure import Failure
 from twisted.trial import unittest
 
-from scrapy.utils.signal import send_catch_log, send_catch_log_deferred
+from scrapy.utils.signal import disconnect_all, send_catch_log, send_catch_log_deferred
 from scrapy.utils.test import get_from_asyncio_queue
 
 
@@ -103,3 +103,75 @@ class SendCatchLogTest2(unittest.TestCase):
         self.assertEqual(len(log.records), 1)
         self.assertIn("Cannot return deferreds from signal handler", str(log))
         dispatcher.disconnect(test_handler, test_signal)
+
+
+class SendCatchLogReceiversTest(unittest.TestCase):
+    def setUp(self):
+        self.signal = object()
+        self.sender = object()
+        self.calls = []
+
+    def tearDown(self):
+        disconnect_all(self.signal)
+        disconnect_all(self.signal, sender=self.sender)
+
+    def send(self, **kwargs):
+        return send_catch_log(self.signal, sender=self.sender, **kwargs)
+
+    def handler(self, arg):
+        self.calls.append(("handler", arg))
+        return "handler"
+
+    def test_no_receivers(self):
+        self.assertEqual(self.send(arg=1), [])
+        self.assertEqual(self.successResultOf(send_catch_log_deferred(self.signal)), [])
+
+    def test_connect_disconnect(self):
+        self.assertEqual(self.send(arg=1), [])
+        dispatcher.connect(self.handler, self.signal, sender=self.sender)
+        self.assertEqual(self.send(arg=2), [(self.handler, "handler")])
+
+        def any_sender_handler(signal, sender, **kwargs):
+            self.calls.append(("any_sender_handler", signal, sender, kwargs))
+
+        dispatcher.connect(any_sender_handler, self.signal)
+        self.send(arg=3)
+        dispatcher.disconnect(self.handler, self.signal, sender=self.sender)
+        self.send(arg=4)
+        self.assertEqual(
+            self.calls,
+            [
+                ("handler", 2),
+                ("handler", 3),
+                ("any_sender_handler", self.signal, self.sender, {"arg": 3}),
+                ("any_sender_handler", self.signal, self.sender, {"arg": 4}),
+            ],
+        )
+
+    def test_accepted_arguments(self):
+        class Receiver:
+            def __call__(self, arg, other=None):
+                return (arg, other)
+
+        def no_arguments():
+            return "no_arguments"
+
+        receiver = Receiver()
+        for handler in (receiver, no_arguments):
+            dispatcher.connect(handler, self.signal, sender=self.sender)
+        for _ in range(2):
+            self.assertEqual(
+                self.send(arg=1, unknown=2),
+                [(receiver, (1, None)), (no_arguments, "no_arguments")],
+            )
+
+    def test_dead_receiver(self):
+        class Receiver:
+            def handler(self, arg):
+                return arg
+
+        receiver = Receiver()
+        dispatcher.connect(receiver.handler, self.signal, sender=self.sender)
+        self.assertEqual(len(self.send(arg=1)), 1)
+        del receiver
+        self.assertEqual(self.send(arg=1), [])
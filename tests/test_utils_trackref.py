@@ -87,3 +87,16 @@ Foo                                 1   oldest: 0s ago\n\n""",
             set(trackref.iter_all("Foo")),
             {o1, o3},
         )
+
+    def test_set_tracking(self):
+        o1 = Foo()  # NOQA
+        trackref.set_tracking(False)
+        try:
+            o2 = Foo()  # NOQA
+        finally:
+            trackref.set_tracking(True)
+        o3 = Foo()  # NOQA
+        self.assertEqual(
+            set(trackref.iter_all("Foo")),
+            {o1, o3},
+        )
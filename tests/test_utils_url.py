@@ -1,9 +1,17 @@
+import threading
+import time
 import unittest
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from w3lib.url import canonicalize_url as _canonicalize_url
 
 from scrapy.linkextractors import IGNORED_EXTENSIONS
 from scrapy.spiders import Spider
 from scrapy.utils.misc import arg_to_iter
 from scrapy.utils.url import (
+    CanonicalURLCache,
+    DomainSet,
     _is_filesystem_path,
     add_http_if_no_scheme,
     guess_scheme,
@@ -609,5 +617,149 @@ class IsPathTestCase(unittest.TestCase):
             )
 
 
+class CanonicalURLCacheTest(unittest.TestCase):
+    def test_canonicalize_url(self):
+        cache = CanonicalURLCache()
+        url = "http://www.example.com/do?b=2&a=1#frag"
+        self.assertEqual(
+            cache.canonicalize_url(url), "http://www.example.com/do?a=1&b=2"
+        )
+        self.assertEqual(
+            cache.canonicalize_url(url, keep_fragments=True),
+            "http://www.example.com/do?a=1&b=2#frag",
+        )
+        self.assertEqual(
+            cache.canonicalize_url(url), "http://www.example.com/do?a=1&b=2"
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_eviction(self):
+        cache = CanonicalURLCache(limit=2)
+        cache.canonicalize_url("http://a.example")
+        cache.canonicalize_url("http://b.example")
+        cache.canonicalize_url("http://a.example")
+        cache.canonicalize_url("http://c.example")
+        self.assertEqual(len(cache), 2)
+        cache.canonicalize_url("http://a.example")
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+        cache.canonicalize_url("http://b.example")
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_disabled(self):
+        cache = CanonicalURLCache(limit=0)
+        cache.canonicalize_url("http://a.example")
+        cache.canonicalize_url("http://a.example")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_threads(self):
+        class SwitchingDict(OrderedDict):
+            # lets other threads run between a lookup and what follows it
+            def __getitem__(self, key):
+                value = super().__getitem__(key)
+                time.sleep(0.0001)
+                return value
+
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                time.sleep(0.0001)
+                return value
+
+        cache = CanonicalURLCache(limit=2)
+        cache._cache = SwitchingDict()
+        urls = [f"http://a.example/?b={i}&a={i}" for i in range(3)]
+        errors = []
+
+        def canonicalize():
+            try:
+                for i in range(200):
+                    url = urls[i % len(urls)]
+                    self.assertEqual(
+                        cache.canonicalize_url(url), _canonicalize_url(url)
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=canonicalize) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 2)
+        self.assertEqual(cache.hits + cache.misses, 4 * 200)
+
+    def test_uncached_arguments(self):
+        cache = CanonicalURLCache()
+        self.assertEqual(
+            cache.canonicalize_url("http://a.example/?q=\xe9", encoding="latin1"),
+            "http://a.example/?q=%E9",
+        )
+        self.assertEqual(
+            cache.canonicalize_url(urlparse("http://a.example/?b&a")),
+            "http://a.example/?a=&b=",
+        )
+        self.assertEqual(len(cache), 0)
+
+
+class DomainSetTest(unittest.TestCase):
+    def test_matches(self):
+        domains = DomainSet(["Example.com", "sub.example.org", "192.169.0.15:8080"])
+        for host in (
+            "example.com",
+            "www.example.com",
+            "a.b.example.com",
+            "sub.example.org",
+            "www.sub.example.org",
+            "192.169.0.15:8080",
+        ):
+            self.assertTrue(domains.matches(host), host)
+        for host in (
+            "",
+            "com",
+            "example.org",
+            "notexample.com",
+            "example.com.evil.net",
+            "notsub.example.org",
+            "192.169.0.15",
+        ):
+            self.assertFalse(domains.matches(host), host)
+
+    def test_set(self):
+        domains = DomainSet(["example.com", "EXAMPLE.COM"])
+        self.assertEqual(len(domains), 1)
+        self.assertIn("Example.com", domains)
+        self.assertNotIn("www.example.com", domains)
+        self.assertNotIn(None, domains)
+        self.assertEqual(set(domains), {"example.com"})
+        self.assertEqual(repr(domains), "DomainSet(['example.com'])")
+        self.assertFalse(DomainSet())
+
+    def test_update(self):
+        domains = DomainSet()
+        self.assertFalse(domains.matches("www.example.com"))
+        domains.add("example.com")
+        self.assertTrue(domains.matches("www.example.com"))
+        domains |= ["example.org"]
+        self.assertTrue(domains.matches("www.example.org"))
+        domains.discard("Example.com")
+        domains.discard("example.net")
+        self.assertFalse(domains.matches("www.example.com"))
+        self.assertEqual(set(domains), {"example.org"})
+
+    def test_url_is_from_any_domain(self):
+        domains = DomainSet(["wheele-bin-art.CO.UK", "192.169.0.15:8080"])
+        for url, expected in (
+            ("http://www.wheele-bin-art.co.uk/get/product/123", True),
+            ("http://www.Wheele-Bin-Art.co.uk/get/product/123", True),
+            ("http://art.co.uk/get/product/123", False),
+            ("http://192.169.0.15:8080/mypage.html", True),
+            ("http://192.169.0.15/mypage.html", False),
+            ("javascript:%20document.orderform.submit%28%29", False),
+        ):
+            self.assertEqual(url_is_from_any_domain(url, domains), expected, url)
+            self.assertEqual(url_is_from_any_domain(url, list(domains)), expected, url)
+
+
 if __name__ == "__main__":
     unittest.main()